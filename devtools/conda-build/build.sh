@@ -1,12 +1,12 @@
 #!/usr/bin/env bash
 set -ex
 
-# 1) Build JS bundle (viewer.js) into molsysviewer/
+# 1) Build JS loader (viewer.js) and code-split bundle (bundle/) into molsysviewer/
 pushd js
 # Si usas package-lock, mejor npm ci; si no, npm install
 npm ci || npm install
 npm run build
 popd
 
-# 2) Install Python package (which now includes viewer.js as package-data)
+# 2) Install Python package (which now includes viewer.js and bundle/ as package-data)
 $PYTHON -m pip install . --no-deps --ignore-installed -vv
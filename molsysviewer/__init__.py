@@ -4,11 +4,13 @@ def __print_version__():
     print("MolSysViewer version " + __version__)
 
 from .viewer import MolSysView
+from .group import MolSysViewGroup
 from .load import load
 from .demo import demo
 
 __all__ = [
     "MolSysView",
+    "MolSysViewGroup",
     "load",
     "demo",
 ]
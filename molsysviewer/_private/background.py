@@ -0,0 +1,121 @@
+# molsysviewer/_private/background.py
+
+"""Cargas en segundo plano (``load(..., background=True)`` / `load_async`).
+
+La conversión con MolSysMT y la serialización del payload se ejecutan en un
+pool de hilos compartido; el kernel queda libre y el resultado se aplica a la
+vista (estado + envío al frontend) desde el propio hilo al terminar, igual
+que los frames de un `TrajectoryPlayer`.
+
+Cada estructura guarda su último `LoadJob`: empezar otra carga en la misma
+estructura cancela la anterior. Si aún no había empezado no llega a
+ejecutarse; si está convirtiendo, se detiene en la siguiente etapa y su
+resultado se descarta. La aplicación del resultado y la cancelación se
+serializan con el mismo lock, así que una carga cancelada nunca toca la
+vista.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+#: Hilos del pool compartido por todas las vistas.
+MAX_WORKERS = 2
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="molsysviewer-load")
+        return _executor
+
+
+class LoadJob:
+    """A load running in a worker thread.
+
+    Returned by ``MolSysView.load(..., background=True)`` and
+    ``MolSysView.load_async``. It can be awaited in a notebook cell
+    (``await view.load_async(...)``) or waited on with `result`.
+    """
+
+    def __init__(
+        self,
+        prepare: Callable[[Callable[[], None]], Any],
+        apply: Callable[[Any], Any],
+        lock: threading.Lock,
+    ) -> None:
+        self._prepare = prepare
+        self._apply = apply
+        self._lock = lock
+        self._cancel = threading.Event()
+        self._applied = False
+        self._future: Future = _get_executor().submit(self._run)
+
+    def _check(self) -> None:
+        """Lanzar CancelledError si la carga fue sustituida (se llama entre etapas)."""
+        if self._cancel.is_set():
+            raise CancelledError()
+
+    def _run(self) -> Any:
+        try:
+            self._check()
+            prepared = self._prepare(self._check)
+            with self._lock:
+                self._check()
+                self._applied = True
+                return self._apply(prepared)
+        finally:
+            # Las closures retienen el sistema de entrada: soltarlas (la vista guarda el LoadJob).
+            self._prepare = self._apply = None
+
+    def cancel(self) -> bool:
+        """Cancel the load; return False if its result was already applied."""
+        with self._lock:
+            if self._applied:
+                return False
+            self._cancel.set()
+        if self._future.cancel():
+            self._prepare = self._apply = None
+        return True
+
+    def cancelled(self) -> bool:
+        """Whether the load was cancelled before its result was applied."""
+        return self._cancel.is_set() and not self._applied
+
+    def done(self) -> bool:
+        """Whether the load finished, failed or was cancelled."""
+        return self._future.done()
+
+    def result(self, timeout: float | None = None) -> Any:
+        """Wait for the load and return its result (a `StructureHandle` for keyed loads).
+
+        Raises ``concurrent.futures.CancelledError`` if the load was
+        cancelled and re-raises any error of the conversion.
+        """
+        return self._future.result(timeout)
+
+    def exception(self, timeout: float | None = None) -> BaseException | None:
+        return self._future.exception(timeout)
+
+    def add_done_callback(self, fn: Callable[["LoadJob"], Any]) -> None:
+        """Call ``fn(job)`` when the load finishes (in the worker thread)."""
+        self._future.add_done_callback(lambda _future: fn(self))
+
+    def __await__(self):
+        return asyncio.wrap_future(self._future).__await__()
+
+    def __repr__(self) -> str:
+        if self.cancelled():
+            state = "cancelled"
+        elif self.done():
+            state = "failed" if self._future.exception() is not None else "done"
+        else:
+            state = "running"
+        return f"<LoadJob {state}>"
@@ -0,0 +1,399 @@
+# molsysviewer/_private/bcif.py
+
+"""Codificador BinaryCIF mínimo y vectorizado (numpy).
+
+Implementa el subconjunto de BinaryCIF 0.3 que necesita el viewer para
+enviar `atom_site` (+ enlaces y celda) al decodificador de Mol*:
+
+- ``ByteArray`` (enteros/floats little-endian),
+- ``FixedPoint`` (floats → Int32 con un factor),
+- ``Delta`` y ``RunLength`` (Int32 → Int32),
+- ``IntegerPacking`` (Int32 → Int8/Int16/Uint8/Uint16),
+- ``StringArray`` (cadenas → índices + tabla de cadenas).
+
+Las cadenas de codificaciones se eligen por columna probando las mismas
+combinaciones que el clasificador de Mol* y quedándose con la más pequeña.
+El contenedor es MessagePack, con un empaquetador propio (sin dependencias).
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+
+BCIF_VERSION = "0.3.0"
+
+# Encoding.IntDataType / Encoding.FloatDataType de Mol*
+INT8, INT16, INT32, UINT8, UINT16, UINT32 = 1, 2, 3, 4, 5, 6
+FLOAT32, FLOAT64 = 32, 33
+
+_DTYPE_CODES = {
+    np.dtype("<i1"): INT8,
+    np.dtype("<i2"): INT16,
+    np.dtype("<i4"): INT32,
+    np.dtype("<u1"): UINT8,
+    np.dtype("<u2"): UINT16,
+    np.dtype("<u4"): UINT32,
+    np.dtype("<f4"): FLOAT32,
+    np.dtype("<f8"): FLOAT64,
+}
+
+
+# ---------------------------------------------------------------------------
+#  Codificaciones de arrays
+# ---------------------------------------------------------------------------
+
+
+def byte_array(data: np.ndarray) -> tuple[list[dict], bytes]:
+    array = np.ascontiguousarray(data)
+    array = array.astype(array.dtype.newbyteorder("<"), copy=False)
+    return [{"kind": "ByteArray", "type": _DTYPE_CODES[array.dtype]}], array.tobytes()
+
+
+def fixed_point(data: np.ndarray, factor: float) -> tuple[dict, np.ndarray]:
+    src_type = FLOAT32 if data.dtype == np.float32 else FLOAT64
+    encoded = np.rint(np.asarray(data, dtype=np.float64) * factor).astype(np.int32)
+    return {"kind": "FixedPoint", "factor": factor, "srcType": src_type}, encoded
+
+
+def delta(data: np.ndarray) -> tuple[dict, np.ndarray]:
+    data = np.asarray(data, dtype=np.int32)
+    if data.size == 0:
+        return {"kind": "Delta", "origin": 0, "srcType": INT32}, data
+    output = np.empty_like(data)
+    output[0] = 0
+    np.subtract(data[1:], data[:-1], out=output[1:])
+    return {"kind": "Delta", "origin": int(data[0]), "srcType": INT32}, output
+
+
+def run_length(data: np.ndarray) -> tuple[dict, np.ndarray]:
+    data = np.asarray(data, dtype=np.int32)
+    encoding = {"kind": "RunLength", "srcType": INT32, "srcSize": int(data.size)}
+    if data.size == 0:
+        return encoding, data
+    starts = np.flatnonzero(np.concatenate(([True], data[1:] != data[:-1])))
+    lengths = np.diff(np.append(starts, data.size))
+    output = np.empty(2 * starts.size, dtype=np.int32)
+    output[0::2] = data[starts]
+    output[1::2] = lengths
+    return encoding, output
+
+
+def _packing_counts(data: np.ndarray, upper: int, signed: bool) -> np.ndarray:
+    """Número de palabras de relleno (límite) que necesita cada valor."""
+    values = data.astype(np.int64)
+    if not signed:
+        return values // upper
+    lower = -upper - 1
+    return np.where(values >= 0, values // upper, values // lower)
+
+
+def integer_packing(data: np.ndarray) -> tuple[list[dict], bytes]:
+    """Int32 → Int8/Int16/Uint8/Uint16 con palabras de desbordamiento, o Int32 si no compensa."""
+    data = np.asarray(data, dtype=np.int32)
+    n = int(data.size)
+    signed = bool(n and data.min() < 0)
+    limit8, limit16 = (0x7F, 0x7FFF) if signed else (0xFF, 0xFFFF)
+
+    extra8 = _packing_counts(data, limit8, signed)
+    extra16 = _packing_counts(data, limit16, signed)
+    size8 = n + int(extra8.sum())
+    size16 = n + int(extra16.sum())
+
+    if n * 4 < size16 * 2:
+        return byte_array(data)
+    if size16 * 2 < size8:
+        byte_count, upper, extra, size = 2, limit16, extra16, size16
+    else:
+        byte_count, upper, extra, size = 1, limit8, extra8, size8
+
+    lower = -upper - 1
+    values = data.astype(np.int64)
+    fill = np.where(values >= 0, upper, lower)
+    remainder = values - extra * fill
+
+    packed = np.repeat(fill, extra + 1)
+    packed[np.cumsum(extra + 1) - 1] = remainder
+    assert packed.size == size
+
+    dtype = {(1, True): np.int8, (2, True): np.int16, (1, False): np.uint8, (2, False): np.uint16}[(byte_count, signed)]
+    byte_encoding, raw = byte_array(packed.astype(dtype))
+    return [{"kind": "IntegerPacking", "byteCount": byte_count, "isUnsigned": not signed, "srcSize": n}] + byte_encoding, raw
+
+
+def encode_int_array(data: Any) -> tuple[list[dict], bytes]:
+    """Elegir la mejor cadena entre IP, Delta+IP, RL+IP y Delta+RL+IP."""
+    data = np.asarray(data, dtype=np.int32)
+    best: tuple[list[dict], bytes] | None = None
+    for use_delta, use_rle in ((False, False), (True, False), (False, True), (True, True)):
+        encodings: list[dict] = []
+        current = data
+        if use_delta:
+            step, current = delta(current)
+            encodings.append(step)
+        if use_rle:
+            step, current = run_length(current)
+            encodings.append(step)
+        tail, raw = integer_packing(current)
+        if best is None or len(raw) < len(best[1]):
+            best = (encodings + tail, raw)
+    assert best is not None
+    return best
+
+
+def encode_float_array(data: Any, *, digits: int = 3) -> tuple[list[dict], bytes]:
+    data = np.asarray(data, dtype=np.float32)
+    head, fixed = fixed_point(data, float(10**digits))
+    tail, raw = encode_int_array(fixed)
+    return [head] + tail, raw
+
+
+def encode_string_array(data: Sequence[str] | np.ndarray) -> tuple[list[dict], bytes]:
+    values = np.asarray(data, dtype=object).astype(str)
+    unique, indices = np.unique(values, return_inverse=True)
+    lengths = np.fromiter((len(s) for s in unique), dtype=np.int32, count=unique.size)
+    offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int32)
+
+    offset_encoding, offset_bytes = encode_int_array(offsets)
+    data_encoding, data_bytes = encode_int_array(indices.astype(np.int32))
+    return [
+        {
+            "kind": "StringArray",
+            "dataEncoding": data_encoding,
+            "stringData": "".join(unique.tolist()),
+            "offsetEncoding": offset_encoding,
+            "offsets": offset_bytes,
+        }
+    ], data_bytes
+
+
+def encode_column(name: str, values: Any, kind: str) -> dict:
+    if kind == "int":
+        encoding, raw = encode_int_array(values)
+    elif kind == "float":
+        encoding, raw = encode_float_array(values)
+    elif kind == "float64":
+        encoding, raw = byte_array(np.asarray(values, dtype=np.float64))
+    elif kind == "str":
+        encoding, raw = encode_string_array(values)
+    else:  # pragma: no cover - uso interno
+        raise ValueError(f"Unknown BinaryCIF column kind: {kind!r}")
+    return {"name": name, "data": {"encoding": encoding, "data": raw}}
+
+
+def encode_category(name: str, columns: Iterable[tuple[str, Any, str]], row_count: int) -> dict:
+    return {
+        "name": f"_{name}",
+        "rowCount": int(row_count),
+        "columns": [encode_column(column, values, kind) for column, values, kind in columns],
+    }
+
+
+def encode_file(header: str, categories: list[dict], *, encoder: str = "molsysviewer") -> bytes:
+    return packb(
+        {
+            "version": BCIF_VERSION,
+            "encoder": encoder,
+            "dataBlocks": [{"header": header, "categories": categories}],
+        }
+    )
+
+
+# ---------------------------------------------------------------------------
+#  Payload MolSys → BinaryCIF
+# ---------------------------------------------------------------------------
+
+_POLYMER_RESIDUES = frozenset(
+    "ALA ARG ASN ASP CYS GLN GLU GLY HIS ILE LEU LYS MET PHE PRO SER THR TRP TYR VAL "
+    "SEC PYL ASX GLX UNK HID HIE HIP HSD HSE HSP CYX ASH GLH LYN "
+    "A C G U I DA DC DG DT DI DU N".split()
+)
+
+_BOND_ORDERS = {1: "sing", 2: "doub", 3: "trip", 4: "quad"}
+
+
+def encode_molsys_payload(payload: dict[str, Any], *, header: str = "MOLSYS") -> bytes:
+    """Encode a MolSys payload (see ``_viewer_json_to_payload``) as BinaryCIF.
+
+    Each coordinate frame becomes one model (``pdbx_PDB_model_num``), bonds go
+    to ``molstar_bond_site`` and the first frame's box to ``cell``.
+    """
+    atoms = payload["atoms"]
+    frames = payload["coordinates"]
+    n_atoms = len(atoms["atom_id"])
+    n_frames = len(frames)
+    rows = n_atoms * n_frames
+
+    def tiled(values: Any, dtype=None) -> np.ndarray:
+        array = np.asarray(values, dtype=dtype)
+        return np.tile(array, n_frames) if n_frames > 1 else array
+
+    atom_ids = np.asarray(atoms["atom_id"], dtype=np.int32)
+    residue_names = np.asarray(atoms["residue_name"], dtype=object).astype(str)
+    group_pdb = np.where(np.isin(residue_names, list(_POLYMER_RESIDUES)), "ATOM", "HETATM")
+
+    positions = np.concatenate([np.asarray(frame["positions"], dtype=np.float32).reshape(n_atoms, 3) for frame in frames])
+    model_num = np.repeat(np.arange(1, n_frames + 1, dtype=np.int32), n_atoms)
+
+    atom_site = [
+        ("group_PDB", tiled(group_pdb), "str"),
+        ("id", tiled(atom_ids), "int"),
+        ("type_symbol", tiled(atoms["element_symbol"]), "str"),
+        ("label_atom_id", tiled(atoms["atom_name"]), "str"),
+        ("label_comp_id", tiled(residue_names), "str"),
+        ("label_asym_id", tiled(atoms["chain_id"]), "str"),
+        ("label_entity_id", tiled(np.asarray(atoms["entity_id"], dtype=object).astype(str)), "str"),
+        ("label_seq_id", tiled(atoms["residue_id"], np.int32), "int"),
+        ("Cartn_x", positions[:, 0], "float"),
+        ("Cartn_y", positions[:, 1], "float"),
+        ("Cartn_z", positions[:, 2], "float"),
+        ("occupancy", np.ones(rows, dtype=np.float32), "float"),
+        ("B_iso_or_equiv", np.zeros(rows, dtype=np.float32), "float"),
+        ("pdbx_formal_charge", tiled(atoms["formal_charge"], np.int32), "int"),
+        ("auth_seq_id", tiled(atoms["residue_id"], np.int32), "int"),
+        ("auth_comp_id", tiled(residue_names), "str"),
+        ("auth_asym_id", tiled(atoms["chain_id"]), "str"),
+        ("auth_atom_id", tiled(atoms["atom_name"]), "str"),
+        ("pdbx_PDB_model_num", model_num, "int"),
+    ]
+    categories = [encode_category("atom_site", atom_site, rows)]
+
+    cell = frames[0].get("cell") if frames else None
+    if cell:
+        categories.append(
+            encode_category(
+                "cell",
+                [(f"length_{axis}", [cell[axis]], "float64") for axis in ("a", "b", "c")]
+                + [(f"angle_{angle}", [cell[angle]], "float64") for angle in ("alpha", "beta", "gamma")],
+                1,
+            )
+        )
+        categories.append(encode_category("symmetry", [("space_group_name_H-M", ["P 1"], "str")], 1))
+
+    bonds = payload.get("bonds")
+    if bonds and len(bonds.get("indexA", ())):
+        index_a = np.asarray(bonds["indexA"], dtype=np.int64)
+        index_b = np.asarray(bonds["indexB"], dtype=np.int64)
+        orders = bonds.get("order")
+        orders = np.ones(index_a.size, dtype=np.int32) if orders is None else np.asarray(orders, dtype=np.int32)
+        value_order = np.array([_BOND_ORDERS.get(int(order), "sing") for order in orders], dtype=object)
+        categories.append(
+            encode_category(
+                "molstar_bond_site",
+                [
+                    ("atom_id_1", atom_ids[index_a], "int"),
+                    ("atom_id_2", atom_ids[index_b], "int"),
+                    ("value_order", value_order, "str"),
+                    ("type_id", np.full(index_a.size, "covale", dtype=object), "str"),
+                ],
+                index_a.size,
+            )
+        )
+
+    return encode_file(header, categories)
+
+
+# ---------------------------------------------------------------------------
+#  MessagePack (subconjunto que entiende mol-io/common/msgpack/decode.ts)
+# ---------------------------------------------------------------------------
+
+
+def packb(obj: Any) -> bytes:
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+
+def _pack(obj: Any, out: bytearray) -> None:
+    if obj is None:
+        out.append(0xC0)
+    elif obj is True:
+        out.append(0xC3)
+    elif obj is False:
+        out.append(0xC2)
+    elif isinstance(obj, (int, np.integer)):
+        _pack_int(int(obj), out)
+    elif isinstance(obj, (float, np.floating)):
+        out.append(0xCB)
+        out += struct.pack(">d", float(obj))
+    elif isinstance(obj, str):
+        raw = obj.encode("utf-8")
+        n = len(raw)
+        if n < 32:
+            out.append(0xA0 | n)
+        elif n < 0x100:
+            out += bytes((0xD9, n))
+        elif n < 0x10000:
+            out.append(0xDA)
+            out += struct.pack(">H", n)
+        else:
+            out.append(0xDB)
+            out += struct.pack(">I", n)
+        out += raw
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        n = len(obj)
+        if n < 0x100:
+            out += bytes((0xC4, n))
+        elif n < 0x10000:
+            out.append(0xC5)
+            out += struct.pack(">H", n)
+        else:
+            out.append(0xC6)
+            out += struct.pack(">I", n)
+        out += obj
+    elif isinstance(obj, (list, tuple)):
+        n = len(obj)
+        if n < 16:
+            out.append(0x90 | n)
+        elif n < 0x10000:
+            out.append(0xDC)
+            out += struct.pack(">H", n)
+        else:
+            out.append(0xDD)
+            out += struct.pack(">I", n)
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, dict):
+        n = len(obj)
+        if n < 16:
+            out.append(0x80 | n)
+        elif n < 0x10000:
+            out.append(0xDE)
+            out += struct.pack(">H", n)
+        else:
+            out.append(0xDF)
+            out += struct.pack(">I", n)
+        for key, value in obj.items():
+            _pack(str(key), out)
+            _pack(value, out)
+    else:
+        raise TypeError(f"Cannot MessagePack-encode {type(obj).__name__}")
+
+
+def _pack_int(value: int, out: bytearray) -> None:
+    if 0 <= value < 0x80:
+        out.append(value)
+    elif -32 <= value < 0:
+        out.append(value & 0xFF)
+    elif 0 <= value < 0x100:
+        out += bytes((0xCC, value))
+    elif 0 <= value < 0x10000:
+        out.append(0xCD)
+        out += struct.pack(">H", value)
+    elif 0 <= value < 0x100000000:
+        out.append(0xCE)
+        out += struct.pack(">I", value)
+    elif -0x80 <= value < 0:
+        out.append(0xD0)
+        out += struct.pack(">b", value)
+    elif -0x8000 <= value < 0:
+        out.append(0xD1)
+        out += struct.pack(">h", value)
+    elif -0x80000000 <= value < 0:
+        out.append(0xD2)
+        out += struct.pack(">i", value)
+    else:
+        # El decodificador de Mol* no soporta enteros de 64 bits.
+        raise OverflowError(f"Integer out of 32-bit range for BinaryCIF: {value}")
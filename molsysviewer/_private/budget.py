@@ -0,0 +1,188 @@
+# molsysviewer/_private/budget.py
+
+"""Ventana de frames y presupuesto de tamaño de las cargas.
+
+`load_from_molsysmt` materializa y serializa en JSON todas las estructuras
+pedidas; una trayectoria larga produce fácilmente un payload de gigabytes que
+agota la memoria del kernel (y la del navegador). Antes de convertir nada,
+`plan_structure_indices` resuelve ``start``/``stop``/``stride`` a índices de
+estructura, estima el tamaño del payload a partir del número de átomos y de
+frames y, si supera los límites de `LoadLimits`, aumenta el stride o lanza un
+`ValueError` explicando cómo ajustar la carga.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass
+from typing import Any
+
+import molsysmt as msm
+import numpy as np
+from molsysmt import pyunitwizard as puw
+
+from .variables import is_all
+
+logger = logging.getLogger(__name__)
+
+ON_EXCEED = ("subsample", "raise")
+
+# Bytes aproximados del payload JSON: por átomo de la topología (ids, nombres,
+# residuo, cadena, entidad, elemento, carga y enlaces) y por posición de un
+# átomo en un frame ("[x, y, z]" con floats de Python, ~20 caracteres cada uno).
+BYTES_PER_ATOM = 96
+BYTES_PER_POSITION = 66
+
+
+@dataclass
+class LoadLimits:
+    """Límites de tamaño de una carga.
+
+    Parameters
+    ----------
+    max_payload_bytes
+        Tamaño máximo estimado del payload; None no limita.
+    max_frames
+        Número máximo de frames; None no limita.
+    on_exceed
+        "subsample" aumenta el stride hasta respetar los límites; "raise"
+        rechaza la carga con un `ValueError`.
+    """
+
+    max_payload_bytes: int | None = None
+    max_frames: int | None = None
+    on_exceed: str = "subsample"
+
+    def __post_init__(self) -> None:
+        if self.on_exceed not in ON_EXCEED:
+            raise ValueError(f"on_exceed must be one of {ON_EXCEED}, got {self.on_exceed!r}")
+        if self.max_payload_bytes is not None:
+            self.max_payload_bytes = int(self.max_payload_bytes)
+            if self.max_payload_bytes <= 0:
+                raise ValueError("max_payload_bytes must be positive.")
+        if self.max_frames is not None:
+            self.max_frames = int(self.max_frames)
+            if self.max_frames < 1:
+                raise ValueError("max_frames must be at least 1.")
+
+    @property
+    def active(self) -> bool:
+        return self.max_payload_bytes is not None or self.max_frames is not None
+
+
+def estimate_payload_bytes(n_atoms: int, n_frames: int) -> int:
+    """Tamaño aproximado (bytes) del payload JSON de `n_atoms` átomos y `n_frames` frames."""
+    return int(n_atoms) * (BYTES_PER_ATOM + BYTES_PER_POSITION * int(n_frames))
+
+
+def plan_structure_indices(
+    molecular_system: Any,
+    *,
+    selection: str | Any = "all",
+    structure_indices: str | Any = "all",
+    syntax: str = "MolSysMT",
+    start: Any = None,
+    stop: Any = None,
+    stride: int | None = None,
+    limits: LoadLimits | None = None,
+) -> tuple[Any, dict[str, Any] | None]:
+    """Índices de estructura a cargar y resumen de la decisión.
+
+    `start`/`stop` son índices de estructura (``stop`` excluido, negativos
+    desde el final) o cantidades de tiempo (``puw``) comparadas con el tiempo
+    de cada estructura. Sin ventana, stride ni límites activos se devuelve
+    `structure_indices` sin consultar el sistema. El resumen (None en ese caso)
+    incluye frames disponibles y elegidos, stride efectivo y bytes estimados.
+    """
+    limits = limits if limits is not None else LoadLimits()
+    if start is None and stop is None and stride is None and not limits.active:
+        return structure_indices, None
+
+    if stride is not None:
+        stride = int(stride)
+        if stride < 1:
+            raise ValueError("stride must be at least 1.")
+
+    n_structures = int(msm.get(molecular_system, element="system", n_structures=True))
+    if is_all(structure_indices):
+        candidates = np.arange(n_structures)
+    else:
+        candidates = np.asarray(structure_indices, dtype=np.int64).reshape(-1)
+
+    keep = np.ones(candidates.size, dtype=bool)
+    times = None
+    for bound, is_start in ((start, True), (stop, False)):
+        if bound is None:
+            continue
+        if puw.is_quantity(bound):
+            if times is None:
+                times = msm.get(molecular_system, element="system", structure_indices=candidates, time=True)
+            values = np.asarray(puw.get_value(times, to_unit=puw.get_unit(bound)), dtype=float).reshape(-1)
+            limit = float(puw.get_value(bound))
+        else:
+            values = candidates
+            limit = int(bound) + n_structures if int(bound) < 0 else int(bound)
+        keep &= values >= limit if is_start else values < limit
+    candidates = candidates[keep]
+    if stride is not None:
+        candidates = candidates[::stride]
+    if candidates.size == 0:
+        raise ValueError("No structures left to load after applying start, stop and stride.")
+
+    report: dict[str, Any] = {
+        "n_structures": n_structures,
+        "n_frames": int(candidates.size),
+        "stride": stride or 1,
+        "subsampled": False,
+    }
+
+    if limits.active:
+        n_atoms = int(msm.get(molecular_system, element="atom", selection=selection, syntax=syntax, n_atoms=True))
+        allowed = candidates.size if limits.max_frames is None else min(candidates.size, limits.max_frames)
+        if limits.max_payload_bytes is not None:
+            per_frame = max(n_atoms * BYTES_PER_POSITION, 1)
+            fitting = (limits.max_payload_bytes - n_atoms * BYTES_PER_ATOM) // per_frame
+            if fitting < 1:
+                raise ValueError(
+                    f"A single structure of {n_atoms} atoms needs about "
+                    f"{_format_bytes(estimate_payload_bytes(n_atoms, 1))}, above "
+                    f"max_payload_bytes={limits.max_payload_bytes}; select fewer atoms or raise the limit."
+                )
+            allowed = min(allowed, int(fitting))
+
+        if allowed < candidates.size:
+            factor = math.ceil(candidates.size / allowed)
+            estimated = _format_bytes(estimate_payload_bytes(n_atoms, candidates.size))
+            if limits.on_exceed == "raise":
+                raise ValueError(
+                    f"Loading {candidates.size} structures of {n_atoms} atoms (about {estimated}) exceeds "
+                    f"the load limits (max_frames={limits.max_frames}, "
+                    f"max_payload_bytes={limits.max_payload_bytes}); pass stride={(stride or 1) * factor} "
+                    f"or a start/stop window, or raise the limits."
+                )
+            candidates = candidates[::factor]
+            report["stride"] = (stride or 1) * factor
+            report["subsampled"] = True
+            logger.warning(
+                "Load of %d structures (about %s) exceeds the load limits; keeping every %d-th structure (%d).",
+                report["n_frames"],
+                estimated,
+                factor,
+                candidates.size,
+            )
+            report["n_frames"] = int(candidates.size)
+        report["n_atoms"] = n_atoms
+        report["estimated_bytes"] = estimate_payload_bytes(n_atoms, candidates.size)
+
+    if is_all(structure_indices) and candidates.size == n_structures:
+        return "all", report
+    return candidates, report
+
+
+def _format_bytes(n_bytes: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if n_bytes < 1024:
+            return f"{n_bytes:.0f} {unit}" if unit == "B" else f"{n_bytes:.1f} {unit}"
+        n_bytes /= 1024
+    return f"{n_bytes:.1f} GB"
@@ -0,0 +1,95 @@
+# molsysviewer/_private/compression.py
+
+"""Compresión transparente de los mensajes de carga con texto (PDB/mmCIF).
+
+Los formatos de coordenadas en texto comprimen ~5–8x. Por encima de un umbral
+el texto se comprime en Python y viaja como buffer binario del widget; el
+frontend lo descomprime con `DecompressionStream` antes de parsearlo. Los
+códecs son exactamente los que soporta `DecompressionStream` en el navegador.
+"""
+
+from __future__ import annotations
+
+import gzip
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any
+
+CODECS = ("gzip", "deflate", "deflate-raw")
+
+
+@dataclass
+class CompressionOptions:
+    """Configuración de la compresión de mensajes de texto.
+
+    Parameters
+    ----------
+    codec
+        "gzip", "deflate" (zlib) o "deflate-raw"; None desactiva la compresión.
+    threshold
+        Tamaño mínimo (bytes UTF-8) a partir del cual se comprime.
+    level
+        Nivel de compresión (1 = rápido, 9 = máximo).
+    """
+
+    codec: str | None = "gzip"
+    threshold: int = 256 * 1024
+    level: int = 6
+
+    def __post_init__(self) -> None:
+        if self.codec is not None and self.codec not in CODECS:
+            raise ValueError(f"codec must be one of {CODECS} or None, got {self.codec!r}")
+        if not 1 <= int(self.level) <= 9:
+            raise ValueError(f"level must be between 1 and 9, got {self.level!r}")
+        self.threshold = int(self.threshold)
+        self.level = int(self.level)
+
+
+def compress(data: bytes, codec: str, level: int = 6) -> bytes:
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if codec == "deflate":
+        return zlib.compress(data, level)
+    if codec == "deflate-raw":
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        return compressor.compress(data) + compressor.flush()
+    raise ValueError(f"Unknown codec: {codec!r}")
+
+
+def send_load_message(view: Any, msg: dict[str, Any]) -> None:
+    """Enviar un mensaje de carga, comprimiendo su texto si procede.
+
+    Sólo afecta a `load_structure_from_string`: si `data` supera el umbral de
+    ``view.compression`` (por defecto `CompressionOptions()`), el texto sale
+    del JSON y viaja comprimido en el primer buffer, con ``compression`` = códec.
+    La razón y el tiempo de compresión quedan en ``view.stats["compression"]``.
+    """
+    options = getattr(view, "compression", None) or CompressionOptions()
+    data = msg.get("data")
+    if msg.get("op") != "load_structure_from_string" or not isinstance(data, str) or options.codec is None:
+        view._send(msg)
+        return
+
+    raw = data.encode("utf-8")
+    if len(raw) < options.threshold:
+        view._send(msg)
+        return
+
+    start = time.perf_counter()
+    blob = compress(raw, options.codec, options.level)
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+    stats = getattr(view, "stats", None)
+    if isinstance(stats, dict):
+        stats["compression"] = {
+            "codec": options.codec,
+            "raw_bytes": len(raw),
+            "bytes": len(blob),
+            "ratio": len(raw) / len(blob) if blob else None,
+            "compress_ms": elapsed_ms,
+        }
+
+    compressed = {key: value for key, value in msg.items() if key != "data"}
+    compressed["compression"] = options.codec
+    view._send(compressed, buffers=[blob])
@@ -0,0 +1,290 @@
+# molsysviewer/_private/fetch.py
+
+"""Cliente HTTP mínimo con pool de conexiones y caché en disco.
+
+Sólo usa la biblioteca estándar (`http.client`). Las conexiones se reutilizan
+por (esquema, host, puerto) mientras el servidor acepte keep-alive, y las
+respuestas con `ETag`/`Last-Modified` se guardan en disco y se revalidan con
+peticiones condicionales: una recarga sin cambios cuesta un `304` sin cuerpo.
+Como `urllib`, respeta los proxies del entorno (``http_proxy``/``https_proxy``/
+``no_proxy``): HTTP va al proxy con la URL absoluta y HTTPS por un túnel
+``CONNECT``.
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import hashlib
+import http.client
+import json
+import os
+import tempfile
+import threading
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass, field
+from pathlib import Path
+
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+_MAX_REDIRECTS = 5
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+@dataclass
+class FetchResult:
+    """Respuesta de `HTTPSession.get`."""
+
+    url: str
+    status: int
+    body: bytes
+    headers: dict[str, str] = field(default_factory=dict)
+    from_cache: bool = False
+
+    def text(self, encoding: str = "utf-8") -> str:
+        return self.body.decode(encoding, errors="replace")
+
+
+def _proxy_for(scheme: str, host: str) -> str | None:
+    """URL del proxy del entorno para `scheme`/`host` (None sin proxy o si `no_proxy` lo excluye)."""
+    proxy = urllib.request.getproxies().get(scheme)
+    if not proxy or urllib.request.proxy_bypass(host):
+        return None
+    return proxy if "://" in proxy else f"http://{proxy}"
+
+
+def _proxy_headers(proxy: str) -> dict[str, str]:
+    """Cabecera ``Proxy-Authorization`` con las credenciales de la URL del proxy, si las tiene."""
+    parts = urllib.parse.urlsplit(proxy)
+    if parts.username is None:
+        return {}
+    credentials = f"{urllib.parse.unquote(parts.username)}:{urllib.parse.unquote(parts.password or '')}"
+    return {"Proxy-Authorization": "Basic " + base64.b64encode(credentials.encode("utf-8")).decode("ascii")}
+
+
+def _default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "molsysviewer" / "http"
+
+
+class HTTPSession:
+    """Sesión HTTP con pool de conexiones keep-alive y caché ETag/Last-Modified.
+
+    Parameters
+    ----------
+    cache_dir
+        Directorio de la caché de respuestas. Por defecto
+        ``$MOLSYSVIEWER_HTTP_CACHE_DIR`` o ``~/.cache/molsysviewer/http``.
+        ``False`` desactiva la caché.
+    max_connections_per_host
+        Número máximo de conexiones ociosas conservadas por host.
+    timeout
+        Timeout (s) de cada petición.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | os.PathLike | bool | None = None,
+        *,
+        max_connections_per_host: int = 4,
+        timeout: float = 30.0,
+    ) -> None:
+        if cache_dir is None:
+            cache_dir = os.environ.get("MOLSYSVIEWER_HTTP_CACHE_DIR") or _default_cache_dir()
+        self.cache_dir = None if cache_dir is False else Path(cache_dir)
+        self.max_connections_per_host = int(max_connections_per_host)
+        self.timeout = float(timeout)
+
+        # Conexiones ociosas por (esquema, host, puerto, proxy)
+        self._idle: dict[tuple[str, str, int, str | None], list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+        #: Contadores sencillos (útiles en tests y para diagnosticar el pool).
+        self.stats = {"requests": 0, "connections": 0, "cache_hits": 0, "revalidated": 0}
+
+    # --- API pública ---
+
+    def get(self, url: str, *, use_cache: bool = True) -> FetchResult:
+        """GET `url`, revalidating against the disk cache when possible.
+
+        Raises `OSError` on network errors and on non-2xx responses.
+        """
+        cached = self._cache_load(url) if use_cache else None
+
+        headers = {"Accept-Encoding": "gzip"}
+        if cached is not None:
+            meta = cached[0]
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        current = url
+        for _ in range(_MAX_REDIRECTS + 1):
+            status, response_headers, body = self._request(current, headers)
+            if status in _REDIRECT_STATUSES and "location" in response_headers:
+                current = urllib.parse.urljoin(current, response_headers["location"])
+                continue
+            break
+        else:
+            raise OSError(f"Too many redirects fetching {url}")
+
+        if status == 304 and cached is not None:
+            meta, cached_body = cached
+            self.stats["cache_hits"] += 1
+            self.stats["revalidated"] += 1
+            return FetchResult(url=current, status=200, body=cached_body, headers=meta.get("headers", {}), from_cache=True)
+
+        if not 200 <= status < 300:
+            raise OSError(f"HTTP {status} fetching {current}")
+
+        if use_cache and ("etag" in response_headers or "last-modified" in response_headers):
+            self._cache_store(url, response_headers, body)
+
+        return FetchResult(url=current, status=status, body=body, headers=response_headers)
+
+    def close(self) -> None:
+        """Close every idle pooled connection."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    # --- pool ---
+
+    def _acquire(self, key: tuple[str, str, int, str | None]) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            connections = self._idle.get(key)
+            if connections:
+                return connections.pop(), True
+        scheme, host, port, proxy = key
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        self.stats["connections"] += 1
+        if proxy is None:
+            return cls(host, port, timeout=self.timeout), False
+        proxy_parts = urllib.parse.urlsplit(proxy)
+        proxy_port = proxy_parts.port or (443 if proxy_parts.scheme == "https" else 80)
+        connection = cls(proxy_parts.hostname, proxy_port, timeout=self.timeout)
+        if scheme == "https":
+            # TLS con el servidor de destino dentro de un túnel CONNECT del proxy.
+            connection.set_tunnel(host, port, headers=_proxy_headers(proxy))
+        return connection, False
+
+    def _release(self, key: tuple[str, str, int, str | None], connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            connections = self._idle.setdefault(key, [])
+            if len(connections) < self.max_connections_per_host:
+                connections.append(connection)
+                return
+        connection.close()
+
+    def _request(self, url: str, headers: dict[str, str]) -> tuple[int, dict[str, str], bytes]:
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url!r}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        proxy = _proxy_for(parts.scheme, parts.hostname)
+        key = (parts.scheme, parts.hostname, port, proxy)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        if proxy is not None and parts.scheme == "http":
+            # Un proxy HTTP recibe la URL absoluta (y sus credenciales en cada petición).
+            target = urllib.parse.urlunsplit((parts.scheme, parts.netloc, target, "", ""))
+            headers = {**headers, **_proxy_headers(proxy)}
+
+        while True:
+            connection, reused = self._acquire(key)
+            try:
+                connection.request("GET", target, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except _STALE_CONNECTION_ERRORS:
+                connection.close()
+                # Una conexión del pool cerrada por el servidor: reintentar con una nueva.
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            break
+
+        self.stats["requests"] += 1
+        response_headers = {name.lower(): value for name, value in response.getheaders()}
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(key, connection)
+
+        if response_headers.get("content-encoding", "").lower() == "gzip":
+            body = gzip.decompress(body)
+            response_headers.pop("content-encoding")
+        return response.status, response_headers, body
+
+    # --- caché en disco ---
+
+    def _cache_paths(self, url: str) -> tuple[Path, Path] | None:
+        if self.cache_dir is None:
+            return None
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        directory = self.cache_dir / digest[:2]
+        return directory / f"{digest}.json", directory / f"{digest}.body"
+
+    def _cache_load(self, url: str) -> tuple[dict, bytes] | None:
+        paths = self._cache_paths(url)
+        if paths is None:
+            return None
+        meta_path, body_path = paths
+        try:
+            meta = json.loads(meta_path.read_text())
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+        return meta, body
+
+    def _cache_store(self, url: str, headers: dict[str, str], body: bytes) -> None:
+        paths = self._cache_paths(url)
+        if paths is None:
+            return
+        meta_path, body_path = paths
+        meta = {
+            "url": url,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "headers": {name: headers[name] for name in ("content-type",) if name in headers},
+        }
+        try:
+            meta_path.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_write(body_path, body)
+            _atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+        except OSError:  # pragma: no cover - caché de sólo lectura
+            pass
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+_default_session: HTTPSession | None = None
+_default_session_lock = threading.Lock()
+
+
+def get_default_session() -> HTTPSession:
+    """Sesión compartida por los loaders (un único pool por proceso)."""
+    global _default_session
+    with _default_session_lock:
+        if _default_session is None:
+            _default_session = HTTPSession()
+        return _default_session
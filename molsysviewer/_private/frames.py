@@ -0,0 +1,76 @@
+# molsysviewer/_private/frames.py
+
+"""Serialización por bloques de los frames del payload (`_extract_frames`).
+
+En lugar de convertir frame a frame (``np.asarray`` + ``* 10`` +
+``.tolist()`` por frame), los frames válidos se agrupan en bloques de
+`CHUNK_FRAMES`: cada bloque se apila y se pasa a Å con una sola operación de
+NumPy y se convierte a listas con un único ``tolist``.
+
+No se usa un pool de hilos: ``tolist`` construye objetos de Python con el GIL
+tomado y es casi todo el coste, así que repartir los bloques entre hilos no
+cambia el rendimiento.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+#: Frames por bloque.
+CHUNK_FRAMES = 64
+
+
+def encode_frames(
+    frames: Any,
+    n_atoms: int,
+    *,
+    scale: float = 10.0,
+    convert_cell: Callable[[Any], dict[str, float] | None] | None = None,
+    chunk_frames: int = CHUNK_FRAMES,
+) -> list[dict[str, Any]]:
+    """Frames del ViewerJSON → frames del payload, con posiciones multiplicadas por `scale`.
+
+    Se descartan los frames que no son dict o cuyas posiciones no tienen
+    forma ``(n_atoms, 3)``; el resto conserva su orden.
+    """
+    if not isinstance(frames, list):
+        return []
+
+    kept: list[tuple[int, dict[str, Any], np.ndarray]] = []
+    for index, frame in enumerate(frames):
+        if not isinstance(frame, dict):
+            continue
+        try:
+            positions = np.asarray(frame.get("positions"), dtype=float)
+        except Exception:  # pragma: no cover - runtime guard
+            logger.debug("MolSys payload: unable to convert positions to ndarray", exc_info=True)
+            continue
+        if positions.shape != (n_atoms, 3):
+            continue
+        kept.append((index, frame, positions))
+    if not kept:
+        return []
+
+    encoded: list[list[list[float]]] = []
+    for i in range(0, len(kept), chunk_frames):
+        block = np.stack([positions for _, _, positions in kept[i : i + chunk_frames]])
+        block *= scale
+        encoded.append(block.tolist())
+
+    payload_frames: list[dict[str, Any]] = []
+    rows = (row for chunk in encoded for row in chunk)
+    for (index, frame, _), positions in zip(kept, rows):
+        frame_payload: dict[str, Any] = {
+            "positions": positions,
+            "time": frame.get("time", index),
+        }
+        cell = convert_cell(frame.get("cell")) if convert_cell is not None else None
+        if cell is not None:
+            frame_payload["cell"] = cell
+        payload_frames.append(frame_payload)
+    return payload_frames
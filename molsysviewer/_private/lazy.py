@@ -0,0 +1,94 @@
+# molsysviewer/_private/lazy.py
+
+"""Conversión diferida a MolSys para los loaders de texto y PDB ID.
+
+El frontend sólo necesita el texto (o su BinaryCIF) para pintar; el MolSys y
+la `atom_mask` sólo hacen falta para las selecciones (`hide`/`show`/
+`isolate`). Los loaders envían primero y convierten después: al primer uso
+("lazy") o en un hilo en segundo plano justo tras el envío ("background").
+Quien accede a `view._molsys` antes de que termine espera de forma
+transparente (ver `MolSysView._molsys`).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any, Callable
+
+import molsysmt as msm
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PARSE_MODES = ("eager", "lazy", "background")
+
+
+class DeferredMolSys:
+    """Resultado `(molsys, atom_mask)` de una conversión que se ejecuta una sola vez."""
+
+    def __init__(self, convert: Callable[[], Any]) -> None:
+        self._convert = convert
+        self._lock = threading.Lock()
+        self._done = False
+        self._value: tuple[Any, np.ndarray] | None = None
+        self._error: BaseException | None = None
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def start(self) -> None:
+        """Run the conversion in a daemon thread (no-op if it already ran)."""
+        if self._done:
+            return
+        thread = threading.Thread(target=self._run_quietly, name="molsysviewer-molsys", daemon=True)
+        thread.start()
+
+    def result(self) -> tuple[Any, np.ndarray]:
+        """Return `(molsys, atom_mask)`, converting now or waiting for the background thread."""
+        with self._lock:
+            if not self._done:
+                try:
+                    molsys = self._convert()
+                    n_atoms = msm.get(molsys, element="atom", n_atoms=True)
+                    self._value = (molsys, np.ones(n_atoms, dtype=bool))
+                except BaseException as exc:
+                    self._error = exc
+                finally:
+                    self._done = True
+                    self._convert = None  # liberar el texto de entrada
+        if self._error is not None:
+            raise self._error
+        assert self._value is not None
+        return self._value
+
+    def _run_quietly(self) -> None:
+        try:
+            self.result()
+        except BaseException:
+            # El error se vuelve a lanzar en el hilo que use el MolSys.
+            logger.debug("Background MolSys conversion failed", exc_info=True)
+
+
+def defer_molsys(view: Any, convert: Callable[[], Any], *, parse: str = "background") -> DeferredMolSys | None:
+    """Asignar a `view` el MolSys producido por `convert` según `parse`.
+
+    - ``"eager"``: se convierte ya y se asignan `_molsys` y `atom_mask`.
+    - ``"lazy"``/``"background"``: se registra un `DeferredMolSys` en la vista
+      y se devuelve para que el loader lo arranque tras enviar (``"background"``).
+
+    Las vistas sin soporte de diferido (p. ej. las de los tests) convierten
+    siempre en el acto.
+    """
+    if parse not in PARSE_MODES:
+        raise ValueError(f"parse must be one of {PARSE_MODES}, got {parse!r}")
+
+    deferred = DeferredMolSys(convert)
+    register = getattr(view, "_defer_molsys", None)
+    if parse == "eager" or register is None:
+        view._molsys, view.atom_mask = deferred.result()
+        return None
+
+    register(deferred)
+    return deferred
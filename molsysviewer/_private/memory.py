@@ -0,0 +1,139 @@
+# molsysviewer/_private/memory.py
+
+"""Política de memoria del estado de una vista (ver `MolSysView.set_memory_policy`).
+
+Tras un `load`, la vista puede guardar hasta tres copias del sistema: el
+objeto original (`molecular_system`), el MolSys convertido (`_molsys`) y el
+payload mientras espera a que el frontend esté listo. La política decide:
+
+- ``source``: el objeto original se guarda tal cual ("keep"), por referencia
+  débil ("weak"; los objetos que no la admiten, como rutas o listas, se
+  guardan tal cual porque son pequeños) o no se guarda ("drop").
+- ``molsys``: se conserva el MolSys ("keep") o sólo el `TopologyIndex` que
+  resuelve las selecciones sencillas ("topology"); las selecciones fuera de
+  su subconjunto dan error en lugar de recurrir a `msm.select`.
+
+`estimate_nbytes` da una estimación del tamaño real (arrays de NumPy,
+tablas de pandas, cantidades de pint y contenedores de Python) para
+`memory_report`.
+"""
+
+from __future__ import annotations
+
+import sys
+import types
+import weakref
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from .topology import TopologyIndex, UnsupportedSelection
+
+SOURCE_POLICIES = ("keep", "weak", "drop")
+MOLSYS_POLICIES = ("keep", "topology")
+
+
+@dataclass
+class MemoryPolicy:
+    """Qué guarda la vista tras cargar un sistema.
+
+    Parameters
+    ----------
+    source
+        "keep", "weak" o "drop" para el objeto original.
+    molsys
+        "keep" o "topology" para el MolSys convertido.
+    """
+
+    source: str = "keep"
+    molsys: str = "keep"
+
+    def __post_init__(self) -> None:
+        if self.source not in SOURCE_POLICIES:
+            raise ValueError(f"source must be one of {SOURCE_POLICIES}, got {self.source!r}")
+        if self.molsys not in MOLSYS_POLICIES:
+            raise ValueError(f"molsys must be one of {MOLSYS_POLICIES}, got {self.molsys!r}")
+
+
+def hold_source(value: Any, policy: str) -> Any:
+    """Lo que la vista guarda de `value` según `policy` (el valor, un `weakref.ref` o None)."""
+    if value is None or policy == "drop":
+        return None
+    if policy == "weak":
+        try:
+            return weakref.ref(value)
+        except TypeError:
+            return value
+    return value
+
+
+def resolve_source(held: Any) -> Any:
+    return held() if isinstance(held, weakref.ref) else held
+
+
+def select_from_index(index: TopologyIndex, selection: Any, syntax: str = "MolSysMT") -> np.ndarray:
+    """Resolver `selection` sólo con el índice (el MolSys ya se liberó)."""
+    if not isinstance(selection, str):
+        return np.asarray(selection, dtype=np.int64).reshape(-1)
+    if syntax == "MolSysMT":
+        try:
+            return index.select(selection)
+        except UnsupportedSelection:
+            pass
+    raise ValueError(
+        f"Selection {selection!r} needs the full MolSys, released by the memory policy "
+        "(molsys='topology'); use a simpler selection or set_memory_policy(molsys='keep') before loading."
+    )
+
+
+_SKIPPED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def estimate_nbytes(obj: Any, seen: set[int] | None = None) -> int:
+    """Bytes aproximados de `obj` y de lo que referencia (sin contar dos veces lo de `seen`)."""
+    if seen is None:
+        seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if item is None or id(item) in seen or isinstance(item, _SKIPPED):
+            continue
+        seen.add(id(item))
+
+        if isinstance(item, np.ndarray):
+            # Las vistas cuentan el array que poseen los datos.
+            if item.base is None:
+                total += item.nbytes
+            else:
+                stack.append(item.base)
+            continue
+        if isinstance(item, (str, bytes, bytearray, int, float, complex, bool)):
+            total += sys.getsizeof(item)
+            continue
+        memory_usage = getattr(type(item), "memory_usage", None)
+        if callable(memory_usage):  # DataFrame / Series / Index de pandas
+            try:
+                total += int(np.sum(item.memory_usage(deep=True)))
+                continue
+            except Exception:
+                pass
+
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif isinstance(item, weakref.ref):
+            continue
+        else:
+            # Cantidades de pint y objetos de MolSysMT: sus atributos.
+            attributes = getattr(item, "__dict__", None)
+            if attributes is not None:
+                stack.append(attributes)
+            slots = getattr(type(item), "__slots__", ())
+            for slot in (slots,) if isinstance(slots, str) else slots:
+                stack.append(getattr(item, slot, None))
+    return total
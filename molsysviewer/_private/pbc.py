@@ -0,0 +1,314 @@
+# molsysviewer/_private/pbc.py
+
+"""Condiciones periódicas de contorno sobre el payload de carga.
+
+Etapa opcional de `load_from_molsysmt` entre la serialización (ViewerJSON →
+payload) y el envío. Todas las operaciones trabajan con NumPy sobre todos los
+frames a la vez, con celdas triclínicas, en coordenadas fraccionarias
+``frac = x @ inv(box)`` (filas de ``box`` = vectores a, b, c en Å):
+
+- "wrap": cada átomo dentro de la celda.
+- "unwrap": quita los saltos de un frame al siguiente (trayectorias continuas).
+- "whole": reconstruye las moléculas partidas por el contorno siguiendo un
+  bosque generador del grafo de enlaces; los desplazamientos de imagen se
+  acumulan desde la raíz con saltos de puntero (log(profundidad) pasos).
+
+`add_images` añade, como átomos extra al final del payload, las imágenes
+vecinas de los átomos a menos de `cutoff` de una cara de la celda; la vista
+guarda el átomo de origen de cada una para que siga su visibilidad.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+PBC_MODES = ("wrap", "unwrap", "whole")
+
+# Los 26 desplazamientos de celda vecinos.
+_SHIFTS = np.array(
+    [(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1) if (i, j, k) != (0, 0, 0)],
+    dtype=np.int64,
+)
+
+
+def cell_to_box(a: Any, b: Any, c: Any, alpha: Any, beta: Any, gamma: Any) -> np.ndarray:
+    """Vectores de celda ``(..., 3, 3)`` a partir de longitudes (Å) y ángulos (grados).
+
+    Convención estándar: a sobre x, b en el plano xy.
+    """
+    a, b, c = (np.asarray(v, dtype=float) for v in (a, b, c))
+    alpha, beta, gamma = (np.radians(np.asarray(v, dtype=float)) for v in (alpha, beta, gamma))
+    cos_a, cos_b, cos_g, sin_g = np.cos(alpha), np.cos(beta), np.cos(gamma), np.sin(gamma)
+    cx = c * cos_b
+    cy = c * (cos_a - cos_b * cos_g) / sin_g
+    cz = np.sqrt(np.maximum(c**2 - cx**2 - cy**2, 0.0))
+    zero = np.zeros_like(a)
+    box = np.stack(
+        [
+            np.stack([a, zero, zero], axis=-1),
+            np.stack([b * cos_g, b * sin_g, zero], axis=-1),
+            np.stack([cx, cy, cz], axis=-1),
+        ],
+        axis=-2,
+    )
+    return box
+
+
+def payload_boxes(frames: list[dict[str, Any]]) -> np.ndarray | None:
+    """Celdas ``(n_frames, 3, 3)`` de los frames del payload, o None si alguno no tiene."""
+    cells = [frame.get("cell") for frame in frames]
+    if not cells or any(cell is None for cell in cells):
+        return None
+    params = np.array([[cell[k] for k in ("a", "b", "c", "alpha", "beta", "gamma")] for cell in cells], dtype=float)
+    return cell_to_box(*params.T)
+
+
+def to_fractional(positions: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    return np.einsum("fni,fij->fnj", positions, np.linalg.inv(boxes))
+
+
+def to_cartesian(fractional: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    return np.einsum("fni,fij->fnj", fractional, boxes)
+
+
+def wrap(positions: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """Llevar cada átomo a la celda ``[0, 1)³`` en coordenadas fraccionarias."""
+    fractional = to_fractional(positions, boxes)
+    return to_cartesian(fractional - np.floor(fractional), boxes)
+
+
+def unwrap(positions: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """Quitar los saltos de celda entre frames consecutivos (el primer frame no cambia)."""
+    fractional = to_fractional(positions, boxes)
+    jumps = np.round(np.diff(fractional, axis=0))
+    fractional[1:] -= np.cumsum(jumps, axis=0)
+    return to_cartesian(fractional, boxes)
+
+
+def _jump_to_roots(pointers: np.ndarray) -> np.ndarray:
+    """Saltos de puntero hasta que cada elemento apunte a la raíz de su árbol."""
+    while True:
+        jumped = pointers[pointers]
+        if np.array_equal(jumped, pointers):
+            return pointers
+        pointers = jumped
+
+
+def _spanning_bonds(n_atoms: int, index_a: np.ndarray, index_b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Componentes conexas (etiqueta = menor átomo) y enlaces de un bosque generador.
+
+    Unión-búsqueda por rondas: cada raíz con enlaces hacia otra componente se
+    engancha a la menor de ellas por uno solo de esos enlaces, y los saltos de
+    puntero aplanan los árboles. Los enlaces usados no cierran ciclos.
+    """
+    labels = np.arange(n_atoms)
+    bond_ids = np.arange(index_a.size)
+    used: list[np.ndarray] = []
+    while True:
+        root_a, root_b = labels[index_a], labels[index_b]
+        crossing = root_a != root_b
+        if not crossing.any():
+            break
+        index_a, index_b, bond_ids = index_a[crossing], index_b[crossing], bond_ids[crossing]
+        high = np.maximum(root_a, root_b)[crossing]
+        low = np.minimum(root_a, root_b)[crossing]
+        order = np.lexsort((bond_ids, low, high))
+        high, low, hooks = high[order], low[order], bond_ids[order]
+        first = np.concatenate([[True], high[1:] != high[:-1]])
+        labels[high[first]] = low[first]
+        used.append(hooks[first])
+        labels = _jump_to_roots(labels)
+    return labels, np.concatenate(used) if used else bond_ids[:0]
+
+
+def bond_forest(n_atoms: int, index_a: np.ndarray, index_b: np.ndarray) -> np.ndarray:
+    """Padre de cada átomo en un bosque generador del grafo de enlaces (las raíces son su propio padre).
+
+    La raíz de cada componente es su menor átomo. Los enlaces del bosque salen
+    de `_spanning_bonds` y se orientan con un recorrido de Euler desde la raíz
+    (rango de cada arco por saltos de puntero): todo en NumPy, en log(n) pasadas.
+    """
+    parent = np.arange(n_atoms)
+    if index_a.size == 0:
+        return parent
+    labels, tree = _spanning_bonds(n_atoms, index_a, index_b)
+    if tree.size == 0:
+        return parent
+
+    # Arcos u → v en ambos sentidos, agrupados por origen.
+    source = np.concatenate([index_a[tree], index_b[tree]])
+    target = np.concatenate([index_b[tree], index_a[tree]])
+    order = np.lexsort((target, source))
+    source, target = source[order], target[order]
+    n_arcs = source.size
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(source, minlength=n_atoms))])
+    twin = np.searchsorted(source * n_atoms + target, target * n_atoms + source)
+
+    # El recorrido sigue, tras u → v, al arco siguiente a v → u entre los de v.
+    following = twin + 1
+    wrap = following == offsets[target + 1]
+    following[wrap] = offsets[target[wrap]]
+    # Cada recorrido empieza en el primer arco de la raíz: el arco que vuelve a él termina.
+    roots = np.flatnonzero((labels == parent) & (offsets[1:] > offsets[:-1]))
+    starts = np.zeros(n_arcs + 1, dtype=bool)
+    starts[offsets[roots]] = True
+    following[starts[following]] = n_arcs
+    following = np.append(following, n_arcs)
+
+    # Arcos que faltan hasta el final del recorrido.
+    remaining = np.ones(n_arcs + 1, dtype=np.int64)
+    remaining[n_arcs] = 0
+    while not (following == n_arcs).all():
+        remaining = remaining + remaining[following]
+        following = following[following]
+
+    # El arco padre → hijo se recorre antes que su gemelo de vuelta.
+    down = remaining[:n_arcs] > remaining[twin]
+    parent[target[down]] = source[down]
+    return parent
+
+
+def make_whole(positions: np.ndarray, boxes: np.ndarray, parent: np.ndarray) -> np.ndarray:
+    """Reconstruir las moléculas partidas siguiendo el bosque `parent` (ver `bond_forest`).
+
+    Cada átomo queda a la imagen mínima de su padre: el desplazamiento de
+    celda acumulado desde la raíz se calcula para todos los átomos y frames
+    con saltos de puntero.
+    """
+    fractional = to_fractional(positions, boxes)
+    shift = -np.round(fractional - fractional[:, parent])
+    ancestor = parent.copy()
+    while True:
+        next_ancestor = ancestor[ancestor]
+        # Las raíces tienen desplazamiento 0, así que sumar el de la raíz no cambia nada.
+        shift = shift + shift[:, ancestor]
+        if np.array_equal(next_ancestor, ancestor):
+            break
+        ancestor = next_ancestor
+    return to_cartesian(fractional + shift, boxes)
+
+
+def image_candidates(positions: np.ndarray, boxes: np.ndarray, cutoff: float) -> tuple[np.ndarray, np.ndarray]:
+    """Átomos e índices de desplazamiento (en `_SHIFTS`) de las imágenes a menos de `cutoff` Å de la celda.
+
+    Se toma la unión sobre todos los frames para que la topología sea fija.
+    """
+    fractional = to_fractional(positions, boxes)
+    # Distancia entre caras opuestas de la celda, por eje: volumen / área de la cara.
+    volume = np.abs(np.linalg.det(boxes))
+    areas = np.stack(
+        [np.linalg.norm(np.cross(boxes[:, (i + 1) % 3], boxes[:, (i + 2) % 3]), axis=-1) for i in range(3)],
+        axis=-1,
+    )
+    margin = (cutoff * areas / volume[:, np.newaxis])[:, np.newaxis, :]
+    low = fractional < margin
+    high = fractional > 1.0 - margin
+
+    candidates = np.zeros((positions.shape[1], len(_SHIFTS)), dtype=bool)
+    for index, shift in enumerate(_SHIFTS):
+        near = np.ones(positions.shape[:2], dtype=bool)
+        for axis in range(3):
+            if shift[axis] == 1:
+                near &= low[:, :, axis]
+            elif shift[axis] == -1:
+                near &= high[:, :, axis]
+        candidates[:, index] = near.any(axis=0)
+    atoms, shifts = np.nonzero(candidates)
+    return atoms, shifts
+
+
+def add_images(payload: dict[str, Any], positions: np.ndarray, boxes: np.ndarray, cutoff: float) -> tuple[np.ndarray, np.ndarray]:
+    """Añadir al payload las imágenes vecinas; devuelve las posiciones ampliadas y el átomo de origen de cada imagen."""
+    atoms, shift_indices = image_candidates(positions, boxes, cutoff)
+    n_atoms = positions.shape[1]
+    n_images = int(atoms.size)
+    if n_images == 0:
+        return positions, atoms
+
+    shifts = _SHIFTS[shift_indices].astype(float)
+    image_positions = positions[:, atoms] + np.einsum("ki,fij->fkj", shifts, boxes)
+
+    block = payload["atoms"]
+    for field, values in block.items():
+        column = np.asarray(values, dtype=object)[atoms]
+        if field == "atom_id":
+            first = int(np.max(values)) + 1
+            column = np.arange(first, first + n_images)
+        elif field == "chain_id":
+            column = np.array([f"{chain}'" for chain in column], dtype=object)
+        block[field] = list(values) + column.tolist()
+
+    bonds = payload.get("bonds")
+    if bonds:
+        # Enlaces entre dos imágenes con el mismo desplazamiento.
+        keys = atoms * len(_SHIFTS) + shift_indices
+        order = np.argsort(keys)
+        sorted_keys = keys[order]
+        index_a = np.asarray(bonds["indexA"], dtype=np.int64)
+        index_b = np.asarray(bonds["indexB"], dtype=np.int64)
+        new_a: list[np.ndarray] = []
+        new_b: list[np.ndarray] = []
+        keep: list[np.ndarray] = []
+        for shift in np.unique(shift_indices):
+            key_a = index_a * len(_SHIFTS) + shift
+            key_b = index_b * len(_SHIFTS) + shift
+            pos_a = np.minimum(np.searchsorted(sorted_keys, key_a), sorted_keys.size - 1)
+            pos_b = np.minimum(np.searchsorted(sorted_keys, key_b), sorted_keys.size - 1)
+            found = (sorted_keys[pos_a] == key_a) & (sorted_keys[pos_b] == key_b)
+            new_a.append(n_atoms + order[pos_a[found]])
+            new_b.append(n_atoms + order[pos_b[found]])
+            keep.append(found)
+        bonds["indexA"] = index_a.tolist() + np.concatenate(new_a).tolist()
+        bonds["indexB"] = index_b.tolist() + np.concatenate(new_b).tolist()
+        if "order" in bonds:
+            order_values = np.asarray(bonds["order"])
+            bonds["order"] = order_values.tolist() + np.concatenate([order_values[found] for found in keep]).tolist()
+
+    return np.concatenate([positions, image_positions], axis=1), atoms
+
+
+def apply_pbc(payload: dict[str, Any], *, mode: str | None = None, images_cutoff: float | None = None) -> dict[str, Any]:
+    """Aplicar la etapa PBC a un payload de `_viewer_json_to_payload`; devuelve un resumen.
+
+    Sin celda en todos los frames no se modifica nada (``"applied": False``).
+    """
+    return apply_pbc_stage(payload, mode=mode, images_cutoff=images_cutoff)[0]
+
+
+def apply_pbc_stage(
+    payload: dict[str, Any], *, mode: str | None = None, images_cutoff: float | None = None
+) -> tuple[dict[str, Any], np.ndarray | None]:
+    """Como `apply_pbc`, y además el átomo de origen de cada imagen añadida (None sin imágenes)."""
+    if mode is not None and mode not in PBC_MODES:
+        raise ValueError(f"pbc must be one of {PBC_MODES} or None, got {mode!r}")
+    frames = payload.get("coordinates") or []
+    boxes = payload_boxes(frames)
+    if boxes is None or (mode is None and not images_cutoff):
+        return {"applied": False, "mode": mode, "n_images": 0}, None
+
+    positions = np.array([frame["positions"] for frame in frames], dtype=float)
+    if mode == "wrap":
+        positions = wrap(positions, boxes)
+    elif mode == "unwrap":
+        positions = unwrap(positions, boxes)
+    elif mode == "whole":
+        bonds = payload.get("bonds") or {}
+        parent = bond_forest(
+            positions.shape[1],
+            np.asarray(bonds.get("indexA", []), dtype=np.int64),
+            np.asarray(bonds.get("indexB", []), dtype=np.int64),
+        )
+        positions = make_whole(positions, boxes, parent)
+
+    image_sources = None
+    if images_cutoff:
+        positions, image_sources = add_images(payload, positions, boxes, float(images_cutoff))
+        if image_sources.size == 0:
+            image_sources = None
+
+    for frame, frame_positions in zip(frames, positions):
+        frame["positions"] = frame_positions.tolist()
+    n_images = 0 if image_sources is None else int(image_sources.size)
+    return {"applied": True, "mode": mode, "n_images": n_images}, image_sources
@@ -0,0 +1,152 @@
+# molsysviewer/_private/preview.py
+
+"""Vista previa de grano grueso para sistemas muy grandes.
+
+Por encima de un umbral de átomos, `load` envía primero una representación
+reducida: una cuenta ("bead") por grupo/residuo o por cada N átomos, en el
+centroide de sus átomos y con el nombre "CA", de modo que el preset de Mol*
+dibuja una traza de Cα para los polímeros en lugar de cartoon + ball & stick
+para todos los átomos. Los centroides se calculan con NumPy para todos los
+frames a la vez (``np.add.reduceat`` sobre los átomos ordenados por cuenta)
+directamente desde el MolSys, sin pasar por ViewerJSON.
+
+El detalle atómico llega después (`StructureState.refine`): el sistema
+completo en segundo plano (``refine="background"``) o a petición, entero o
+sólo para la región de una selección, que se superpone a las cuentas.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+import molsysmt as msm
+import numpy as np
+from molsysmt import pyunitwizard as puw
+
+REFINE_MODES = ("background", "manual")
+
+
+@dataclass
+class PreviewOptions:
+    """Configuración de la vista previa (ver `MolSysView.set_preview`).
+
+    Parameters
+    ----------
+    enabled
+        Si `load` usa la vista previa por encima de `threshold`.
+    threshold
+        Número de átomos a partir del cual se usa.
+    beads
+        "group" (una cuenta por grupo/residuo) o un entero N (una cuenta por
+        cada N átomos consecutivos).
+    refine
+        "background" (el detalle se envía en cuanto está serializado) o
+        "manual" (sólo con `refine`).
+    """
+
+    enabled: bool = False
+    threshold: int = 1_000_000
+    beads: str | int = "group"
+    refine: str = "background"
+
+    def __post_init__(self) -> None:
+        self.threshold = int(self.threshold)
+        if self.threshold < 0:
+            raise ValueError("threshold must be a non-negative number of atoms.")
+        if isinstance(self.beads, str):
+            if self.beads != "group":
+                raise ValueError(f"beads must be 'group' or a positive integer, got {self.beads!r}")
+        elif int(self.beads) < 1:
+            raise ValueError(f"beads must be 'group' or a positive integer, got {self.beads!r}")
+        else:
+            self.beads = int(self.beads)
+        if self.refine not in REFINE_MODES:
+            raise ValueError(f"refine must be one of {REFINE_MODES}, got {self.refine!r}")
+
+    def applies(self, n_atoms: int, preview: bool | None = None) -> bool:
+        """Si una carga de `n_atoms` átomos empieza por la vista previa (`preview` fuerza la decisión)."""
+        if preview is not None:
+            return bool(preview)
+        return self.enabled and n_atoms > self.threshold
+
+
+@dataclass
+class PreviewState:
+    """Lo necesario para enviar el detalle de una estructura mostrada como vista previa."""
+
+    molsys: Any
+    label: str | None
+    bead_of_atom: np.ndarray
+    n_beads: int
+    refine: str = "background"
+    pbc: str | None = None
+    images_cutoff: float | None = None
+    show_cell: bool = False
+    # Clave de la estructura del frontend con el detalle de una región (ver refine)
+    detail_key: str | None = field(default=None)
+
+    def bead_mask(self, atom_mask: np.ndarray) -> np.ndarray:
+        """Cuentas visibles: las que tienen algún átomo visible."""
+        return np.bincount(self.bead_of_atom, weights=atom_mask, minlength=self.n_beads) > 0
+
+
+def bead_index(n_atoms: int, group_index: np.ndarray | None = None, atoms_per_bead: int | None = None) -> tuple[np.ndarray, int]:
+    """Cuenta de cada átomo (0..n_beads-1, en orden de primera aparición) y número de cuentas."""
+    if atoms_per_bead is not None:
+        bead = np.arange(n_atoms, dtype=np.int64) // int(atoms_per_bead)
+        return bead, int(bead[-1]) + 1 if n_atoms else 0
+    group_index = np.asarray(group_index, dtype=np.int64).reshape(-1)
+    if group_index.shape[0] != n_atoms:
+        raise ValueError(f"Expected {n_atoms} group indices, got {group_index.shape[0]}.")
+    _, first, inverse = np.unique(group_index, return_index=True, return_inverse=True)
+    # Renumerar por primera aparición para que las cuentas sigan el orden de los átomos.
+    rank = np.empty(first.size, dtype=np.int64)
+    rank[np.argsort(first, kind="stable")] = np.arange(first.size)
+    return rank[inverse], int(first.size)
+
+
+def bead_centroids(coordinates: np.ndarray, bead_of_atom: np.ndarray, n_beads: int) -> tuple[np.ndarray, np.ndarray]:
+    """Centroides ``(n_frames, n_beads, 3)`` y primer átomo de cada cuenta."""
+    counts = np.bincount(bead_of_atom, minlength=n_beads)
+    order = np.argsort(bead_of_atom, kind="stable")
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    sums = np.add.reduceat(coordinates[:, order], starts, axis=1)
+    return sums / counts[np.newaxis, :, np.newaxis], order[starts]
+
+
+def build_preview_payload(molsys: Any, n_atoms: int, options: PreviewOptions) -> tuple[dict[str, Any], np.ndarray, int]:
+    """Payload de cuentas (mismo formato que `_viewer_json_to_payload`), cuenta de cada átomo y nº de cuentas."""
+    group_index = np.asarray(msm.get(molsys, element="atom", group_index=True), dtype=np.int64)
+    if options.beads == "group":
+        bead_of_atom, n_beads = bead_index(n_atoms, group_index=group_index)
+    else:
+        bead_of_atom, n_beads = bead_index(n_atoms, atoms_per_bead=options.beads)
+
+    coordinates = puw.get_value(msm.get(molsys, element="atom", coordinates=True), to_unit="angstroms")
+    coordinates = np.asarray(coordinates, dtype=float)
+    if coordinates.ndim == 2:
+        coordinates = coordinates[np.newaxis]
+    centroids, first_atom = bead_centroids(coordinates, bead_of_atom, n_beads)
+
+    # Etiquetas de cada cuenta: las del grupo y la cadena de su primer átomo.
+    groups = group_index[first_atom]
+    chain_index = np.asarray(msm.get(molsys, element="atom", chain_index=True), dtype=np.int64)[first_atom]
+    group_names = np.asarray(msm.get(molsys, element="group", group_name=True), dtype=object)[groups]
+    group_ids = np.asarray(msm.get(molsys, element="group", group_id=True))[groups]
+    chain_ids = np.asarray(msm.get(molsys, element="chain", chain_id=True), dtype=object)[chain_index]
+
+    payload = {
+        "atoms": {
+            "atom_id": list(range(1, n_beads + 1)),
+            "atom_name": ["CA"] * n_beads,
+            "residue_id": [int(value) for value in group_ids],
+            "residue_name": [str(value) for value in group_names],
+            "chain_id": [str(value) for value in chain_ids],
+            "entity_id": ["1"] * n_beads,
+            "element_symbol": ["C"] * n_beads,
+            "formal_charge": [0] * n_beads,
+        },
+        "coordinates": [{"positions": frame.tolist(), "time": index} for index, frame in enumerate(centroids)],
+    }
+    return payload, bead_of_atom, n_beads
@@ -0,0 +1,196 @@
+# molsysviewer/_private/progressive.py
+
+"""Carga progresiva de payloads grandes por bloques de átomos.
+
+Un payload MolSysMT sólo se dibuja cuando el mensaje entero ha llegado y se
+ha convertido en una única `Topology` de Mol*. Con la carga progresiva el
+payload se parte en bloques de grupos (residuos) completos, de unos
+`chunk_atoms` átomos, en el orden de las cadenas o en orden espacial
+(curva de Morton sobre los centroides de los grupos en el primer frame):
+
+- cada bloque viaja en su propio mensaje ``load_payload_chunk`` con sus
+  campos de átomos, los enlaces internos al bloque y, como buffers binarios,
+  sus índices de átomo (int32) y las posiciones del primer frame (float32);
+  el frontend lo dibuja como una estructura provisional en cuanto llega;
+- el mensaje final ``finish_payload_chunks`` trae el resto del payload
+  (frames sin las posiciones del primero, enlaces, tiempo y meta); el
+  frontend reensambla los bloques en orden atómico, carga un único modelo y
+  quita las estructuras provisionales.
+
+El frontend informa del avance con eventos ``load_progress``
+(``view.stats["load_progress"]``).
+"""
+
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+ORDERS = ("chain", "spatial")
+
+_load_ids = itertools.count(1)
+
+
+@dataclass
+class ProgressiveOptions:
+    """Configuración de la carga progresiva (ver `MolSysView.set_progressive`).
+
+    Parameters
+    ----------
+    enabled
+        Si `load` envía por bloques los sistemas por encima de `threshold`.
+    threshold
+        Número de átomos a partir del cual se usa.
+    chunk_atoms
+        Átomos aproximados por bloque (los grupos no se parten).
+    order
+        "chain" (orden de los átomos) o "spatial" (regiones compactas).
+    """
+
+    enabled: bool = False
+    threshold: int = 200_000
+    chunk_atoms: int = 50_000
+    order: str = "chain"
+
+    def __post_init__(self) -> None:
+        self.threshold = int(self.threshold)
+        self.chunk_atoms = int(self.chunk_atoms)
+        if self.threshold < 0:
+            raise ValueError("threshold must be a non-negative number of atoms.")
+        if self.chunk_atoms < 1:
+            raise ValueError("chunk_atoms must be a positive number of atoms.")
+        if self.order not in ORDERS:
+            raise ValueError(f"order must be one of {ORDERS}, got {self.order!r}")
+
+    def applies(self, n_atoms: int, progressive: bool | None = None) -> bool:
+        """Si una carga de `n_atoms` átomos se envía por bloques (`progressive` fuerza la decisión)."""
+        if progressive is not None:
+            return bool(progressive)
+        return self.enabled and n_atoms > self.threshold
+
+
+def group_starts(atoms: dict[str, Any], n_atoms: int) -> np.ndarray:
+    """Primer átomo de cada grupo: donde cambia la cadena o el residuo respecto al átomo anterior."""
+    change = np.zeros(n_atoms, dtype=bool)
+    if n_atoms:
+        change[0] = True
+    for field in ("chain_id", "residue_id"):
+        values = atoms.get(field)
+        if values is None or len(values) != n_atoms:
+            continue
+        values = np.asarray(values)
+        change[1:] |= values[1:] != values[:-1]
+    return np.flatnonzero(change)
+
+
+def morton_order(points: np.ndarray, bits: int = 10) -> np.ndarray:
+    """Orden de los puntos ``(n, 3)`` a lo largo de una curva de Morton."""
+    if points.shape[0] == 0:
+        return np.zeros(0, dtype=np.int64)
+    low = points.min(axis=0)
+    # Misma escala en los tres ejes: las celdas de la rejilla son cúbicas.
+    span = max(float((points.max(axis=0) - low).max()), 1e-9)
+    cells = ((points - low) / span * ((1 << bits) - 1)).astype(np.uint64)
+    code = np.zeros(points.shape[0], dtype=np.uint64)
+    for bit in range(bits):
+        for axis in range(3):
+            code |= ((cells[:, axis] >> np.uint64(bit)) & np.uint64(1)) << np.uint64(3 * bit + axis)
+    return np.argsort(code, kind="stable")
+
+
+def chunk_of_atoms(payload: dict[str, Any], chunk_atoms: int, order: str = "chain") -> tuple[np.ndarray, int]:
+    """Bloque de cada átomo (0..n_chunks-1, en orden de envío) y número de bloques."""
+    atoms = payload["atoms"]
+    n_atoms = len(atoms["atom_id"])
+    starts = group_starts(atoms, n_atoms)
+    sizes = np.diff(np.append(starts, n_atoms))
+
+    groups = np.arange(starts.size)
+    if order == "spatial":
+        positions = np.asarray(payload["coordinates"][0]["positions"], dtype=float).reshape(n_atoms, 3)
+        centroids = np.add.reduceat(positions, starts, axis=0) / sizes[:, np.newaxis]
+        groups = morton_order(centroids)
+
+    # Grupos completos hasta llenar cada bloque; un grupo mayor que un bloque va solo.
+    filled = np.cumsum(sizes[groups]) - sizes[groups]
+    _, chunk_of_sorted = np.unique(filled // chunk_atoms, return_inverse=True)
+    chunk_of_group = np.empty(starts.size, dtype=np.int64)
+    chunk_of_group[groups] = chunk_of_sorted
+    return np.repeat(chunk_of_group, sizes), int(chunk_of_sorted.max()) + 1 if starts.size else 0
+
+
+def split_payload(
+    msg: dict[str, Any],
+    chunk_atoms: int,
+    order: str = "chain",
+) -> tuple[list[tuple[dict[str, Any], list[bytes]]], dict[str, Any]] | None:
+    """Mensajes de los bloques (con sus buffers) y mensaje final de un ``load_molsys_payload``.
+
+    Devuelve None si el payload cabe en un solo bloque.
+    """
+    payload = msg["payload"]
+    atoms = payload["atoms"]
+    n_atoms = len(atoms["atom_id"])
+    chunk_of_atom, n_chunks = chunk_of_atoms(payload, chunk_atoms, order)
+    if n_chunks < 2:
+        return None
+
+    load_id = next(_load_ids)
+    label = msg.get("label")
+    frames = payload["coordinates"]
+    positions = np.asarray(frames[0]["positions"], dtype=np.float32).reshape(n_atoms, 3)
+
+    bonds = payload.get("bonds")
+    if bonds:
+        index_a = np.asarray(bonds["indexA"], dtype=np.int64)
+        index_b = np.asarray(bonds["indexB"], dtype=np.int64)
+        bond_order = np.asarray(bonds["order"], dtype=np.int64) if "order" in bonds else None
+        # Enlaces internos a cada bloque, agrupados por bloque.
+        internal = np.flatnonzero(chunk_of_atom[index_a] == chunk_of_atom[index_b])
+        internal = internal[np.argsort(chunk_of_atom[index_a[internal]], kind="stable")]
+        bond_bounds = np.searchsorted(chunk_of_atom[index_a[internal]], np.arange(n_chunks + 1))
+
+    atom_order = np.argsort(chunk_of_atom, kind="stable")
+    atom_bounds = np.searchsorted(chunk_of_atom[atom_order], np.arange(n_chunks + 1))
+    local = np.empty(n_atoms, dtype=np.int64)
+
+    chunks: list[tuple[dict[str, Any], list[bytes]]] = []
+    for chunk in range(n_chunks):
+        indices = atom_order[atom_bounds[chunk] : atom_bounds[chunk + 1]]
+        rows = indices.tolist()
+        chunk_msg: dict[str, Any] = {
+            "op": "load_payload_chunk",
+            "load_id": load_id,
+            "chunk": chunk,
+            "n_chunks": n_chunks,
+            "n_atoms": n_atoms,
+            "label": label,
+            "atoms": {field: [values[i] for i in rows] for field, values in atoms.items()},
+        }
+        if bonds:
+            local[indices] = np.arange(indices.size)
+            selected = internal[bond_bounds[chunk] : bond_bounds[chunk + 1]]
+            chunk_msg["bonds"] = {
+                "indexA": local[index_a[selected]].tolist(),
+                "indexB": local[index_b[selected]].tolist(),
+            }
+            if bond_order is not None:
+                chunk_msg["bonds"]["order"] = bond_order[selected].tolist()
+        buffers = [indices.astype("<i4").tobytes(), positions[indices].astype("<f4").tobytes()]
+        chunks.append((chunk_msg, buffers))
+
+    # Las posiciones del primer frame ya viajaron con los bloques.
+    rest = {key: value for key, value in payload.items() if key != "atoms"}
+    rest["coordinates"] = [{key: value for key, value in frames[0].items() if key != "positions"}, *frames[1:]]
+    finish = {
+        "op": "finish_payload_chunks",
+        "load_id": load_id,
+        "n_chunks": n_chunks,
+        "n_atoms": n_atoms,
+        "label": label,
+        "payload": rest,
+    }
+    return chunks, finish
@@ -0,0 +1,54 @@
+# molsysviewer/_private/properties.py
+
+"""Propiedades escalares por átomo (ver `MolSysView.set_atom_property`).
+
+Los valores viajan como buffer float32 little-endian: ``(n_atoms,)`` para una
+propiedad fija o ``(n_frames, n_atoms)`` para una por frame. El frontend los
+guarda en un canal con nombre que leen sus temas de color y tamaño
+("molsysviewer-atom-property"). Con un `TrajectoryPlayer` activo, los canales
+por frame no se envían enteros: cada frame de la reproducción lleva su fila.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+
+def as_property_values(values: Any, n_atoms: int | None = None) -> np.ndarray:
+    """Validar la forma de `values`: ``(n_atoms,)`` o ``(n_frames, n_atoms)``.
+
+    No copia: un ``np.memmap`` por frame sigue en disco y sus filas se
+    convierten con `property_row` al enviarlas.
+    """
+    array = np.asarray(values)
+    if array.ndim not in (1, 2) or array.size == 0:
+        raise ValueError(f"Expected values of shape (n_atoms,) or (n_frames, n_atoms), got {array.shape}.")
+    if n_atoms is not None and array.shape[-1] != n_atoms:
+        raise ValueError(f"Got values for {array.shape[-1]} atoms but the structure has {n_atoms}.")
+    return array
+
+
+def property_row(values: np.ndarray, frame: int | None = None) -> np.ndarray:
+    """Bloque (o la fila de `frame`) como float32 little-endian C-contiguo, listo para enviar."""
+    block = values if frame is None else values[frame]
+    return np.ascontiguousarray(block, dtype="<f4")
+
+
+def property_domain(values: np.ndarray) -> list[float]:
+    """Intervalo ``[min, max]`` de los valores finitos (``[0, 1]`` si no hay ninguno)."""
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return [0.0, 1.0]
+    low, high = float(finite.min()), float(finite.max())
+    if low == high:
+        high = low + 1.0
+    return [low, high]
+
+
+def color_map_option(color_map: Any) -> str | list[int] | None:
+    """Nombre de lista de colores de Mol* o lista de colores hex como enteros."""
+    if color_map is None or isinstance(color_map, str):
+        return color_map
+    return [int(color) for color in color_map]
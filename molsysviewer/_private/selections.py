@@ -0,0 +1,32 @@
+# molsysviewer/_private/selections.py
+
+"""Selecciones con nombre (ver `MolSysView.define_selection`).
+
+Los índices de una selección se resuelven una vez en Python y viajan una sola
+vez al frontend como buffer int32 little-endian; las ops posteriores sólo
+envían el nombre (``"selection": name``) y el frontend usa su copia.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+
+def as_atom_indices(atom_indices: Any) -> np.ndarray:
+    """Índices atómicos como array int32 1D, ordenados y sin repetir."""
+    values = np.asarray(atom_indices, dtype=np.int64).reshape(-1)
+    if values.size and values.min() < 0:
+        raise ValueError("Atom indices must be non-negative.")
+    if values.size and values.max() > np.iinfo(np.int32).max:
+        raise ValueError("Atom indices do not fit in 32 bits.")
+    return np.unique(values).astype("<i4")
+
+
+def selection_name(view: Any, name: str) -> str:
+    """Validar que `name` es una selección definida en `view` y devolverlo."""
+    selections = getattr(view, "selections", None) or {}
+    if name not in selections:
+        raise ValueError(f"Unknown selection {name!r}; define it first with view.define_selection().")
+    return name
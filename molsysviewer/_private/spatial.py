@@ -0,0 +1,354 @@
+# molsysviewer/_private/spatial.py
+
+"""Índice espacial (cell list) sobre las coordenadas de un frame.
+
+`SpatialIndex` reparte los átomos en una rejilla de celdas de al menos
+`cell_size` Å y guarda su orden por celda (las celdas ocupadas, ordenadas, y
+el inicio de cada una), de modo que las consultas de vecindad no recorren
+todos los átomos ni vuelven a buscar desde cero como ``msm.select``:
+
+- `pairs_within`: pares (punto, átomo, distancia) a menos de un radio;
+- `within`: átomos a menos de un radio de algún punto;
+- `nearest`: los k átomos más cercanos a cada punto.
+
+`contact_pairs` y `aggregate_contacts` construyen sobre ellas las redes de
+contactos entre dos selecciones (ver `LinkShapes.add_contact_network`).
+
+Las consultas son vectorizadas: para cada desplazamiento de celda vecina se
+expanden a la vez los rangos de átomos de las celdas de todos los puntos de
+un lote (sin bucle de Python por átomo ni por punto).
+
+Con caja (filas = vectores a, b, c en Å) la rejilla es periódica y se
+construye en coordenadas fraccionarias con al menos `cell_size` Å de ancho
+perpendicular por celda, así que vale para celdas triclínicas: cada
+candidato se mide contra la imagen que corresponde al desplazamiento de
+celda recorrido. Sin caja, la rejilla cubre la caja envolvente de los átomos.
+
+`update` cambia las coordenadas sin reconstruir la rejilla: recalcula la
+celda de cada átomo y reordena el orden anterior, casi ordenado, con una
+ordenación estable (lineal en la práctica cuando pocos átomos cambian de
+celda, como entre frames consecutivos).
+"""
+
+from __future__ import annotations
+
+import itertools
+from typing import Any
+
+import numpy as np
+
+#: Lado mínimo de las celdas (Å).
+DEFAULT_CELL_SIZE = 5.0
+
+#: Puntos de consulta por lote (acota la memoria de la expansión de candidatos).
+QUERY_BATCH = 16_384
+
+
+def perpendicular_widths(box: np.ndarray) -> np.ndarray:
+    """Distancia entre caras opuestas de la celda ``(3, 3)``."""
+    volume = abs(float(np.linalg.det(box)))
+    areas = np.linalg.norm(np.cross(box[[1, 2, 0]], box[[2, 0, 1]]), axis=1)
+    return volume / areas
+
+
+class SpatialIndex:
+    """Cell list de las posiciones ``(n_atoms, 3)`` de un frame (Å), periódica si hay `box`.
+
+    Parameters
+    ----------
+    positions
+        Coordenadas en Å.
+    box
+        Vectores de celda ``(3, 3)`` en Å (filas a, b, c), o None.
+    cell_size
+        Lado mínimo de las celdas en Å.
+    """
+
+    def __init__(self, positions: Any, box: Any = None, cell_size: float = DEFAULT_CELL_SIZE) -> None:
+        self.cell_size = float(cell_size)
+        if self.cell_size <= 0:
+            raise ValueError("cell_size must be a positive distance in Å.")
+        self.stats: dict[str, int] = {"builds": 0, "updates": 0, "moved": 0}
+        self._build(positions, box)
+
+    # --- construcción ---
+
+    @property
+    def n_atoms(self) -> int:
+        return int(self.positions.shape[0])
+
+    @property
+    def periodic(self) -> bool:
+        return self.box is not None
+
+    def _build(self, positions: Any, box: Any) -> None:
+        positions = _as_positions(positions)
+        if box is not None:
+            box = np.asarray(box, dtype=float).reshape(3, 3)
+            if abs(np.linalg.det(box)) < 1e-12:
+                box = None
+        if box is not None:
+            self.origin = np.zeros(3)
+            self._grid_box = box
+            self.shape = np.maximum(1, np.floor(perpendicular_widths(box) / self.cell_size)).astype(np.int64)
+        else:
+            # Rejilla sobre la caja envolvente con una celda de margen por lado,
+            # para que `update` no reconstruya por pequeños desplazamientos.
+            low = positions.min(axis=0) if positions.shape[0] else np.zeros(3)
+            extent = positions.max(axis=0) - low if positions.shape[0] else np.zeros(3)
+            self.shape = np.floor(extent / self.cell_size).astype(np.int64) + 3
+            self.origin = low - self.cell_size
+            self._grid_box = np.diag(self.shape * self.cell_size)
+        self.box = box
+        self._inverse = np.linalg.inv(self._grid_box)
+        self._widths = perpendicular_widths(self._grid_box)
+
+        self.positions = positions
+        self._fractional = self._to_fractional(positions)
+        self._cell = self._cell_of(self._fractional)
+        self._order = np.argsort(self._cell, kind="stable")
+        self._index_cells()
+        self.stats["builds"] += 1
+
+    def update(self, positions: Any, box: Any = None) -> None:
+        """Cambiar las coordenadas (mismo número de átomos), reutilizando la rejilla si se puede."""
+        positions = _as_positions(positions)
+        same_box = (box is None and self.box is None) or (
+            box is not None and self.box is not None and np.allclose(np.asarray(box, dtype=float).reshape(3, 3), self.box)
+        )
+        if positions.shape[0] != self.n_atoms or not same_box:
+            self._build(positions, box)
+            return
+        fractional = self._to_fractional(positions)
+        if not self.periodic and ((fractional < 0.0) | (fractional >= 1.0)).any():
+            # Algún átomo salió de la rejilla no periódica.
+            self._build(positions, box)
+            return
+
+        cell = self._cell_of(fractional)
+        moved = int(np.count_nonzero(cell != self._cell))
+        self.positions = positions
+        self._fractional = fractional
+        if moved:
+            # El orden anterior está casi ordenado por las celdas nuevas.
+            self._order = self._order[np.argsort(cell[self._order], kind="stable")]
+            self._cell = cell
+            self._index_cells()
+        else:
+            self._sort_coordinates()
+        self.stats["updates"] += 1
+        self.stats["moved"] = moved
+
+    def _to_fractional(self, points: np.ndarray) -> np.ndarray:
+        fractional = (points - self.origin) @ self._inverse
+        if self.periodic:
+            fractional -= np.floor(fractional)
+        return fractional
+
+    def _cell_of(self, fractional: np.ndarray) -> np.ndarray:
+        cells = np.clip(np.floor(fractional * self.shape).astype(np.int64), 0, self.shape - 1)
+        return np.ravel_multi_index(cells.T, self.shape) if cells.shape[0] else np.zeros(0, dtype=np.int64)
+
+    def _index_cells(self) -> None:
+        sorted_cells = self._cell[self._order]
+        self._occupied, self._starts = np.unique(sorted_cells, return_index=True)
+        self._ends = np.append(self._starts[1:], sorted_cells.size)
+        self._sort_coordinates()
+
+    def _sort_coordinates(self) -> None:
+        # Coordenadas en el orden de las celdas: los candidatos de una celda son contiguos.
+        self._sorted = (self._fractional if self.periodic else self.positions)[self._order]
+
+    # --- consultas ---
+
+    def pairs_within(self, points: Any, radius: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Pares ``(punto, átomo, distancia)`` con el átomo a menos de `radius` Å del punto.
+
+        Sin orden definido; con caja, cada par aparece una vez (la imagen más cercana).
+        """
+        points = _as_positions(points)
+        radius = float(radius)
+        if radius < 0:
+            raise ValueError("radius must be a non-negative distance in Å.")
+        found = [
+            self._batch_pairs(points[start : start + QUERY_BATCH], radius, start)
+            for start in range(0, points.shape[0], QUERY_BATCH)
+        ]
+        if not found or self.n_atoms == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty.copy(), np.zeros(0)
+        query, atom, distance = (np.concatenate(parts) for parts in zip(*found))
+
+        if self.periodic and query.size and radius > 0.5 * float(self._widths.min()):
+            # Un radio mayor que media celda puede alcanzar varias imágenes del mismo átomo.
+            order = np.lexsort((distance, atom, query))
+            query, atom, distance = query[order], atom[order], distance[order]
+            first = np.ones(query.size, dtype=bool)
+            first[1:] = (query[1:] != query[:-1]) | (atom[1:] != atom[:-1])
+            query, atom, distance = query[first], atom[first], distance[first]
+        return query, atom, distance
+
+    def within(self, points: Any, radius: float) -> np.ndarray:
+        """Índices (ordenados) de los átomos a menos de `radius` Å de algún punto."""
+        _, atom, _ = self.pairs_within(points, radius)
+        return np.unique(atom)
+
+    def nearest(self, points: Any, k: int = 1) -> tuple[np.ndarray, np.ndarray]:
+        """Los `k` átomos más cercanos a cada punto: índices y distancias ``(n_points, k)``.
+
+        Si hay menos de `k` átomos, las columnas sobrantes tienen índice -1 y distancia inf.
+        """
+        points = _as_positions(points)
+        k = int(k)
+        if k < 1:
+            raise ValueError("k must be a positive integer.")
+        n_points = points.shape[0]
+        indices = np.full((n_points, k), -1, dtype=np.int64)
+        distances = np.full((n_points, k), np.inf)
+        wanted = min(k, self.n_atoms)
+        pending = np.arange(n_points)
+        radius = self.cell_size
+        # Radio creciente sólo para los puntos que aún no tienen k vecinos, hasta cubrir todos los átomos.
+        diagonal = float(np.linalg.norm(self._grid_box.sum(axis=0)))
+        limit = diagonal + self.cell_size
+        if not self.periodic and n_points:
+            center = self.origin + self._grid_box.sum(axis=0) / 2.0
+            limit += float(np.linalg.norm(points - center, axis=1).max())
+        while pending.size and wanted:
+            query, atom, distance = self.pairs_within(points[pending], radius)
+            counts = np.bincount(query, minlength=pending.size)
+            done = counts >= wanted
+            if radius >= limit:
+                done[:] = True
+            rows = np.flatnonzero(done[query])
+            if rows.size:
+                query, atom, distance = query[rows], atom[rows], distance[rows]
+                order = np.lexsort((distance, query))
+                query, atom, distance = query[order], atom[order], distance[order]
+                rank = np.arange(query.size) - np.searchsorted(query, query)
+                keep = rank < k
+                target = pending[query[keep]]
+                indices[target, rank[keep]] = atom[keep]
+                distances[target, rank[keep]] = distance[keep]
+            pending = pending[~done]
+            radius *= 2.0
+        return indices, distances
+
+    def _batch_pairs(self, points: np.ndarray, radius: float, offset: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        fractional = self._to_fractional(points)
+        cells = np.floor(fractional * self.shape).astype(np.int64)
+        reach = np.ceil(radius * self.shape / self._widths - 1e-9).astype(np.int64)
+        # Con más de una vuelta a la rejilla sólo se repetirían imágenes.
+        reach = np.minimum(np.maximum(reach, 1), self.shape)
+        if not self.periodic:
+            # Fuera de la rejilla no hay átomos: basta partir de la celda más cercana del borde.
+            cells = np.clip(cells, 0, self.shape - 1)
+        radius2 = radius * radius
+        query_ids = np.arange(points.shape[0], dtype=np.int64)
+
+        found_query, found_atom, found_distance = [], [], []
+        for shift in itertools.product(*(range(-r, r + 1) for r in reach)):
+            neighbour = cells + np.asarray(shift, dtype=np.int64)
+            if self.periodic:
+                images = np.floor_divide(neighbour, self.shape)
+                neighbour = neighbour - images * self.shape
+                rows = query_ids
+            else:
+                rows = np.flatnonzero(((neighbour >= 0) & (neighbour < self.shape)).all(axis=1))
+                neighbour = neighbour[rows]
+            if rows.size == 0:
+                continue
+            linear = np.ravel_multi_index(neighbour.T, self.shape)
+            slot = np.searchsorted(self._occupied, linear)
+            slot = np.minimum(slot, max(self._occupied.size - 1, 0))
+            hit = self._occupied[slot] == linear if self._occupied.size else np.zeros(rows.size, dtype=bool)
+            rows, slot = rows[hit], slot[hit]
+            if rows.size == 0:
+                continue
+            starts = self._starts[slot]
+            lengths = self._ends[slot] - starts
+            total = int(lengths.sum())
+            # Concatenar los rangos de átomos de cada celda sin bucle de Python.
+            shifts = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+            candidates = shifts + np.arange(total, dtype=np.int64)
+            query = np.repeat(rows, lengths)
+
+            if self.periodic:
+                image = np.repeat(images[hit], lengths, axis=0)
+                delta = (self._sorted[candidates] + image - fractional[query]) @ self._grid_box
+            else:
+                delta = self._sorted[candidates] - points[query]
+            distance2 = np.einsum("ij,ij->i", delta, delta)
+            close = np.flatnonzero(distance2 <= radius2)
+            found_query.append(query[close] + offset)
+            found_atom.append(self._order[candidates[close]])
+            found_distance.append(np.sqrt(distance2[close]))
+
+        if not found_query:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty.copy(), np.zeros(0)
+        return np.concatenate(found_query), np.concatenate(found_atom), np.concatenate(found_distance)
+
+
+def contact_pairs(
+    index: SpatialIndex,
+    atoms_a: np.ndarray,
+    atoms_b: np.ndarray,
+    cutoff: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Contactos entre dos conjuntos de átomos: pares ``(n, 2)`` (átomo de A, átomo de B) y distancias.
+
+    Sin pares de un átomo consigo mismo y, si A y B se solapan, sin el mismo
+    par en los dos sentidos. Ordenados por el átomo de A y luego el de B.
+    """
+    atoms_a = np.asarray(atoms_a, dtype=np.int64)
+    atoms_b = np.asarray(atoms_b, dtype=np.int64)
+    if atoms_b.size == index.n_atoms:
+        target = index
+    else:
+        # Índice sólo de B: los candidatos descartados por no estar en B no llegan a medirse.
+        target = SpatialIndex(index.positions[atoms_b], index.box, cell_size=max(index.cell_size, float(cutoff)))
+    query, atom, distance = target.pairs_within(index.positions[atoms_a], cutoff)
+    first = atoms_a[query]
+    second = atom if target is index else atoms_b[atom]
+
+    in_a = np.zeros(index.n_atoms, dtype=bool)
+    in_b = np.zeros(index.n_atoms, dtype=bool)
+    in_a[atoms_a] = True
+    in_b[atoms_b] = True
+    keep = (first != second) & ~(in_a[second] & in_b[first] & (first > second))
+    first, second, distance = first[keep], second[keep], distance[keep]
+
+    order = np.lexsort((second, first))
+    return np.stack((first[order], second[order]), axis=1), distance[order]
+
+
+def aggregate_contacts(
+    pairs: np.ndarray,
+    distances: np.ndarray,
+    group_of_atom: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Un contacto por par de grupos distintos: el par de átomos más cercano, su distancia y cuántos resume."""
+    group_of_atom = np.asarray(group_of_atom, dtype=np.int64)
+    groups = group_of_atom[pairs]
+    keep = groups[:, 0] != groups[:, 1]
+    pairs, distances, groups = pairs[keep], distances[keep], groups[keep]
+
+    # Clave del par de grupos sin orden: (menor, mayor).
+    low, high = groups.min(axis=1), groups.max(axis=1)
+    key = low * (int(group_of_atom.max(initial=0)) + 1) + high
+    order = np.lexsort((distances, key))
+    key = key[order]
+    first = np.flatnonzero(np.concatenate(([True], key[1:] != key[:-1]))) if key.size else np.zeros(0, dtype=np.int64)
+    counts = np.diff(np.append(first, key.size))
+    selected = order[first]
+    return pairs[selected], distances[selected], counts
+
+
+def _as_positions(points: Any) -> np.ndarray:
+    points = np.asarray(points, dtype=float)
+    if points.ndim == 1 and points.size == 3:
+        points = points.reshape(1, 3)
+    if points.ndim != 2 or points.shape[1] != 3:
+        raise ValueError(f"Expected coordinates with shape (n, 3), got {points.shape}.")
+    return points
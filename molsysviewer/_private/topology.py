@@ -0,0 +1,407 @@
+# molsysviewer/_private/topology.py
+
+"""Índice de topología vectorizado para selecciones sencillas.
+
+La mayoría de las selecciones son simples: una cadena, un rango de residuos,
+un tipo de molécula, un elemento... Pasarlas por el parser completo de
+`msm.select` cuesta mucho más que responderlas con arrays precalculados.
+
+`TopologyIndex` guarda, por cada nivel (group, component, chain, molecule,
+entity), el índice de nivel de cada átomo y los rangos de átomos de cada
+entidad en formato CSR (``offsets``/``atoms``), más los atributos de cada
+nivel; los atributos de texto se guardan como códigos categóricos. Con eso
+un subconjunto de la sintaxis MolSysMT se evalúa con numpy:
+
+- comparaciones ``campo op valor`` con ``==``, ``!=``, ``<``, ``<=``, ``>``,
+  ``>=``, ``in`` y ``not in`` (un valor o una lista ``[...]``),
+- rangos encadenados ``10 <= group_id <= 20``,
+- ``and``, ``or``, ``not``, paréntesis y ``all``.
+
+Cualquier otra cosa lanza `UnsupportedSelection` y `fast_select` recurre a
+`msm.select`.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from typing import Any
+
+import molsysmt as msm
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LEVELS = ("group", "component", "chain", "molecule", "entity")
+
+#: Campos soportados: nombre -> (nivel, atributo de msm.get); None = el propio índice.
+FIELDS: dict[str, tuple[str, str | None]] = {
+    "atom_index": ("atom", None),
+    "atom_id": ("atom", "atom_id"),
+    "atom_name": ("atom", "atom_name"),
+    "atom_type": ("atom", "atom_type"),
+    "group_index": ("group", None),
+    "group_id": ("group", "group_id"),
+    "group_name": ("group", "group_name"),
+    "group_type": ("group", "group_type"),
+    "component_index": ("component", None),
+    "chain_index": ("chain", None),
+    "chain_id": ("chain", "chain_id"),
+    "chain_name": ("chain", "chain_name"),
+    "molecule_index": ("molecule", None),
+    "molecule_name": ("molecule", "molecule_name"),
+    "molecule_type": ("molecule", "molecule_type"),
+    "entity_index": ("entity", None),
+    "entity_name": ("entity", "entity_name"),
+    "entity_type": ("entity", "entity_type"),
+}
+
+_FLIPPED = {"==": "==", "!=": "!=", "<": ">", "<=": ">=", ">": "<", ">=": "<="}
+
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<op><=|>=|==|!=|<|>)
+      | (?P<punct>[()\[\],])
+      | (?P<string>'[^']*'|"[^"]*")
+      | (?P<number>[-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)
+      | (?P<name>[A-Za-z_][A-Za-z_0-9]*)
+    )""",
+    re.VERBOSE,
+)
+
+
+class UnsupportedSelection(ValueError):
+    """La selección cae fuera del subconjunto que resuelve `TopologyIndex`."""
+
+
+class _Column:
+    """Atributo de un nivel: valores numéricos o códigos categóricos."""
+
+    def __init__(self, values: np.ndarray) -> None:
+        if values.dtype.kind in "iuf":
+            self.values = values
+            self.categories: dict[str, int] | None = None
+        else:
+            labels = np.array(["" if value is None else str(value) for value in values.tolist()])
+            categories, codes = np.unique(labels, return_inverse=True)
+            self.values = codes.astype(np.int32)
+            self.categories = {str(label): code for code, label in enumerate(categories.tolist())}
+
+    def compare(self, op: str, value: Any) -> np.ndarray:
+        many = isinstance(value, list)
+        items = value if many else [value]
+
+        if self.categories is not None:
+            if not all(isinstance(item, str) for item in items) or op not in ("==", "!="):
+                raise UnsupportedSelection("Only ==, != and in are supported for text fields")
+            codes = [self.categories[item] for item in items if item in self.categories]
+            mask = np.isin(self.values, codes) if many else (
+                self.values == codes[0] if codes else np.zeros(self.values.shape, dtype=bool)
+            )
+        else:
+            if not all(isinstance(item, (int, float)) for item in items):
+                raise UnsupportedSelection("Numeric fields must be compared with numbers")
+            if many:
+                if op not in ("==", "!="):
+                    raise UnsupportedSelection("Lists can only be used with ==, != and in")
+                mask = np.isin(self.values, items)
+            else:
+                mask = _apply(op, self.values, value)
+        return ~mask if op == "!=" else mask
+
+
+def _apply(op: str, values: np.ndarray, value: Any) -> np.ndarray:
+    if op in ("==", "!="):
+        return values == value
+    if op == "<":
+        return values < value
+    if op == "<=":
+        return values <= value
+    if op == ">":
+        return values > value
+    return values >= value
+
+
+class TopologyIndex:
+    """Índice de topología de un sistema (ver docstring del módulo).
+
+    Parameters
+    ----------
+    n_atoms
+        Número de átomos.
+    atom_levels
+        Para cada nivel, el índice de nivel de cada átomo.
+    attributes
+        Atributos por campo (``FIELDS``), con un valor por entidad de su nivel
+        (o por átomo para los campos ``atom_*``).
+    """
+
+    def __init__(
+        self,
+        n_atoms: int,
+        atom_levels: dict[str, np.ndarray],
+        attributes: dict[str, np.ndarray] | None = None,
+    ) -> None:
+        self.n_atoms = int(n_atoms)
+        self.atom_levels: dict[str, np.ndarray] = {}
+        self.level_sizes: dict[str, int] = {"atom": self.n_atoms}
+        self._csr: dict[str, tuple[np.ndarray, np.ndarray | None]] = {}
+
+        for level, values in atom_levels.items():
+            try:
+                values = np.asarray(values, dtype=np.int64).reshape(-1)
+            except (TypeError, ValueError):  # índices ausentes (None) en parte del sistema
+                continue
+            if values.shape[0] != self.n_atoms or (values.size and values.min() < 0):
+                continue
+            size = int(values.max()) + 1 if values.size else 0
+            self.atom_levels[level] = values
+            self.level_sizes[level] = size
+            self._csr[level] = _build_csr(values, size)
+
+        self.columns: dict[str, _Column] = {}
+        for field, values in (attributes or {}).items():
+            level = FIELDS[field][0]
+            values = np.asarray(values).reshape(-1)
+            if level in self.level_sizes and values.shape[0] == self.level_sizes[level]:
+                self.columns[field] = _Column(values)
+
+    @classmethod
+    def from_molsys(cls, molsys: Any) -> "TopologyIndex":
+        n_atoms = int(msm.get(molsys, element="atom", n_atoms=True))
+        atom_levels = {}
+        for level in LEVELS:
+            values = _try_get(molsys, "atom", f"{level}_index")
+            if values is not None:
+                atom_levels[level] = values
+        attributes = {}
+        for field, (level, attribute) in FIELDS.items():
+            if attribute is None:
+                continue
+            values = _try_get(molsys, level, attribute)
+            if values is not None:
+                attributes[field] = values
+        return cls(n_atoms, atom_levels, attributes)
+
+    # --- consultas ---
+
+    def atoms_of(self, level: str, ids: np.ndarray) -> np.ndarray:
+        """Atom indices (sorted) of the entities `ids` of `level`, using the CSR ranges."""
+        if level == "atom":
+            return np.asarray(ids, dtype=np.int64)
+        offsets, order = self._csr[level]
+        ids = np.asarray(ids, dtype=np.int64)
+        starts = offsets[ids]
+        lengths = offsets[ids + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64)
+        # Concatenar los rangos [start, start + length) sin bucle de Python.
+        shifts = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        positions = shifts + np.arange(total, dtype=np.int64)
+        if order is None:
+            return positions
+        return np.sort(order[positions])
+
+    def select(self, selection: str) -> np.ndarray:
+        """Sorted atom indices of `selection`; `UnsupportedSelection` if outside the subset."""
+        return _Parser(_tokenize(selection), self).parse()
+
+    # --- evaluación ---
+
+    def _compare(self, field: str, op: str, value: Any) -> np.ndarray:
+        if field not in FIELDS:
+            raise UnsupportedSelection(f"Unsupported field: {field}")
+        level, attribute = FIELDS[field]
+        if level not in self.level_sizes:
+            raise UnsupportedSelection(f"No {level} information available")
+
+        if attribute is None:
+            size = self.level_sizes[level]
+            # Atajo para índices: `group_index == 5` no recorre ningún array.
+            if op == "==" and not isinstance(value, list):
+                if not isinstance(value, int):
+                    raise UnsupportedSelection("Index fields must be compared with integers")
+                ids = np.array([value] if 0 <= value < size else [], dtype=np.int64)
+                return self.atoms_of(level, ids)
+            column = _Column(np.arange(size))
+        else:
+            column = self.columns.get(field)
+            if column is None:
+                raise UnsupportedSelection(f"No values available for {field}")
+
+        ids = np.nonzero(column.compare(op, value))[0]
+        return self.atoms_of(level, ids)
+
+
+def _build_csr(values: np.ndarray, size: int) -> tuple[np.ndarray, np.ndarray | None]:
+    """Offsets (size + 1) y orden de átomos; el orden es None si los niveles ya son contiguos."""
+    if values.size == 0 or np.all(values[1:] >= values[:-1]):
+        offsets = np.searchsorted(values, np.arange(size + 1), side="left")
+        return offsets.astype(np.int64), None
+    order = np.argsort(values, kind="stable")
+    offsets = np.searchsorted(values[order], np.arange(size + 1), side="left")
+    return offsets.astype(np.int64), order.astype(np.int64)
+
+
+def _try_get(molsys: Any, element: str, attribute: str) -> np.ndarray | None:
+    try:
+        values = msm.get(molsys, element=element, **{attribute: True})
+    except Exception:  # pragma: no cover - depende de la forma y versión de MolSysMT
+        logger.debug("Topology index: msm.get(%s, %s) failed", element, attribute, exc_info=True)
+        return None
+    if values is None:
+        return None
+    return np.asarray(values)
+
+
+def _tokenize(text: str) -> list[tuple[str, Any]]:
+    tokens: list[tuple[str, Any]] = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None or match.end() == position:
+            raise UnsupportedSelection(f"Unsupported syntax near {text[position:]!r}")
+        position = match.end()
+        kind = match.lastgroup
+        token = match.group(kind)
+        if kind == "string":
+            tokens.append(("value", token[1:-1]))
+        elif kind == "number":
+            number = float(token)
+            tokens.append(("value", int(number) if re.fullmatch(r"[-+]?\d+", token) else number))
+        elif kind == "name" and token in ("and", "or", "not", "in", "all"):
+            tokens.append((token, token))
+        else:
+            tokens.append((kind, token))
+    return tokens
+
+
+class _Parser:
+    """Descenso recursivo: or < and < not < comparación."""
+
+    def __init__(self, tokens: list[tuple[str, Any]], index: TopologyIndex) -> None:
+        self.tokens = tokens
+        self.position = 0
+        self.index = index
+
+    def parse(self) -> np.ndarray:
+        if not self.tokens:
+            raise UnsupportedSelection("Empty selection")
+        result = self._or()
+        if self.position != len(self.tokens):
+            raise UnsupportedSelection(f"Unexpected token {self.tokens[self.position][1]!r}")
+        return result
+
+    def _peek(self) -> tuple[str, Any] | None:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _take(self, kind: str, value: Any = None) -> Any:
+        token = self._peek()
+        if token is None or token[0] != kind or (value is not None and token[1] != value):
+            raise UnsupportedSelection(f"Expected {value or kind}")
+        self.position += 1
+        return token[1]
+
+    def _accept(self, kind: str, value: Any = None) -> bool:
+        token = self._peek()
+        if token is not None and token[0] == kind and (value is None or token[1] == value):
+            self.position += 1
+            return True
+        return False
+
+    def _or(self) -> np.ndarray:
+        result = self._and()
+        while self._accept("or"):
+            result = np.union1d(result, self._and())
+        return result
+
+    def _and(self) -> np.ndarray:
+        result = self._not()
+        while self._accept("and"):
+            result = np.intersect1d(result, self._not(), assume_unique=True)
+        return result
+
+    def _not(self) -> np.ndarray:
+        if self._accept("not"):
+            inner = self._not()
+            return np.setdiff1d(np.arange(self.index.n_atoms, dtype=np.int64), inner, assume_unique=True)
+        return self._primary()
+
+    def _primary(self) -> np.ndarray:
+        if self._accept("punct", "("):
+            result = self._or()
+            self._take("punct", ")")
+            return result
+        if self._accept("all"):
+            return np.arange(self.index.n_atoms, dtype=np.int64)
+        return self._comparison()
+
+    def _operand(self) -> tuple[str, Any]:
+        token = self._peek()
+        if token is None:
+            raise UnsupportedSelection("Unexpected end of selection")
+        if token[0] == "name":
+            self.position += 1
+            if token[1] not in FIELDS:
+                raise UnsupportedSelection(f"Unsupported field: {token[1]}")
+            return "field", token[1]
+        if token[0] == "value":
+            self.position += 1
+            return "value", token[1]
+        if token == ("punct", "["):
+            self.position += 1
+            items: list[Any] = []
+            while not self._accept("punct", "]"):
+                if items:
+                    self._take("punct", ",")
+                items.append(self._take("value"))
+            return "value", items
+        raise UnsupportedSelection(f"Unexpected token {token[1]!r}")
+
+    def _operator(self) -> str:
+        if self._accept("in"):
+            return "=="
+        if self._accept("not"):
+            self._take("in")
+            return "!="
+        token = self._peek()
+        if token is not None and token[0] == "op":
+            self.position += 1
+            return token[1]
+        raise UnsupportedSelection("Expected a comparison operator")
+
+    def _comparison(self) -> np.ndarray:
+        left = self._operand()
+        op = self._operator()
+        right = self._operand()
+
+        if left[0] == "field" and right[0] == "value":
+            result = self.index._compare(left[1], op, right[1])
+            field = left[1]
+        elif left[0] == "value" and right[0] == "field":
+            result = self.index._compare(right[1], _FLIPPED[op], left[1])
+            field = right[1]
+        else:
+            raise UnsupportedSelection("A comparison needs one field and one value")
+
+        # Rango encadenado: `10 <= group_id <= 20`.
+        token = self._peek()
+        if left[0] == "value" and token is not None and token[0] == "op":
+            op2 = self._operator()
+            bound = self._operand()
+            if bound[0] != "value":
+                raise UnsupportedSelection("A comparison needs one field and one value")
+            result = np.intersect1d(result, self.index._compare(field, op2, bound[1]), assume_unique=True)
+        return result
+
+
+def fast_select(index: TopologyIndex | None, molsys: Any, selection: Any, syntax: str = "MolSysMT") -> np.ndarray:
+    """Resolver `selection` con el índice si es posible; si no, con `msm.select`."""
+    if index is not None and isinstance(selection, str) and syntax == "MolSysMT":
+        try:
+            return index.select(selection)
+        except UnsupportedSelection:
+            logger.debug("Topology index: falling back to msm.select for %r", selection)
+    return msm.select(molsys, selection=selection, syntax=syntax)
@@ -0,0 +1,280 @@
+# molsysviewer/_private/trajectory.py
+
+"""Lectura por bloques de trayectorias y anillo de frames precargados.
+
+`load_from_molsysmt` materializa en memoria todas las estructuras pedidas; para
+trayectorias más grandes que la RAM el reproductor (ver
+`molsysviewer.trajectory.TrajectoryPlayer`) lee sólo bloques de frames:
+
+- `MolSysMTFrameSource` pide a MolSysMT las coordenadas (y la caja) de un
+  rango de ``structure_indices`` (DCD/XTC/HDF5/... sin cargar el archivo entero).
+- `ArrayFrameSource` sirve frames de un array ya en memoria o de un
+  ``np.memmap``/``np.load(..., mmap_mode="r")``.
+
+`FrameRing` mantiene en un hilo de fondo los bloques que contienen los
+próximos frames de la reproducción y cuenta aciertos, fallos y tiempo de
+espera.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+import molsysmt as msm
+import numpy as np
+from molsysmt import pyunitwizard as puw
+
+from .variables import is_all
+
+logger = logging.getLogger(__name__)
+
+
+class FrameSource:
+    """Origen de frames: `read(start, stop)` devuelve las coordenadas ``(k, n_atoms, 3)``
+    float32 en Å y las cajas ``(k, 3, 3)`` en Å (None sin celda periódica)."""
+
+    n_frames: int
+    n_atoms: int
+
+    def read(self, start: int, stop: int) -> tuple[np.ndarray, np.ndarray | None]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class ArrayFrameSource(FrameSource):
+    """Frames de un array ``(n_frames, n_atoms, 3)`` en Å (admite ``np.memmap``).
+
+    `boxes` es opcional: una caja ``(3, 3)`` común o una por frame ``(n_frames, 3, 3)``, en Å.
+    """
+
+    def __init__(self, coordinates: Any, boxes: Any = None) -> None:
+        if isinstance(coordinates, str):
+            coordinates = np.load(coordinates, mmap_mode="r")
+        if coordinates.ndim != 3 or coordinates.shape[2] != 3:
+            raise ValueError(f"Expected coordinates of shape (n_frames, n_atoms, 3), got {coordinates.shape}.")
+        self._coordinates = coordinates
+        self.n_frames = int(coordinates.shape[0])
+        self.n_atoms = int(coordinates.shape[1])
+        self._boxes = None
+        if boxes is not None:
+            boxes = np.asarray(boxes, dtype=float)
+            if boxes.shape == (3, 3):
+                boxes = np.broadcast_to(boxes, (self.n_frames, 3, 3))
+            if boxes.shape != (self.n_frames, 3, 3):
+                raise ValueError(f"Expected boxes of shape (3, 3) or ({self.n_frames}, 3, 3), got {boxes.shape}.")
+            self._boxes = boxes
+
+    def read(self, start: int, stop: int) -> tuple[np.ndarray, np.ndarray | None]:
+        coordinates = np.ascontiguousarray(self._coordinates[start:stop], dtype="<f4")
+        boxes = None if self._boxes is None else np.array(self._boxes[start:stop])
+        return coordinates, boxes
+
+
+class MolSysMTFrameSource(FrameSource):
+    """Frames leídos con ``msm.get(..., structure_indices=rango, coordinates=True)`` (y ``box=True``)."""
+
+    def __init__(self, molecular_system: Any, *, selection: Any = "all", syntax: str = "MolSysMT") -> None:
+        self._molecular_system = molecular_system
+        self._atom_indices = None
+        if not is_all(selection):
+            self._atom_indices = np.asarray(msm.select(molecular_system, selection=selection, syntax=syntax))
+        self.n_frames = int(msm.get(molecular_system, element="system", n_structures=True))
+        if self._atom_indices is not None:
+            self.n_atoms = int(self._atom_indices.size)
+        else:
+            self.n_atoms = int(msm.get(molecular_system, element="atom", n_atoms=True))
+
+    def read(self, start: int, stop: int) -> tuple[np.ndarray, np.ndarray | None]:
+        structure_indices = np.arange(start, stop)
+        coordinates = msm.get(
+            self._molecular_system,
+            element="atom",
+            selection="all" if self._atom_indices is None else self._atom_indices,
+            structure_indices=structure_indices,
+            coordinates=True,
+        )
+        coordinates = puw.get_value(coordinates, to_unit="angstroms")
+        coordinates = np.ascontiguousarray(coordinates, dtype="<f4").reshape(stop - start, self.n_atoms, 3)
+        try:
+            boxes = msm.get(self._molecular_system, element="system", structure_indices=structure_indices, box=True)
+        except Exception:  # pragma: no cover - depende de la forma y versión de MolSysMT
+            logger.debug("msm.get(box) failed for frames %d-%d", start, stop, exc_info=True)
+            boxes = None
+        if boxes is not None:
+            boxes = np.asarray(puw.get_value(boxes, to_unit="angstroms"), dtype=float).reshape(stop - start, 3, 3)
+        return coordinates, boxes
+
+
+class FrameRing:
+    """Bloques de frames precargados en un hilo de fondo alrededor del cursor de reproducción.
+
+    El cursor avanza con `frame(index)`; el hilo lee por delante los bloques
+    que contienen ``index, index + step, ...`` hasta ocupar `capacity` frames y
+    descarta los bloques que ya no van a usarse.
+    """
+
+    def __init__(self, source: FrameSource, *, chunk_size: int = 32, capacity: int = 256) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+        self.source = source
+        self.chunk_size = int(chunk_size)
+        self.capacity = max(int(capacity), self.chunk_size)
+
+        self._cond = threading.Condition()
+        # Cada bloque es (coordenadas, cajas) tal como lo devuelve `source.read`.
+        self._chunks: OrderedDict[int, tuple[np.ndarray, np.ndarray | None]] = OrderedDict()
+        self._loading: set[int] = set()
+        self._cursor = 0
+        self._step = 1
+        self._closed = False
+        self._thread: threading.Thread | None = None
+
+        self.hits = 0
+        self.misses = 0
+        self.stall_s = 0.0
+
+    # --- API del consumidor ---
+
+    def frame(self, index: int, *, step: int | None = None) -> np.ndarray:
+        """Coordenadas del frame `index`; `step` indica hacia dónde seguirá la reproducción."""
+        return self.frame_and_box(index, step=step)[0]
+
+    def frame_and_box(self, index: int, *, step: int | None = None) -> tuple[np.ndarray, np.ndarray | None]:
+        """Coordenadas y caja (None sin celda periódica) del frame `index`."""
+        if not 0 <= index < self.source.n_frames:
+            raise IndexError(f"Frame {index} out of range (0-{self.source.n_frames - 1}).")
+        start = self._chunk_start(index)
+        with self._cond:
+            self._cursor = index
+            if step is not None and step != 0:
+                self._step = int(step)
+            self._ensure_thread()
+            self._cond.notify_all()
+
+            block = self._chunks.get(start)
+            if block is not None:
+                self.hits += 1
+                self._chunks.move_to_end(start)
+                return self._row(block, index - start)
+
+            self.misses += 1
+            t0 = time.perf_counter()
+            while start in self._loading and not self._closed:
+                self._cond.wait()
+            block = self._chunks.get(start)
+            if block is None:
+                self._loading.add(start)
+        try:
+            if block is None:
+                try:
+                    block = self._read_chunk(start)
+                finally:
+                    # También si la lectura falla: si no, quien espere este bloque no despierta nunca.
+                    with self._cond:
+                        self._loading.discard(start)
+                        if block is not None:
+                            self._store(start, block)
+                        self._cond.notify_all()
+        finally:
+            self.stall_s += time.perf_counter() - t0
+        return self._row(block, index - start)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        requests = self.hits + self.misses
+        with self._cond:
+            buffered = sum(coordinates.shape[0] for coordinates, _ in self._chunks.values())
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else None,
+            "stall_ms": self.stall_s * 1000.0,
+            "buffered_frames": buffered,
+        }
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._chunks.clear()
+            self._cond.notify_all()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=1.0)
+        self.source.close()
+
+    # --- interno ---
+
+    def _chunk_start(self, index: int) -> int:
+        return index - index % self.chunk_size
+
+    @staticmethod
+    def _row(block: tuple[np.ndarray, np.ndarray | None], offset: int) -> tuple[np.ndarray, np.ndarray | None]:
+        coordinates, boxes = block
+        return coordinates[offset], None if boxes is None else boxes[offset]
+
+    def _read_chunk(self, start: int) -> tuple[np.ndarray, np.ndarray | None]:
+        stop = min(start + self.chunk_size, self.source.n_frames)
+        return self.source.read(start, stop)
+
+    def _upcoming(self) -> list[int]:
+        """Inicios de bloque que cubren los próximos `capacity` frames de la reproducción."""
+        n_frames = self.source.n_frames
+        starts: list[int] = []
+        index = self._cursor
+        while 0 <= index < n_frames and len(starts) * self.chunk_size < self.capacity:
+            start = self._chunk_start(index)
+            if not starts or starts[-1] != start:
+                starts.append(start)
+            index += self._step
+        return starts
+
+    def _store(self, start: int, block: tuple[np.ndarray, np.ndarray | None]) -> None:
+        if self._closed:
+            return
+        self._chunks[start] = block
+        keep = set(self._upcoming())
+        while len(self._chunks) * self.chunk_size > self.capacity:
+            victim = next((key for key in self._chunks if key not in keep), None)
+            if victim is None:
+                break
+            del self._chunks[victim]
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None and not self._closed:
+            self._thread = threading.Thread(target=self._run, name="molsysviewer-frames", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                start = None
+                while start is None:
+                    if self._closed:
+                        return
+                    start = next(
+                        (s for s in self._upcoming() if s not in self._chunks and s not in self._loading),
+                        None,
+                    )
+                    if start is None:
+                        self._cond.wait()
+                self._loading.add(start)
+            try:
+                block = self._read_chunk(start)
+            except Exception:
+                # El consumidor volverá a intentarlo (y verá el error) al pedir ese frame.
+                logger.debug("Prefetch of frames %d+ failed", start, exc_info=True)
+                block = None
+            with self._cond:
+                self._loading.discard(start)
+                if block is not None:
+                    self._store(start, block)
+                self._cond.notify_all()
+                if block is None:
+                    # Evitar reintentar en bucle el mismo bloque hasta que el cursor cambie.
+                    self._cond.wait()
@@ -0,0 +1 @@
+// local stub
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import uuid
+from typing import Any, Iterator
+
+import molsysmt as msm
+import numpy as np
+
+from ._private.compression import CompressionOptions, send_load_message
+from .loaders.load_molsysmt import _build_load_message, _convert_to_molsys
+from .viewer import MolSysView
+from .widget import MolSysViewGroupHub
+
+
+class MolSysViewGroup:
+    """Grupo de MolSysView que comparten un único sistema molecular.
+
+    El sistema se convierte y serializa una sola vez en Python y se envía una
+    sola vez al navegador (a través de un hub sin vista). Cada vista del grupo
+    lo carga desde allí, pero conserva su propia máscara de visibilidad y sus
+    propias shapes. La cámara y el frame pueden sincronizarse opcionalmente.
+    """
+
+    def __init__(self, n_views: int = 2, *, sync_camera: bool = False, sync_frames: bool = False) -> None:
+        self.group_id = uuid.uuid4().hex
+        self.sync_camera = bool(sync_camera)
+        self.sync_frames = bool(sync_frames)
+
+        self.hub = MolSysViewGroupHub(group_id=self.group_id)
+        self.compression = CompressionOptions()
+
+        self._ready = False
+        self._pending_messages: list[dict] = []
+        self._pending_buffers: list[list | None] = []
+
+        def _handle_msg(widget, content, buffers):  # type: ignore[override]
+            if content.get("event") == "ready":
+                self._ready = True
+                for msg, buffers in zip(self._pending_messages, self._pending_buffers):
+                    self.hub.send(msg, buffers)
+                self._pending_messages.clear()
+                self._pending_buffers.clear()
+
+        self.hub.on_msg(_handle_msg)
+
+        self.molecular_system = None
+        self.selection = None
+        self.structure_indices = None
+        self._molsys = None
+
+        self.views: list[MolSysView] = []
+        for _ in range(int(n_views)):
+            self.add_view()
+
+    def __len__(self) -> int:
+        return len(self.views)
+
+    def __getitem__(self, index: int) -> MolSysView:
+        return self.views[index]
+
+    def __iter__(self) -> Iterator[MolSysView]:
+        return iter(self.views)
+
+    def _send(self, msg: dict, buffers: list | None = None) -> None:
+        """Publicar un mensaje para todo el grupo (una sola vez)."""
+        if self._ready:
+            self.hub.send(msg, buffers)
+        else:
+            self._pending_messages.append(msg)
+            self._pending_buffers.append(buffers)
+
+    def _attach_system(self, view: MolSysView, n_atoms: int) -> None:
+        # Como cualquier carga: sustituye a la que la vista tuviera en segundo plano y
+        # suelta selecciones, propiedades y reproductor del sistema anterior.
+        view._cancel_load_job()
+        view._replace_structure()
+        # El MolSys se comparte por referencia; la máscara es propia de cada vista.
+        view.molecular_system = self.molecular_system
+        view.selection = self.selection
+        view.structure_indices = self.structure_indices
+        view._molsys = self._molsys
+        view.atom_mask = np.ones(n_atoms, dtype=bool)
+
+    def add_view(self, view: MolSysView | None = None) -> MolSysView:
+        """Add a view (new or existing) to the group and return it."""
+        view = MolSysView() if view is None else view
+        view._send(
+            {
+                "op": "join_group",
+                "group_id": self.group_id,
+                "sync_camera": self.sync_camera,
+                "sync_frames": self.sync_frames,
+            }
+        )
+        if self._molsys is not None:
+            n_atoms = msm.get(self._molsys, element="atom", n_atoms=True)
+            self._attach_system(view, n_atoms)
+        self.views.append(view)
+        return view
+
+    def load(
+        self,
+        molecular_system: Any,
+        selection="all",
+        structure_indices="all",
+        syntax="MolSysMT",
+        label: str | None = None,
+    ) -> None:
+        """Convert and serialize `molecular_system` once and broadcast it to every view."""
+        self.molecular_system = molecular_system
+        self.selection = selection
+        self.structure_indices = structure_indices
+
+        self._molsys = _convert_to_molsys(
+            molecular_system,
+            selection=selection,
+            structure_indices=structure_indices,
+            syntax=syntax,
+        )
+        n_atoms = msm.get(self._molsys, element="atom", n_atoms=True)
+        for view in self.views:
+            self._attach_system(view, n_atoms)
+
+        send_load_message(self, _build_load_message(self._molsys, label=label))
+
+    def reset_viewer(self) -> None:
+        """Clear the shared system from every view of the group."""
+        self.molecular_system = None
+        self.selection = None
+        self.structure_indices = None
+        self._molsys = None
+        for view in self.views:
+            view._reset_structure_state()
+        self._send({"op": "clear_all", "options": {}})
+
+    def show(self):
+        """Return an `ipywidgets.HBox` with the widgets of all views side by side."""
+        import ipywidgets
+
+        for view in self.views:
+            view._already_shown = True
+            view.widget.layout.width = "auto"
+            view.widget.layout.flex = "1 1 0%"
+        return ipywidgets.HBox([view.widget for view in self.views])
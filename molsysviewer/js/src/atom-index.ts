@@ -0,0 +1,145 @@
+// src/atom-index.ts
+import { Structure, StructureElement, Unit, ElementIndex } from "molstar/lib/mol-model/structure";
+import { OrderedSet } from "molstar/lib/mol-data/int/ordered-set";
+import { SortedArray } from "molstar/lib/mol-data/int/sorted-array";
+import { Vec3 } from "molstar/lib/mol-math/linear-algebra";
+
+/**
+ * Tablas de búsqueda átomo global → (unidad, elemento) compartidas por todas
+ * las ops indexadas por átomo (shapes, pocket surfaces, visibilidad).
+ *
+ * Los índices que llegan de Python son índices globales de átomo (el
+ * `ElementIndex` del modelo). En vez de recorrer `structure.units` en cada op,
+ * se construye una vez por `Structure` un mapa plano en typed arrays, con el
+ * chain id y las coordenadas del frame actual. La caché es un WeakMap
+ * indexado por la propia `Structure`: un cambio de frame o una recarga crean
+ * una `Structure` nueva y la entrada antigua se descarta sola.
+ */
+export interface AtomIndex {
+    readonly structure: Structure;
+    /** Número de posiciones de las tablas (máximo ElementIndex + 1). */
+    readonly size: number;
+    /** Número de átomos presentes en la estructura. */
+    readonly count: number;
+    /** Índice en `structure.units` de cada átomo, o -1 si no está en la estructura. */
+    readonly unitOf: Int32Array;
+    /** Posición (ordinal) del átomo dentro de `unit.elements`. */
+    readonly ordinalOf: Int32Array;
+    /** Código de cadena (`label_asym_id`) de cada átomo, índice en `chainNames`. */
+    readonly chainOf: Int32Array;
+    readonly chainNames: readonly string[];
+    /** Coordenadas del frame actual, x/y/z intercaladas. */
+    readonly positions: Float32Array;
+}
+
+const cache = new WeakMap<Structure, AtomIndex>();
+
+export function getAtomIndex(structure: Structure): AtomIndex {
+    let index = cache.get(structure);
+    if (!index) {
+        index = buildAtomIndex(structure);
+        cache.set(structure, index);
+    }
+    return index;
+}
+
+function buildAtomIndex(structure: Structure): AtomIndex {
+    let size = 0;
+    for (const unit of structure.units) {
+        if (!Unit.isAtomic(unit)) continue;
+        const count = OrderedSet.size(unit.elements);
+        if (count > 0) size = Math.max(size, OrderedSet.getAt(unit.elements, count - 1) + 1);
+    }
+
+    const unitOf = new Int32Array(size).fill(-1);
+    const ordinalOf = new Int32Array(size);
+    const chainOf = new Int32Array(size).fill(-1);
+    const positions = new Float32Array(3 * size);
+    const chainNames: string[] = [];
+    const chainCodes = new Map<string, number>();
+    const position = Vec3();
+    let atomCount = 0;
+
+    structure.units.forEach((unit, unitIndex) => {
+        if (!Unit.isAtomic(unit)) return;
+        const { elements } = unit;
+        const labelAsymId = unit.model.atomicHierarchy.chains.label_asym_id;
+        const count = OrderedSet.size(elements);
+        for (let ordinal = 0; ordinal < count; ordinal++) {
+            const element = OrderedSet.getAt(elements, ordinal) as ElementIndex;
+            // Con ensamblajes un mismo átomo aparece en varias unidades: gana la primera.
+            if (unitOf[element] !== -1) continue;
+            unitOf[element] = unitIndex;
+            ordinalOf[element] = ordinal;
+            atomCount++;
+
+            const chainName = labelAsymId.value(unit.getChainIndex(element));
+            let code = chainCodes.get(chainName);
+            if (code === undefined) {
+                code = chainNames.length;
+                chainNames.push(chainName);
+                chainCodes.set(chainName, code);
+            }
+            chainOf[element] = code;
+
+            unit.conformation.position(element, position);
+            positions[3 * element] = position[0];
+            positions[3 * element + 1] = position[1];
+            positions[3 * element + 2] = position[2];
+        }
+    });
+
+    return { structure, size, count: atomCount, unitOf, ordinalOf, chainOf, chainNames, positions };
+}
+
+export function hasAtom(index: AtomIndex, atom: number): boolean {
+    return atom >= 0 && atom < index.size && index.unitOf[atom] !== -1;
+}
+
+/** Coordenadas del átomo en el frame actual, o undefined si no está en la estructura. */
+export function atomPosition(index: AtomIndex, atom: number): [number, number, number] | undefined {
+    if (!hasAtom(index, atom)) return undefined;
+    const p = index.positions;
+    return [p[3 * atom], p[3 * atom + 1], p[3 * atom + 2]];
+}
+
+export function atomChainId(index: AtomIndex, atom: number): string | undefined {
+    if (!hasAtom(index, atom)) return undefined;
+    const code = index.chainOf[atom];
+    return code < 0 ? undefined : index.chainNames[code];
+}
+
+/** Loci de los átomos dados (se ignoran los que no están en la estructura). */
+export function lociFromAtomIndices(index: AtomIndex, atoms: ArrayLike<number>): StructureElement.Loci {
+    const byUnit = new Map<number, number[]>();
+    for (let i = 0, n = atoms.length; i < n; i++) {
+        const atom = atoms[i];
+        if (!hasAtom(index, atom)) continue;
+        const unitIndex = index.unitOf[atom];
+        let ordinals = byUnit.get(unitIndex);
+        if (!ordinals) {
+            ordinals = [];
+            byUnit.set(unitIndex, ordinals);
+        }
+        ordinals.push(index.ordinalOf[atom]);
+    }
+
+    const elements: StructureElement.Loci["elements"][0][] = [];
+    const unitIndices = Array.from(byUnit.keys()).sort((a, b) => a - b);
+    for (const unitIndex of unitIndices) {
+        const ordinals = byUnit.get(unitIndex)!;
+        ordinals.sort((a, b) => a - b);
+        elements.push({
+            unit: index.structure.units[unitIndex],
+            indices: SortedArray.deduplicate(SortedArray.ofSortedArray(ordinals)) as unknown as OrderedSet<StructureElement.UnitIndex>,
+        });
+    }
+    return StructureElement.Loci(index.structure, elements);
+}
+
+/** Subestructura con los átomos dados, o undefined si ninguno está en la estructura. */
+export function subsetFromAtomIndices(index: AtomIndex, atoms: ArrayLike<number>): Structure | undefined {
+    const loci = lociFromAtomIndices(index, atoms);
+    if (loci.elements.length === 0) return undefined;
+    return StructureElement.toStructure(loci);
+}
@@ -0,0 +1,191 @@
+// src/atom-properties.ts
+import { PluginContext } from "molstar/lib/mol-plugin/context";
+import { Bond, ElementIndex, Model, StructureElement, Unit } from "molstar/lib/mol-model/structure";
+import { Location } from "molstar/lib/mol-model/location";
+import type { ColorTheme } from "molstar/lib/mol-theme/color";
+import type { SizeTheme } from "molstar/lib/mol-theme/size";
+import { ThemeDataContext } from "molstar/lib/mol-theme/theme";
+import { Color } from "molstar/lib/mol-util/color";
+import { ColorListName } from "molstar/lib/mol-util/color/lists";
+import { ColorScale } from "molstar/lib/mol-util/color/scale";
+import { ParamDefinition as PD } from "molstar/lib/mol-util/param-definition";
+
+/**
+ * Canales de propiedades escalares por átomo (MolSysView.set_atom_property).
+ *
+ * Los valores llegan de Python como Float32Array: uno por átomo (índice
+ * global, el ElementIndex del modelo) o un bloque (n_frames, n_atoms). Se
+ * guardan en un registro por (estructura, nombre) y los temas de color y
+ * tamaño "molsysviewer-atom-property" los leen al colorear. Los parámetros
+ * del tema sólo llevan la clave del canal y una versión, que cambia cuando
+ * llegan valores nuevos para que Mol* vuelva a aplicar el tema.
+ *
+ * Los canales por frame de un TrajectoryPlayer llegan fila a fila con cada
+ * frame (`streamed`): la fila se guarda antes de cambiar las coordenadas y la
+ * reconstrucción de las representaciones ya la usa.
+ */
+export interface AtomPropertyChannel {
+    /** Valores del frame mostrado (canal fijo o por frame enviado fila a fila). */
+    values: Float32Array;
+    /** Bloque (n_frames, n_atoms) completo, si el canal por frame se envió de una vez. */
+    block?: Float32Array;
+    nAtoms: number;
+    nFrames: number;
+    version: number;
+}
+
+const channels = new Map<string, AtomPropertyChannel>();
+let nextVersion = 1;
+
+/** Clave de un canal: vista (`scope`, el registro es global a la página), estructura y nombre. */
+export function channelKey(scope: string, structure: string, name: string): string {
+    return `${scope}/${structure}/${name}`;
+}
+
+/** Guardar (o reemplazar) los valores de un canal; devuelve su nueva versión. */
+export function setAtomPropertyChannel(key: string, data: Float32Array, nAtoms: number, nFrames: number, streamed: boolean): number {
+    const version = nextVersion++;
+    if (nFrames > 1 && !streamed) {
+        channels.set(key, { values: data.subarray(0, nAtoms), block: data, nAtoms, nFrames, version });
+    } else {
+        channels.set(key, { values: data, nAtoms, nFrames, version });
+    }
+    return version;
+}
+
+/** Sustituir la fila de un canal enviado fila a fila (frame de un TrajectoryPlayer). */
+export function setAtomPropertyRow(key: string, row: Float32Array) {
+    const channel = channels.get(key);
+    if (channel && !channel.block && row.length === channel.nAtoms) channel.values = row;
+}
+
+export function deleteAtomPropertyChannel(key: string) {
+    channels.delete(key);
+}
+
+export function deleteAtomPropertyChannels(prefix: string) {
+    for (const key of Array.from(channels.keys())) {
+        if (key.startsWith(prefix)) channels.delete(key);
+    }
+}
+
+function atomValue(channel: AtomPropertyChannel, unit: Unit, element: ElementIndex): number {
+    if (!Unit.isAtomic(unit) || element >= channel.nAtoms) return NaN;
+    if (channel.block) {
+        // Multimodelo cargado con load(): la fila es la del modelo mostrado.
+        const frame = Math.min(Model.TrajectoryInfo.get(unit.model).index, channel.nFrames - 1);
+        return channel.block[frame * channel.nAtoms + element];
+    }
+    return channel.values[element];
+}
+
+function locationValue(channel: AtomPropertyChannel | undefined, location: Location): number {
+    if (!channel) return NaN;
+    if (StructureElement.Location.is(location)) return atomValue(channel, location.unit, location.element);
+    if (Bond.isLocation(location)) return atomValue(channel, location.aUnit, location.aUnit.elements[location.aIndex]);
+    return NaN;
+}
+
+
+// ------------------------------------------------------------------
+// Tema de color
+// ------------------------------------------------------------------
+export const AtomPropertyThemeName = "molsysviewer-atom-property";
+
+const DefaultPropertyColor = Color(0xcccccc);
+
+export const AtomPropertyColorThemeParams = {
+    channel: PD.Text("", { isHidden: true }),
+    version: PD.Numeric(0, {}, { isHidden: true }),
+    domain: PD.Interval([0, 1]),
+    colorMap: PD.Value<ColorListName | number[]>("turbo", { isHidden: true }),
+};
+export type AtomPropertyColorThemeParams = typeof AtomPropertyColorThemeParams;
+
+function AtomPropertyColorTheme(
+    ctx: ThemeDataContext,
+    props: PD.Values<AtomPropertyColorThemeParams>
+): ColorTheme<AtomPropertyColorThemeParams> {
+    const channel = channels.get(props.channel);
+    const listOrName = Array.isArray(props.colorMap) ? props.colorMap.map(c => Color(c)) : props.colorMap;
+    const scale = ColorScale.create({ domain: props.domain, listOrName, minLabel: "min", maxLabel: "max" });
+
+    function color(location: Location): Color {
+        const value = locationValue(channel, location);
+        return Number.isFinite(value) ? scale.color(value) : DefaultPropertyColor;
+    }
+
+    return {
+        factory: AtomPropertyColorTheme,
+        granularity: "group",
+        preferSmoothing: true,
+        color,
+        props,
+        description: "Assigns a color from a per-atom property set in Python.",
+        legend: scale.legend,
+    };
+}
+
+export const AtomPropertyColorThemeProvider: ColorTheme.Provider<AtomPropertyColorThemeParams, typeof AtomPropertyThemeName> = {
+    name: AtomPropertyThemeName,
+    label: "MolSysViewer Atom Property",
+    category: "Atom Property",
+    factory: AtomPropertyColorTheme,
+    getParams: () => AtomPropertyColorThemeParams,
+    defaultValues: PD.getDefaultValues(AtomPropertyColorThemeParams),
+    isApplicable: (ctx: ThemeDataContext) => !!ctx.structure,
+};
+
+
+// ------------------------------------------------------------------
+// Tema de tamaño
+// ------------------------------------------------------------------
+export const AtomPropertySizeThemeParams = {
+    channel: PD.Text("", { isHidden: true }),
+    version: PD.Numeric(0, {}, { isHidden: true }),
+    domain: PD.Interval([0, 1]),
+    range: PD.Interval([0.5, 2.0]),
+};
+export type AtomPropertySizeThemeParams = typeof AtomPropertySizeThemeParams;
+
+function AtomPropertySizeTheme(
+    ctx: ThemeDataContext,
+    props: PD.Values<AtomPropertySizeThemeParams>
+): SizeTheme<AtomPropertySizeThemeParams> {
+    const channel = channels.get(props.channel);
+    const [low, high] = props.domain;
+    const [minSize, maxSize] = props.range;
+    const span = high - low || 1;
+
+    function size(location: Location): number {
+        const value = locationValue(channel, location);
+        if (!Number.isFinite(value)) return 1;
+        const t = Math.min(Math.max((value - low) / span, 0), 1);
+        return minSize + t * (maxSize - minSize);
+    }
+
+    return {
+        factory: AtomPropertySizeTheme,
+        granularity: "group",
+        size,
+        props,
+        description: "Assigns a size from a per-atom property set in Python.",
+    };
+}
+
+export const AtomPropertySizeThemeProvider: SizeTheme.Provider<AtomPropertySizeThemeParams, typeof AtomPropertyThemeName> = {
+    name: AtomPropertyThemeName,
+    label: "MolSysViewer Atom Property",
+    category: "",
+    factory: AtomPropertySizeTheme,
+    getParams: () => AtomPropertySizeThemeParams,
+    defaultValues: PD.getDefaultValues(AtomPropertySizeThemeParams),
+    isApplicable: (ctx: ThemeDataContext) => !!ctx.structure,
+};
+
+/** Registrar los temas en el plugin (una vez por plugin). */
+export function registerAtomPropertyThemes(plugin: PluginContext) {
+    const { colorThemeRegistry, sizeThemeRegistry } = plugin.representation.structure.themes;
+    if (!colorThemeRegistry.has(AtomPropertyColorThemeProvider)) colorThemeRegistry.add(AtomPropertyColorThemeProvider);
+    if (!sizeThemeRegistry.has(AtomPropertySizeThemeProvider)) sizeThemeRegistry.add(AtomPropertySizeThemeProvider);
+}
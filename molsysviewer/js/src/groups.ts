@@ -0,0 +1,155 @@
+// src/groups.ts
+import { PluginContext } from "molstar/lib/mol-plugin/context";
+import { StateTransforms } from "molstar/lib/mol-plugin-state/transforms";
+import { StateSelection } from "molstar/lib/mol-state";
+import { Camera } from "molstar/lib/mol-canvas3d/camera";
+import { Vec3 } from "molstar/lib/mol-math/linear-algebra";
+
+/**
+ * Grupos de vistas (MolSysViewGroup en Python).
+ *
+ * El hub del grupo (MolSysViewGroupHub, un anywidget sin render) recibe el
+ * payload una sola vez y lo publica en `globalThis.__molsysviewer_groups`.
+ * Cada controlador que se une al grupo se suscribe a ese registro: carga el
+ * último payload publicado y los siguientes, y opcionalmente sincroniza la
+ * cámara y el frame con el resto de miembros, todo en el navegador.
+ *
+ * La forma de las entradas del registro debe coincidir con la que crea el
+ * `_esm` del hub en molsysviewer/widget.py.
+ */
+
+export type GroupListener = (msg: any, buffers?: DataView[]) => void;
+
+export interface ViewGroupEntry {
+    /** Último mensaje de carga publicado (se reenvía a las vistas que llegan tarde). */
+    last?: [any, DataView[] | undefined];
+    listeners: Set<GroupListener>;
+    members: Set<ViewGroupMember>;
+}
+
+export interface ViewGroupOptions {
+    syncCamera: boolean;
+    syncFrames: boolean;
+}
+
+export function getViewGroup(groupId: string): ViewGroupEntry {
+    const root = globalThis as any;
+    if (!root.__molsysviewer_groups) root.__molsysviewer_groups = new Map<string, ViewGroupEntry>();
+    const groups: Map<string, ViewGroupEntry> = root.__molsysviewer_groups;
+    let entry = groups.get(groupId);
+    if (!entry) {
+        entry = { listeners: new Set(), members: new Set() };
+        groups.set(groupId, entry);
+    }
+    if (!entry.members) entry.members = new Set();
+    return entry;
+}
+
+export class ViewGroupMember {
+    private readonly subscriptions: Array<{ unsubscribe(): void }> = [];
+    private lastCamera?: Pick<Camera.Snapshot, "position" | "up" | "target">;
+    private applyingCamera = false;
+    private applyingFrame = false;
+
+    constructor(
+        private readonly plugin: PluginContext,
+        private readonly group: ViewGroupEntry,
+        readonly options: ViewGroupOptions,
+        private readonly listener: GroupListener
+    ) {}
+
+    join() {
+        this.group.listeners.add(this.listener);
+        this.group.members.add(this);
+
+        const canvas3d = this.plugin.canvas3d;
+        if (this.options.syncCamera && canvas3d) {
+            this.subscriptions.push(canvas3d.didDraw.subscribe(() => this.broadcastCamera()));
+        }
+        if (this.options.syncFrames) {
+            this.subscriptions.push(
+                this.plugin.state.data.events.object.updated.subscribe(({ ref }) => this.broadcastFrame(ref))
+            );
+        }
+
+        if (this.group.last) {
+            const [msg, buffers] = this.group.last;
+            this.listener(msg, buffers);
+        }
+    }
+
+    leave() {
+        this.group.listeners.delete(this.listener);
+        this.group.members.delete(this);
+        for (const sub of this.subscriptions) sub.unsubscribe();
+        this.subscriptions.length = 0;
+    }
+
+    private peers(predicate: (member: ViewGroupMember) => boolean) {
+        return Array.from(this.group.members).filter(member => member !== this && predicate(member));
+    }
+
+    private broadcastCamera() {
+        const canvas3d = this.plugin.canvas3d;
+        if (!canvas3d || this.applyingCamera) return;
+        const snapshot = canvas3d.camera.getSnapshot();
+        if (this.lastCamera && sameView(this.lastCamera, snapshot)) return;
+        this.lastCamera = copyView(snapshot);
+        for (const peer of this.peers(member => member.options.syncCamera)) peer.applyCamera(this.lastCamera);
+    }
+
+    private applyCamera(view: Pick<Camera.Snapshot, "position" | "up" | "target">) {
+        const canvas3d = this.plugin.canvas3d;
+        if (!canvas3d) return;
+        this.lastCamera = copyView(view);
+        this.applyingCamera = true;
+        try {
+            canvas3d.camera.setState(copyView(view), 0);
+            canvas3d.requestDraw();
+        } finally {
+            this.applyingCamera = false;
+        }
+    }
+
+    private broadcastFrame(ref: string) {
+        if (this.applyingFrame) return;
+        const cell = this.plugin.state.data.cells.get(ref);
+        if (!cell || cell.transform.transformer !== StateTransforms.Model.ModelFromTrajectory) return;
+        const modelIndex = (cell.transform.params as any)?.modelIndex;
+        if (typeof modelIndex !== "number") return;
+        for (const peer of this.peers(member => member.options.syncFrames)) {
+            peer.applyFrame(modelIndex).catch(err => console.error("[MolSysViewer] Error sincronizando frame", err));
+        }
+    }
+
+    private async applyFrame(modelIndex: number) {
+        const state = this.plugin.state.data;
+        const cells = state.select(StateSelection.Generators.ofTransformer(StateTransforms.Model.ModelFromTrajectory));
+        const builder = state.build();
+        let changed = false;
+        for (const cell of cells) {
+            if ((cell.transform.params as any)?.modelIndex === modelIndex) continue;
+            builder.to(cell.transform.ref).update({ modelIndex });
+            changed = true;
+        }
+        if (!changed) return;
+        this.applyingFrame = true;
+        try {
+            await builder.commit();
+        } finally {
+            this.applyingFrame = false;
+        }
+    }
+}
+
+function copyView(snapshot: Pick<Camera.Snapshot, "position" | "up" | "target">) {
+    return {
+        position: Vec3.clone(snapshot.position),
+        up: Vec3.clone(snapshot.up),
+        target: Vec3.clone(snapshot.target),
+    };
+}
+
+function sameView(a: Pick<Camera.Snapshot, "position" | "up" | "target">, b: Pick<Camera.Snapshot, "position" | "up" | "target">) {
+    return Vec3.exactEquals(a.position, b.position) && Vec3.exactEquals(a.up, b.up) && Vec3.exactEquals(a.target, b.target);
+}
@@ -0,0 +1,117 @@
+// src/loader.ts
+
+/**
+ * Cargador ligero del widget (lo que anywidget recibe como `_esm`).
+ *
+ * El bundle real (`widget.js` + chunks generados por esbuild con --splitting)
+ * vive en `molsysviewer/bundle/` como package data. Este módulo lo pide a
+ * Python una sola vez por página, crea blob URLs para cada fichero reescribiendo
+ * los imports relativos (`./chunk-XXXX.js`) y carga la entrada. Los chunks de
+ * shapes y pocket surfaces se quedan como blobs sin parsear hasta que el
+ * controlador los importa dinámicamente la primera vez que se usan.
+ *
+ * No importa nada de Mol*: debe mantenerse pequeño.
+ */
+
+type ModuleSources = Record<string, string>;
+
+interface BundleCache {
+    urls: Map<string, string>;
+    entry?: Promise<any>;
+}
+
+interface LoaderTimings {
+    /** performance.now() al entrar en render(). */
+    t0: number;
+    /** Tiempo hasta tener disponibles los fuentes del bundle (ms). */
+    bundle_ms?: number;
+    /** Tiempo de parseo/evaluación del chunk de entrada (ms). */
+    entry_ms?: number;
+    /** true si el bundle ya estaba cargado en la página por otro widget. */
+    cached?: boolean;
+}
+
+const RELATIVE_IMPORT = /(\bfrom\s*|\bimport\s*\(\s*|\bimport\s*)(["'])\.\/([^"']+)\2/g;
+
+function getBundleRegistry(): Map<string, BundleCache> {
+    const root = globalThis as any;
+    if (!root.__molsysviewer_bundles) root.__molsysviewer_bundles = new Map<string, BundleCache>();
+    return root.__molsysviewer_bundles;
+}
+
+function createModuleUrls(modules: ModuleSources): Map<string, string> {
+    const urls = new Map<string, string>();
+    const visiting = new Set<string>();
+
+    const resolve = (name: string): string => {
+        const known = urls.get(name);
+        if (known) return known;
+        if (visiting.has(name)) throw new Error(`[MolSysViewer] import circular en el bundle: ${name}`);
+        visiting.add(name);
+
+        const source = modules[name];
+        const rewritten = source.replace(RELATIVE_IMPORT, (match, prefix: string, quote: string, target: string) => {
+            if (!(target in modules)) return match;
+            return `${prefix}${quote}${resolve(target)}${quote}`;
+        });
+
+        const url = URL.createObjectURL(new Blob([rewritten], { type: "text/javascript" }));
+        visiting.delete(name);
+        urls.set(name, url);
+        return url;
+    };
+
+    for (const name of Object.keys(modules)) resolve(name);
+    return urls;
+}
+
+function requestBundle(model: any, bundleId: string): Promise<ModuleSources> {
+    return new Promise((resolve, reject) => {
+        const onMessage = (msg: any) => {
+            if (!msg || msg.event !== "bundle" || msg.bundle_id !== bundleId) return;
+            model.off("msg:custom", onMessage);
+            if (!msg.modules || typeof msg.modules !== "object") {
+                reject(new Error("[MolSysViewer] respuesta de bundle vacía"));
+                return;
+            }
+            resolve(msg.modules as ModuleSources);
+        };
+        model.on("msg:custom", onMessage);
+        model.send({ event: "request_bundle", bundle_id: bundleId });
+    });
+}
+
+async function loadEntry(model: any, timings: LoaderTimings) {
+    const bundleId: string = model.get("_bundle_id");
+    const entryName: string = model.get("_entry") || "widget.js";
+    const registry = getBundleRegistry();
+
+    let cache = registry.get(bundleId);
+    timings.cached = !!cache;
+    if (!cache) {
+        cache = { urls: new Map() };
+        registry.set(bundleId, cache);
+        const bundle = cache;
+        bundle.entry = (async () => {
+            const modules = await requestBundle(model, bundleId);
+            timings.bundle_ms = performance.now() - timings.t0;
+            bundle.urls = createModuleUrls(modules);
+            const url = bundle.urls.get(entryName);
+            if (!url) throw new Error(`[MolSysViewer] el bundle no contiene ${entryName}`);
+            const start = performance.now();
+            const entry = await import(/* webpackIgnore: true */ url);
+            timings.entry_ms = performance.now() - start;
+            return entry;
+        })();
+        bundle.entry.catch(() => registry.delete(bundleId));
+    }
+    return cache.entry;
+}
+
+export default {
+    async render({ model, el }: { model: any; el: HTMLElement }) {
+        const timings: LoaderTimings = { t0: performance.now() };
+        const entry = await loadEntry(model, timings);
+        return entry.default.render({ model, el, timings });
+    },
+};
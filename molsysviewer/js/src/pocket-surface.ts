@@ -23,14 +23,18 @@ import { PhysicalSizeTheme } from "molstar/lib/mol-theme/size/physical";
 import { ThemeDataContext } from "molstar/lib/mol-theme/theme";
 import { ValueCell } from "molstar/lib/mol-util/value-cell";
 import { Structure, StructureElement } from "molstar/lib/mol-model/structure";
-import { SortedArray } from "molstar/lib/mol-data/int/sorted-array";
 import { OrderedSet } from "molstar/lib/mol-data/int/ordered-set";
 import { Clip } from "molstar/lib/mol-util/clip";
 
+import { getAtomIndex, subsetFromAtomIndices } from "./atom-index";
+import { targetStructure } from "./structure";
+
 const MSVTransform = StateTransformer.builderFactory("molsysviewer");
 
 export interface PocketSurfaceOptions {
     atom_indices: number[];
+    /** Nombre de una selección definida con define_selection (el widget la resuelve). */
+    selection?: string;
     scalars?: number[];
     grid?: {
         resolution?: number;
@@ -99,24 +103,7 @@ function normalizeMouths(input?: number[] | number[][]): number[][] {
 }
 
 function createSubsetFromAtomIndices(structure: Structure, atomIndices: number[]): Structure | undefined {
-    const wanted = new Set(atomIndices);
-    const lociElements: StructureElement.Loci["elements"][0][] = [];
-
-    for (const unit of structure.units) {
-        const match: number[] = [];
-        const elements = unit.elements;
-        const count = OrderedSet.size(elements);
-        for (let i = 0; i < count; i++) {
-            const element = OrderedSet.getAt(elements, i);
-            if (wanted.has(element)) match.push(i);
-        }
-        if (match.length) {
-            lociElements.push({ unit, indices: SortedArray.ofSortedArray(match) as OrderedSet });
-        }
-    }
-
-    if (lociElements.length === 0) return undefined;
-    return StructureElement.toStructure(StructureElement.Loci(structure, lociElements));
+    return subsetFromAtomIndices(getAtomIndex(structure), atomIndices);
 }
 
 function buildClipPlanes(structure: Structure, options: PocketSurfaceOptions) {
@@ -241,15 +228,22 @@ function createClipProps(structure: Structure, options: PocketSurfaceOptions) {
     };
 }
 
-export async function addPocketSurfaceFromPython(plugin: PluginContext, options: PocketSurfaceOptions) {
-    const structureRef = plugin.managers.structure.hierarchy.current.structures.slice(-1)[0];
-    const structure = structureRef?.cell.obj?.data as Structure | undefined;
+export async function addPocketSurfaceFromPython(
+    plugin: PluginContext,
+    options: PocketSurfaceOptions,
+    target?: Structure,
+    loci?: StructureElement.Loci
+) {
+    const structure = targetStructure(plugin, target);
     if (!structure) {
         console.warn("[MolSysViewer] add_pocket_surface sin estructura cargada");
         return undefined;
     }
 
-    const subset = createSubsetFromAtomIndices(structure, options.atom_indices);
+    // Con una selección con nombre el loci ya viene precalculado.
+    const subset = loci && loci.structure === structure
+        ? (loci.elements.length ? StructureElement.toStructure(loci) : undefined)
+        : createSubsetFromAtomIndices(structure, options.atom_indices);
     if (!subset || subset.elementCount === 0) {
         console.warn("[MolSysViewer] add_pocket_surface sin átomos seleccionados");
         return undefined;
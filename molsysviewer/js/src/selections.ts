@@ -0,0 +1,53 @@
+// src/selections.ts
+import { Structure, StructureElement } from "molstar/lib/mol-model/structure";
+
+import { getAtomIndex, lociFromAtomIndices } from "./atom-index";
+
+/**
+ * Selecciones con nombre (MolSysView.define_selection en Python).
+ *
+ * Python envía los índices una sola vez (buffer int32); las ops posteriores
+ * sólo traen `selection: name`. Cada entrada guarda además su loci por
+ * estructura (WeakMap), de modo que sólo se recalcula tras una recarga o un
+ * cambio de frame. Redefinir un nombre sustituye sólo esa entrada.
+ */
+
+interface SelectionEntry {
+    atoms: Int32Array;
+    loci: WeakMap<Structure, StructureElement.Loci>;
+}
+
+export class SelectionRegistry {
+    private readonly entries = new Map<string, SelectionEntry>();
+
+    define(name: string, atoms: Int32Array) {
+        this.entries.set(name, { atoms, loci: new WeakMap() });
+    }
+
+    remove(name: string) {
+        this.entries.delete(name);
+    }
+
+    clear() {
+        this.entries.clear();
+    }
+
+    has(name: string) {
+        return this.entries.has(name);
+    }
+
+    atoms(name: string): Int32Array | undefined {
+        return this.entries.get(name)?.atoms;
+    }
+
+    loci(name: string, structure: Structure): StructureElement.Loci | undefined {
+        const entry = this.entries.get(name);
+        if (!entry) return undefined;
+        let loci = entry.loci.get(structure);
+        if (!loci) {
+            loci = lociFromAtomIndices(getAtomIndex(structure), entry.atoms);
+            entry.loci.set(structure, loci);
+        }
+        return loci;
+    }
+}
@@ -15,8 +15,13 @@ import { Vec3 } from "molstar/lib/mol-math/linear-algebra";
 
 import { OrderedSet } from "molstar/lib/mol-data/int/ordered-set";
 
-import { Structure, Unit, ElementIndex } from "molstar/lib/mol-model/structure";
+import { Structure } from "molstar/lib/mol-model/structure";
 
+import { getAtomIndex, atomPosition, atomChainId } from "./atom-index";
+import { targetStructure } from "./structure";
+
+import { Lines } from "molstar/lib/mol-geo/geometry/lines/lines";
+import { LinesBuilder } from "molstar/lib/mol-geo/geometry/lines/lines-builder";
 import { Mesh } from "molstar/lib/mol-geo/geometry/mesh/mesh";
 import { MeshBuilder } from "molstar/lib/mol-geo/geometry/mesh/mesh-builder";
 import { addSphere } from "molstar/lib/mol-geo/geometry/mesh/builder/sphere";
@@ -321,7 +326,7 @@ export async function addTransparentSpheresFromPython(
 // Network links (cylinders between point pairs)
 // ------------------------------------------------------------------
 
-type NetworkLinkColorMode = "link" | "pocket" | "chain";
+type NetworkLinkColorMode = "link" | "pocket" | "chain" | "distance";
 type NetworkLinkMode = "coordinates" | "atom-indices";
 
 const DefaultLinkPalette = [
@@ -343,6 +348,9 @@ export interface NetworkLinkSpec {
     pocketId?: string | number;
     chainId?: string;
     label?: string;
+    // Redes de contactos: distancia del par y contactos atómicos que resume
+    distance?: number;
+    contacts?: number;
 }
 
 interface NetworkLinksData {
@@ -397,8 +405,15 @@ function getNetworkLinksShape(
     const mesh = buildNetworkLinkMesh(data, _props, shape?.geometry);
     const getColor = (groupId: number) => Color(data.links[groupId].color);
     const getSize = (groupId: number) => data.links[groupId].radius;
-    const getLabel = (groupId: number) =>
-        data.links[groupId].label ?? `Link ${groupId} (r = ${data.links[groupId].radius.toFixed(2)})`;
+    const getLabel = (groupId: number) => {
+        const link = data.links[groupId];
+        if (link.label) return link.label;
+        if (link.distance !== undefined) {
+            const contacts = link.contacts !== undefined ? `, ${link.contacts} atom contacts` : "";
+            return `Contact ${groupId} (${link.distance.toFixed(2)} Å${contacts})`;
+        }
+        return `Link ${groupId} (r = ${link.radius.toFixed(2)})`;
+    };
 
     return Shape.create(data.name, data, mesh, getColor, getSize, getLabel);
 }
@@ -479,6 +494,18 @@ export interface NetworkLinkOptions {
     alpha?: number;
     radial_segments?: number;
     tag?: string;
+    // Redes de contactos (add_contact_network): pares y distancias llegan como buffers
+    binary?: boolean;
+    count?: number;
+    level?: string;
+    distance_range?: [number, number];
+    radius_range?: [number, number];
+    color_map?: number[] | string;
+    pair_array?: Int32Array;
+    distance_array?: Float32Array;
+    count_array?: Int32Array;
+    /** Recalcular con las coordenadas de cada frame (ver updateBoundShapes). */
+    bound?: boolean;
 }
 
 function normalizeCoordinatePair(entry: CoordinatePair): { start: [number, number, number]; end: [number, number, number] } | null {
@@ -524,25 +551,6 @@ function prepareColorLookup(keys: Array<string | number>, fallback: number) {
     return (key?: string | number) => (key !== undefined ? colorByKey.get(key) ?? fallback : fallback);
 }
 
-function buildUnitLookup(structure: Structure) {
-    const map = new Map<ElementIndex, { unit: Unit; elementIndex: ElementIndex }>();
-    for (const unit of structure.units) {
-        const { elements } = unit;
-        const count = OrderedSet.size(elements);
-        for (let i = 0; i < count; i++) {
-            const element = OrderedSet.getAt(elements, i) as ElementIndex;
-            map.set(element, { unit, elementIndex: element });
-        }
-    }
-    return map;
-}
-
-function getChainId(unit: Unit, elementIndex: ElementIndex) {
-    if (!Unit.isAtomic(unit)) return undefined;
-    const chainIndex = unit.getChainIndex(elementIndex);
-    return unit.model.atomicHierarchy.chains.label_asym_id.value(chainIndex);
-}
-
 function buildLinksFromCoordinates(options: NetworkLinkOptions): NetworkLinkSpec[] {
     const pairs = options.coordinate_pairs ?? [];
     const normalizedPairs = pairs
@@ -581,36 +589,30 @@ function buildLinksFromAtoms(structure: Structure, options: NetworkLinkOptions):
     const count = pairs.length;
     if (count === 0) return [];
 
-    const lookup = buildUnitLookup(structure);
+    const index = getAtomIndex(structure);
     const radii = expandToList<number>(options.radii, count, Number, 0.2);
     const pocketIds = expandToList<string | number>(options.pocket_ids, count, v => v, "");
     const colorMode: NetworkLinkColorMode = options.color_mode ?? "link";
     const colors = expandToList<number>(options.colors, count, Number, ColorNames.skyblue);
 
-    const positionsStart = Vec3();
-    const positionsEnd = Vec3();
-
     const chainIdList: string[] = [];
     const specs: NetworkLinkSpec[] = [];
 
     for (let i = 0; i < count; i++) {
         const [a, b] = pairs[i];
-        const locA = lookup.get(a as ElementIndex);
-        const locB = lookup.get(b as ElementIndex);
-        if (!locA || !locB) {
+        const start = atomPosition(index, a);
+        const end = atomPosition(index, b);
+        if (!start || !end) {
             console.warn(`[MolSysViewer] atom_pairs[${i}] no coincide con átomos de la estructura`);
             continue;
         }
 
-        locA.unit.conformation.position(locA.elementIndex, positionsStart);
-        locB.unit.conformation.position(locB.elementIndex, positionsEnd);
-
-        const chainId = getChainId(locA.unit, locA.elementIndex) ?? getChainId(locB.unit, locB.elementIndex);
+        const chainId = atomChainId(index, a) ?? atomChainId(index, b);
         chainIdList.push(chainId ?? "");
 
         specs.push({
-            start: [positionsStart[0], positionsStart[1], positionsStart[2]],
-            end: [positionsEnd[0], positionsEnd[1], positionsEnd[2]],
+            start,
+            end,
             radius: radii[i],
             color: colors[i],
             pocketId: pocketIds[i],
@@ -635,7 +637,55 @@ function buildLinksFromAtoms(structure: Structure, options: NetworkLinkOptions):
     return specs;
 }
 
-export async function addNetworkLinksFromPython(plugin: PluginContext, options: NetworkLinkOptions) {
+function buildLinksFromAtomArrays(structure: Structure, options: NetworkLinkOptions): NetworkLinkSpec[] {
+    const pairs = options.pair_array!;
+    const distances = options.distance_array;
+    const counts = options.count_array;
+    const count = pairs.length >> 1;
+    if (count === 0) return [];
+
+    const index = getAtomIndex(structure);
+    const radius = Array.isArray(options.radii) ? Number(options.radii[0]) : Number(options.radii ?? 0.2);
+    const color = Array.isArray(options.colors) ? Number(options.colors[0]) : Number(options.colors ?? ColorNames.skyblue);
+    const [minDistance, maxDistance] = options.distance_range ?? [0, 1];
+    const span = maxDistance > minDistance ? maxDistance - minDistance : 1;
+    const radiusRange = options.radius_range;
+    const palette = Array.isArray(options.color_map) && options.color_map.length === 0 ? undefined : options.color_map;
+    const scale = options.color_mode === "distance" && distances
+        ? ColorScale.create({ domain: [minDistance, minDistance + span], listOrName: palette ?? "turbo", minLabel: "min", maxLabel: "max" })
+        : undefined;
+
+    const specs: NetworkLinkSpec[] = [];
+    let missing = 0;
+    for (let i = 0; i < count; i++) {
+        const start = atomPosition(index, pairs[2 * i]);
+        const end = atomPosition(index, pairs[2 * i + 1]);
+        if (!start || !end) {
+            missing++;
+            continue;
+        }
+        const distance = distances ? distances[i] : undefined;
+        const t = distance !== undefined ? Math.min(1, Math.max(0, (distance - minDistance) / span)) : 0;
+        specs.push({
+            start,
+            end,
+            radius: radiusRange ? radiusRange[0] + t * (radiusRange[1] - radiusRange[0]) : radius,
+            color: scale && distance !== undefined ? scale.color(distance) : color,
+            distance,
+            contacts: counts ? counts[i] : undefined,
+        });
+    }
+    if (missing > 0) {
+        console.warn(`[MolSysViewer] ${missing} pares de atom_pairs no coinciden con átomos de la estructura`);
+    }
+    return specs;
+}
+
+function prepareNetworkLinksData(
+    plugin: PluginContext,
+    options: NetworkLinkOptions,
+    target?: Structure
+): NetworkLinksData | undefined {
     const mode: NetworkLinkMode = options.mode ?? (options.atom_pairs ? "atom-indices" : "coordinates");
     const radialSegments = Math.max(3, Math.floor(options.radial_segments ?? 16));
     const alpha = options.alpha ?? 1.0;
@@ -644,13 +694,12 @@ export async function addNetworkLinksFromPython(plugin: PluginContext, options:
     let name = "Network Links";
 
     if (mode === "atom-indices") {
-        const structureRef = plugin.managers.structure.hierarchy.current.structures.slice(-1)[0];
-        const structure = structureRef?.cell.obj?.data as Structure | undefined;
+        const structure = targetStructure(plugin, target);
         if (!structure) {
             console.warn("[MolSysViewer] add_network_links sin estructura cargada");
             return undefined;
         }
-        links = buildLinksFromAtoms(structure, options);
+        links = options.pair_array ? buildLinksFromAtomArrays(structure, options) : buildLinksFromAtoms(structure, options);
         name = getNetworkLinksName(links.length);
     } else {
         links = buildLinksFromCoordinates(options);
@@ -662,13 +711,18 @@ export async function addNetworkLinksFromPython(plugin: PluginContext, options:
         return undefined;
     }
 
-    const data: NetworkLinksData = {
+    return {
         links,
         alpha,
         radialSegments,
         name,
         tag: options.tag,
     };
+}
+
+export async function addNetworkLinksFromPython(plugin: PluginContext, options: NetworkLinkOptions, target?: Structure) {
+    const data = prepareNetworkLinksData(plugin, options, target);
+    if (!data) return undefined;
 
     const props: NetworkLinksProps = {
         ...PD.getDefaultValues(NetworkLinksParams),
@@ -825,6 +879,7 @@ export interface TriangleFacesOptions {
     alpha?: number;
     labels?: string | string[];
     tag?: string;
+    bound?: boolean;
 }
 
 function normalizeTriangle(entry: TriangleVerticesInput): TriangleFaceSpec["vertices"] | null {
@@ -879,10 +934,7 @@ function buildTrianglesFromAtoms(structure: Structure, options: TriangleFacesOpt
     const triplets = options.atom_triplets ?? options.atomTriplets ?? [];
     if (triplets.length === 0) return [];
 
-    const lookup = buildUnitLookup(structure);
-    const a = Vec3();
-    const b = Vec3();
-    const c = Vec3();
+    const index = getAtomIndex(structure);
 
     const colors = expandToList<number>(options.colors, triplets.length, Number, ColorNames.orange);
     const labels = expandOptionalToList<string>(options.labels, triplets.length, String);
@@ -896,24 +948,16 @@ function buildTrianglesFromAtoms(structure: Structure, options: TriangleFacesOpt
             continue;
         }
 
-        const locA = lookup.get(triplet[0] as ElementIndex);
-        const locB = lookup.get(triplet[1] as ElementIndex);
-        const locC = lookup.get(triplet[2] as ElementIndex);
-        if (!locA || !locB || !locC) {
+        const a = atomPosition(index, triplet[0]);
+        const b = atomPosition(index, triplet[1]);
+        const c = atomPosition(index, triplet[2]);
+        if (!a || !b || !c) {
             console.warn(`[MolSysViewer] atom_triplets[${i}] no coincide con átomos de la estructura`);
             continue;
         }
 
-        locA.unit.conformation.position(locA.elementIndex, a);
-        locB.unit.conformation.position(locB.elementIndex, b);
-        locC.unit.conformation.position(locC.elementIndex, c);
-
         triangles.push({
-            vertices: [
-                [a[0], a[1], a[2]],
-                [b[0], b[1], b[2]],
-                [c[0], c[1], c[2]],
-            ],
+            vertices: [a, b, c],
             color: colors[i],
             label: labels[i],
         });
@@ -922,15 +966,18 @@ function buildTrianglesFromAtoms(structure: Structure, options: TriangleFacesOpt
     return triangles;
 }
 
-function prepareTriangleFacesData(plugin: PluginContext, options: TriangleFacesOptions): TriangleFacesData | undefined {
+function prepareTriangleFacesData(
+    plugin: PluginContext,
+    options: TriangleFacesOptions,
+    target?: Structure
+): TriangleFacesData | undefined {
     const alpha = options.alpha ?? 1.0;
     let triangles: TriangleFaceSpec[] = [];
 
     const atomTriplets = options.atom_triplets ?? options.atomTriplets;
 
     if (atomTriplets && atomTriplets.length > 0) {
-        const structureRef = plugin.managers.structure.hierarchy.current.structures.slice(-1)[0];
-        const structure = structureRef?.cell.obj?.data as Structure | undefined;
+        const structure = targetStructure(plugin, target);
         if (!structure) {
             console.warn("[MolSysViewer] add_triangle_faces con atom_triplets pero sin estructura cargada");
             return undefined;
@@ -956,9 +1003,10 @@ function prepareTriangleFacesData(plugin: PluginContext, options: TriangleFacesO
 
 export async function addTriangleFacesFromPython(
     plugin: PluginContext,
-    options: TriangleFacesOptions
+    options: TriangleFacesOptions,
+    target?: Structure
 ): Promise<StateObjectRef<SO.Shape.Representation3D> | undefined> {
-    const data = prepareTriangleFacesData(plugin, options);
+    const data = prepareTriangleFacesData(plugin, options, target);
     if (!data) return undefined;
 
     const props: TriangleFacesProps = {
@@ -1198,6 +1246,7 @@ export interface TetrahedraOptions {
     show_all_faces?: boolean;
     tag?: string;
     name?: string;
+    bound?: boolean;
 }
 
 function normalizeTetraVertices(entry: TetraCoordsInput[][]): TetrahedronVertices | null {
@@ -1240,11 +1289,7 @@ function buildTetrahedraFromAtoms(structure: Structure, options: TetrahedraOptio
     const quads = (options.atomQuads ?? options.atom_quads ?? []).map(normalizeQuad).filter((q): q is number[] => q !== null);
     if (quads.length === 0) return [];
 
-    const lookup = buildUnitLookup(structure);
-    const a = Vec3();
-    const b = Vec3();
-    const c = Vec3();
-    const d = Vec3();
+    const index = getAtomIndex(structure);
 
     const colors = expandToList<number>(options.colors, quads.length, Number, ColorNames.orange);
     const alphas = expandToList<number>(options.alphas, quads.length, v => Math.max(0, Math.min(1, Number(v))), 0.6);
@@ -1254,27 +1299,17 @@ function buildTetrahedraFromAtoms(structure: Structure, options: TetrahedraOptio
 
     for (let i = 0; i < quads.length; i++) {
         const quad = quads[i];
-        const locA = lookup.get(quad[0] as ElementIndex);
-        const locB = lookup.get(quad[1] as ElementIndex);
-        const locC = lookup.get(quad[2] as ElementIndex);
-        const locD = lookup.get(quad[3] as ElementIndex);
-        if (!locA || !locB || !locC || !locD) {
+        const a = atomPosition(index, quad[0]);
+        const b = atomPosition(index, quad[1]);
+        const c = atomPosition(index, quad[2]);
+        const d = atomPosition(index, quad[3]);
+        if (!a || !b || !c || !d) {
             console.warn(`[MolSysViewer] atom_quads[${i}] no coincide con átomos de la estructura`);
             continue;
         }
 
-        locA.unit.conformation.position(locA.elementIndex, a);
-        locB.unit.conformation.position(locB.elementIndex, b);
-        locC.unit.conformation.position(locC.elementIndex, c);
-        locD.unit.conformation.position(locD.elementIndex, d);
-
         tetrahedra.push({
-            vertices: [
-                [a[0], a[1], a[2]],
-                [b[0], b[1], b[2]],
-                [c[0], c[1], c[2]],
-                [d[0], d[1], d[2]],
-            ],
+            vertices: [a, b, c, d],
             color: colors[i],
             alpha: alphas[i],
             label: labels[i],
@@ -1284,14 +1319,17 @@ function buildTetrahedraFromAtoms(structure: Structure, options: TetrahedraOptio
     return tetrahedra;
 }
 
-function prepareTetrahedraData(plugin: PluginContext, options: TetrahedraOptions): TetrahedraData | undefined {
+function prepareTetrahedraData(
+    plugin: PluginContext,
+    options: TetrahedraOptions,
+    target?: Structure
+): TetrahedraData | undefined {
     const exteriorOnly = options.exterior_only ?? !options.show_all_faces;
     let tetrahedra: TetrahedronSpec[] = [];
 
     const atomQuads = options.atomQuads ?? options.atom_quads;
     if (atomQuads && atomQuads.length > 0) {
-        const structureRef = plugin.managers.structure.hierarchy.current.structures.slice(-1)[0];
-        const structure = structureRef?.cell.obj?.data as Structure | undefined;
+        const structure = targetStructure(plugin, target);
         if (!structure) {
             console.warn("[MolSysViewer] add_tetrahedra con atom_quads pero sin estructura cargada");
             return undefined;
@@ -1317,9 +1355,10 @@ function prepareTetrahedraData(plugin: PluginContext, options: TetrahedraOptions
 
 export async function addTetrahedraFromPython(
     plugin: PluginContext,
-    options: TetrahedraOptions
+    options: TetrahedraOptions,
+    target?: Structure
 ): Promise<StateObjectRef<SO.Shape.Representation3D> | undefined> {
-    const data = prepareTetrahedraData(plugin, options);
+    const data = prepareTetrahedraData(plugin, options, target);
     if (!data) return undefined;
 
     const props: TetrahedraProps = {
@@ -1502,6 +1541,8 @@ export const DisplacementVectors3D = MSVTransform({
 export interface DisplacementVectorOptions {
     origins?: Array<[number, number, number]>;
     atom_indices?: number[];
+    /** Nombre de una selección definida con define_selection (el widget la resuelve). */
+    selection?: string;
     vectors?: Array<[number, number, number]>;
     length_scale?: number;
     min_length?: number;
@@ -1512,32 +1553,29 @@ export interface DisplacementVectorOptions {
     radius_scale?: number;
     radial_segments?: number;
     tag?: string;
+    bound?: boolean;
 }
 
 function resolveOriginsFromAtoms(
     plugin: PluginContext,
-    atomIndices: number[]
+    atomIndices: number[],
+    target?: Structure
 ): Array<[number, number, number] | undefined> {
-    const structureRef = plugin.managers.structure.hierarchy.current.structures.slice(-1)[0];
-    const structure = structureRef?.cell.obj?.data as Structure | undefined;
+    const structure = targetStructure(plugin, target);
     if (!structure) {
         console.warn("[MolSysViewer] add_displacement_vectors sin estructura cargada");
         return [];
     }
 
-    const lookup = buildUnitLookup(structure);
-    const position = Vec3();
+    const index = getAtomIndex(structure);
     const origins: Array<[number, number, number] | undefined> = [];
 
     atomIndices.forEach((idx, pos) => {
-        const loc = lookup.get(idx as ElementIndex);
-        if (!loc) {
+        const origin = atomPosition(index, idx);
+        if (!origin) {
             console.warn(`[MolSysViewer] atom_indices[${pos}] no coincide con átomos de la estructura`);
-            origins.push(undefined);
-            return;
         }
-        loc.unit.conformation.position(loc.elementIndex, position);
-        origins.push([position[0], position[1], position[2]]);
+        origins.push(origin);
     });
 
     return origins;
@@ -1545,7 +1583,8 @@ function resolveOriginsFromAtoms(
 
 function prepareDisplacementVectorData(
     plugin: PluginContext,
-    options: DisplacementVectorOptions
+    options: DisplacementVectorOptions,
+    target?: Structure
 ): DisplacementVectorData | undefined {
     const vectors = options.vectors ?? [];
     if (!vectors || vectors.length === 0) {
@@ -1554,7 +1593,7 @@ function prepareDisplacementVectorData(
     }
 
     const origins = options.atom_indices && options.atom_indices.length > 0
-        ? resolveOriginsFromAtoms(plugin, options.atom_indices)
+        ? resolveOriginsFromAtoms(plugin, options.atom_indices, target)
         : options.origins ?? [];
 
     if (!origins || origins.length === 0) {
@@ -1655,9 +1694,10 @@ function prepareDisplacementVectorData(
 
 export async function addDisplacementVectorsFromPython(
     plugin: PluginContext,
-    options: DisplacementVectorOptions
+    options: DisplacementVectorOptions,
+    target?: Structure
 ): Promise<StateObjectRef<SO.Shape.Representation3D> | undefined> {
-    const data = prepareDisplacementVectorData(plugin, options);
+    const data = prepareDisplacementVectorData(plugin, options, target);
     if (!data) return undefined;
 
     const props: DisplacementVectorProps = {
@@ -1682,3 +1722,198 @@ export async function addDisplacementVectorsFromPython(
 
     return node.ref;
 }
+
+// ------------------------------------------------------------------
+// Shapes ligadas a átomos (bound): siguen los frames de la trayectoria
+// ------------------------------------------------------------------
+
+export type BoundShapeKind = "links" | "triangles" | "tetrahedra" | "vectors";
+
+export interface BoundShape {
+    kind: BoundShapeKind;
+    options: NetworkLinkOptions | TriangleFacesOptions | TetrahedraOptions | DisplacementVectorOptions;
+}
+
+function prepareBoundShapeData(plugin: PluginContext, shape: BoundShape, structure: Structure) {
+    switch (shape.kind) {
+        case "links":
+            return prepareNetworkLinksData(plugin, shape.options as NetworkLinkOptions, structure);
+        case "triangles":
+            return prepareTriangleFacesData(plugin, shape.options as TriangleFacesOptions, structure);
+        case "tetrahedra":
+            return prepareTetrahedraData(plugin, shape.options as TetrahedraOptions, structure);
+        case "vectors":
+            return prepareDisplacementVectorData(plugin, shape.options as DisplacementVectorOptions, structure);
+    }
+}
+
+/**
+ * Recalcula la geometría de las shapes ligadas a átomos con las coordenadas
+ * de `structure` (el frame actual), en una sola actualización del estado.
+ *
+ * Sólo cambian los datos del nodo: el transform actualiza la representación
+ * existente y el MeshBuilder reutiliza los buffers de la malla anterior, sin
+ * crear nodos nuevos ni pasar por Python.
+ */
+export async function updateBoundShapes(plugin: PluginContext, shapes: Map<string, BoundShape>, structure: Structure) {
+    const state = plugin.state.data;
+    const builder = state.build();
+    let changed = false;
+    for (const [ref, shape] of shapes) {
+        const cell = state.cells.get(ref);
+        if (!cell) {
+            shapes.delete(ref);
+            continue;
+        }
+        const data = prepareBoundShapeData(plugin, shape, structure);
+        if (!data) continue;
+        builder.to(ref).update({ ...(cell.transform.params as any), data });
+        changed = true;
+    }
+    if (!changed) return;
+    await PluginCommands.State.Update(plugin, {
+        state,
+        tree: builder,
+        options: { doNotLogTiming: true },
+    });
+}
+
+// ------------------------------------------------------------------
+// Unit cell (aristas de la celda periódica como líneas)
+// ------------------------------------------------------------------
+
+interface UnitCellData {
+    origin: [number, number, number];
+    /** Vectores a, b, c de la celda en Å. */
+    vectors: [[number, number, number], [number, number, number], [number, number, number]];
+    color: number;
+    name: string;
+}
+
+const UnitCellParams = {
+    ...Lines.Params,
+};
+type UnitCellParams = typeof UnitCellParams;
+type UnitCellProps = PD.Values<UnitCellParams>;
+
+/** Las 12 aristas del paralelepípedo origin + {0,1}a + {0,1}b + {0,1}c. */
+function buildUnitCellLines(data: UnitCellData, _props: UnitCellProps, prev?: Lines): Lines {
+    const builder = LinesBuilder.create(12, 12, prev);
+    const [a, b, c] = data.vectors;
+    const corner = (i: number, j: number, k: number): [number, number, number] => [
+        data.origin[0] + i * a[0] + j * b[0] + k * c[0],
+        data.origin[1] + i * a[1] + j * b[1] + k * c[1],
+        data.origin[2] + i * a[2] + j * b[2] + k * c[2],
+    ];
+    for (let i = 0; i <= 1; i++) {
+        for (let j = 0; j <= 1; j++) {
+            const edges: Array<[[number, number, number], [number, number, number]]> = [
+                [corner(0, i, j), corner(1, i, j)],
+                [corner(i, 0, j), corner(i, 1, j)],
+                [corner(i, j, 0), corner(i, j, 1)],
+            ];
+            for (const [start, end] of edges) {
+                builder.add(start[0], start[1], start[2], end[0], end[1], end[2], 0);
+            }
+        }
+    }
+    return builder.getLines();
+}
+
+function getUnitCellShape(_ctx: RuntimeContext, data: UnitCellData, props: UnitCellProps, shape?: Shape<Lines>) {
+    const lines = buildUnitCellLines(data, props, shape?.geometry);
+    return Shape.create(data.name, data, lines, () => Color(data.color), () => 1, () => data.name);
+}
+
+const UnitCellVisuals = {
+    lines: (_ctx: RepresentationContext, _getParams: RepresentationParamsGetter<UnitCellData, UnitCellParams>) =>
+        ShapeRepresentation(getUnitCellShape, Lines.Utils),
+};
+
+function UnitCellRepresentation(
+    ctx: RepresentationContext,
+    getParams: RepresentationParamsGetter<UnitCellData, UnitCellParams>
+): Representation<UnitCellData, UnitCellParams> {
+    return Representation.createMulti(
+        "UnitCell",
+        ctx,
+        getParams,
+        Representation.StateBuilder,
+        UnitCellVisuals as unknown as Representation.Def<UnitCellData, UnitCellParams>
+    );
+}
+
+const UnitCellTransformParams = {
+    data: PD.Value<UnitCellData>(undefined as any),
+    props: PD.Value<UnitCellProps>(undefined as any),
+};
+
+export const UnitCell3D = MSVTransform({
+    name: "molsysviewer-unit-cell-3d",
+    display: { name: "Unit Cell" },
+    from: SO.Root,
+    to: SO.Shape.Representation3D,
+    params: UnitCellTransformParams,
+})({
+    canAutoUpdate() {
+        return true;
+    },
+    apply({ params }, plugin: PluginContext) {
+        return Task.create("Unit Cell", async ctx => {
+            const repr = UnitCellRepresentation(
+                { webgl: plugin.canvas3d?.webgl, ...plugin.representation.structure.themes },
+                () => UnitCellParams
+            );
+            await repr.createOrUpdate(params.props, params.data).runInContext(ctx);
+            return new SO.Shape.Representation3D({ repr, sourceData: params.data }, { label: params.data.name });
+        });
+    },
+    update({ b, newParams }, _plugin: PluginContext) {
+        return Task.create("Unit Cell", async ctx => {
+            await b.data.repr.createOrUpdate(newParams.props, newParams.data).runInContext(ctx);
+            b.data.sourceData = newParams.data;
+            return StateTransformer.UpdateResult.Updated;
+        });
+    },
+});
+
+export interface UnitCellOptions {
+    origin?: [number, number, number];
+    vectors?: number[][];
+    color?: number;
+    tag?: string;
+}
+
+export async function addUnitCellFromPython(
+    plugin: PluginContext,
+    options: UnitCellOptions
+): Promise<StateObjectRef<SO.Shape.Representation3D> | undefined> {
+    const vectors = options.vectors;
+    if (!vectors || vectors.length !== 3 || vectors.some(v => !v || v.length !== 3)) {
+        console.warn("[MolSysViewer] add_unit_cell sin tres vectores de celda");
+        return undefined;
+    }
+
+    const data: UnitCellData = {
+        origin: options.origin ?? [0, 0, 0],
+        vectors: vectors.map(v => [Number(v[0]), Number(v[1]), Number(v[2])]) as UnitCellData["vectors"],
+        color: options.color ?? ColorNames.gray,
+        name: "Unit Cell",
+    };
+    const props: UnitCellProps = {
+        ...PD.getDefaultValues(UnitCellParams),
+    };
+
+    const builder = plugin.state.data.build();
+    const node = builder.toRoot().apply(UnitCell3D, { data, props } as any, {
+        tags: options.tag ?? "molsysviewer:unit-cell",
+    });
+
+    await PluginCommands.State.Update(plugin, {
+        state: plugin.state.data,
+        tree: builder,
+        options: { doNotLogTiming: true },
+    });
+
+    return node.ref;
+}
@@ -1,14 +1,16 @@
 // src/structure.ts
 import { PluginContext } from "molstar/lib/mol-plugin/context";
 import { PluginStateObject as SO } from "molstar/lib/mol-plugin-state/objects";
-import { StateObjectRef } from "molstar/lib/mol-state";
+import { StateObjectRef, StateTransform } from "molstar/lib/mol-state";
 import { Column } from "molstar/lib/mol-data/db/column";
 import { Table } from "molstar/lib/mol-data/db/table";
 import { BasicSchema, createBasic } from "molstar/lib/mol-model-formats/structure/basic/schema";
 import { Topology } from "molstar/lib/mol-model/structure/topology";
 import { Coordinates } from "molstar/lib/mol-model/structure/coordinates";
 import { Model } from "molstar/lib/mol-model/structure/model";
+import { Structure } from "molstar/lib/mol-model/structure";
 import { Cell } from "molstar/lib/mol-math/geometry/spacegroup/cell";
+import { StateTransforms } from "molstar/lib/mol-plugin-state/transforms";
 
 export interface LoadStructureOptions {
     /** Referencia al nodo anterior que se debe eliminar antes de cargar. */
@@ -60,6 +62,24 @@ export interface MolSysPayload {
     };
 }
 
+/** Topología de un payload MolSysMT sin coordenadas (ver load_ensemble en Python). */
+export type MolSysTopologyPayload = Omit<MolSysPayload, "coordinates" | "time">;
+
+export interface LoadedEnsemble extends LoadedStructure {
+    /** Estructura de cada confórmero, en orden (una por modelo de la trayectoria). */
+    conformers: StateTransform.Ref[];
+}
+
+/**
+ * Estructura sobre la que actúa una op: la del slot que la envía o, si no se
+ * indica, la última cargada en el plugin.
+ */
+export function targetStructure(plugin: PluginContext, structure?: Structure): Structure | undefined {
+    if (structure) return structure;
+    const structureRef = plugin.managers.structure.hierarchy.current.structures.slice(-1)[0];
+    return structureRef?.cell.obj?.data as Structure | undefined;
+}
+
 async function recyclePreviousNode(plugin: PluginContext, previous?: StateObjectRef) {
     if (!previous) return;
     const builder = plugin.build();
@@ -96,6 +116,36 @@ export async function loadStructureFromString(
     };
 }
 
+/**
+ * Carga un BinaryCIF ya en memoria (p. ej. transcodificado en Python y
+ * recibido como buffer binario del widget).
+ */
+export async function loadStructureFromBinary(
+    plugin: PluginContext,
+    data: Uint8Array,
+    format: string = "mmcif",
+    label?: string,
+    options?: LoadStructureOptions
+): Promise<LoadedStructure> {
+    await recyclePreviousNode(plugin, options?.previous);
+
+    const raw = await plugin.builders.data.rawData({
+        data: data as Uint8Array<ArrayBuffer>,
+        label: label ?? "Structure from BinaryCIF",
+        ext: "bcif",
+    });
+
+    // ParseCif detecta datos binarios (Uint8Array) y usa el decodificador BinaryCIF.
+    const trajectory = await plugin.builders.structure.parseTrajectory(raw, format as any);
+    const preset = await plugin.builders.structure.hierarchy.applyPreset(trajectory, "default");
+
+    return {
+        data: raw.ref,
+        trajectory: trajectory.ref,
+        structure: preset?.structure?.ref,
+    };
+}
+
 export async function loadStructureFromUrl(
     plugin: PluginContext,
     url: string,
@@ -147,19 +197,7 @@ export async function loadStructureFromMolSysPayload(
         throw new Error("MolSys payload did not include atom identifiers");
     }
 
-    const firstFrame = payload.coordinates[0];
-    const atomSite = createAtomSiteTable(payload, atomCount, firstFrame);
-    const basic = createBasic({ atom_site: atomSite }, true);
-    const topology = Topology.create(
-        label ?? "MolSysMT",
-        basic,
-        createBondColumns(payload.bonds),
-        {
-            kind: "mol-viewer:molsysmt",
-            name: label ?? "MolSysMT",
-            data: payload.meta ?? {},
-        }
-    );
+    const topology = createTopology(payload, atomCount, splitPositions(payload.coordinates[0], atomCount), label);
 
     const frames = payload.coordinates.map((frame, index) => createFrame(frame, atomCount, index));
     const delta = payload.time?.delta ?? 1;
@@ -195,7 +233,153 @@ export async function loadStructureFromMolSysPayload(
     };
 }
 
-function createAtomSiteTable(payload: MolSysPayload, atomCount: number, frame: MolSysFramePayload) {
+/** Bloque de una carga progresiva (ver molsysviewer/_private/progressive.py). */
+export interface PayloadChunk {
+    /** Índices de sus átomos en el sistema completo. */
+    indices: Int32Array;
+    /** Posiciones del primer frame en Å, contiguas como `(n, 3)`. */
+    positions: Float32Array;
+    atoms: MolSysAtomPayload;
+}
+
+/** Resto del payload de una carga progresiva: el primer frame llega sin posiciones. */
+export type PayloadChunksRest = Omit<MolSysPayload, "atoms" | "coordinates"> & {
+    coordinates: Array<Partial<MolSysFramePayload>>;
+};
+
+/** Payload de un solo bloque, para dibujarlo como estructura provisional. */
+export function payloadFromChunk(chunk: PayloadChunk, bonds?: MolSysPayload["bonds"]): MolSysPayload {
+    const { indices, positions: block } = chunk;
+    const positions = new Array<number[]>(indices.length);
+    for (let i = 0; i < indices.length; i++) {
+        positions[i] = [block[3 * i], block[3 * i + 1], block[3 * i + 2]];
+    }
+    return { atoms: chunk.atoms, coordinates: [{ positions }], bonds };
+}
+
+/**
+ * Reensambla el payload completo a partir de los bloques de una carga
+ * progresiva: cada campo de átomos y las posiciones del primer frame se
+ * colocan en el orden atómico original.
+ */
+export function assemblePayloadChunks(chunks: PayloadChunk[], atomCount: number, rest: PayloadChunksRest): MolSysPayload {
+    const atoms: Record<string, unknown[]> = {};
+    const positions = new Array<number[]>(atomCount);
+    let received = 0;
+    for (const chunk of chunks) {
+        const { indices, positions: block } = chunk;
+        for (const [field, values] of Object.entries(chunk.atoms)) {
+            if (!Array.isArray(values) || values.length !== indices.length) continue;
+            const column = atoms[field] ?? (atoms[field] = new Array(atomCount));
+            for (let i = 0; i < indices.length; i++) column[indices[i]] = values[i];
+        }
+        for (let i = 0; i < indices.length; i++) {
+            positions[indices[i]] = [block[3 * i], block[3 * i + 1], block[3 * i + 2]];
+        }
+        received += indices.length;
+    }
+    if (received !== atomCount) {
+        throw new Error(`Progressive load received ${received} of ${atomCount} atoms`);
+    }
+    const [first, ...others] = rest.coordinates ?? [];
+    return {
+        ...rest,
+        atoms: atoms as unknown as MolSysAtomPayload,
+        coordinates: [{ ...first, positions }, ...(others as MolSysFramePayload[])],
+    };
+}
+
+/**
+ * Carga un ensemble de confórmeros con una topología común.
+ *
+ * `block` trae las coordenadas de todos los confórmeros en Å, contiguas como
+ * `(nConformers, atomCount, 3)`. Se crea una sola trayectoria y, a partir de
+ * ella, un modelo y una estructura por confórmero con su representación, de
+ * modo que se superponen y cada uno se muestra u oculta sin volver a recibir
+ * nada.
+ */
+export async function loadEnsembleFromBlock(
+    plugin: PluginContext,
+    payload: MolSysTopologyPayload,
+    block: Float32Array,
+    nConformers: number,
+    label?: string,
+    options?: LoadStructureOptions
+): Promise<LoadedEnsemble> {
+    await recyclePreviousNode(plugin, options?.previous);
+
+    const atomCount = payload?.atoms?.atom_id?.length ?? 0;
+    if (atomCount === 0 || nConformers <= 0) {
+        throw new Error("Ensemble payload requires atoms and at least one conformer");
+    }
+    if (block.length !== nConformers * atomCount * 3) {
+        throw new Error("Ensemble coordinate block does not match conformer and atom counts");
+    }
+
+    const frames: Coordinates.Frame[] = [];
+    for (let i = 0; i < nConformers; i++) frames.push(createFrameFromBlock(block, i, atomCount));
+    const topology = createTopology(payload, atomCount, frames[0], label);
+    const coordinates = Coordinates.create(frames, { value: 1, unit: "step" }, { value: 0, unit: "step" });
+
+    const trajectory = await plugin.runTask(
+        Model.trajectoryFromTopologyAndCoordinates(topology, coordinates),
+        { useOverlay: false }
+    );
+
+    const builder = plugin.build();
+    const trajectoryNode = builder
+        .toRoot()
+        .insert(
+            new SO.Molecule.Trajectory(trajectory, {
+                label: label ?? "MolSysMT Ensemble",
+                description: `${nConformers} conformer${nConformers === 1 ? "" : "s"}`,
+            })
+        );
+    const conformers: StateTransform.Ref[] = [];
+    for (let i = 0; i < nConformers; i++) {
+        const structure = trajectoryNode
+            .apply(StateTransforms.Model.ModelFromTrajectory, { modelIndex: i })
+            .apply(StateTransforms.Model.StructureFromModel, { type: { name: "model", params: {} } });
+        conformers.push(structure.ref);
+    }
+    await builder.commit();
+
+    for (const ref of conformers) {
+        await plugin.builders.structure.representation.applyPreset(ref, "auto");
+    }
+
+    return {
+        trajectory: trajectoryNode.ref,
+        structure: conformers[0],
+        conformers,
+    };
+}
+
+function createTopology(
+    payload: MolSysTopologyPayload,
+    atomCount: number,
+    positions: { x: ArrayLike<number>; y: ArrayLike<number>; z: ArrayLike<number> },
+    label?: string
+) {
+    const atomSite = createAtomSiteTable(payload, atomCount, positions);
+    const basic = createBasic({ atom_site: atomSite }, true);
+    return Topology.create(
+        label ?? "MolSysMT",
+        basic,
+        createBondColumns(payload.bonds),
+        {
+            kind: "mol-viewer:molsysmt",
+            name: label ?? "MolSysMT",
+            data: payload.meta ?? {},
+        }
+    );
+}
+
+function createAtomSiteTable(
+    payload: MolSysTopologyPayload,
+    atomCount: number,
+    { x, y, z }: { x: ArrayLike<number>; y: ArrayLike<number>; z: ArrayLike<number> }
+) {
     const atoms = payload.atoms;
     const ids = ensureNumericArray(atoms.atom_id, atomCount, i => i + 1);
     const names = ensureStringArray(atoms.atom_name, atomCount, i => `A${i + 1}`);
@@ -206,8 +390,6 @@ function createAtomSiteTable(payload: MolSysPayload, atomCount: number, frame: M
     const entityIds = ensureStringArray(atoms.entity_id, atomCount, () => "1");
     const charges = ensureNumericArray(atoms.formal_charge, atomCount, () => 0);
 
-    const { x, y, z } = splitPositions(frame, atomCount);
-
     return Table.ofPartialColumns(BasicSchema.atom_site, {
         id: Column.ofIntArray(ids),
         label_atom_id: Column.ofStringArray(names),
@@ -279,6 +461,27 @@ function createFrame(frame: MolSysFramePayload, atomCount: number, index: number
     };
 }
 
+/** Frame `index` del bloque `(n, atomCount, 3)`, separado en columnas x/y/z. */
+export function createFrameFromBlock(block: Float32Array, index: number, atomCount: number): Coordinates.Frame {
+    const x = new Float32Array(atomCount);
+    const y = new Float32Array(atomCount);
+    const z = new Float32Array(atomCount);
+    let offset = index * atomCount * 3;
+    for (let i = 0; i < atomCount; i++, offset += 3) {
+        x[i] = block[offset];
+        y[i] = block[offset + 1];
+        z[i] = block[offset + 2];
+    }
+    return {
+        elementCount: atomCount,
+        time: { value: index, unit: "step" },
+        x,
+        y,
+        z,
+        xyzOrdering: { isIdentity: true },
+    };
+}
+
 function createBondColumns(bonds: MolSysPayload["bonds"]): Topology["bonds"] {
     if (!bonds || bonds.indexA.length === 0) {
         return {
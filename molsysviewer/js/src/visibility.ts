@@ -0,0 +1,201 @@
+// src/visibility.ts
+import { PluginContext } from "molstar/lib/mol-plugin/context";
+import { StructureComponentRef } from "molstar/lib/mol-plugin-state/manager/structure/hierarchy-state";
+import {
+    clearStructureTransparency,
+    setStructureTransparency,
+} from "molstar/lib/mol-plugin-state/helpers/structure-transparency";
+import { StructureComponentParams } from "molstar/lib/mol-plugin-state/helpers/structure-component";
+import { Structure, StructureElement } from "molstar/lib/mol-model/structure";
+import { OrderedSet } from "molstar/lib/mol-data/int/ordered-set";
+import { SortedArray } from "molstar/lib/mol-data/int/sorted-array";
+
+import { getAtomIndex, lociFromAtomIndices } from "./atom-index";
+
+/**
+ * Motor de visibilidad de átomos.
+ *
+ * Dos estrategias:
+ *  - "transparency": transparencia 1 sobre los átomos ocultos. Barato de
+ *    aplicar, pero la geometría oculta se sigue construyendo y dibujando.
+ *  - "subset": cada componente de la estructura se reconstruye con la
+ *    intersección de su selección original y los átomos visibles (un bundle),
+ *    así que la geometría oculta nunca se construye ni se dibuja. Cuesta una
+ *    reconstrucción de las representaciones proporcional a lo visible.
+ *
+ * En modo "auto" se usa "subset" cuando la fracción visible es pequeña
+ * (aislar un sitio de unión en una cápside) y "transparency" cuando se
+ * ocultan unos pocos átomos de un sistema grande.
+ */
+
+export type VisibilityMode = "auto" | "subset" | "transparency";
+
+export const DEFAULT_SUBSET_THRESHOLD = 0.5;
+
+export interface VisibilityOptions {
+    mode?: VisibilityMode;
+    /** Fracción visible máxima con la que "auto" elige "subset". */
+    subset_threshold?: number;
+}
+
+export interface VisibilityReport {
+    mode: "all" | "subset" | "transparency";
+    visible: number;
+    total: number;
+}
+
+interface ComponentOverride {
+    params: StructureComponentParams;
+    structure: Structure;
+}
+
+export class VisibilityEngine {
+    /** Parámetros y estructura originales de los componentes reemplazados por subconjuntos. */
+    private readonly overrides = new Map<string, ComponentOverride>();
+    private transparent = false;
+
+    constructor(private readonly plugin: PluginContext) {}
+
+    async apply(
+        structure: Structure,
+        components: StructureComponentRef[],
+        visibleAtomIndices: ArrayLike<number> | undefined,
+        options?: VisibilityOptions
+    ): Promise<VisibilityReport> {
+        const index = getAtomIndex(structure);
+        const total = index.count;
+
+        if (!visibleAtomIndices || visibleAtomIndices.length === 0) {
+            await this.reset(components);
+            return { mode: "all", visible: total, total };
+        }
+
+        const visible = new Uint8Array(index.size);
+        let visibleCount = 0;
+        for (let i = 0, n = visibleAtomIndices.length; i < n; i++) {
+            const atom = visibleAtomIndices[i];
+            if (atom < 0 || atom >= index.size || index.unitOf[atom] === -1 || visible[atom]) continue;
+            visible[atom] = 1;
+            visibleCount++;
+        }
+
+        if (visibleCount === total) {
+            await this.reset(components);
+            return { mode: "all", visible: total, total };
+        }
+
+        const mode = chooseMode(options, total > 0 ? visibleCount / total : 1);
+        if (mode === "subset") {
+            await this.clearTransparency(components);
+            await this.applySubsets(components, visible);
+        } else {
+            await this.restoreComponents();
+            await this.clearTransparency(components);
+
+            const hiddenAtoms: number[] = [];
+            for (let atom = 0; atom < index.size; atom++) {
+                if (!visible[atom] && index.unitOf[atom] !== -1) hiddenAtoms.push(atom);
+            }
+            const loci = lociFromAtomIndices(index, hiddenAtoms);
+            await setStructureTransparency(this.plugin, components, 1, async () => loci);
+            this.transparent = true;
+        }
+        return { mode, visible: visibleCount, total };
+    }
+
+    /** Mostrar todos los átomos: deshace subconjuntos y transparencias. */
+    async reset(components: StructureComponentRef[]) {
+        await this.restoreComponents();
+        await this.clearTransparency(components);
+    }
+
+    /** Devolver a los componentes reemplazados su selección original. */
+    async restoreComponents() {
+        if (this.overrides.size === 0) return;
+        const cells = this.plugin.state.data.cells;
+        const update = this.plugin.build();
+        let changed = false;
+        for (const [ref, override] of this.overrides) {
+            if (!cells.has(ref)) continue;
+            update.to(ref).update(override.params);
+            changed = true;
+        }
+        this.overrides.clear();
+        if (changed) await update.commit();
+    }
+
+    private async clearTransparency(components: StructureComponentRef[]) {
+        if (!this.transparent) return;
+        await clearStructureTransparency(this.plugin, components);
+        this.transparent = false;
+    }
+
+    private async applySubsets(components: StructureComponentRef[], visible: Uint8Array) {
+        const cells = this.plugin.state.data.cells;
+
+        // Los componentes que quedaron vacíos (StateObject.Null) desaparecen de la jerarquía,
+        // así que también se recorren los ya reemplazados.
+        const refs = new Set<string>(this.overrides.keys());
+        for (const component of components) refs.add(component.cell.transform.ref);
+
+        const update = this.plugin.build();
+        let changed = false;
+        for (const ref of refs) {
+            const cell = cells.get(ref);
+            if (!cell) {
+                this.overrides.delete(ref);
+                continue;
+            }
+            let override = this.overrides.get(ref);
+            if (!override) {
+                const data = cell.obj?.data;
+                if (!(data instanceof Structure)) continue;
+                override = { params: cell.transform.params as StructureComponentParams, structure: data };
+                this.overrides.set(ref, override);
+            }
+
+            const parent = cells.get(cell.transform.parent)?.obj?.data;
+            if (!(parent instanceof Structure)) continue;
+
+            const bundle = StructureElement.Bundle.fromLoci(intersectVisible(parent, override.structure, visible));
+            update.to(ref).update({
+                ...override.params,
+                type: { name: "bundle", params: bundle },
+                nullIfEmpty: true,
+            });
+            changed = true;
+        }
+        if (changed) await update.commit();
+    }
+}
+
+function chooseMode(options: VisibilityOptions | undefined, fraction: number): "subset" | "transparency" {
+    const mode = options?.mode ?? "auto";
+    if (mode === "subset" || mode === "transparency") return mode;
+    const threshold = options?.subset_threshold ?? DEFAULT_SUBSET_THRESHOLD;
+    return fraction <= threshold ? "subset" : "transparency";
+}
+
+/** Átomos visibles de `component`, como loci sobre su estructura padre. */
+function intersectVisible(parent: Structure, component: Structure, visible: Uint8Array): StructureElement.Loci {
+    const elements: StructureElement.Loci["elements"][0][] = [];
+    for (const unit of component.units) {
+        const parentUnit = parent.unitMap.get(unit.id);
+        if (!parentUnit) continue;
+        const ordinals: number[] = [];
+        const count = OrderedSet.size(unit.elements);
+        for (let i = 0; i < count; i++) {
+            const element = OrderedSet.getAt(unit.elements, i);
+            if (element < visible.length && visible[element]) {
+                ordinals.push(SortedArray.indexOf(parentUnit.elements, element));
+            }
+        }
+        if (ordinals.length) {
+            elements.push({
+                unit: parentUnit,
+                indices: SortedArray.ofSortedArray(ordinals) as unknown as OrderedSet<StructureElement.UnitIndex>,
+            });
+        }
+    }
+    return StructureElement.Loci(parent, elements);
+}
@@ -6,40 +6,56 @@ import { PluginContext } from "molstar/lib/mol-plugin/context";
 import { DefaultPluginSpec } from "molstar/lib/mol-plugin/spec";
 import { PluginCommands } from "molstar/lib/mol-plugin/commands";
 import { PluginStateObject as SO } from "molstar/lib/mol-plugin-state/objects";
+import { StateTransforms } from "molstar/lib/mol-plugin-state/transforms";
+import { StructureRef } from "molstar/lib/mol-plugin-state/manager/structure/hierarchy-state";
+import { clearStructureTransparency } from "molstar/lib/mol-plugin-state/helpers/structure-transparency";
+import { Structure, StructureElement } from "molstar/lib/mol-model/structure";
+import { StateObjectRef, StateTransform } from "molstar/lib/mol-state";
+import { setSubtreeVisibility } from "molstar/lib/mol-plugin/behavior/static/state";
 import {
-    StructureComponentRef,
-    StructureRef,
-} from "molstar/lib/mol-plugin-state/manager/structure/hierarchy-state";
-import {
-    clearStructureTransparency,
-    setStructureTransparency,
-} from "molstar/lib/mol-plugin-state/helpers/structure-transparency";
-import { Structure, StructureElement, Unit } from "molstar/lib/mol-model/structure";
-import { StructureSelection } from "molstar/lib/mol-model/structure/query";
-import { OrderedSet } from "molstar/lib/mol-data/int/ordered-set";
-import { SortedArray } from "molstar/lib/mol-data/int/sorted-array";
-import { StateObjectRef } from "molstar/lib/mol-state";
+    createStructureColorThemeParams,
+    createStructureSizeThemeParams,
+} from "molstar/lib/mol-plugin-state/helpers/structure-representation-params";
 
-import {
+import type {
+    BoundShape,
+    BoundShapeKind,
     DisplacementVectorOptions,
-    addDisplacementVectorsFromPython,
-    addNetworkLinksFromPython,
-    addTetrahedraFromPython,
-    addTriangleFacesFromPython,
-    addTransparentSphereFromPython,
-    addTransparentSpheresFromPython,
     NetworkLinkOptions,
     TetrahedraOptions,
     TriangleFacesOptions,
     TransparentSphereSpec,
+    UnitCellOptions,
 } from "./shapes";
-import { addPocketSurfaceFromPython, PocketSurfaceOptions } from "./pocket-surface";
+import type { PocketSurfaceOptions } from "./pocket-surface";
+import { getViewGroup, ViewGroupMember } from "./groups";
+import { getAtomIndex } from "./atom-index";
+import { VisibilityEngine, VisibilityOptions, VisibilityReport } from "./visibility";
+import { SelectionRegistry } from "./selections";
+import {
+    AtomPropertyThemeName,
+    channelKey,
+    deleteAtomPropertyChannel,
+    deleteAtomPropertyChannels,
+    registerAtomPropertyThemes,
+    setAtomPropertyChannel,
+    setAtomPropertyRow,
+} from "./atom-properties";
 import {
     LoadedStructure,
+    MolSysAtomPayload,
     MolSysPayload,
+    MolSysTopologyPayload,
+    PayloadChunk,
+    PayloadChunksRest,
+    assemblePayloadChunks,
+    createFrameFromBlock,
+    loadEnsembleFromBlock,
+    loadStructureFromBinary,
     loadStructureFromString,
     loadStructureFromUrl,
     loadStructureFromMolSysPayload,
+    payloadFromChunk,
 } from "./structure";
 
 
@@ -50,8 +66,9 @@ import {
  * The build process is manual and performed only when the maintainer decides
  * to regenerate `viewer.js`.
  *
- * The generated file is:
- *    ../viewer.js  (molsysviewer/viewer.js)
+ * The generated files are:
+ *    ../viewer.js   (molsysviewer/viewer.js, the small loader from loader.ts)
+ *    ../bundle/*.js (molsysviewer/bundle/, this entry plus its lazy chunks)
  *
  * This project intentionally commits the generated JS artifact so that the
  * Python package can be distributed without requiring a Node/TypeScript
@@ -67,11 +84,108 @@ import {
  */
 
 
+// ------------------------------------------------------------------
+// Módulos cargados bajo demanda
+// ------------------------------------------------------------------
+// Los transforms de shapes (TransparentSpheres3D, NetworkLinks3D, Tetrahedra3D,
+// ...) y PocketSurface3D viven en chunks separados del bundle: no se parsean
+// hasta la primera op que los necesita, de modo que el plugin y la carga de
+// estructuras llegan antes al `ready`.
+let shapesModule: Promise<typeof import("./shapes")> | undefined;
+let pocketSurfaceModule: Promise<typeof import("./pocket-surface")> | undefined;
+
+function loadShapesModule() {
+    if (!shapesModule) shapesModule = import("./shapes");
+    return shapesModule;
+}
+
+function loadPocketSurfaceModule() {
+    if (!pocketSurfaceModule) pocketSurfaceModule = import("./pocket-surface");
+    return pocketSurfaceModule;
+}
+
+
+// ------------------------------------------------------------------
+// Transporte comprimido (ver molsysviewer/_private/compression.py)
+// ------------------------------------------------------------------
+async function decompressText(buffer: DataView, codec: CompressionFormat): Promise<string> {
+    const bytes = new Uint8Array(buffer.buffer, buffer.byteOffset, buffer.byteLength);
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream(codec));
+    return await new Response(stream).text();
+}
+
+
 // ------------------------------------------------------------------
 // Controlador principal del viewer
 // ------------------------------------------------------------------
+type NotifyPython = (event: Record<string, unknown>) => void;
+
+/** Clave de la estructura por defecto (mensajes sin `structure`). */
+const DEFAULT_STRUCTURE = "";
+
+/**
+ * Estado de una estructura cargada (MolSysView.load(..., key=...) en Python).
+ *
+ * Cada slot tiene su subárbol en el estado de Mol*, su motor de visibilidad,
+ * sus selecciones con nombre y sus shapes, de modo que varias estructuras
+ * conviven en la misma vista y se quitan sin recargar las demás.
+ */
+interface StructureSlot {
+    readonly key: string;
+    loaded?: LoadedStructure;
+    current?: StructureRef;
+    readonly visibility: VisibilityEngine;
+    readonly selections: SelectionRegistry;
+    readonly shapeRefs: Set<StateObjectRef<SO.Shape.Representation3D>>;
+    /** Si el slot es un ensemble: estructura y motor de visibilidad de cada confórmero. */
+    conformers?: {
+        refs: StateTransform.Ref[];
+        engines: VisibilityEngine[];
+    };
+    /** Frames recibidos de un TrajectoryPlayer (ver handleSetFrameCoordinates). */
+    frames?: FrameStream;
+    /** Nombres de los canales de propiedades por átomo del slot (ver atom-properties.ts). */
+    readonly properties: Set<string>;
+    /** Carga progresiva en curso (ver handleLoadPayloadChunk). */
+    progressive?: ProgressiveLoad;
+    /** Shapes con `bound` que se recalculan en cada frame (ver syncBoundShapes). */
+    readonly bound: BoundShapes;
+}
+
+interface BoundShapes {
+    /** Ref del nodo de la shape → tipo y opciones con que se creó. */
+    readonly shapes: Map<string, BoundShape>;
+    /** Hay una actualización en curso; otro cambio de frame sólo marca `pending`. */
+    busy: boolean;
+    pending: boolean;
+}
+
+interface ProgressiveLoad {
+    readonly loadId: number;
+    readonly nChunks: number;
+    readonly atomCount: number;
+    /** Bloques recibidos, en orden de llegada. */
+    readonly chunks: PayloadChunk[];
+    /** Trayectorias de las estructuras provisionales de cada bloque. */
+    refs: StateObjectRef[];
+    readonly start: number;
+    firstPaintMs?: number;
+    /** Cola de la carga: bloques y mensaje final se aplican en orden. */
+    queue: Promise<void>;
+}
+
+interface FrameStream {
+    /** Nodo ModelWithCoordinates insertado sobre el modelo de la estructura. */
+    decorator?: StateTransform.Ref;
+    /** Hay un frame aplicándose; los que llegan mientras tanto sólo sustituyen a `next`. */
+    busy: boolean;
+    next?: { frame: number; frameCount: number; positions: Float32Array; rows: Array<[string, Float32Array]> };
+}
+
+let nextControllerId = 0;
+
 class MolSysViewerController {
-    static async create(target: HTMLElement): Promise<MolSysViewerController> {
+    static async create(target: HTMLElement, notify: NotifyPython = () => {}): Promise<MolSysViewerController> {
         const canvas = document.createElement("canvas");
         canvas.style.width = "100%";
         canvas.style.height = "100%";
@@ -91,69 +205,163 @@ class MolSysViewerController {
             console.error("[MolSysViewer] Plugin init function not found (initViewer/initViewerAsync missing)");
         }
         if (!ok) console.error("[MolSysViewer] Failed to init Mol* viewer");
+        registerAtomPropertyThemes(plugin);
 
-        return new MolSysViewerController(plugin);
+        return new MolSysViewerController(plugin, notify);
     }
 
-    private readonly shapeRefs = new Set<StateObjectRef<SO.Shape.Representation3D>>();
-    private currentStructure?: StructureRef;
-    private loadedStructure?: LoadedStructure;
+    private readonly slots = new Map<string, StructureSlot>();
     private readonly labelRefs = new Set<StateObjectRef>();
+    private groupMember?: ViewGroupMember;
+    /** Prefijo de los canales de propiedades de esta vista (el registro es global). */
+    private readonly scope = `view${nextControllerId++}`;
+
+    private constructor(
+        private readonly plugin: PluginContext,
+        private readonly notify: NotifyPython
+    ) {
+        // Un cambio de frame (TrajectoryPlayer o controles de Mol*) vuelve a crear el objeto de la estructura.
+        this.plugin.state.data.events.object.updated.subscribe(({ ref }) => {
+            for (const slot of this.slots.values()) {
+                if (slot.bound.shapes.size > 0 && StateObjectRef.resolveRef(slot.loaded?.structure) === ref) {
+                    this.syncBoundShapes(slot);
+                }
+            }
+        });
+    }
 
-    private constructor(private readonly plugin: PluginContext) {}
+    /** Slot de la estructura `key` (la estructura por defecto si no se indica). */
+    private getSlot(key?: string): StructureSlot {
+        const slotKey = typeof key === "string" ? key : DEFAULT_STRUCTURE;
+        let slot = this.slots.get(slotKey);
+        if (!slot) {
+            slot = {
+                key: slotKey,
+                visibility: new VisibilityEngine(this.plugin),
+                selections: new SelectionRegistry(),
+                shapeRefs: new Set(),
+                properties: new Set(),
+                bound: { shapes: new Map(), busy: false, pending: false },
+            };
+            this.slots.set(slotKey, slot);
+        }
+        return slot;
+    }
 
-    async handleMessage(msg: ViewerMessage) {
+    async handleMessage(msg: ViewerMessage, buffers?: DataView[]) {
         if (!msg || typeof msg !== "object") return;
         if (!("op" in msg)) {
             console.warn("[MolSysViewer] mensaje sin 'op'", msg);
             return;
         }
 
+        // Los mensajes de un StructureHandle traen su clave; el resto van a la estructura por defecto.
+        const key = (msg as StructureScopedMessage).structure;
+
         try {
             switch (msg.op) {
                 case "load_structure_from_string":
                 case "load_pdb_string":
-                    await this.handleLoadFromString(msg as LoadStructureMessage);
+                    await this.handleLoadFromString(this.getSlot(key), msg as LoadStructureMessage, buffers);
+                    break;
+
+                case "load_structure_from_bcif":
+                    await this.handleLoadFromBcif(this.getSlot(key), msg as LoadStructureFromBcifMessage, buffers);
                     break;
 
                 case "load_molsys_payload":
-                    await this.handleLoadMolSysPayload(msg as LoadMolSysPayloadMessage);
+                    await this.handleLoadMolSysPayload(this.getSlot(key), msg as LoadMolSysPayloadMessage);
+                    break;
+
+                case "load_payload_chunk":
+                    await this.handleLoadPayloadChunk(this.getSlot(key), msg as LoadPayloadChunkMessage, buffers);
+                    break;
+
+                case "finish_payload_chunks":
+                    await this.handleFinishPayloadChunks(this.getSlot(key), msg as FinishPayloadChunksMessage);
+                    break;
+
+                case "load_ensemble":
+                    await this.handleLoadEnsemble(this.getSlot(key), msg as LoadEnsembleMessage, buffers);
+                    break;
+
+                case "show_conformers":
+                    this.showConformers(this.getSlot(key), (msg as ShowConformersMessage).conformers);
+                    break;
+
+                case "set_frame_coordinates":
+                    await this.handleSetFrameCoordinates(this.getSlot(key), msg as SetFrameCoordinatesMessage, buffers);
+                    break;
+
+                case "set_atom_property":
+                    await this.handleSetAtomProperty(this.getSlot(key), msg as SetAtomPropertyMessage, buffers);
+                    break;
+
+                case "remove_atom_property":
+                    await this.removeAtomProperty(this.getSlot(key), (msg as RemoveAtomPropertyMessage).name);
                     break;
 
                 case "load_structure_from_url":
-                    await this.handleLoadFromUrl(msg as LoadStructureFromUrlMessage);
+                    await this.handleLoadFromUrl(this.getSlot(key), msg as LoadStructureFromUrlMessage);
                     break;
 
                 case "load_pdb_id":
-                    await this.handleLoadPdbId(msg as LoadPdbIdMessage);
+                    await this.handleLoadPdbId(this.getSlot(key), msg as LoadPdbIdMessage);
                     break;
 
                 case "add_sphere":
-                    await this.handleAddSphere(msg as AddSphereMessage);
+                    await this.handleAddSphere(this.getSlot(key), msg as AddSphereMessage);
                     break;
 
                 case "add_alpha_sphere_set":
-                    await this.handleAddAlphaSphereSet(msg as AddAlphaSphereSetMessage);
+                    await this.handleAddAlphaSphereSet(this.getSlot(key), msg as AddAlphaSphereSetMessage);
                     break;
 
                 case "add_pocket_surface":
-                    await this.handleAddPocketSurface(msg as AddPocketSurfaceMessage);
+                    await this.handleAddPocketSurface(this.getSlot(key), msg as AddPocketSurfaceMessage);
                     break;
                 case "add_network_links":
-                    await this.handleAddNetworkLinks(msg as AddNetworkLinksMessage);
+                    await this.handleAddNetworkLinks(this.getSlot(key), msg as AddNetworkLinksMessage, buffers);
                     break;
                 case "add_displacement_vectors":
-                    await this.handleAddDisplacementVectors(msg as AddDisplacementVectorsMessage);
+                    await this.handleAddDisplacementVectors(this.getSlot(key), msg as AddDisplacementVectorsMessage);
                     break;
                 case "add_tetrahedra":
-                    await this.handleAddTetrahedra(msg as AddTetrahedraMessage);
+                    await this.handleAddTetrahedra(this.getSlot(key), msg as AddTetrahedraMessage);
                     break;
                 case "add_triangle_faces":
-                    await this.handleAddTriangleFaces(msg as AddTriangleFacesMessage);
+                    await this.handleAddTriangleFaces(this.getSlot(key), msg as AddTriangleFacesMessage);
+                    break;
+                case "add_unit_cell":
+                    await this.handleAddUnitCell(this.getSlot(key), msg as AddUnitCellMessage);
                     break;
 
                 case "update_visibility":
-                    await this.handleUpdateVisibility(msg as UpdateVisibilityMessage);
+                    await this.handleUpdateVisibility(this.getSlot(key), msg as UpdateVisibilityMessage);
+                    break;
+
+                case "define_selection":
+                    this.handleDefineSelection(this.getSlot(key), msg as DefineSelectionMessage, buffers);
+                    break;
+
+                case "remove_selection":
+                    this.getSlot(key).selections.remove((msg as RemoveSelectionMessage).name);
+                    break;
+
+                case "clear_selections":
+                    this.getSlot(key).selections.clear();
+                    break;
+
+                case "remove_structure":
+                    await this.removeStructure(key ?? DEFAULT_STRUCTURE);
+                    break;
+
+                case "join_group":
+                    this.joinGroup(msg as JoinGroupMessage);
+                    break;
+
+                case "leave_group":
+                    this.leaveGroup();
                     break;
 
                 case "reset_view":
@@ -177,45 +385,392 @@ class MolSysViewerController {
         }
     }
 
-    private async handleLoadFromString(msg: LoadStructureMessage) {
-        const text = msg.data ?? msg.pdb ?? msg.pdb_text ?? "";
+    private async handleLoadFromString(slot: StructureSlot, msg: LoadStructureMessage, buffers?: DataView[]) {
+        let text: string | undefined = msg.data ?? msg.pdb ?? msg.pdb_text;
+        let decompressMs: number | undefined;
+        let bytes = text?.length ?? 0;
+        if (msg.compression) {
+            const buffer = buffers?.[0];
+            if (!buffer) {
+                console.warn("[MolSysViewer] mensaje comprimido sin buffer");
+                return;
+            }
+            const start = performance.now();
+            text = await decompressText(buffer, msg.compression);
+            decompressMs = performance.now() - start;
+            bytes = buffer.byteLength;
+        }
         if (!text || typeof text !== "string") {
             console.warn("[MolSysViewer] mensaje de carga sin data/pdb/pdb_text");
             return;
         }
         const format = msg.format ?? "pdb";
         const label = msg.label ?? "Structure";
-        await this.loadFromString(text, format, label);
+        const start = performance.now();
+        await this.loadFromString(slot, text, format, label);
+        this.reportLoad(msg.op, bytes, start, decompressMs === undefined ? undefined : { decompress_ms: decompressMs });
+    }
+
+    private async handleLoadFromBcif(slot: StructureSlot, msg: LoadStructureFromBcifMessage, buffers?: DataView[]) {
+        const buffer = buffers?.[0];
+        if (!buffer) {
+            console.warn("[MolSysViewer] load_structure_from_bcif sin buffer");
+            return;
+        }
+        // Copia a un ArrayBuffer propio: el decodificador de Mol* usa `.buffer` sin offset.
+        const data = new Uint8Array(buffer.buffer, buffer.byteOffset, buffer.byteLength).slice();
+        const start = performance.now();
+        await this.loadFromBinary(slot, data, msg.label ?? "Structure");
+        this.reportLoad(msg.op, data.byteLength, start);
+    }
+
+    /** Informar a Python del tamaño recibido y del tiempo de parseo + preset (view.stats["load"]). */
+    private reportLoad(op: string, bytes: number, start: number, extra?: Record<string, unknown>) {
+        this.notify({ event: "loaded", op, bytes, parse_ms: performance.now() - start, ...extra });
     }
 
-    private async handleLoadMolSysPayload(msg: LoadMolSysPayloadMessage) {
+    private async handleLoadMolSysPayload(slot: StructureSlot, msg: LoadMolSysPayloadMessage) {
         if (!msg.payload) {
             console.warn("[MolSysViewer] load_molsys_payload sin payload");
             return;
         }
-        await this.loadFromMolSysPayload(msg.payload, msg.label);
+        await this.loadFromMolSysPayload(slot, msg.payload, msg.label);
+    }
+
+    /**
+     * Bloque de una carga progresiva: se dibuja en cuanto llega como una
+     * estructura provisional. Los mensajes se atienden de forma concurrente,
+     * así que bloques y mensaje final pasan por la cola de la carga.
+     */
+    private async handleLoadPayloadChunk(slot: StructureSlot, msg: LoadPayloadChunkMessage, buffers?: DataView[]) {
+        const [indexBuffer, positionBuffer] = buffers ?? [];
+        if (!msg.atoms || !indexBuffer || !positionBuffer) {
+            console.warn("[MolSysViewer] load_payload_chunk sin átomos o sin buffers");
+            return;
+        }
+        // Copias alineadas: el DataView puede no empezar en múltiplo de 4.
+        const chunk: PayloadChunk = {
+            indices: new Int32Array(indexBuffer.buffer.slice(indexBuffer.byteOffset, indexBuffer.byteOffset + indexBuffer.byteLength)),
+            positions: new Float32Array(
+                positionBuffer.buffer.slice(positionBuffer.byteOffset, positionBuffer.byteOffset + positionBuffer.byteLength)
+            ),
+            atoms: msg.atoms,
+        };
+        const load = this.progressiveLoad(slot, msg);
+        await this.enqueueProgressive(load, async () => {
+            if (slot.progressive !== load) return;
+            if (load.chunks.length === 0) {
+                // Primer bloque: la estructura anterior deja sitio a la nueva.
+                await this.removeLoadedStructure(slot);
+                await this.releaseCurrentStructure(slot);
+                slot.current = undefined;
+            }
+            const label = `${msg.label ?? "Structure"} (${msg.chunk + 1}/${msg.n_chunks})`;
+            const loaded = await loadStructureFromMolSysPayload(this.plugin, payloadFromChunk(chunk, msg.bonds), label);
+            load.refs.push(loaded.trajectory);
+            load.chunks.push(chunk);
+            if (load.firstPaintMs === undefined) load.firstPaintMs = performance.now() - load.start;
+            this.notifyProgress(slot, load, false);
+        });
+    }
+
+    /** Último mensaje de una carga progresiva: un único modelo sustituye a los bloques. */
+    private async handleFinishPayloadChunks(slot: StructureSlot, msg: FinishPayloadChunksMessage) {
+        const load = slot.progressive;
+        if (!load || load.loadId !== msg.load_id || !msg.payload) {
+            console.warn("[MolSysViewer] finish_payload_chunks sin carga progresiva en curso");
+            return;
+        }
+        await this.enqueueProgressive(load, async () => {
+            if (slot.progressive !== load) return;
+            const payload = assemblePayloadChunks(load.chunks, msg.n_atoms, msg.payload);
+            await this.loadFromMolSysPayload(slot, payload, msg.label ?? undefined);
+            // El modelo completo ya está dibujado: fuera las estructuras provisionales.
+            await this.removeChunkStructures(load);
+            slot.progressive = undefined;
+            this.notifyProgress(slot, load, true);
+        });
+    }
+
+    /** Carga progresiva del bloque `msg`; una carga nueva descarta la anterior del slot. */
+    private progressiveLoad(slot: StructureSlot, msg: LoadPayloadChunkMessage): ProgressiveLoad {
+        const current = slot.progressive;
+        if (current?.loadId === msg.load_id) return current;
+        const load: ProgressiveLoad = {
+            loadId: msg.load_id,
+            nChunks: msg.n_chunks,
+            atomCount: msg.n_atoms,
+            chunks: [],
+            refs: [],
+            start: performance.now(),
+            queue: current ? current.queue.then(() => this.removeChunkStructures(current)) : Promise.resolve(),
+        };
+        slot.progressive = load;
+        return load;
+    }
+
+    private enqueueProgressive(load: ProgressiveLoad, task: () => Promise<void>): Promise<void> {
+        load.queue = load.queue.then(task).catch(error => {
+            console.error("[MolSysViewer] Error en la carga progresiva:", error);
+        });
+        return load.queue;
+    }
+
+    private async removeChunkStructures(load: ProgressiveLoad) {
+        const refs = load.refs;
+        load.refs = [];
+        for (const ref of refs) await this.removeStateObject(ref);
+    }
+
+    /** Avance de una carga progresiva (view.stats["load_progress"] en Python). */
+    private notifyProgress(slot: StructureSlot, load: ProgressiveLoad, done: boolean) {
+        this.notify({
+            event: "load_progress",
+            ...(slot.key ? { structure: slot.key } : {}),
+            load_id: load.loadId,
+            chunks: load.chunks.length,
+            n_chunks: load.nChunks,
+            atoms: load.chunks.reduce((total, chunk) => total + chunk.indices.length, 0),
+            n_atoms: load.atomCount,
+            first_paint_ms: load.firstPaintMs,
+            elapsed_ms: performance.now() - load.start,
+            done,
+        });
+    }
+
+    private async handleLoadEnsemble(slot: StructureSlot, msg: LoadEnsembleMessage, buffers?: DataView[]) {
+        const buffer = buffers?.[0];
+        if (!msg.topology || !buffer) {
+            console.warn("[MolSysViewer] load_ensemble sin topología o sin buffer");
+            return;
+        }
+        // Copia alineada: el DataView puede no empezar en múltiplo de 4.
+        const block = new Float32Array(buffer.buffer.slice(buffer.byteOffset, buffer.byteOffset + buffer.byteLength));
+        const start = performance.now();
+        const previous = slot.loaded?.data ?? slot.loaded?.trajectory;
+        const ensemble = await loadEnsembleFromBlock(this.plugin, msg.topology, block, msg.n_conformers, msg.label, {
+            previous,
+        });
+        slot.loaded = ensemble;
+        await this.captureCurrentStructure(slot);
+        slot.conformers = {
+            refs: ensemble.conformers,
+            engines: ensemble.conformers.map(() => new VisibilityEngine(this.plugin)),
+        };
+        this.showConformers(slot, msg.conformers);
+        this.reportLoad(msg.op, buffer.byteLength, start, { n_conformers: msg.n_conformers });
+    }
+
+    /** Mostrar sólo los confórmeros indicados (todos si no se indica): sin recargar ni reconstruir nada. */
+    private showConformers(slot: StructureSlot, conformers?: number[] | null) {
+        if (!slot.conformers) {
+            console.warn("[MolSysViewer] show_conformers sin ensemble cargado");
+            return;
+        }
+        const visible = conformers ? new Set(conformers) : undefined;
+        const state = this.plugin.state.data;
+        slot.conformers.refs.forEach((ref, index) => {
+            if (state.cells.has(ref)) setSubtreeVisibility(state, ref, visible ? !visible.has(index) : false);
+        });
+    }
+
+    /**
+     * Cambiar las coordenadas del modelo del slot por las de un frame.
+     *
+     * Si llegan frames más rápido de lo que se aplican, sólo se aplica el
+     * último recibido (la reproducción no acumula retraso). Cada frame
+     * aplicado se notifica a Python (evento "frame").
+     */
+    private async handleSetFrameCoordinates(slot: StructureSlot, msg: SetFrameCoordinatesMessage, buffers?: DataView[]) {
+        const buffer = buffers?.[0];
+        if (!buffer) {
+            console.warn("[MolSysViewer] set_frame_coordinates sin buffer");
+            return;
+        }
+        const structure = this.getStructure(slot);
+        if (!structure || !slot.loaded?.structure) {
+            console.warn("[MolSysViewer] set_frame_coordinates sin estructura cargada");
+            return;
+        }
+        // Copia alineada: el DataView puede no empezar en múltiplo de 4.
+        const positions = new Float32Array(buffer.buffer.slice(buffer.byteOffset, buffer.byteOffset + buffer.byteLength));
+        const atomCount = structure.model.atomicHierarchy.atoms._rowCount;
+        if (positions.length !== atomCount * 3) {
+            console.warn(`[MolSysViewer] set_frame_coordinates: ${positions.length / 3} átomos, la estructura tiene ${atomCount}`);
+            return;
+        }
+
+        // Filas de las propiedades por frame que viajan con el frame, un buffer por propiedad.
+        const rows: Array<[string, Float32Array]> = [];
+        (msg.properties ?? []).forEach((name, index) => {
+            const row = buffers?.[index + 1];
+            if (row) rows.push([name, new Float32Array(row.buffer.slice(row.byteOffset, row.byteOffset + row.byteLength))]);
+        });
+
+        const stream = slot.frames ?? (slot.frames = { busy: false });
+        stream.next = { frame: msg.frame ?? 0, frameCount: msg.n_frames ?? 1, positions, rows };
+        if (stream.busy) return;
+        stream.busy = true;
+        try {
+            while (stream.next) {
+                const { frame, frameCount, positions: next, rows: nextRows } = stream.next;
+                stream.next = undefined;
+                const start = performance.now();
+                // La reconstrucción de las representaciones tras el cambio de coordenadas ya lee estas filas.
+                for (const [name, row] of nextRows) setAtomPropertyRow(this.propertyKey(slot, name), row);
+                await this.applyFrame(slot, stream, frame, frameCount, next);
+                this.notify({
+                    event: "frame",
+                    ...(slot.key ? { structure: slot.key } : {}),
+                    frame,
+                    apply_ms: performance.now() - start,
+                });
+            }
+        } finally {
+            stream.busy = false;
+        }
+    }
+
+    private async applyFrame(slot: StructureSlot, stream: FrameStream, frame: number, frameCount: number, positions: Float32Array) {
+        const state = this.plugin.state.data;
+        const params = {
+            atomicCoordinateFrame: createFrameFromBlock(positions, 0, positions.length / 3),
+            frameIndex: frame,
+            frameCount,
+        };
+        const builder = state.build();
+        if (stream.decorator && state.transforms.has(stream.decorator)) {
+            builder.to(stream.decorator).update(params);
+        } else {
+            const structureRef = StateObjectRef.resolveRef(slot.loaded?.structure);
+            const modelRef = structureRef ? state.transforms.get(structureRef)?.parent : undefined;
+            if (!modelRef) return;
+            // ModelWithCoordinates es un decorador: se inserta entre el modelo y la estructura.
+            stream.decorator = builder.to(modelRef).apply(StateTransforms.Model.ModelWithCoordinates, params).ref;
+        }
+        await PluginCommands.State.Update(this.plugin, {
+            state,
+            tree: builder,
+            options: { doNotLogTiming: true },
+        });
+    }
+
+    private propertyKey(slot: StructureSlot, name: string): string {
+        return channelKey(this.scope, slot.key, name);
+    }
+
+    private async handleSetAtomProperty(slot: StructureSlot, msg: SetAtomPropertyMessage, buffers?: DataView[]) {
+        const buffer = buffers?.[0];
+        if (!msg.name || !buffer) {
+            console.warn("[MolSysViewer] set_atom_property sin nombre o sin buffer");
+            return;
+        }
+        // Copia alineada: el DataView puede no empezar en múltiplo de 4.
+        const data = new Float32Array(buffer.buffer.slice(buffer.byteOffset, buffer.byteOffset + buffer.byteLength));
+        const nFrames = msg.n_frames ?? 1;
+        const expected = msg.n_atoms * (msg.streamed ? 1 : nFrames);
+        if (data.length !== expected) {
+            console.warn(`[MolSysViewer] set_atom_property '${msg.name}': ${data.length} valores, se esperaban ${expected}`);
+            return;
+        }
+        const key = this.propertyKey(slot, msg.name);
+        const version = setAtomPropertyChannel(key, data, msg.n_atoms, nFrames, !!msg.streamed);
+        slot.properties.add(msg.name);
+        await this.applyAtomPropertyThemes(slot, key, version, msg.color ?? undefined, msg.size ?? undefined);
+    }
+
+    /**
+     * Aplicar los temas de la propiedad a las representaciones del slot.
+     *
+     * Sin `color`/`size`, las representaciones que ya usaban el canal sólo
+     * reciben la nueva versión, de modo que se recolorean con los valores nuevos.
+     */
+    private async applyAtomPropertyThemes(
+        slot: StructureSlot,
+        key: string,
+        version: number,
+        color?: AtomPropertyColorOptions,
+        size?: AtomPropertySizeOptions
+    ) {
+        const update = this.plugin.build();
+        let changed = false;
+        for (const { current } of this.visibilityTargets(slot)) {
+            for (const component of current.components) {
+                for (const repr of component.representations) {
+                    const params = repr.cell.transform.params;
+                    if (!params) continue;
+                    const colorTheme = color
+                        ? {
+                              name: AtomPropertyThemeName,
+                              params: { channel: key, version, domain: color.domain, colorMap: color.color_map ?? "turbo" },
+                          }
+                        : usesChannel(params.colorTheme, key)
+                          ? { ...params.colorTheme, params: { ...params.colorTheme.params, version } }
+                          : undefined;
+                    const sizeTheme = size
+                        ? { name: AtomPropertyThemeName, params: { channel: key, version, domain: size.domain, range: size.range } }
+                        : usesChannel(params.sizeTheme, key)
+                          ? { ...params.sizeTheme, params: { ...params.sizeTheme.params, version } }
+                          : undefined;
+                    if (!colorTheme && !sizeTheme) continue;
+                    update.to(repr.cell).update(prev => {
+                        if (colorTheme) prev.colorTheme = colorTheme as typeof prev.colorTheme;
+                        if (sizeTheme) prev.sizeTheme = sizeTheme as typeof prev.sizeTheme;
+                    });
+                    changed = true;
+                }
+            }
+        }
+        if (changed) await update.commit();
+    }
+
+    /** Quitar un canal; las representaciones que lo usaban vuelven a los temas por defecto. */
+    private async removeAtomProperty(slot: StructureSlot, name: string) {
+        const key = this.propertyKey(slot, name);
+        slot.properties.delete(name);
+        deleteAtomPropertyChannel(key);
+        const update = this.plugin.build();
+        let changed = false;
+        for (const { current } of this.visibilityTargets(slot)) {
+            const structure = current.cell.obj?.data;
+            for (const component of current.components) {
+                for (const repr of component.representations) {
+                    const params = repr.cell.transform.params;
+                    if (!params) continue;
+                    const resetColor = usesChannel(params.colorTheme, key);
+                    const resetSize = usesChannel(params.sizeTheme, key);
+                    if (!resetColor && !resetSize) continue;
+                    update.to(repr.cell).update(prev => {
+                        if (resetColor) prev.colorTheme = createStructureColorThemeParams(this.plugin, structure, prev.type.name);
+                        if (resetSize) prev.sizeTheme = createStructureSizeThemeParams(this.plugin, structure, prev.type.name);
+                    });
+                    changed = true;
+                }
+            }
+        }
+        if (changed) await update.commit();
     }
 
-    private async handleLoadFromUrl(msg: LoadStructureFromUrlMessage) {
+    private async handleLoadFromUrl(slot: StructureSlot, msg: LoadStructureFromUrlMessage) {
         if (!msg.url || typeof msg.url !== "string") {
             console.warn("[MolSysViewer] load_structure_from_url sin url");
             return;
         }
-        await this.loadFromUrl(msg.url, msg.format, msg.label);
+        await this.loadFromUrl(slot, msg.url, msg.format, msg.label);
     }
 
-    private async handleLoadPdbId(msg: LoadPdbIdMessage) {
+    private async handleLoadPdbId(slot: StructureSlot, msg: LoadPdbIdMessage) {
         const pdbId = msg.pdb_id?.trim();
         if (!pdbId) {
             console.warn("[MolSysViewer] load_pdb_id sin pdb_id");
             return;
         }
-        await this.loadPdbId(pdbId);
+        await this.loadPdbId(slot, pdbId);
     }
 
-    private async handleAddSphere(msg: AddSphereMessage) {
+    private async handleAddSphere(slot: StructureSlot, msg: AddSphereMessage) {
         const options = msg.options ?? {};
-        await this.addSphere({
+        await this.addSphere(slot, {
             center: options.center ?? [0, 0, 0],
             radius: options.radius ?? 10,
             color: options.color ?? 0x00ff00,
@@ -223,7 +778,7 @@ class MolSysViewerController {
         });
     }
 
-    private async handleAddAlphaSphereSet(msg: AddAlphaSphereSetMessage) {
+    private async handleAddAlphaSphereSet(slot: StructureSlot, msg: AddAlphaSphereSetMessage) {
         const options = msg.options;
         if (!options?.alpha_spheres?.centers || !options.alpha_spheres.radii) {
             console.warn("[MolSysViewer] add_alpha_sphere_set sin datos de alpha_spheres");
@@ -247,7 +802,8 @@ class MolSysViewerController {
         }));
 
         const tag = options.tag ?? "molsysviewer:alpha-spheres";
-        await addTransparentSpheresFromPython(this.plugin, alphaSpecs, alphaAlpha, tag);
+        const { addTransparentSpheresFromPython } = await loadShapesModule();
+        slot.shapeRefs.add(await addTransparentSpheresFromPython(this.plugin, alphaSpecs, alphaAlpha, tag));
 
         if (options.atom_spheres?.centers && options.atom_spheres.centers.length > 0) {
             const atomRadius = options.atom_spheres.radius ?? 1.0;
@@ -259,174 +815,328 @@ class MolSysViewerController {
                 color: atomColor,
                 alpha: atomAlpha,
             }));
-            await addTransparentSpheresFromPython(this.plugin, atomSpecs, atomAlpha, tag);
+            slot.shapeRefs.add(await addTransparentSpheresFromPython(this.plugin, atomSpecs, atomAlpha, tag));
         }
     }
 
-    private async handleAddPocketSurface(msg: AddPocketSurfaceMessage) {
-        const options = msg.options ?? ({} as PocketSurfaceOptions);
+    private async handleAddPocketSurface(slot: StructureSlot, msg: AddPocketSurfaceMessage) {
+        let options = msg.options ?? ({} as PocketSurfaceOptions);
+        let loci: StructureElement.Loci | undefined;
+        if (options.selection !== undefined) {
+            const atoms = this.resolveSelection(slot, options.selection, "add_pocket_surface");
+            if (!atoms) return;
+            const structure = this.getStructure(slot);
+            loci = structure ? slot.selections.loci(options.selection, structure) : undefined;
+            options = { ...options, atom_indices: Array.from(atoms) };
+        }
         if (!Array.isArray(options.atom_indices) || options.atom_indices.length === 0) {
             console.warn("[MolSysViewer] add_pocket_surface sin atom_indices");
             return;
         }
         try {
-            await addPocketSurfaceFromPython(this.plugin, options);
+            const { addPocketSurfaceFromPython } = await loadPocketSurfaceModule();
+            const ref = await addPocketSurfaceFromPython(this.plugin, options, this.getStructure(slot), loci);
+            if (ref) slot.shapeRefs.add(ref);
         } catch (err) {
             console.error("[MolSysViewer] Error creando pocket surface", err);
         }
     }
 
-    private async handleAddNetworkLinks(msg: AddNetworkLinksMessage) {
-        const options = msg.options ?? {};
+    private async handleAddNetworkLinks(slot: StructureSlot, msg: AddNetworkLinksMessage, buffers?: DataView[]) {
+        let options = msg.options ?? {};
+        if (options.binary) {
+            // Pares int32 (2 por enlace), distancias float32 y, por grupos, contactos int32.
+            const [pairs, distances, counts] = (buffers ?? []).map(b => b.buffer.slice(b.byteOffset, b.byteOffset + b.byteLength));
+            if (!pairs) {
+                console.warn("[MolSysViewer] add_network_links binario sin buffer de pares");
+                return;
+            }
+            options = {
+                ...options,
+                pair_array: new Int32Array(pairs),
+                distance_array: distances ? new Float32Array(distances) : undefined,
+                count_array: counts ? new Int32Array(counts) : undefined,
+            };
+        }
         try {
-            await addNetworkLinksFromPython(this.plugin, options);
+            const { addNetworkLinksFromPython } = await loadShapesModule();
+            const ref = await addNetworkLinksFromPython(this.plugin, options, this.getStructure(slot));
+            if (ref) slot.shapeRefs.add(ref);
+            if (ref && options.bound) this.trackBoundShape(slot, ref, "links", options);
         } catch (err) {
             console.error("[MolSysViewer] Error creando network links", err);
         }
     }
 
-    private async handleAddDisplacementVectors(msg: AddDisplacementVectorsMessage) {
-        const options = msg.options ?? {};
+    private async handleAddDisplacementVectors(slot: StructureSlot, msg: AddDisplacementVectorsMessage) {
+        let options = msg.options ?? {};
         if (!options.vectors || options.vectors.length === 0) {
             console.warn("[MolSysViewer] add_displacement_vectors sin vectores");
             return;
         }
+        if (options.selection !== undefined && !options.atom_indices) {
+            const atoms = this.resolveSelection(slot, options.selection, "add_displacement_vectors");
+            if (!atoms) return;
+            options = { ...options, atom_indices: Array.from(atoms) };
+        }
         try {
-            await addDisplacementVectorsFromPython(this.plugin, options);
+            const { addDisplacementVectorsFromPython } = await loadShapesModule();
+            const ref = await addDisplacementVectorsFromPython(this.plugin, options, this.getStructure(slot));
+            if (ref) slot.shapeRefs.add(ref);
+            if (ref && options.bound) this.trackBoundShape(slot, ref, "vectors", options);
         } catch (err) {
             console.error("[MolSysViewer] Error creando displacement vectors", err);
         }
     }
 
-    private async handleAddTetrahedra(msg: AddTetrahedraMessage) {
+    private async handleAddTetrahedra(slot: StructureSlot, msg: AddTetrahedraMessage) {
         const options = msg.options ?? {};
         if (!options.tetraCoords && !options.tetra_coords && !options.atomQuads && !options.atom_quads) {
             console.warn("[MolSysViewer] add_tetrahedra sin tetraCoords ni atom_quads");
             return;
         }
         try {
-            const ref = await addTetrahedraFromPython(this.plugin, options);
-            if (ref) this.shapeRefs.add(ref);
+            const { addTetrahedraFromPython } = await loadShapesModule();
+            const ref = await addTetrahedraFromPython(this.plugin, options, this.getStructure(slot));
+            if (ref) slot.shapeRefs.add(ref);
+            if (ref && options.bound) this.trackBoundShape(slot, ref, "tetrahedra", options);
         } catch (err) {
             console.error("[MolSysViewer] Error creando tetrahedra", err);
         }
     }
 
-    private async handleAddTriangleFaces(msg: AddTriangleFacesMessage) {
+    private async handleAddTriangleFaces(slot: StructureSlot, msg: AddTriangleFacesMessage) {
         const options = msg.options ?? {};
         if (!options.vertices && !options.atom_triplets && !options.atomTriplets) {
             console.warn("[MolSysViewer] add_triangle_faces sin vertices ni atom_triplets");
             return;
         }
         try {
-            const ref = await addTriangleFacesFromPython(this.plugin, options);
-            if (ref) this.shapeRefs.add(ref);
+            const { addTriangleFacesFromPython } = await loadShapesModule();
+            const ref = await addTriangleFacesFromPython(this.plugin, options, this.getStructure(slot));
+            if (ref) slot.shapeRefs.add(ref);
+            if (ref && options.bound) this.trackBoundShape(slot, ref, "triangles", options);
         } catch (err) {
             console.error("[MolSysViewer] Error creando triangle faces", err);
         }
     }
 
-    private async handleUpdateVisibility(msg: UpdateVisibilityMessage) {
-        const indices = msg.options?.visible_atom_indices;
-        await this.updateVisibility(indices);
+    private trackBoundShape(slot: StructureSlot, ref: StateObjectRef, kind: BoundShapeKind, options: BoundShape["options"]) {
+        const resolved = StateObjectRef.resolveRef(ref);
+        if (resolved) slot.bound.shapes.set(resolved, { kind, options });
     }
 
-    private async loadFromString(data: string, format: string, label?: string) {
-        const previous = this.loadedStructure?.data ?? this.loadedStructure?.trajectory;
-        this.loadedStructure = await loadStructureFromString(this.plugin, data, format, label, {
+    /**
+     * Recalcular las shapes con `bound` del slot con el frame actual.
+     *
+     * Se llama desde el evento de actualización de la estructura, dentro del
+     * Update de Mol* que la cambió: la actualización de las shapes se difiere
+     * y los frames que llegan mientras tanto se reducen al último.
+     */
+    private syncBoundShapes(slot: StructureSlot) {
+        const bound = slot.bound;
+        if (bound.busy) {
+            bound.pending = true;
+            return;
+        }
+        bound.busy = true;
+        setTimeout(async () => {
+            try {
+                do {
+                    bound.pending = false;
+                    const structure = this.getStructure(slot);
+                    if (!structure || bound.shapes.size === 0) break;
+                    const { updateBoundShapes } = await loadShapesModule();
+                    await updateBoundShapes(this.plugin, bound.shapes, structure);
+                } while (bound.pending);
+            } catch (err) {
+                console.error("[MolSysViewer] Error actualizando shapes ligadas a átomos", err);
+            } finally {
+                bound.busy = false;
+            }
+        }, 0);
+    }
+
+    private async handleAddUnitCell(slot: StructureSlot, msg: AddUnitCellMessage) {
+        try {
+            const { addUnitCellFromPython } = await loadShapesModule();
+            const ref = await addUnitCellFromPython(this.plugin, msg.options ?? {});
+            if (ref) slot.shapeRefs.add(ref);
+        } catch (err) {
+            console.error("[MolSysViewer] Error creando unit cell", err);
+        }
+    }
+
+    private async handleUpdateVisibility(slot: StructureSlot, msg: UpdateVisibilityMessage) {
+        const { visible_atom_indices, selection, ...options } = msg.options ?? {};
+        if (selection !== undefined) {
+            const atoms = this.resolveSelection(slot, selection, "update_visibility");
+            if (!atoms) return;
+            await this.updateVisibility(slot, atoms, options);
+            return;
+        }
+        await this.updateVisibility(slot, visible_atom_indices, options);
+    }
+
+    private handleDefineSelection(slot: StructureSlot, msg: DefineSelectionMessage, buffers?: DataView[]) {
+        const buffer = buffers?.[0];
+        if (!msg.name || !buffer) {
+            console.warn("[MolSysViewer] define_selection sin nombre o sin buffer");
+            return;
+        }
+        // Copia alineada: el DataView puede no empezar en múltiplo de 4.
+        const atoms = new Int32Array(buffer.buffer.slice(buffer.byteOffset, buffer.byteOffset + buffer.byteLength));
+        slot.selections.define(msg.name, atoms);
+        // Precalcular el loci con la estructura actual.
+        const structure = this.getStructure(slot);
+        if (structure) slot.selections.loci(msg.name, structure);
+    }
+
+    private resolveSelection(slot: StructureSlot, name: string, op: string): Int32Array | undefined {
+        const atoms = slot.selections.atoms(name);
+        if (!atoms) console.warn(`[MolSysViewer] ${op}: selección '${name}' no definida`);
+        return atoms;
+    }
+
+    private joinGroup(msg: JoinGroupMessage) {
+        if (!msg.group_id) {
+            console.warn("[MolSysViewer] join_group sin group_id");
+            return;
+        }
+        this.leaveGroup();
+        const member = new ViewGroupMember(
+            this.plugin,
+            getViewGroup(msg.group_id),
+            { syncCamera: !!msg.sync_camera, syncFrames: !!msg.sync_frames },
+            (groupMsg, groupBuffers) => {
+                this.handleMessage(groupMsg, groupBuffers).catch(err =>
+                    console.error("[MolSysViewer] Error procesando mensaje de grupo:", groupMsg, err)
+                );
+            }
+        );
+        this.groupMember = member;
+        member.join();
+    }
+
+    private leaveGroup() {
+        this.groupMember?.leave();
+        this.groupMember = undefined;
+    }
+
+    private async loadFromString(slot: StructureSlot, data: string, format: string, label?: string) {
+        const previous = slot.loaded?.data ?? slot.loaded?.trajectory;
+        slot.loaded = await loadStructureFromString(this.plugin, data, format, label, {
             previous,
         });
-        this.captureCurrentStructure();
+        await this.captureCurrentStructure(slot);
     }
 
-    private async loadFromUrl(url: string, format?: string, label?: string) {
-        const previous = this.loadedStructure?.data ?? this.loadedStructure?.trajectory;
-        this.loadedStructure = await loadStructureFromUrl(this.plugin, url, format, label, {
+    private async loadFromBinary(slot: StructureSlot, data: Uint8Array, label?: string) {
+        const previous = slot.loaded?.data ?? slot.loaded?.trajectory;
+        slot.loaded = await loadStructureFromBinary(this.plugin, data, "mmcif", label, {
             previous,
         });
-        this.captureCurrentStructure();
+        await this.captureCurrentStructure(slot);
     }
 
-    private async loadFromMolSysPayload(payload: MolSysPayload, label?: string) {
-        const previous = this.loadedStructure?.data ?? this.loadedStructure?.trajectory;
-        this.loadedStructure = await loadStructureFromMolSysPayload(this.plugin, payload, label, {
+    private async loadFromUrl(slot: StructureSlot, url: string, format?: string, label?: string) {
+        const previous = slot.loaded?.data ?? slot.loaded?.trajectory;
+        slot.loaded = await loadStructureFromUrl(this.plugin, url, format, label, {
             previous,
         });
-        this.captureCurrentStructure();
+        await this.captureCurrentStructure(slot);
     }
 
-    private captureCurrentStructure() {
+    private async loadFromMolSysPayload(slot: StructureSlot, payload: MolSysPayload, label?: string) {
+        const previous = slot.loaded?.data ?? slot.loaded?.trajectory;
+        slot.loaded = await loadStructureFromMolSysPayload(this.plugin, payload, label, {
+            previous,
+        });
+        await this.captureCurrentStructure(slot);
+    }
+
+    private async captureCurrentStructure(slot: StructureSlot) {
+        await this.releaseCurrentStructure(slot);
+        // La estructura del slot es la que creó su preset (hay una por slot en la jerarquía).
         const structures = this.plugin.managers.structure.hierarchy.current.structures;
-        this.currentStructure = structures.length ? structures[structures.length - 1] : undefined;
+        const ref = slot.loaded?.structure;
+        slot.current = ref ? structures.find(s => s.cell.transform.ref === ref) : undefined;
+        if (!slot.current && slot.key === DEFAULT_STRUCTURE && structures.length) {
+            slot.current = structures[structures.length - 1];
+        }
+        // Construir ya las tablas átomo → unidad: las ops indexadas por átomo las reutilizan.
+        const structure = this.getStructure(slot);
+        if (structure) getAtomIndex(structure);
     }
 
-    private getStructure(): Structure | undefined {
-        return this.currentStructure?.cell.obj?.data as Structure | undefined;
+    /** Olvidar el estado ligado a la estructura anterior del slot. */
+    private async releaseCurrentStructure(slot: StructureSlot) {
+        // Los subconjuntos de visibilidad se refieren a la estructura anterior.
+        await slot.visibility.restoreComponents();
+        for (const engine of slot.conformers?.engines ?? []) await engine.restoreComponents();
+        slot.conformers = undefined;
+        slot.frames = undefined;
+        // Las shapes con `bound` se recalcularían con los índices de átomo sobre la estructura nueva.
+        await this.removeBoundShapes(slot);
     }
 
-    private getComponents(): StructureComponentRef[] {
-        return this.currentStructure?.components ?? [];
+    /** Quitar las shapes con `bound` del slot (sus índices de átomo son de la estructura anterior). */
+    private async removeBoundShapes(slot: StructureSlot) {
+        const bound = slot.bound.shapes;
+        if (bound.size === 0) return;
+        const refs = Array.from(slot.shapeRefs).filter(ref => bound.has(StateObjectRef.resolveRef(ref) ?? ""));
+        bound.clear();
+        for (const ref of refs) slot.shapeRefs.delete(ref);
+        await Promise.all(refs.map(ref => this.removeStateObject(ref)));
     }
 
-    private async addSphere(options: AddSphereMessage["options"]) {
+    private getStructure(slot: StructureSlot): Structure | undefined {
+        return slot.current?.cell.obj?.data as Structure | undefined;
+    }
+
+    /** Estructuras a las que se aplica la visibilidad del slot: la suya o, en un ensemble, cada confórmero. */
+    private visibilityTargets(slot: StructureSlot): Array<{ current: StructureRef; engine: VisibilityEngine }> {
+        if (!slot.conformers) return slot.current ? [{ current: slot.current, engine: slot.visibility }] : [];
+        const { refs, engines } = slot.conformers;
+        const byRef = new Map(
+            this.plugin.managers.structure.hierarchy.current.structures.map(s => [s.cell.transform.ref, s] as const)
+        );
+        const targets: Array<{ current: StructureRef; engine: VisibilityEngine }> = [];
+        refs.forEach((ref, index) => {
+            const current = byRef.get(ref);
+            if (current) targets.push({ current, engine: engines[index] });
+        });
+        return targets;
+    }
+
+    private async addSphere(slot: StructureSlot, options: AddSphereMessage["options"]) {
+        const { addTransparentSphereFromPython } = await loadShapesModule();
         const ref = await addTransparentSphereFromPython(this.plugin, {
             center: options?.center ?? [0, 0, 0],
             radius: options?.radius ?? 10,
             color: options?.color ?? 0x00ff00,
             alpha: options?.alpha ?? 0.4,
         });
-        this.shapeRefs.add(ref);
+        slot.shapeRefs.add(ref);
     }
 
-    private async updateVisibility(visibleAtomIndices?: number[]) {
-        const structure = this.getStructure();
-        if (!structure) {
+    private async updateVisibility(
+        slot: StructureSlot,
+        visibleAtomIndices?: ArrayLike<number>,
+        options?: VisibilityOptions
+    ) {
+        const targets = this.visibilityTargets(slot);
+        if (targets.length === 0) {
             console.warn("[MolSysViewer] update_visibility sin estructura cargada");
             return;
         }
-        const components = this.getComponents();
-        if (components.length === 0) return;
-
-        await clearStructureTransparency(this.plugin, components);
-
-        if (!Array.isArray(visibleAtomIndices) || visibleAtomIndices.length === 0) return;
-
-        const selectionBuilder = StructureSelection.LinearBuilder(structure);
-        const visibleSet = new Set(visibleAtomIndices);
-        let hasHidden = false;
-
-        for (const unit of structure.units) {
-            if (!Unit.isAtomic(unit)) continue;
-            const elementCount = OrderedSet.size(unit.elements);
-            if (elementCount === 0) continue;
-
-            const hiddenElements: number[] = [];
-            for (let ordinal = 0; ordinal < elementCount; ordinal++) {
-                const elementIndex = OrderedSet.getAt(unit.elements, ordinal);
-                if (!visibleSet.has(elementIndex)) {
-                    hiddenElements.push(elementIndex);
-                }
-            }
-
-            if (hiddenElements.length === 0) continue;
-            hasHidden = true;
-
-            const elementSubset =
-                hiddenElements.length === elementCount
-                    ? unit.elements
-                    : (SortedArray.ofSortedArray(hiddenElements) as StructureElement.Set);
-            const childUnit = unit.getChild(elementSubset);
-            const hiddenStructure = Structure.create([childUnit], { parent: structure });
-            selectionBuilder.add(hiddenStructure);
+        let report: VisibilityReport | undefined;
+        for (const { current, engine } of targets) {
+            const structure = current.cell.obj?.data as Structure | undefined;
+            if (!structure || current.components.length === 0) continue;
+            report = await engine.apply(structure, current.components, visibleAtomIndices, options);
         }
-
-        if (!hasHidden) return;
-
-        const selection = selectionBuilder.getSelection();
-        if (StructureSelection.isEmpty(selection)) return;
-
-        const loci = StructureSelection.toLociWithSourceUnits(selection);
-        await setStructureTransparency(this.plugin, components, 1, async () => loci);
+        if (report) this.notify({ event: "visibility", ...(slot.key ? { structure: slot.key } : {}), ...report });
     }
 
     private async resetView() {
@@ -438,15 +1148,18 @@ class MolSysViewerController {
         const styles = options?.styles ?? true;
         const labels = options?.labels ?? false;
 
-        if (shapes) await this.clearShapes();
-        if (styles) await this.resetStructureDecorations();
+        for (const slot of this.slots.values()) {
+            if (shapes) await this.clearShapes(slot);
+            if (styles) await this.resetStructureDecorations(slot);
+        }
         if (labels) await this.clearLabels();
     }
 
-    private async clearShapes() {
-        if (this.shapeRefs.size === 0) return;
-        await Promise.all(Array.from(this.shapeRefs).map(ref => this.removeStateObject(ref)));
-        this.shapeRefs.clear();
+    private async clearShapes(slot: StructureSlot) {
+        if (slot.shapeRefs.size === 0) return;
+        await Promise.all(Array.from(slot.shapeRefs).map(ref => this.removeStateObject(ref)));
+        slot.shapeRefs.clear();
+        slot.bound.shapes.clear();
     }
 
     private async clearLabels() {
@@ -455,33 +1168,52 @@ class MolSysViewerController {
         this.labelRefs.clear();
     }
 
-    private async resetStructureDecorations() {
-        const components = this.getComponents();
-        if (components.length === 0) return;
-        await clearStructureTransparency(this.plugin, components);
+    private async resetStructureDecorations(slot: StructureSlot) {
+        for (const { current } of this.visibilityTargets(slot)) {
+            if (current.components.length === 0) continue;
+            await clearStructureTransparency(this.plugin, current.components);
+        }
     }
 
     private async clearAll() {
-        await this.clearScene({ shapes: true, styles: true, labels: true });
-        await this.removeLoadedStructure();
-        this.currentStructure = undefined;
+        await this.clearLabels();
+        for (const key of Array.from(this.slots.keys())) await this.removeStructure(key);
+    }
+
+    /** Quitar una estructura con sus shapes y selecciones; las demás no se tocan. */
+    private async removeStructure(key: string) {
+        const slot = this.slots.get(key);
+        if (!slot) return;
+        this.slots.delete(key);
+        await this.clearShapes(slot);
+        const load = slot.progressive;
+        if (load) {
+            slot.progressive = undefined;
+            await load.queue;
+            await this.removeChunkStructures(load);
+        }
+        await this.removeLoadedStructure(slot);
+        slot.current = undefined;
+        slot.selections.clear();
+        deleteAtomPropertyChannels(this.propertyKey(slot, ""));
+        slot.properties.clear();
     }
 
-    private async removeLoadedStructure() {
-        if (!this.loadedStructure) return;
+    private async removeLoadedStructure(slot: StructureSlot) {
+        if (!slot.loaded) return;
         const refs: Array<StateObjectRef | undefined> = [
-            this.loadedStructure.structure,
-            this.loadedStructure.trajectory,
-            this.loadedStructure.data,
+            slot.loaded.structure,
+            slot.loaded.trajectory,
+            slot.loaded.data,
         ];
         for (const ref of refs) await this.removeStateObject(ref);
-        this.loadedStructure = undefined;
+        slot.loaded = undefined;
     }
 
-    private async loadPdbId(pdbId: string) {
+    private async loadPdbId(slot: StructureSlot, pdbId: string) {
         const normalized = pdbId.trim().toUpperCase();
         const url = `https://files.rcsb.org/download/${normalized}.pdb`;
-        await this.loadFromUrl(url, "pdb", `PDB ${normalized}`);
+        await this.loadFromUrl(slot, url, "pdb", `PDB ${normalized}`);
     }
 
     private async removeStateObject(ref?: StateObjectRef) {
@@ -495,9 +1227,21 @@ class MolSysViewerController {
 }
 
 
+/** Si un tema de color o tamaño es el de propiedades por átomo sobre el canal `key`. */
+function usesChannel(theme: { name: string; params: any } | undefined, key: string): theme is { name: string; params: any } {
+    return theme?.name === AtomPropertyThemeName && theme.params?.channel === key;
+}
+
+
 // ------------------------------------------------------------------
 // Tipos de mensajes
 // ------------------------------------------------------------------
+/** Cualquier op puede llevar la clave de la estructura a la que se aplica. */
+type StructureScopedMessage = {
+    op: string;
+    structure?: string;
+};
+
 type AddSphereMessage = {
     op: "add_sphere";
     options?: {
@@ -552,6 +1296,11 @@ type AddTriangleFacesMessage = {
     options?: TriangleFacesOptions;
 };
 
+type AddUnitCellMessage = {
+    op: "add_unit_cell";
+    options?: UnitCellOptions;
+};
+
 type LoadStructureMessage = {
     op: "load_structure_from_string" | "load_pdb_string";
     data?: string;
@@ -559,6 +1308,13 @@ type LoadStructureMessage = {
     pdb_text?: string;
     format?: string;
     label?: string;
+    /** Si está presente, el texto viaja comprimido en el primer buffer con este códec. */
+    compression?: CompressionFormat;
+};
+
+type LoadStructureFromBcifMessage = {
+    op: "load_structure_from_bcif";
+    label?: string;
 };
 
 type LoadMolSysPayloadMessage = {
@@ -567,6 +1323,78 @@ type LoadMolSysPayloadMessage = {
     label?: string;
 };
 
+type LoadPayloadChunkMessage = {
+    op: "load_payload_chunk";
+    load_id: number;
+    chunk: number;
+    n_chunks: number;
+    n_atoms: number;
+    label?: string | null;
+    /** Campos de los átomos del bloque; índices y posiciones viajan en los buffers. */
+    atoms: MolSysAtomPayload;
+    /** Enlaces internos al bloque, con índices locales. */
+    bonds?: MolSysPayload["bonds"];
+};
+
+type FinishPayloadChunksMessage = {
+    op: "finish_payload_chunks";
+    load_id: number;
+    n_chunks: number;
+    n_atoms: number;
+    label?: string | null;
+    payload: PayloadChunksRest;
+};
+
+type LoadEnsembleMessage = {
+    op: "load_ensemble";
+    topology: MolSysTopologyPayload;
+    n_conformers: number;
+    n_atoms?: number;
+    /** Confórmeros visibles tras la carga (todos si es null). */
+    conformers?: number[] | null;
+    label?: string;
+};
+
+type ShowConformersMessage = {
+    op: "show_conformers";
+    conformers?: number[] | null;
+};
+
+type SetFrameCoordinatesMessage = {
+    op: "set_frame_coordinates";
+    frame?: number;
+    n_frames?: number;
+    n_atoms?: number;
+    /** Propiedades por frame cuyas filas viajan en los buffers siguientes, en este orden. */
+    properties?: string[];
+};
+
+type AtomPropertyColorOptions = {
+    domain: [number, number];
+    color_map?: string | number[] | null;
+};
+
+type AtomPropertySizeOptions = {
+    domain: [number, number];
+    range: [number, number];
+};
+
+type SetAtomPropertyMessage = {
+    op: "set_atom_property";
+    name: string;
+    n_atoms: number;
+    n_frames?: number;
+    /** Canal por frame enviado fila a fila con los frames de un TrajectoryPlayer. */
+    streamed?: boolean;
+    color?: AtomPropertyColorOptions | null;
+    size?: AtomPropertySizeOptions | null;
+};
+
+type RemoveAtomPropertyMessage = {
+    op: "remove_atom_property";
+    name: string;
+};
+
 type LoadStructureFromUrlMessage = {
     op: "load_structure_from_url";
     url: string;
@@ -576,11 +1404,32 @@ type LoadStructureFromUrlMessage = {
 
 type UpdateVisibilityMessage = {
     op: "update_visibility";
-    options?: {
+    options?: VisibilityOptions & {
         visible_atom_indices?: number[];
+        selection?: string;
     };
 };
 
+type DefineSelectionMessage = {
+    op: "define_selection";
+    name: string;
+    count?: number;
+};
+
+type RemoveSelectionMessage = {
+    op: "remove_selection";
+    name: string;
+};
+
+type ClearSelectionsMessage = {
+    op: "clear_selections";
+};
+
+type RemoveStructureMessage = {
+    op: "remove_structure";
+    structure: string;
+};
+
 type ClearSceneMessage = {
     op: "clear_scene";
     options?: {
@@ -590,6 +1439,13 @@ type ClearSceneMessage = {
     };
 };
 
+type JoinGroupMessage = {
+    op: "join_group";
+    group_id: string;
+    sync_camera?: boolean;
+    sync_frames?: boolean;
+};
+
 type ClearAllMessage = {
     op: "clear_all";
 };
@@ -608,12 +1464,26 @@ type ViewerMessage =
     AddDisplacementVectorsMessage |
     AddTetrahedraMessage |
     AddTriangleFacesMessage |
+    AddUnitCellMessage |
     LoadStructureMessage |
+    LoadStructureFromBcifMessage |
     LoadMolSysPayloadMessage |
+    LoadPayloadChunkMessage |
+    FinishPayloadChunksMessage |
+    LoadEnsembleMessage |
+    ShowConformersMessage |
+    SetFrameCoordinatesMessage |
+    SetAtomPropertyMessage |
+    RemoveAtomPropertyMessage |
     LoadStructureFromUrlMessage |
     LoadPdbIdMessage |
     UpdateVisibilityMessage |
+    DefineSelectionMessage |
+    RemoveSelectionMessage |
+    ClearSelectionsMessage |
+    RemoveStructureMessage |
     ClearSceneMessage |
+    JoinGroupMessage |
     ClearAllMessage |
     Record<string, unknown>;
 
@@ -622,15 +1492,26 @@ type ViewerMessage =
 // AnyWidget entry point
 // ------------------------------------------------------------------
 export default {
-    render({ model, el }: { model: any; el: HTMLElement }) {
+    render({ model, el, timings }: { model: any; el: HTMLElement; timings?: { t0: number } & Record<string, unknown> }) {
 
-        const controllerPromise = MolSysViewerController.create(el);
+        const t0 = timings?.t0 ?? performance.now();
+        const pluginStart = performance.now();
+        const controllerPromise = MolSysViewerController.create(el, event => model.send(event));
 
-        // Avisar a Python cuando esté listo
+        // Avisar a Python cuando esté listo (con los tiempos de arranque)
         (async () => {
             try {
                 await controllerPromise;
-                model.send({ event: "ready" });
+                const now = performance.now();
+                const { t0: _t0, ...loaderTimings } = timings ?? { t0 };
+                model.send({
+                    event: "ready",
+                    timings: {
+                        ...loaderTimings,
+                        plugin_init_ms: now - pluginStart,
+                        time_to_ready_ms: now - t0,
+                    },
+                });
             } catch (err) {
                 console.error("[MolSysViewer] Error inicializando plugin:", err);
             }
@@ -638,12 +1519,12 @@ export default {
 
         console.log("[MolSysViewer] widget render inicial");
 
-        model.on("msg:custom", async (msg: ViewerMessage) => {
+        model.on("msg:custom", async (msg: ViewerMessage, buffers?: DataView[]) => {
             if (!msg || typeof msg !== "object") return;
             console.log("[MolSysViewer] mensaje desde Python:", msg);
             try {
                 const controller = await controllerPromise;
-                await controller.handleMessage(msg);
+                await controller.handleMessage(msg, buffers);
             } catch (error) {
                 console.error("[MolSysViewer] Error manejando mensaje:", msg, error);
             }
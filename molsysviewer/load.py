@@ -13,6 +13,18 @@ def load(
     selection: Selection = "all",
     structure_indices: StructureIndices = "all",
     view: MolSysView | None = None,
+    *,
+    start: Any = None,
+    stop: Any = None,
+    stride: int | None = None,
+    max_frames: int | None = None,
+    max_payload_bytes: int | None = None,
+    on_exceed: str | None = None,
+    pbc: str | None = None,
+    images_cutoff: float | None = None,
+    show_cell: bool = False,
+    preview: bool | None = None,
+    progressive: bool | None = None,
 ) -> MolSysView:
 
     view = MolSysView() if view is None else view
@@ -20,6 +32,17 @@ def load(
         molecular_system,
         selection=selection,
         structure_indices=structure_indices,
+        start=start,
+        stop=stop,
+        stride=stride,
+        max_frames=max_frames,
+        max_payload_bytes=max_payload_bytes,
+        on_exceed=on_exceed,
+        pbc=pbc,
+        images_cutoff=images_cutoff,
+        show_cell=show_cell,
+        preview=preview,
+        progressive=progressive,
     )
     return view
 
@@ -5,6 +5,7 @@ from .load_pdb_string import load_pdb_string
 from .load_mmcif_string import load_mmcif_string
 from .load_pdb_id import load_pdb_id
 from .load_from_url import load_from_url
+from .resolver import StructureResolver, get_default_resolver, set_default_resolver
 
 __all__ = [
     "load_from_molsysmt",
@@ -12,5 +13,8 @@ __all__ = [
     "load_mmcif_string",
     "load_pdb_id",
     "load_from_url",
+    "StructureResolver",
+    "get_default_resolver",
+    "set_default_resolver",
 ]
 
@@ -0,0 +1,128 @@
+# molsysviewer/loaders/load_ensemble.py
+
+from __future__ import annotations
+
+from typing import Any
+
+import molsysmt as msm
+import numpy as np
+from molsysmt import pyunitwizard as puw
+
+from .._private.variables import is_all
+from .load_molsysmt import _convert_to_molsys, _molsys_to_viewer_json, _viewer_json_to_topology
+
+
+def load_ensemble(
+    view: Any,
+    *,
+    molecular_system: Any,
+    selection: str | Any = "all",
+    structure_indices: str | Any = "all",
+    syntax: str = "MolSysMT",
+    label: str | None = None,
+    superpose: bool | str | Any = False,
+    conformers: str | Any = "all",
+) -> int:
+    """Backend interno para MolSysView.load_ensemble(...).
+
+    Cada estructura del sistema es un confórmero con la misma topología
+    (modelos de RMN, poses de docking, representantes de clusters). La
+    topología (átomos y enlaces) viaja una sola vez en JSON y las coordenadas
+    como un único bloque float32 ``(n_conf, n_atoms, 3)`` en Å, en un buffer
+    binario. Devuelve el número de confórmeros.
+    """
+
+    replace_structure = getattr(view, "_replace_structure", None)
+    if replace_structure is not None:
+        replace_structure()
+
+    view.molecular_system = molecular_system
+    view.selection = selection
+    view.structure_indices = structure_indices
+
+    view._molsys = _convert_to_molsys(
+        molecular_system,
+        selection=selection,
+        structure_indices=structure_indices,
+        syntax=syntax,
+    )
+    n_atoms = msm.get(view._molsys, element="atom", n_atoms=True)
+    view.atom_mask = np.ones(n_atoms, dtype=bool)
+
+    viewer_json = _molsys_to_viewer_json(view._molsys)
+    topology = _viewer_json_to_topology(viewer_json) if viewer_json is not None else None
+    if topology is None:
+        raise ValueError("Could not build the topology of the ensemble from the molecular system.")
+
+    block = _conformer_block(view._molsys, n_atoms)
+    if superpose is not False and superpose is not None:
+        atom_indices = None if superpose is True or is_all(superpose) else view._select(superpose, syntax=syntax)
+        block = superpose_conformers(block, atom_indices=atom_indices)
+
+    n_conformers = int(block.shape[0])
+    view._ensemble = (view._molsys, n_conformers)
+    visible = conformer_indices(conformers, n_conformers)
+    view.visible_conformers = visible
+
+    view._send(
+        {
+            "op": "load_ensemble",
+            "topology": topology,
+            "n_conformers": n_conformers,
+            "n_atoms": int(n_atoms),
+            "conformers": visible,
+            "label": label,
+        },
+        buffers=[block.tobytes()],
+    )
+    return n_conformers
+
+
+def _conformer_block(molsys: Any, n_atoms: int) -> np.ndarray:
+    """Coordenadas de todos los confórmeros como array C-contiguo float32 en Å."""
+    coordinates = msm.get(molsys, element="atom", coordinates=True)
+    coordinates = puw.get_value(coordinates, to_unit="angstroms")
+    block = np.ascontiguousarray(coordinates, dtype="<f4")
+    if block.ndim == 2:
+        block = block[np.newaxis]
+    if block.ndim != 3 or block.shape[1:] != (n_atoms, 3) or block.shape[0] == 0:
+        raise ValueError(f"Unexpected coordinates shape {block.shape} for an ensemble of {n_atoms} atoms.")
+    return block
+
+
+def conformer_indices(conformers: str | Any, n_conformers: int) -> list[int] | None:
+    """Índices de confórmeros validados; None significa todos."""
+    if is_all(conformers):
+        return None
+    values = np.unique(np.asarray(conformers, dtype=np.int64).reshape(-1))
+    if values.size and (values[0] < 0 or values[-1] >= n_conformers):
+        raise ValueError(f"Conformer indices must be between 0 and {n_conformers - 1}.")
+    return values.tolist()
+
+
+def superpose_conformers(
+    block: np.ndarray,
+    *,
+    atom_indices: Any | None = None,
+    reference: int = 0,
+) -> np.ndarray:
+    """Superponer cada confórmero sobre `reference` (Kabsch, vectorizado).
+
+    El ajuste se hace con `atom_indices` (todos los átomos si es None) y la
+    transformación resultante se aplica al confórmero completo.
+    """
+    fit = block if atom_indices is None else block[:, np.asarray(atom_indices, dtype=np.int64)]
+    fit = fit.astype(np.float64)
+    centroids = fit.mean(axis=1, keepdims=True)
+    moved = fit - centroids
+    target = moved[reference]
+
+    covariance = np.einsum("nmi,mj->nij", moved, target)
+    u, _, vt = np.linalg.svd(covariance)
+    # Corregir reflexiones para que la rotación sea propia (det = +1).
+    d = np.where(np.linalg.det(u @ vt) < 0, -1.0, 1.0)
+    u[:, :, -1] *= d[:, np.newaxis]
+    rotations = u @ vt
+
+    aligned = (block - centroids) @ rotations + centroids[reference]
+    return np.ascontiguousarray(aligned, dtype="<f4")
@@ -2,8 +2,25 @@
 
 from __future__ import annotations
 
+import gzip
+import posixpath
+import urllib.parse
 from typing import Any
 
+import molsysmt as msm
+import numpy as np
+
+from .._private.compression import send_load_message
+from .._private.fetch import HTTPSession, get_default_session
+from .load_molsysmt import _build_load_message
+
+_FORMATS_BY_EXTENSION = {
+    "pdb": "pdb",
+    "ent": "pdb",
+    "cif": "mmcif",
+    "mmcif": "mmcif",
+}
+
 
 def load_from_url(
     view: Any,
@@ -11,27 +28,82 @@ def load_from_url(
     url: str,
     format: str | None = None,
     label: str | None = None,
+    fetch: str = "frontend",
+    session: HTTPSession | None = None,
 ) -> None:
     """Backend interno para MolSysView.load_from_url(...).
 
-    De momento:
-    - delega totalmente el parseo de la URL al frontend (Mol*),
-    - deja `_molsys` y `atom_mask` a None (no hay operaciones de selección).
+    Con `fetch="frontend"` (por defecto) la descarga y el parseo se delegan
+    en Mol* y `_molsys`/`atom_mask` quedan a None (no hay operaciones de
+    selección).
+
+    Con `fetch="python"` el contenido se descarga en Python con una sesión
+    HTTP con pool de conexiones y caché ETag/Last-Modified, se parsea una vez
+    con MolSysMT y se envía por el camino normal de payload, de modo que
+    `hide`/`show`/`isolate` funcionan igual que tras `load(...)`.
     """
 
+    if fetch not in ("frontend", "python"):
+        raise ValueError(f"fetch must be 'frontend' or 'python', got {fetch!r}")
+
+    # Esta carga sustituye a la que estuviera en segundo plano (ver `_private/background.py`).
+    cancel_pending = getattr(view, "_cancel_load_job", None)
+    if cancel_pending is not None:
+        cancel_pending()
+    replace_structure = getattr(view, "_replace_structure", None)
+    if replace_structure is not None:
+        replace_structure()
+
     view.molecular_system = url
     view.selection = "all"
     view.structure_indices = "all"
-    view._molsys = None
-    view.atom_mask = None
     view.structure_mask = None
 
-    view._send(
-        {
-            "op": "load_structure_from_url",
-            "url": url,
-            "format": format,
-            "label": label,
-        }
+    if fetch == "frontend":
+        view._molsys = None
+        view.atom_mask = None
+
+        view._send(
+            {
+                "op": "load_structure_from_url",
+                "url": url,
+                "format": format,
+                "label": label,
+            }
+        )
+        return
+
+    fmt = format or _guess_format(url)
+    if fmt not in ("pdb", "mmcif"):
+        raise ValueError(f"Python-side fetching supports PDB and mmCIF text, got format {fmt!r} for {url!r}")
+
+    if session is None:
+        session = get_default_session()
+    body = session.get(url).body
+    if body[:2] == b"\x1f\x8b":
+        body = gzip.decompress(body)
+    text = body.decode("utf-8", errors="replace")
+
+    view._molsys = msm.convert(
+        text,
+        to_form="molsysmt.MolSys",
+        selection="all",
+        structure_indices="all",
+        syntax="MolSysMT",
     )
+    n_atoms = msm.get(view._molsys, element="atom", n_atoms=True)
+    view.atom_mask = np.ones(n_atoms, dtype=bool)
+
+    send_load_message(view, _build_load_message(view._molsys, label=label))
+
+    apply_memory_policy = getattr(view, "_apply_memory_policy", None)
+    if apply_memory_policy is not None:
+        apply_memory_policy()
+
 
+def _guess_format(url: str) -> str | None:
+    name = posixpath.basename(urllib.parse.urlsplit(url).path).lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    extension = name.rsplit(".", 1)[-1] if "." in name else ""
+    return _FORMATS_BY_EXTENSION.get(extension)
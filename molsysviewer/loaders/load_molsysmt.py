@@ -3,11 +3,19 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from dataclasses import dataclass
+from typing import Any, Callable
 
 import molsysmt as msm
 import numpy as np
 
+from .._private.budget import LoadLimits, plan_structure_indices
+from .._private.compression import send_load_message
+from .._private.frames import encode_frames
+from .._private.pbc import PBC_MODES, apply_pbc_stage, cell_to_box
+from .._private.preview import PreviewOptions, PreviewState, build_preview_payload
+from .._private.progressive import ProgressiveOptions, split_payload
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,53 +27,303 @@ def load_from_molsysmt(
     structure_indices: str | Any = "all",
     syntax: str = "MolSysMT",
     label: str | None = None,
+    start: Any = None,
+    stop: Any = None,
+    stride: int | None = None,
+    limits: LoadLimits | None = None,
+    pbc: str | None = None,
+    images_cutoff: float | None = None,
+    show_cell: bool = False,
+    preview: bool | None = None,
+    progressive: bool | None = None,
 ) -> None:
     """Backend interno para MolSysView.load(...).
 
+    - Resuelve `start`/`stop`/`stride` y los límites de tamaño (ver
+      `_private.budget`) antes de convertir nada.
     - Convierte cualquier `molecular_system` a MolSysMT.MolSys.
     - Inicializa la máscara de átomos.
     - Intenta el camino nativo (payload MolSysMT → Mol*).
     - Si falla, hace fallback a PDB string.
+    - Aplica la etapa PBC (`pbc`, `images_cutoff`, ver `_private.pbc`) al
+      payload y dibuja la celda del primer frame si `show_cell`.
+    - Por encima del umbral de ``view.preview_options`` (o con `preview`),
+      envía primero la vista previa de grano grueso (ver `_private.preview`).
+    - Por encima del umbral de ``view.progressive_options`` (o con
+      `progressive`), envía el payload por bloques (ver `_private.progressive`).
+
+    Una carga síncrona sustituye a la carga en segundo plano que la vista
+    tuviera en curso (ver `_private.background`).
+    """
+
+    cancel_pending = getattr(view, "_cancel_load_job", None)
+    if cancel_pending is not None:
+        cancel_pending()
+    prepared = prepare_load_from_molsysmt(
+        view,
+        molecular_system=molecular_system,
+        selection=selection,
+        structure_indices=structure_indices,
+        syntax=syntax,
+        label=label,
+        start=start,
+        stop=stop,
+        stride=stride,
+        limits=limits,
+        pbc=pbc,
+        images_cutoff=images_cutoff,
+        show_cell=show_cell,
+        preview=preview,
+        progressive=progressive,
+    )
+    apply_prepared_load(view, prepared)
+
+
+@dataclass
+class PreparedLoad:
+    """Resultado de `prepare_load_from_molsysmt`, listo para aplicarse a una vista."""
+
+    molecular_system: Any
+    selection: Any
+    structure_indices: Any
+    molsys: Any
+    n_atoms: int
+    msg: dict[str, Any]
+    budget: dict[str, Any] | None = None
+    pbc: dict[str, Any] | None = None
+    # Átomo de origen de cada imagen periódica añadida al final del payload
+    image_sources: np.ndarray | None = None
+    show_cell: bool = False
+    # Vista previa enviada en lugar del sistema completo (msg es el de las cuentas)
+    preview: PreviewState | None = None
+    # Bloques de una carga progresiva (msg es el mensaje final)
+    chunks: list[tuple[dict[str, Any], list[bytes]]] | None = None
+
+
+def prepare_load_from_molsysmt(
+    view: Any,
+    *,
+    molecular_system: Any,
+    selection: str | Any = "all",
+    structure_indices: str | Any = "all",
+    syntax: str = "MolSysMT",
+    label: str | None = None,
+    start: Any = None,
+    stop: Any = None,
+    stride: int | None = None,
+    limits: LoadLimits | None = None,
+    pbc: str | None = None,
+    images_cutoff: float | None = None,
+    show_cell: bool = False,
+    preview: bool | None = None,
+    progressive: bool | None = None,
+    check: Callable[[], None] | None = None,
+) -> PreparedLoad:
+    """Parte costosa de la carga: plan, conversión, serialización y PBC.
+
+    No modifica la vista, de modo que puede ejecutarse en un hilo de trabajo.
+    `check` se llama entre etapas y lanza ``CancelledError`` si la carga fue
+    sustituida por otra. Con vista previa sólo se construye el payload de
+    cuentas; el completo lo construye después `build_full_message`.
     """
 
+    if pbc is not None and pbc not in PBC_MODES:
+        raise ValueError(f"pbc must be one of {PBC_MODES} or None, got {pbc!r}")
+    if images_cutoff is not None and images_cutoff < 0:
+        raise ValueError("images_cutoff must be a non-negative distance in Å.")
+    check = check or (lambda: None)
+
+    planned_indices, budget = plan_structure_indices(
+        molecular_system,
+        selection=selection,
+        structure_indices=structure_indices,
+        syntax=syntax,
+        start=start,
+        stop=stop,
+        stride=stride,
+        limits=limits if limits is not None else getattr(view, "load_limits", None),
+    )
+    check()
+
+    # Convertir a MolSys
+    molsys = _convert_to_molsys(
+        molecular_system,
+        selection=selection,
+        structure_indices=planned_indices,
+        syntax=syntax,
+    )
+    n_atoms = msm.get(molsys, element="atom", n_atoms=True)
+    check()
+
+    preview_options = getattr(view, "preview_options", None) or PreviewOptions()
+    if preview_options.applies(n_atoms, preview):
+        try:
+            payload, bead_of_atom, n_beads = build_preview_payload(molsys, n_atoms, preview_options)
+        except Exception:  # pragma: no cover - depende de la forma y versión de MolSysMT
+            logger.debug("Preview payload failed; loading the full system", exc_info=True)
+        else:
+            return PreparedLoad(
+                molecular_system=molecular_system,
+                selection=selection,
+                structure_indices=planned_indices,
+                molsys=molsys,
+                n_atoms=n_atoms,
+                msg={"op": "load_molsys_payload", "payload": payload, "label": label},
+                budget=budget,
+                preview=PreviewState(
+                    molsys=molsys,
+                    label=label,
+                    bead_of_atom=bead_of_atom,
+                    n_beads=n_beads,
+                    refine=preview_options.refine,
+                    pbc=pbc,
+                    images_cutoff=images_cutoff,
+                    show_cell=show_cell,
+                ),
+            )
+
+    msg, pbc_report, image_sources = build_full_message(
+        molsys, label=label, pbc=pbc, images_cutoff=images_cutoff, check=check
+    )
+
+    chunks = None
+    progressive_options = getattr(view, "progressive_options", None) or ProgressiveOptions()
+    if msg["op"] == "load_molsys_payload" and progressive_options.applies(n_atoms, progressive):
+        check()
+        split = split_payload(msg, progressive_options.chunk_atoms, progressive_options.order)
+        if split is not None:
+            chunks, msg = split
+
+    return PreparedLoad(
+        molecular_system=molecular_system,
+        selection=selection,
+        structure_indices=planned_indices,
+        molsys=molsys,
+        n_atoms=n_atoms,
+        msg=msg,
+        budget=budget,
+        pbc=pbc_report,
+        image_sources=image_sources,
+        show_cell=show_cell,
+        chunks=chunks,
+    )
+
+
+def build_full_message(
+    molsys: Any,
+    *,
+    label: str | None = None,
+    pbc: str | None = None,
+    images_cutoff: float | None = None,
+    check: Callable[[], None] | None = None,
+) -> tuple[dict[str, Any], dict[str, Any] | None, np.ndarray | None]:
+    """Mensaje de carga del sistema completo con la etapa PBC aplicada, el resumen PBC y
+    el átomo de origen de cada imagen periódica (None sin imágenes)."""
+    msg = _build_load_message(molsys, label=label)
+    pbc_report = None
+    image_sources = None
+    if pbc is not None or images_cutoff:
+        if msg["op"] == "load_molsys_payload":
+            if check is not None:
+                check()
+            pbc_report, image_sources = apply_pbc_stage(msg["payload"], mode=pbc, images_cutoff=images_cutoff)
+        else:
+            logger.warning("PBC options ignored: the system was sent as a PDB string.")
+    return msg, pbc_report, image_sources
+
+
+def apply_prepared_load(view: Any, prepared: PreparedLoad) -> None:
+    """Guardar el resultado en el estado de la vista y enviarlo al frontend."""
+    if prepared.budget is not None:
+        view.stats["load_budget"] = prepared.budget
+    if prepared.pbc is not None:
+        view.stats["pbc"] = prepared.pbc
+
+    replace_preview = getattr(view, "_replace_preview", None)
+    if replace_preview is not None:
+        replace_preview(prepared.preview)
+    replace_structure = getattr(view, "_replace_structure", None)
+    if replace_structure is not None:
+        replace_structure()
+
     # Guardar en el estado del viewer
-    view.molecular_system = molecular_system
-    view.selection = selection
-    view.structure_indices = structure_indices
+    view.molecular_system = prepared.molecular_system
+    view.selection = prepared.selection
+    view.structure_indices = prepared.structure_indices
+    view._molsys = prepared.molsys
+    view.atom_mask = np.ones(prepared.n_atoms, dtype=bool)
+    view._image_sources = prepared.image_sources
+
+    # Los bloques de una carga progresiva van antes que el mensaje final.
+    for chunk_msg, buffers in prepared.chunks or ():
+        view._send(chunk_msg, buffers)
+    send_load_message(view, prepared.msg)
+
+    if prepared.preview is not None:
+        if prepared.preview.refine == "background" and replace_preview is not None:
+            view.refine(background=True)
+    elif prepared.show_cell:
+        show_unit_cell(view, prepared.msg)
+
+    apply_memory_policy = getattr(view, "_apply_memory_policy", None)
+    if apply_memory_policy is not None:
+        apply_memory_policy()
+
+
+def show_unit_cell(view: Any, msg: dict[str, Any]) -> None:
+    """Dibujar la celda del primer frame del payload (si la hay) como líneas."""
+    frames = (msg.get("payload") or {}).get("coordinates") or []
+    cell = frames[0].get("cell") if frames else None
+    if cell is None:
+        logger.warning("show_cell ignored: the system has no unit cell.")
+        return
+    box = cell_to_box(*(cell[k] for k in ("a", "b", "c", "alpha", "beta", "gamma")))
+    view.shapes.add_unit_cell(box.tolist(), tag="molsysviewer:unit-cell")
+
 
-    # Convertir a MolSys y crear máscara
-    view._molsys = msm.convert(
+def _convert_to_molsys(
+    molecular_system: Any,
+    *,
+    selection: str | Any = "all",
+    structure_indices: str | Any = "all",
+    syntax: str = "MolSysMT",
+) -> Any:
+    return msm.convert(
         molecular_system,
         to_form="molsysmt.MolSys",
         selection=selection,
         structure_indices=structure_indices,
         syntax=syntax,
     )
-    n_atoms = msm.get(view._molsys, element="atom", n_atoms=True)
-    view.atom_mask = np.ones(n_atoms, dtype=bool)
 
-    # Intentar camino nativo MolSysMT -> payload Mol* (vía ViewerJSON)
+
+def _build_load_message(molsys: Any, *, label: str | None = None) -> dict[str, Any]:
+    """Construye el mensaje de carga para el frontend.
+
+    Intenta el camino nativo (payload MolSysMT → Mol*, vía ViewerJSON) y, si
+    falla, hace fallback a PDB string.
+    """
     try:
-        payload = _serialize_molsys_payload(view._molsys)
+        payload = _serialize_molsys_payload(molsys)
     except Exception as exc:  # pragma: no cover - defensive, MolSysMT internals
         logger.debug("MolSys payload serialization failed: %s", exc, exc_info=True)
         payload = None
 
     if payload is not None:
-        # Enviar payload al frontend
-        _load_molsys_payload(view, payload, label=label)
-        return
-
-    # Fallback: PDB string
-    pdb_string = msm.convert(view._molsys, to_form="string:pdb")
-    view._send(
-        {
-            "op": "load_structure_from_string",
-            "format": "pdb",
-            "data": pdb_string,
+        return {
+            "op": "load_molsys_payload",
+            "payload": payload,
             "label": label,
         }
-    )
+
+    # Fallback: PDB string
+    pdb_string = msm.convert(molsys, to_form="string:pdb")
+    return {
+        "op": "load_structure_from_string",
+        "format": "pdb",
+        "data": pdb_string,
+        "label": label,
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -118,6 +376,21 @@ def _molsys_to_viewer_json(molsys: Any) -> dict[str, Any] | None:
 
 
 def _viewer_json_to_payload(viewer_json: dict[str, Any]) -> dict[str, Any] | None:
+    payload = _viewer_json_to_topology(viewer_json)
+    if payload is None:
+        return None
+    n_atoms = len(payload["atoms"]["atom_id"])
+
+    coordinates_payload = _extract_frames(viewer_json.get("frames") or viewer_json.get("coordinates"), n_atoms)
+    if not coordinates_payload:
+        return None
+    payload["coordinates"] = coordinates_payload
+
+    return payload
+
+
+def _viewer_json_to_topology(viewer_json: dict[str, Any]) -> dict[str, Any] | None:
+    """Bloques `atoms` y `bonds` del payload (sin coordenadas)."""
     atoms_block = viewer_json.get("atoms") or {}
     atom_ids = atoms_block.get("atom_id")
     n_atoms = len(atom_ids) if atom_ids is not None else 0
@@ -161,10 +434,6 @@ def _viewer_json_to_payload(viewer_json: dict[str, Any]) -> dict[str, Any] | Non
     )
     formal_charges = _prepare_atom_field(atoms_block.get("formal_charge"), n_atoms, lambda _i: 0)
 
-    coordinates_payload = _extract_frames(viewer_json.get("frames") or viewer_json.get("coordinates"), n_atoms)
-    if not coordinates_payload:
-        return None
-
     bonds_payload = _normalize_bonds(viewer_json.get("bonds"))
 
     payload: dict[str, Any] = {
@@ -178,7 +447,6 @@ def _viewer_json_to_payload(viewer_json: dict[str, Any]) -> dict[str, Any] | Non
             "element_symbol": element_symbols,
             "formal_charge": formal_charges,
         },
-        "coordinates": coordinates_payload,
     }
     if bonds_payload is not None:
         payload["bonds"] = bonds_payload
@@ -187,44 +455,9 @@ def _viewer_json_to_payload(viewer_json: dict[str, Any]) -> dict[str, Any] | Non
 
 
 def _extract_frames(frames: Any, n_atoms: int) -> list[dict[str, Any]]:
-    if not isinstance(frames, list):
-        return []
-
-    payload_frames: list[dict[str, Any]] = []
-    for index, frame in enumerate(frames):
-        if not isinstance(frame, dict):
-            continue
-
-        positions = _positions_to_angstroms(frame.get("positions"), n_atoms)
-        if positions is None:
-            continue
-
-        frame_payload: dict[str, Any] = {
-            "positions": positions,
-            "time": frame.get("time", index),
-        }
-
-        cell = _cell_to_angstroms(frame.get("cell"))
-        if cell is not None:
-            frame_payload["cell"] = cell
-
-        payload_frames.append(frame_payload)
-
-    return payload_frames
-
-
-def _positions_to_angstroms(positions: Any, n_atoms: int) -> list[list[float]] | None:
-    try:
-        array = np.asarray(positions, dtype=float)
-    except Exception:  # pragma: no cover - runtime guard
-        logger.debug("MolSys payload: unable to convert positions to ndarray", exc_info=True)
-        return None
-
-    if array.shape != (n_atoms, 3):
-        return None
-
-    # ViewerJSON usa nanómetros; el viewer espera Å.
-    return (array * 10.0).tolist()
+    # ViewerJSON usa nanómetros; el viewer espera Å. Los frames se convierten
+    # por bloques y en paralelo (ver _private/frames.py).
+    return encode_frames(frames, n_atoms, scale=10.0, convert_cell=_cell_to_angstroms)
 
 
 def _cell_to_angstroms(cell: Any) -> dict[str, float] | None:
@@ -285,19 +518,3 @@ def _normalize_bonds(bonds: Any) -> dict[str, Any] | None:
         payload["order"] = order_array.tolist()
 
     return payload
-
-
-def _load_molsys_payload(
-    view: Any,
-    payload: dict[str, Any],
-    *,
-    label: str | None = None,
-) -> None:
-    """Enviar un payload ya construido al frontend."""
-    view._send(
-        {
-            "op": "load_molsys_payload",
-            "payload": payload,
-            "label": label,
-        }
-    )
@@ -5,7 +5,13 @@ from __future__ import annotations
 from typing import Any
 
 import molsysmt as msm
-import numpy as np
+
+from .._private.lazy import defer_molsys
+from .resolver import StructureResolver, get_default_resolver
+from .transport import _parse_mode, _send_structure_text
+
+# Formatos que MolSysMT puede parsear desde texto (BinaryCIF queda fuera).
+_TEXT_FORMATS = ("mmcif", "pdb")
 
 
 def load_pdb_id(
@@ -13,8 +19,19 @@ def load_pdb_id(
     *,
     pdb_id: str,
     label: str | None = None,
+    resolver: StructureResolver | None = None,
+    transport: str = "text",
+    parse: str | None = None,
 ) -> None:
-    """Backend interno para MolSysView.load_pdb_id(...)."""
+    """Backend interno para MolSysView.load_pdb_id(...).
+
+    El fichero se resuelve una sola vez en Python (mirror local → caché en
+    disco → descarga, ver `StructureResolver`) y el texto se envía al
+    frontend, que ya no vuelve a descargarlo. El MolSys de las selecciones se
+    construye a partir del mismo texto según `parse` (ver `_private/lazy.py`);
+    con `transport="bcif"` la conversión es inmediata (ver `_parse_mode`).
+    """
+    parse = _parse_mode(transport, parse)
 
     if pdb_id is None:
         raise ValueError("pdb_id must be a non-empty string.")
@@ -23,29 +40,44 @@ def load_pdb_id(
     if not pdb_id_str:
         raise ValueError("pdb_id must be a non-empty string.")
 
+    if resolver is None:
+        resolver = get_default_resolver()
+    formats = [fmt for fmt in resolver.formats if fmt in _TEXT_FORMATS] or list(_TEXT_FORMATS)
+    structure = resolver.resolve(pdb_id_str, formats=formats)
+    text = structure.read_text()
+
     # Estado Python
+    # Esta carga sustituye a la que estuviera en segundo plano (ver `_private/background.py`).
+    cancel_pending = getattr(view, "_cancel_load_job", None)
+    if cancel_pending is not None:
+        cancel_pending()
+    replace_structure = getattr(view, "_replace_structure", None)
+    if replace_structure is not None:
+        replace_structure()
+
     view.molecular_system = pdb_id
     view.selection = "all"
     view.structure_indices = "all"
 
-    view._molsys = msm.convert(
-        pdb_id,
-        to_form="molsysmt.MolSys",
-        selection="all",
-        structure_indices="all",
-        syntax="MolSysMT",
-    )
-    n_atoms = msm.get(view._molsys, element="atom", n_atoms=True)
-    view.atom_mask = np.ones(n_atoms, dtype=bool)
-
-    # Normalizamos a minúsculas por consistencia
-    pdb_id_str = pdb_id_str.lower()
-
-    view._send(
-        {
-            "op": "load_pdb_id",
-            "pdb_id": pdb_id_str,
-            "label": label,
-        }
+    # El MolSys sólo hace falta para las selecciones: se convierte tras enviar.
+    pending = defer_molsys(
+        view,
+        lambda: msm.convert(
+            text,
+            to_form="molsysmt.MolSys",
+            selection="all",
+            structure_indices="all",
+            syntax="MolSysMT",
+        ),
+        parse=parse,
     )
 
+    _send_structure_text(
+        view,
+        data=text,
+        format=structure.format,
+        label=label if label is not None else structure.pdb_id.upper(),
+        transport=transport,
+    )
+    if pending is not None and parse == "background":
+        pending.start()
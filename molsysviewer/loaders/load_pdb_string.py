@@ -5,7 +5,9 @@ from __future__ import annotations
 from typing import Any
 
 import molsysmt as msm
-import numpy as np
+
+from .._private.lazy import defer_molsys
+from .transport import _parse_mode, _send_structure_text
 
 
 def load_pdb_string(
@@ -13,28 +15,44 @@ def load_pdb_string(
     *,
     pdb_string: str,
     label: str | None = None,
+    transport: str = "text",
+    parse: str | None = None,
 ) -> None:
-    """Backend interno para MolSysView.load_pdb_string(...)."""
+    """Backend interno para MolSysView.load_pdb_string(...).
+
+    Con `transport="bcif"` el texto se transcodifica a BinaryCIF en Python
+    (ver `_send_structure_text`). `parse` controla cuándo se construye el
+    MolSys de las selecciones: "background" (por defecto), "lazy" o "eager"
+    (ver `_private/lazy.py`); con BinaryCIF sólo cabe "eager" (ver `_parse_mode`).
+    """
+
+    parse = _parse_mode(transport, parse)
+
+    # Esta carga sustituye a la que estuviera en segundo plano (ver `_private/background.py`).
+    cancel_pending = getattr(view, "_cancel_load_job", None)
+    if cancel_pending is not None:
+        cancel_pending()
+    replace_structure = getattr(view, "_replace_structure", None)
+    if replace_structure is not None:
+        replace_structure()
 
     view.molecular_system = pdb_string
     view.selection = "all"
     view.structure_indices = "all"
 
-    view._molsys = msm.convert(
-        pdb_string,
-        to_form="molsysmt.MolSys",
-        selection="all",
-        structure_indices="all",
-        syntax="MolSysMT",
-    )
-    n_atoms = msm.get(view._molsys, element="atom", n_atoms=True)
-    view.atom_mask = np.ones(n_atoms, dtype=bool)
-
-    view._send(
-        {
-            "op": "load_structure_from_string",
-            "format": "pdb",
-            "data": pdb_string,
-            "label": label,
-        }
+    # El MolSys sólo hace falta para las selecciones: se convierte tras enviar.
+    pending = defer_molsys(
+        view,
+        lambda: msm.convert(
+            pdb_string,
+            to_form="molsysmt.MolSys",
+            selection="all",
+            structure_indices="all",
+            syntax="MolSysMT",
+        ),
+        parse=parse,
     )
+
+    _send_structure_text(view, data=pdb_string, format="pdb", label=label, transport=transport)
+    if pending is not None and parse == "background":
+        pending.start()
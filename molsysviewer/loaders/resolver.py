@@ -0,0 +1,288 @@
+# molsysviewer/loaders/resolver.py
+
+from __future__ import annotations
+
+import gzip
+import http.client
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Sequence
+
+from .._private.fetch import HTTPSession, get_default_session
+
+logger = logging.getLogger(__name__)
+
+#: Extensiones reconocidas por formato (en orden de preferencia).
+FORMAT_EXTENSIONS: dict[str, tuple[str, ...]] = {
+    "mmcif": ("cif", "mmcif"),
+    "pdb": ("pdb", "ent"),
+    "bcif": ("bcif",),
+}
+
+#: Plantillas de descarga por formato. Aceptan `{pdb_id}` (minúsculas) y `{PDB_ID}` (mayúsculas).
+DEFAULT_URL_TEMPLATES: dict[str, str] = {
+    "mmcif": "https://files.rcsb.org/download/{PDB_ID}.cif.gz",
+    "pdb": "https://files.rcsb.org/download/{PDB_ID}.pdb.gz",
+    "bcif": "https://models.rcsb.org/{PDB_ID}.bcif.gz",
+}
+
+DEFAULT_MAX_CACHE_BYTES = 2 * 1024**3
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "molsysviewer" / "structures"
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class ResolvedStructure:
+    """Fichero de estructura localizado por un StructureResolver."""
+
+    pdb_id: str
+    format: str
+    path: Path
+    source: str  # "mirror" | "cache" | "download"
+
+    @property
+    def compressed(self) -> bool:
+        return self.path.suffix == ".gz"
+
+    def read_bytes(self) -> bytes:
+        """Contenido del fichero, ya descomprimido."""
+        raw = self.path.read_bytes()
+        if raw[:2] == _GZIP_MAGIC:
+            return gzip.decompress(raw)
+        return raw
+
+    def read_text(self) -> str:
+        if self.format == "bcif":
+            raise ValueError("BinaryCIF files have no text representation; use read_bytes()")
+        return self.read_bytes().decode("utf-8", errors="replace")
+
+
+class StructureResolver:
+    """Resuelve PDB IDs a ficheros locales: mirror → caché en disco → descarga.
+
+    Parameters
+    ----------
+    cache_dir
+        Directorio de la caché en disco. Por defecto ``$MOLSYSVIEWER_CACHE_DIR``
+        o ``~/.cache/molsysviewer/structures``.
+    mirror_root
+        Raíz de un mirror local (sólo lectura) del PDB. Se aceptan las
+        disposiciones plana (``<root>/1crn.cif.gz``) y "divided" de wwPDB
+        (``<root>/cr/1crn.cif.gz``, ``<root>/cr/pdb1crn.ent.gz``). Por defecto
+        ``$MOLSYSVIEWER_PDB_MIRROR``.
+    formats
+        Formatos a probar, en orden: "mmcif", "pdb" y/o "bcif".
+    url_templates
+        Plantillas de descarga por formato (ver ``DEFAULT_URL_TEMPLATES``).
+    max_cache_bytes
+        Tamaño máximo de la caché; al superarlo se eliminan los ficheros
+        usados hace más tiempo.
+    offline
+        Si es True nunca se descarga nada. Por defecto ``$MOLSYSVIEWER_OFFLINE``.
+    session
+        Sesión HTTP usada para descargar. Por defecto la sesión compartida
+        del paquete, de modo que las conexiones al servidor se reutilizan.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | os.PathLike | None = None,
+        *,
+        mirror_root: str | os.PathLike | None = None,
+        formats: Sequence[str] = ("mmcif", "pdb"),
+        url_templates: dict[str, str] | None = None,
+        max_cache_bytes: int | None = DEFAULT_MAX_CACHE_BYTES,
+        offline: bool | None = None,
+        session: HTTPSession | None = None,
+    ) -> None:
+        if cache_dir is None:
+            cache_dir = os.environ.get("MOLSYSVIEWER_CACHE_DIR") or _default_cache_dir()
+        if mirror_root is None:
+            mirror_root = os.environ.get("MOLSYSVIEWER_PDB_MIRROR") or None
+
+        unknown = [fmt for fmt in formats if fmt not in FORMAT_EXTENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown structure format(s): {unknown}")
+
+        self.cache_dir = Path(cache_dir)
+        self.mirror_root = Path(mirror_root) if mirror_root is not None else None
+        self.formats = tuple(formats)
+        self.url_templates = dict(DEFAULT_URL_TEMPLATES if url_templates is None else url_templates)
+        self.max_cache_bytes = max_cache_bytes
+        self.offline = _env_flag("MOLSYSVIEWER_OFFLINE") if offline is None else bool(offline)
+        self.session = session
+
+    # --- API pública ---
+
+    def resolve(self, pdb_id: str, formats: Sequence[str] | None = None) -> ResolvedStructure:
+        """Locate `pdb_id` in the mirror or the cache, downloading it only if needed."""
+        pdb_id = _normalize_pdb_id(pdb_id)
+        formats = self.formats if formats is None else tuple(formats)
+
+        for fmt in formats:
+            path = self._find_in_mirror(pdb_id, fmt)
+            if path is not None:
+                return ResolvedStructure(pdb_id, fmt, path, "mirror")
+
+        for fmt in formats:
+            path = self._find_in_cache(pdb_id, fmt)
+            if path is not None:
+                _touch(path)
+                return ResolvedStructure(pdb_id, fmt, path, "cache")
+
+        if self.offline:
+            raise FileNotFoundError(
+                f"{pdb_id} not found in the local mirror/cache and downloads are disabled (offline mode)"
+            )
+
+        errors: list[str] = []
+        for fmt in formats:
+            try:
+                path = self._download(pdb_id, fmt)
+            except (OSError, http.client.HTTPException) as exc:
+                logger.debug("Structure download failed for %s (%s)", pdb_id, fmt, exc_info=True)
+                errors.append(f"{fmt}: {exc}")
+                continue
+            if path is not None:
+                self.evict()
+                return ResolvedStructure(pdb_id, fmt, path, "download")
+
+        raise FileNotFoundError(f"Unable to resolve structure {pdb_id}: " + "; ".join(errors or ["no URL template"]))
+
+    def cache_size(self) -> int:
+        """Bytes currently held by the on-disk cache."""
+        return sum(path.stat().st_size for path in self._cached_files())
+
+    def evict(self, max_bytes: int | None = None) -> list[Path]:
+        """Remove least-recently-used cache files until the cache fits in `max_bytes`."""
+        limit = self.max_cache_bytes if max_bytes is None else max_bytes
+        if limit is None:
+            return []
+
+        entries = []
+        for path in self._cached_files():
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _mtime, size, _path in entries)
+
+        removed: list[Path] = []
+        for _mtime, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= limit:
+                break
+            try:
+                path.unlink()
+            except OSError:  # pragma: no cover - concurrent removal
+                continue
+            total -= size
+            removed.append(path)
+        return removed
+
+    def clear_cache(self) -> None:
+        self.evict(max_bytes=0)
+
+    # --- internos ---
+
+    def _cached_files(self) -> Iterable[Path]:
+        if not self.cache_dir.is_dir():
+            return []
+        return [path for path in self.cache_dir.rglob("*") if path.is_file() and not path.name.startswith(".")]
+
+    def _cache_path(self, pdb_id: str, fmt: str) -> Path:
+        extension = FORMAT_EXTENSIONS[fmt][0]
+        return self.cache_dir / pdb_id[1:3] / f"{pdb_id}.{extension}.gz"
+
+    def _find_in_cache(self, pdb_id: str, fmt: str) -> Path | None:
+        path = self._cache_path(pdb_id, fmt)
+        return path if path.is_file() else None
+
+    def _find_in_mirror(self, pdb_id: str, fmt: str) -> Path | None:
+        if self.mirror_root is None:
+            return None
+        for candidate in _mirror_candidates(self.mirror_root, pdb_id, fmt):
+            if candidate.is_file():
+                return candidate
+        return None
+
+    def _download(self, pdb_id: str, fmt: str) -> Path | None:
+        template = self.url_templates.get(fmt)
+        if not template:
+            return None
+        url = template.format(pdb_id=pdb_id, PDB_ID=pdb_id.upper())
+
+        session = self.session if self.session is not None else get_default_session()
+        # El resolver mantiene su propia caché; la de la sesión sería redundante.
+        data = session.get(url, use_cache=False).body
+        if data[:2] != _GZIP_MAGIC:
+            data = gzip.compress(data)
+
+        target = self._cache_path(pdb_id, fmt)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=".download-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp_name, target)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        return target
+
+
+def _normalize_pdb_id(pdb_id: str) -> str:
+    value = str(pdb_id).strip().lower() if pdb_id is not None else ""
+    if not value:
+        raise ValueError("pdb_id must be a non-empty string.")
+    if not value.isalnum():
+        raise ValueError(f"Invalid PDB ID: {pdb_id!r}")
+    return value
+
+
+def _mirror_candidates(root: Path, pdb_id: str, fmt: str) -> Iterable[Path]:
+    names: list[str] = []
+    for extension in FORMAT_EXTENSIONS[fmt]:
+        for stem in (pdb_id, pdb_id.upper()):
+            names.append(f"{stem}.{extension}")
+        if extension == "ent":
+            names.append(f"pdb{pdb_id}.ent")
+    directories = (root, root / pdb_id[1:3])
+    for directory in directories:
+        for name in names:
+            yield directory / f"{name}.gz"
+            yield directory / name
+
+
+def _touch(path: Path) -> None:
+    try:
+        os.utime(path)
+    except OSError:  # pragma: no cover - read-only cache
+        pass
+
+
+_default_resolver: StructureResolver | None = None
+
+
+def get_default_resolver() -> StructureResolver:
+    """Resolver compartido usado por `load_pdb_id` cuando no se pasa uno explícito."""
+    global _default_resolver
+    if _default_resolver is None:
+        _default_resolver = StructureResolver()
+    return _default_resolver
+
+
+def set_default_resolver(resolver: StructureResolver | None) -> None:
+    """Replace the shared resolver (None restores the environment-based default)."""
+    global _default_resolver
+    _default_resolver = resolver
@@ -0,0 +1,103 @@
+# molsysviewer/loaders/transport.py
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any
+
+from .._private.bcif import encode_molsys_payload
+from .._private.compression import send_load_message
+from .load_molsysmt import _serialize_molsys_payload
+
+logger = logging.getLogger(__name__)
+
+#: Formas de enviar al frontend una estructura que llegó como texto.
+TRANSPORTS = ("text", "bcif")
+
+
+def _record_stats(view: Any, key: str, values: dict[str, Any]) -> None:
+    stats = getattr(view, "stats", None)
+    if isinstance(stats, dict):
+        stats[key] = values
+
+
+def _parse_mode(transport: str, parse: str | None) -> str:
+    """Modo de `defer_molsys` para una carga con `transport`.
+
+    BinaryCIF se transcodifica del MolSys ya parseado, así que con
+    ``transport="bcif"`` la conversión es siempre inmediata ("eager"); un
+    `parse` diferido explícito se rechaza en vez de ignorarlo.
+    """
+    if parse is None:
+        return "eager" if transport == "bcif" else "background"
+    if transport == "bcif" and parse != "eager":
+        raise ValueError(f"transport='bcif' is encoded from the parsed system and needs parse='eager', got {parse!r}")
+    return parse
+
+
+def _send_structure_text(
+    view: Any,
+    *,
+    data: str,
+    format: str,
+    label: str | None = None,
+    transport: str = "text",
+) -> None:
+    """Enviar al frontend una estructura de texto (PDB/mmCIF).
+
+    - ``transport="text"``: el texto tal cual (`load_structure_from_string`).
+    - ``transport="bcif"``: se transcodifica en Python a BinaryCIF a partir de
+      `view._molsys` (ya parseado) y se envía como buffer binario
+      (`load_structure_from_bcif`), que Mol* decodifica sin tokenizar texto.
+      Si el MolSys no se puede serializar, o su conversión está diferida
+      (no se fuerza aquí, ver `_parse_mode`), se recurre al texto.
+
+    Los tamaños y el tiempo de codificación quedan en ``view.stats["transport"]``;
+    el frontend añade el tiempo de parseo en ``view.stats["load"]``.
+    """
+    if transport not in TRANSPORTS:
+        raise ValueError(f"transport must be one of {TRANSPORTS}, got {transport!r}")
+
+    if transport == "bcif":
+        start = time.perf_counter()
+        try:
+            if getattr(view, "_pending_molsys", None) is not None:
+                # Leer `view._molsys` resolvería ya la conversión diferida.
+                logger.debug("BinaryCIF skipped: the MolSys conversion is deferred")
+                payload = None
+            else:
+                payload = _serialize_molsys_payload(view._molsys) if view._molsys is not None else None
+            blob = encode_molsys_payload(payload) if payload is not None else None
+        except Exception as exc:  # pragma: no cover - defensive, MolSysMT internals
+            logger.debug("BinaryCIF transcoding failed: %s", exc, exc_info=True)
+            blob = None
+
+        if blob is not None:
+            text_bytes = len(data.encode("utf-8"))
+            _record_stats(
+                view,
+                "transport",
+                {
+                    "encoding": "bcif",
+                    "source_format": format,
+                    "text_bytes": text_bytes,
+                    "bytes": len(blob),
+                    "ratio": text_bytes / len(blob) if blob else None,
+                    "encode_ms": (time.perf_counter() - start) * 1000.0,
+                },
+            )
+            view._send({"op": "load_structure_from_bcif", "label": label}, buffers=[blob])
+            return
+
+    _record_stats(view, "transport", {"encoding": "text", "source_format": format, "bytes": len(data)})
+    # Por encima del umbral de `view.compression` el texto viaja comprimido.
+    send_load_message(
+        view,
+        {
+            "op": "load_structure_from_string",
+            "format": format,
+            "data": data,
+            "label": label,
+        }
+    )
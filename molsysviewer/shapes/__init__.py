@@ -6,6 +6,7 @@ from .links import LinkShapes
 from .displacements import DisplacementVectors
 from .triangle_faces import TriangleFaces
 from .tetrahedra import Tetrahedra
+from .unit_cell import UnitCell
 
 
 class ShapesManager:
@@ -25,6 +26,7 @@ class ShapesManager:
         self.vectors = DisplacementVectors(view)
         self.triangles = TriangleFaces(view)
         self.tetrahedra = Tetrahedra(view)
+        self.cell = UnitCell(view)
 
     def add_sphere(
         self,
@@ -61,6 +63,13 @@ class ShapesManager:
     ):
         return self.links.add_links(*args, **kwargs)
 
+    def add_contact_network(
+        self,
+        *args,
+        **kwargs,
+    ):
+        return self.links.add_contact_network(*args, **kwargs)
+
     def add_displacement_vectors(
         self,
         *args,
@@ -82,6 +91,17 @@ class ShapesManager:
     ):
         return self.tetrahedra.add_tetrahedra(*args, **kwargs)
 
+    def add_unit_cell(
+        self,
+        *args,
+        **kwargs,
+    ):
+        return self.cell.add_unit_cell(*args, **kwargs)
+
+    def spatial_index(self, frame=None, **kwargs):
+        """Índice espacial del frame actual de la estructura (ver `StructureState.spatial_index`)."""
+        return self._view.spatial_index(frame, **kwargs)
+
 
 __all__ = [
     "ShapesManager",
@@ -91,4 +111,5 @@ __all__ = [
     "DisplacementVectors",
     "TriangleFaces",
     "Tetrahedra",
+    "UnitCell",
 ]
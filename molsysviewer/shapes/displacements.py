@@ -6,6 +6,8 @@ from typing import Iterable, Sequence
 
 import numpy as np
 
+from .._private.selections import selection_name
+
 
 class DisplacementVectors:
     def __init__(self, view) -> None:
@@ -36,6 +38,7 @@ class DisplacementVectors:
         vectors: Iterable[Sequence[float]] | np.ndarray,
         *,
         atom_indices: Iterable[int] | None = None,
+        selection: str | None = None,
         length_scale: float = 1.0,
         min_length: float = 0.0,
         max_length: float | None = None,
@@ -45,6 +48,7 @@ class DisplacementVectors:
         radius_scale: float = 0.05,
         radial_segments: int | None = None,
         tag: str | None = None,
+        bound: bool = False,
     ) -> None:
         """Añade flechas (cilindro + cono) para vectores de desplazamiento.
 
@@ -56,6 +60,9 @@ class DisplacementVectors:
             Vectores de desplazamiento (n, 3).
         atom_indices
             Índices atómicos para tomar las coordenadas actuales como origen.
+        selection
+            Nombre de una selección definida con ``view.define_selection``;
+            alternativa a ``atom_indices`` que sólo envía el nombre.
         length_scale
             Factor global de escala para la longitud de los vectores.
         min_length
@@ -74,16 +81,22 @@ class DisplacementVectors:
             Segmentos radiales opcionales del cilindro/cono.
         tag
             Etiqueta opcional para el nodo de estado en Mol*.
+        bound
+            Con ``atom_indices`` o ``selection``, el frontend recalcula los
+            orígenes con las coordenadas de cada frame de la trayectoria (los
+            vectores no cambian). Cargar otro sistema los quita.
         """
 
         vector_array = self._to_array(vectors, "vectors")
         origins_array = None if origins is None else self._to_array(origins, "origins")
 
-        if origins_array is None and atom_indices is None:
-            raise ValueError("Debes proporcionar origins o atom_indices")
+        if origins_array is None and atom_indices is None and selection is None:
+            raise ValueError("Debes proporcionar origins, atom_indices o selection")
 
         if origins_array is not None and origins_array.shape[0] != vector_array.shape[0]:
             raise ValueError("origins y vectors deben tener el mismo número de filas")
+        if bound and atom_indices is None and selection is None:
+            raise ValueError("bound=True necesita atom_indices o selection")
 
         options: dict = {
             "vectors": vector_array.tolist(),
@@ -98,6 +111,8 @@ class DisplacementVectors:
             options["origins"] = origins_array.tolist()
         if atom_indices is not None:
             options["atom_indices"] = [int(i) for i in atom_indices]
+        elif selection is not None:
+            options["selection"] = selection_name(self._view, selection)
         if max_length is not None:
             options["max_length"] = float(max_length)
         if color_map is not None:
@@ -106,5 +121,7 @@ class DisplacementVectors:
             options["radial_segments"] = int(radial_segments)
         if tag is not None:
             options["tag"] = tag
+        if bound:
+            options["bound"] = True
 
         self._view._send({"op": "add_displacement_vectors", "options": options})
@@ -2,8 +2,14 @@
 
 from __future__ import annotations
 
+import logging
 from typing import Iterable, Sequence
 
+from .._private.selections import as_atom_indices
+from .._private.spatial import aggregate_contacts, contact_pairs
+
+logger = logging.getLogger(__name__)
+
 
 class LinkShapes:
     def __init__(self, view) -> None:
@@ -63,6 +69,7 @@ class LinkShapes:
         alpha: float = 1.0,
         radial_segments: int | None = None,
         tag: str | None = None,
+        bound: bool = False,
     ) -> None:
         """Añade cilindros/barras conectando pares de puntos o de átomos.
 
@@ -85,6 +92,10 @@ class LinkShapes:
             Segmentos radiales del cilindro (>=3). Por defecto 16.
         tag
             Etiqueta opcional para el nodo de estado en Mol*.
+        bound
+            Con ``atom_pairs``, el frontend recalcula los extremos con las
+            coordenadas de cada frame de la trayectoria (sin reenviar nada).
+            Cargar otro sistema los quita.
         """
 
         coordinate_pairs_list = self._to_coord_pairs(coordinate_pairs)
@@ -92,6 +103,8 @@ class LinkShapes:
 
         if not coordinate_pairs_list and not atom_pairs_list:
             raise ValueError("Debes aportar coordinate_pairs o atom_pairs")
+        if bound and not atom_pairs_list:
+            raise ValueError("bound=True necesita atom_pairs")
 
         n_links = len(coordinate_pairs_list) if coordinate_pairs_list else len(atom_pairs_list)
 
@@ -122,5 +135,114 @@ class LinkShapes:
             options["radial_segments"] = int(radial_segments)
         if tag is not None:
             options["tag"] = tag
+        if bound:
+            options["bound"] = True
 
         self._view._send({"op": "add_network_links", "options": options})
+
+    def add_contact_network(
+        self,
+        selection_a="all",
+        selection_b=None,
+        cutoff: float = 4.0,
+        *,
+        syntax: str = "MolSysMT",
+        level: str = "atom",
+        frame: int | None = None,
+        radius: float = 0.1,
+        radius_range: Sequence[float] | None = None,
+        color: int = 0x4499ff,
+        color_map: Sequence[int] | str | None = None,
+        alpha: float = 1.0,
+        radial_segments: int | None = None,
+        tag: str | None = None,
+        bound: bool = False,
+    ) -> int:
+        """Añade un enlace por contacto entre dos selecciones.
+
+        Los contactos salen del índice espacial de la estructura (ver
+        `MolSysView.spatial_index`) y los pares y sus distancias viajan al
+        frontend como arrays binarios. Devuelve el número de enlaces enviados
+        (0 si no hay contactos; entonces no se envía nada).
+
+        Parameters
+        ----------
+        selection_a, selection_b
+            Átomos de cada lado (selección MolSysMT, selección con nombre o
+            índices). Sin `selection_b`, contactos dentro de `selection_a`.
+        cutoff
+            Distancia máxima en Å (la imagen más cercana si hay celda).
+        syntax
+            Sintaxis de las selecciones.
+        level
+            "atom" | "group" | "component" | "chain" | "molecule" | "entity".
+            Fuera de "atom", un enlace por par de grupos, moléculas... en
+            contacto, entre sus átomos más cercanos.
+        frame
+            Frame cuyas coordenadas se usan (ver `spatial_index`).
+        radius, radius_range
+            Radio fijo en Å, o radios para la distancia mínima y la máxima.
+        color, color_map
+            Color fijo, o paleta (colores o nombre de Mol*, p. ej. "turbo")
+            de la distancia mínima a `cutoff`.
+        alpha
+            Transparencia global (0-1).
+        radial_segments
+            Segmentos radiales del cilindro (>=3). Por defecto 16.
+        tag
+            Etiqueta opcional para el nodo de estado en Mol*.
+        bound
+            Los extremos siguen a los átomos al cambiar de frame; los
+            contactos, distancias y colores siguen siendo los de `frame`.
+            Cargar otro sistema los quita.
+        """
+        cutoff = float(cutoff)
+        if cutoff <= 0:
+            raise ValueError("cutoff debe ser una distancia positiva en Å")
+
+        view = self._view
+        index = view.spatial_index(frame)
+        atoms_a = as_atom_indices(view._select(selection_a, syntax=syntax))
+        atoms_b = atoms_a if selection_b is None else as_atom_indices(view._select(selection_b, syntax=syntax))
+        pairs, distances = contact_pairs(index, atoms_a, atoms_b, cutoff)
+
+        counts = None
+        if level != "atom":
+            topology = view._topology_index()
+            if topology is None or level not in topology.atom_levels:
+                raise ValueError(f"No hay información de {level} para agrupar los contactos")
+            pairs, distances, counts = aggregate_contacts(pairs, distances, topology.atom_levels[level])
+
+        n_links = int(pairs.shape[0])
+        if n_links == 0:
+            logger.warning("add_contact_network: sin contactos a menos de %.2f Å; no se envía nada.", cutoff)
+            return 0
+
+        options: dict = {
+            "mode": "atom-indices",
+            "binary": True,
+            "count": n_links,
+            "level": level,
+            "distance_range": [float(distances.min()), cutoff],
+            "radii": float(radius),
+            "colors": int(color),
+            "alpha": float(alpha),
+            "color_mode": "distance" if color_map is not None else "link",
+        }
+        if radius_range is not None:
+            low, high = radius_range
+            options["radius_range"] = [float(low), float(high)]
+        if color_map is not None:
+            options["color_map"] = color_map if isinstance(color_map, str) else [int(c) for c in color_map]
+        if radial_segments is not None:
+            options["radial_segments"] = int(radial_segments)
+        if tag is not None:
+            options["tag"] = tag
+        if bound:
+            options["bound"] = True
+
+        buffers = [pairs.astype("<i4").tobytes(), distances.astype("<f4").tobytes()]
+        if counts is not None:
+            buffers.append(counts.astype("<i4").tobytes())
+        view._send({"op": "add_network_links", "options": options}, buffers=buffers)
+        return n_links
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from typing import Iterable, Sequence
 
+from .._private.selections import selection_name
+
 
 def _normalize_mouths(mouth_atom_indices: Sequence[int] | Sequence[Sequence[int]]):
     if not isinstance(mouth_atom_indices, Sequence) or isinstance(
@@ -36,7 +38,8 @@ class PocketSurfaces:
     def add_pocket_surface(
         self,
         *,
-        atom_indices: Sequence[int],
+        atom_indices: Sequence[int] | None = None,
+        selection: str | None = None,
         scalars: Sequence[float] | None = None,
         grid: dict | None = None,
         alpha: float | None = None,
@@ -44,14 +47,18 @@ class PocketSurfaces:
         mouth_atom_indices: Sequence[int] | Sequence[Sequence[int]] | None = None,
         clip_plane: dict | None = None,
     ) -> None:
-        """Envía al frontend la petición de una superficie tipo pocket/void."""
+        """Envía al frontend la petición de una superficie tipo pocket/void.
 
-        if not atom_indices:
-            raise ValueError("atom_indices is required and cannot be empty")
+        Los átomos se dan con `atom_indices` o con `selection`, el nombre de una
+        selección registrada con `view.define_selection` (sólo viaja el nombre).
+        """
 
-        options: dict = {
-            "atom_indices": [int(i) for i in atom_indices],
-        }
+        if selection is not None:
+            options: dict = {"selection": selection_name(self._view, selection)}
+        elif not atom_indices:
+            raise ValueError("atom_indices is required and cannot be empty")
+        else:
+            options = {"atom_indices": [int(i) for i in atom_indices]}
 
         if scalars is not None:
             options["scalars"] = [float(s) for s in scalars]
@@ -67,14 +67,21 @@ class Tetrahedra:
         show_all_faces: bool | None = None,
         tag: str | None = None,
         name: str | None = None,
+        bound: bool = False,
     ) -> None:
-        """Añade tetraedros como malla triangular, usando coordenadas o índices atómicos."""
+        """Añade tetraedros como malla triangular, usando coordenadas o índices atómicos.
+
+        Con ``bound=True`` (sólo con ``atom_quads``) el frontend recalcula los
+        vértices con las coordenadas de cada frame de la trayectoria.
+        """
 
         coords_list = self._normalize_vertices(tetra_coords)
         atom_quads_list = self._normalize_quads(atom_quads)
 
         if not coords_list and not atom_quads_list:
             raise ValueError("Debes proporcionar tetra_coords o atom_quads")
+        if bound and not atom_quads_list:
+            raise ValueError("bound=True necesita atom_quads")
 
         n = len(coords_list) if coords_list else len(atom_quads_list)
 
@@ -100,6 +107,8 @@ class Tetrahedra:
             options["labels"] = labels_list
         if tag is not None:
             options["tag"] = tag
+        if bound:
+            options["bound"] = True
 
         self._view._send({"op": "add_tetrahedra", "options": options})
 
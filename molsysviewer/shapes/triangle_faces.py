@@ -74,14 +74,21 @@ class TriangleFaces:
         alpha: float = 1.0,
         labels: Sequence[str] | str | None = None,
         tag: str | None = None,
+        bound: bool = False,
     ) -> None:
-        """Añade caras triangulares personalizadas usando coordenadas o índices atómicos."""
+        """Añade caras triangulares personalizadas usando coordenadas o índices atómicos.
+
+        Con ``bound=True`` (sólo con ``atom_triplets``) el frontend recalcula los
+        vértices con las coordenadas de cada frame de la trayectoria.
+        """
 
         vertices_list = self._normalize_vertices(vertices)
         atom_triplets_list = self._normalize_triplets(atom_triplets)
 
         if not vertices_list and not atom_triplets_list:
             raise ValueError("Debes proporcionar vertices o atom_triplets")
+        if bound and not atom_triplets_list:
+            raise ValueError("bound=True necesita atom_triplets")
 
         n = len(vertices_list) if vertices_list else len(atom_triplets_list)
 
@@ -100,5 +107,7 @@ class TriangleFaces:
             options["labels"] = labels_list
         if tag is not None:
             options["tag"] = tag
+        if bound:
+            options["bound"] = True
 
         self._view._send({"op": "add_triangle_faces", "options": options})
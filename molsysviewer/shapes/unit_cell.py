@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+
+class UnitCell:
+    def __init__(self, view) -> None:
+        self._view = view
+
+    def add_unit_cell(
+        self,
+        vectors: Sequence[Sequence[float]],
+        *,
+        origin: Sequence[float] = (0.0, 0.0, 0.0),
+        color: int = 0x808080,
+        tag: str | None = None,
+    ) -> None:
+        """Añade las 12 aristas de la celda como líneas (vectores a, b, c en Å)."""
+
+        rows = [list(v) for v in vectors]
+        if len(rows) != 3 or any(len(v) != 3 for v in rows):
+            raise ValueError("vectors debe ser una matriz 3x3 con los vectores a, b, c")
+        if len(origin) != 3:
+            raise ValueError(f"origin debe ser [x, y, z]; recibido {origin}")
+
+        options: dict = {
+            "vectors": [[float(x) for x in v] for v in rows],
+            "origin": [float(x) for x in origin],
+            "color": int(color),
+        }
+        if tag is not None:
+            options["tag"] = tag
+
+        self._view._send({"op": "add_unit_cell", "options": options})
@@ -0,0 +1,1092 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import TYPE_CHECKING, Any
+
+import molsysmt as msm
+import numpy as np
+from molsysmt import pyunitwizard as puw
+
+from ._private.background import LoadJob
+from ._private.compression import send_load_message
+from ._private.lazy import DeferredMolSys
+from ._private.memory import estimate_nbytes, hold_source, resolve_source, select_from_index
+from ._private.preview import PreviewState
+from ._private.properties import as_property_values, color_map_option, property_domain, property_row
+from ._private.selections import as_atom_indices
+from ._private.spatial import DEFAULT_CELL_SIZE, SpatialIndex
+from ._private.topology import TopologyIndex, fast_select
+from ._private.trajectory import ArrayFrameSource, FrameSource, MolSysMTFrameSource
+from ._private.variables import is_all
+from .loaders import load_from_molsysmt as _load_from_molsysmt
+from .loaders.load_molsysmt import (
+    _build_load_message,
+    _convert_to_molsys,
+    apply_prepared_load,
+    build_full_message,
+    prepare_load_from_molsysmt,
+    show_unit_cell,
+)
+from .loaders.load_ensemble import conformer_indices, load_ensemble as _load_ensemble
+from .shapes import ShapesManager
+from .trajectory import TrajectoryPlayer
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .viewer import MolSysView
+
+logger = logging.getLogger(__name__)
+
+
+class StructureState:
+    """Estado de una estructura cargada: MolSys, máscara de átomos y selecciones.
+
+    Lo comparten `MolSysView` (la estructura por defecto) y `StructureHandle`
+    (estructuras cargadas con ``view.load(..., key=...)``). Las subclases
+    proporcionan `_send`, `visibility_mode`, `subset_threshold` y
+    `memory_policy`.
+    """
+
+    def _init_structure_state(self) -> None:
+        # Conversión a MolSys pendiente (ver _private/lazy.py)
+        self._pending_molsys: DeferredMolSys | None = None
+        self._molsys_value = None
+        self._atom_mask_value = None
+
+        # Índice de topología del MolSys actual, construido en la primera selección
+        self._topology: tuple[Any, TopologyIndex | None] | None = None
+
+        # Índice que sustituye al MolSys liberado por la política de memoria (molsys="topology")
+        self._released_topology: TopologyIndex | None = None
+
+        # Vista previa de grano grueso pendiente de detalle (ver refine)
+        self._preview: PreviewState | None = None
+
+        # (origen de las coordenadas, frame, índice espacial) de la última consulta (ver spatial_index)
+        self._spatial: tuple[Any, int, SpatialIndex] | None = None
+
+        self.molecular_system = None
+        self.selection = None
+        self.structure_indices = None
+        self._molsys = None
+        self.atom_mask = None
+        self.structure_mask = None
+
+        # Selecciones con nombre ya enviadas al frontend (ver define_selection)
+        self.selections: dict[str, np.ndarray] = {}
+
+        # (MolSys, nº de confórmeros) del último load_ensemble y confórmeros visibles (None = todos)
+        self._ensemble: tuple[Any, int] | None = None
+        self.visible_conformers: list[int] | None = None
+
+        # Reproductor de la última trayectoria cargada con load_trajectory
+        self.trajectory: TrajectoryPlayer | None = None
+
+        # Propiedades por átomo enviadas al frontend (ver set_atom_property)
+        self.atom_properties: dict[str, np.ndarray] = {}
+
+        # Átomo de origen de las imágenes periódicas cargadas tras los átomos reales (ver _private/pbc.py)
+        self._image_sources: np.ndarray | None = None
+
+        # Última carga en segundo plano (ver _private/background.py)
+        self._load_job: LoadJob | None = None
+        self._load_lock = threading.RLock()
+
+    def _reset_structure_state(self) -> None:
+        self._cancel_load_job()
+        self._preview = None
+        self.molecular_system = None
+        self.selection = None
+        self.structure_indices = None
+        self._molsys = None
+        self.atom_mask = None
+        self.structure_mask = None
+        self.selections.clear()
+        self._topology = None
+        self._ensemble = None
+        self.visible_conformers = None
+        self.atom_properties.clear()
+        self._replace_structure()
+
+    def _replace_structure(self) -> None:
+        """Soltar lo que dependía del sistema anterior; lo llaman las cargas que lo sustituyen."""
+        # El reproductor seguiría enviando frames (y coordenadas a spatial_index) del sistema anterior.
+        if self.trajectory is not None:
+            self.trajectory.properties.clear()
+            self.trajectory.close()
+            self.trajectory = None
+        self._spatial = None
+        self._image_sources = None
+        # Las propiedades por átomo tienen los valores (y el número de átomos) del sistema anterior.
+        for name in list(self.atom_properties):
+            del self.atom_properties[name]
+            self._send({"op": "remove_atom_property", "name": name})
+        # Los índices de las selecciones con nombre eran del sistema anterior.
+        if self.selections:
+            self.selections.clear()
+            self._send({"op": "clear_selections"})
+
+    # --- Política de memoria ---
+
+    @property
+    def molecular_system(self):
+        """Source object of the last load (None if released by the memory policy)."""
+        return resolve_source(self._source)
+
+    @molecular_system.setter
+    def molecular_system(self, value) -> None:
+        self._source = hold_source(value, self.memory_policy.source)
+
+    def _apply_memory_policy(self) -> None:
+        """Soltar lo que la política de memoria no guarda (tras cargar o al cambiarla)."""
+        policy = self.memory_policy
+        self.molecular_system = self.molecular_system
+        if policy.molsys != "topology":
+            return
+        # Los ensembles necesitan el MolSys para show_conformers y las vistas previas para refine;
+        # las conversiones pendientes aún no lo tienen.
+        if (
+            self._pending_molsys is not None
+            or self._molsys_value is None
+            or self._ensemble is not None
+            or self._preview is not None
+        ):
+            return
+        index = self._topology_index()
+        if index is None:
+            logger.debug("Memory policy: no topology index, keeping the MolSys")
+            return
+        self._released_topology = index
+        self._topology = None
+        self._spatial = None
+        self._molsys_value = None
+
+    @property
+    def _selectable(self) -> bool:
+        """Si hay con qué resolver selecciones (el MolSys o el índice que lo sustituye)."""
+        return self._molsys is not None or self._released_topology is not None
+
+    def memory_report(self) -> dict[str, int]:
+        """Approximate bytes held in the kernel by this structure.
+
+        Returns
+        -------
+        dict
+            Bytes per item: ``molsys`` (converted MolSys), ``molecular_system``
+            (source object, not counting what it shares with the MolSys),
+            ``topology_index``, ``spatial_index``, ``atom_mask``,
+            ``selections``, ``atom_properties`` and ``ensemble``, plus their
+            ``total``.
+        """
+        report = self._memory_items(set())
+        report["total"] = sum(report.values())
+        return report
+
+    def _memory_items(self, seen: set[int]) -> dict[str, int]:
+        topology = self._released_topology
+        if topology is None and self._topology is not None:
+            topology = self._topology[1]
+        return {
+            "molsys": estimate_nbytes(self._molsys_value, seen),
+            "molecular_system": estimate_nbytes(self.molecular_system, seen),
+            "topology_index": estimate_nbytes(topology, seen),
+            "spatial_index": estimate_nbytes(self._spatial[2] if self._spatial is not None else None, seen),
+            "atom_mask": estimate_nbytes(self._atom_mask_value, seen),
+            "selections": estimate_nbytes(self.selections, seen),
+            "atom_properties": estimate_nbytes(self.atom_properties, seen),
+            "ensemble": estimate_nbytes(self._ensemble, seen),
+        }
+
+    # --- MolSys diferido ---
+
+    @property
+    def _molsys(self):
+        self._resolve_pending_molsys()
+        return self._molsys_value
+
+    @_molsys.setter
+    def _molsys(self, value) -> None:
+        # Asignar un MolSys explícito descarta cualquier conversión pendiente, el índice liberado
+        # y la vista previa de otro sistema.
+        self._pending_molsys = None
+        self._molsys_value = value
+        self._released_topology = None
+        if self._preview is not None and self._preview.molsys is not value:
+            self._preview = None
+
+    @property
+    def atom_mask(self):
+        self._resolve_pending_molsys()
+        return self._atom_mask_value
+
+    @atom_mask.setter
+    def atom_mask(self, value) -> None:
+        self._resolve_pending_molsys()
+        self._atom_mask_value = value
+
+    @property
+    def molsys_ready(self) -> bool:
+        """Whether the MolSys used for selections is available without waiting."""
+        pending = self._pending_molsys
+        return pending is None or pending.done
+
+    def _defer_molsys(self, deferred: DeferredMolSys) -> None:
+        self._pending_molsys = deferred
+        self._molsys_value = None
+        self._atom_mask_value = None
+        self._released_topology = None
+
+    def _resolve_pending_molsys(self) -> None:
+        pending = self._pending_molsys
+        if pending is None:
+            return
+        try:
+            molsys, atom_mask = pending.result()
+        except BaseException:
+            # La conversión falló: sin MolSys (las selecciones no harán nada), pero se informa una vez.
+            if self._pending_molsys is pending:
+                self._pending_molsys = None
+            raise
+        # Un load posterior puede haber reemplazado la conversión mientras esperábamos.
+        if self._pending_molsys is pending:
+            self._pending_molsys = None
+            self._molsys_value = molsys
+            self._atom_mask_value = atom_mask
+
+    @property
+    def visible_atom_indices(self):
+        """Return the indices of currently visible atoms."""
+        if self.atom_mask is None:
+            return None
+        # lista para que sea JSON-serializable sin problemas
+        return np.nonzero(self.atom_mask)[0].tolist()
+
+    @property
+    def visible_structure_indices(self):
+        """Return the indices of currently visible structures."""
+        if self.structure_mask is None:
+            return None
+        # lista para que sea JSON-serializable sin problemas
+        return np.nonzero(self.structure_mask)[0].tolist()
+
+    # --- Cargas en segundo plano ---
+
+    def load_async(
+        self,
+        molecular_system: Any,
+        selection="all",
+        structure_indices="all",
+        syntax="MolSysMT",
+        label: str | None = None,
+        **kwargs,
+    ) -> LoadJob:
+        """Load a molecular system in a worker thread without blocking the kernel.
+
+        Takes the same arguments as `load` and is equivalent to
+        ``load(..., background=True)``. The conversion with MolSysMT and the
+        serialization run in a thread pool; the structure is replaced and
+        sent to the frontend when they finish. Starting another load of the
+        same structure cancels this one.
+
+        Returns
+        -------
+        LoadJob
+            Awaitable handle (``await view.load_async(...)``) with
+            ``result``, ``done`` and ``cancel``.
+        """
+        return self.load(
+            molecular_system,
+            selection=selection,
+            structure_indices=structure_indices,
+            syntax=syntax,
+            label=label,
+            background=True,
+            **kwargs,
+        )
+
+    def _start_load_job(self, options: dict[str, Any], result: Any = None) -> LoadJob:
+        """Lanzar `load_from_molsysmt(self, **options)` en el pool; cancela la carga anterior."""
+
+        def prepare(check):
+            return prepare_load_from_molsysmt(self, check=check, **options)
+
+        def apply(prepared):
+            apply_prepared_load(self, prepared)
+            return result
+
+        return self._start_job(prepare, apply)
+
+    def _start_job(self, prepare, apply) -> LoadJob:
+        with self._load_lock:
+            self._cancel_load_job()
+            self._load_job = LoadJob(prepare, apply, self._load_lock)
+            return self._load_job
+
+    def _cancel_load_job(self) -> None:
+        with self._load_lock:
+            job, self._load_job = self._load_job, None
+            if job is not None:
+                job.cancel()
+
+    # --- Vista previa de grano grueso ---
+
+    @property
+    def previewing(self) -> bool:
+        """Whether the structure is shown as a coarse-grained preview (see `refine`)."""
+        return self._preview is not None
+
+    def refine(self, selection=None, syntax: str = "MolSysMT", *, background: bool = False) -> LoadJob | None:
+        """Send the atomic detail of a structure shown as a coarse-grained preview.
+
+        Parameters
+        ----------
+        selection : str or sequence of int, optional
+            Without a selection the whole system replaces the preview. With
+            one, only its atoms are sent and drawn over the beads; a later
+            call replaces that region.
+        syntax : str, default 'MolSysMT'
+            Syntax for the selection language.
+        background : bool, default False
+            Serialize the whole system in a worker thread (only without
+            `selection`); a new load cancels it.
+
+        Returns
+        -------
+        LoadJob or None
+            The job of a background refinement.
+        """
+        preview = self._preview
+        if preview is None:
+            return None
+
+        if selection is not None and not is_all(selection):
+            atom_indices = as_atom_indices(self._select(selection, syntax=syntax))
+            detail = _convert_to_molsys(preview.molsys, selection=atom_indices)
+            label = f"{preview.label or 'structure'} (detail)"
+            preview.detail_key = self._detail_key()
+            msg = _build_load_message(detail, label=label)
+            msg["structure"] = preview.detail_key
+            self._root_send(msg)
+            return None
+
+        def prepare(check):
+            return build_full_message(
+                preview.molsys, label=preview.label, pbc=preview.pbc, images_cutoff=preview.images_cutoff, check=check
+            )
+
+        def apply(prepared):
+            self._apply_refinement(preview, *prepared)
+
+        if background:
+            return self._start_job(prepare, apply)
+        apply(prepare(None))
+        return None
+
+    def _apply_refinement(
+        self,
+        preview: PreviewState,
+        msg: dict[str, Any],
+        pbc_report: dict[str, Any] | None,
+        image_sources: np.ndarray | None,
+    ) -> None:
+        if self._preview is not preview:
+            return  # otra carga sustituyó a la vista previa
+        self._replace_preview(None)
+        if pbc_report is not None:
+            self.stats["pbc"] = pbc_report
+        self._image_sources = image_sources
+        send_load_message(self, msg)
+        if preview.show_cell:
+            show_unit_cell(self, msg)
+        if self.atom_mask is not None and not self.atom_mask.all():
+            self._update_visibility_in_frontend()
+        self._apply_memory_policy()
+
+    def _replace_preview(self, preview: PreviewState | None) -> None:
+        """Cambiar la vista previa; quita del frontend la región de detalle de la anterior."""
+        previous = self._preview
+        if previous is not None and previous.detail_key is not None:
+            self._root_send({"op": "remove_structure", "structure": previous.detail_key})
+        self._preview = preview
+
+    def _detail_key(self) -> str:
+        return f"{getattr(self, 'key', '')}#detail"
+
+    def _root_send(self, msg: dict) -> None:
+        """Enviar sin la clave de esta estructura (mensajes con su propia ``structure``)."""
+        getattr(self, "_view", self)._send(msg)
+
+    # --- util interno ---
+
+    def _update_visibility_in_frontend(self, selection_name: str | None = None):
+        if self.atom_mask is None:
+            return
+        options: dict[str, Any] = {
+            "mode": self.visibility_mode,
+            "subset_threshold": self.subset_threshold,
+        }
+        if self._preview is not None:
+            # La vista previa sólo tiene las cuentas: visibles las que tienen algún átomo visible.
+            options["visible_atom_indices"] = np.flatnonzero(self._preview.bead_mask(self.atom_mask)).tolist()
+        elif selection_name is not None and self._image_sources is None:
+            # Si lo visible es exactamente una selección con nombre basta con enviar el nombre.
+            options["selection"] = selection_name
+        else:
+            visible = np.flatnonzero(self.atom_mask)
+            sources = self._image_sources
+            if sources is not None:
+                # Las imágenes periódicas van tras los átomos reales y siguen la visibilidad de su origen.
+                visible = np.concatenate([visible, self.atom_mask.size + np.flatnonzero(self.atom_mask[sources])])
+            options["visible_atom_indices"] = visible.tolist()
+        self._send({"op": "update_visibility", "options": options})
+
+    def _select(self, selection, syntax="MolSysMT"):
+        """Índices atómicos de `selection`: una selección con nombre, índices o sintaxis MolSysMT."""
+        if isinstance(selection, str) and selection in self.selections:
+            return self.selections[selection]
+        molsys = self._molsys
+        if molsys is None and self._released_topology is not None:
+            return select_from_index(self._released_topology, selection, syntax=syntax)
+        return fast_select(self._topology_index(), molsys, selection, syntax=syntax)
+
+    def _topology_index(self) -> TopologyIndex | None:
+        """Índice de topología del MolSys actual (se reconstruye si el MolSys cambia)."""
+        molsys = self._molsys
+        if molsys is None:
+            return self._released_topology
+        cached = self._topology
+        if cached is None or cached[0] is not molsys:
+            try:
+                index = TopologyIndex.from_molsys(molsys)
+            except Exception:  # pragma: no cover - sin índice se usa siempre msm.select
+                logger.debug("Topology index could not be built", exc_info=True)
+                index = None
+            self._topology = (molsys, index)
+            return index
+        return cached[1]
+
+    # --- Índice espacial ---
+
+    def spatial_index(self, frame: int | None = None, *, cell_size: float | None = None) -> SpatialIndex:
+        """Cell list over the coordinates of one frame, for neighborhood queries.
+
+        The index is built once and kept: asking again for another frame of
+        the same system only updates the atom positions (atoms that changed
+        cell are re-sorted), and asking for the same frame reuses it.
+
+        Parameters
+        ----------
+        frame : int, optional
+            Structure index of the loaded system; by default the frame shown
+            by the trajectory player (see `load_trajectory`) or 0.
+        cell_size : float, optional
+            Minimum cell side in Å; changing it rebuilds the index.
+
+        Returns
+        -------
+        SpatialIndex
+            Index with ``within``, ``pairs_within`` and ``nearest`` queries
+            (distances in Å). It is periodic when the system has a unit cell.
+        """
+        owner, frame = self._coordinates_owner(frame)
+        cached = self._spatial
+        if cached is not None and cached[0] is owner and (cell_size is None or cell_size == cached[2].cell_size):
+            index = cached[2]
+            if cached[1] == frame:
+                return index
+            index.update(*self._frame_coordinates(owner, frame))
+        else:
+            positions, box = self._frame_coordinates(owner, frame)
+            index = SpatialIndex(positions, box, cell_size=DEFAULT_CELL_SIZE if cell_size is None else cell_size)
+        self._spatial = (owner, frame, index)
+        return index
+
+    def select_within(
+        self,
+        distance: float,
+        of,
+        selection="all",
+        syntax: str = "MolSysMT",
+        *,
+        level: str = "atom",
+        frame: int | None = None,
+    ) -> np.ndarray:
+        """Atoms of `selection` closer than `distance` to `of`, using the spatial index.
+
+        Parameters
+        ----------
+        distance : float
+            Cutoff in Å.
+        of : str, sequence of int or array of shape (n, 3)
+            Reference atoms (MolSysMT selection, named selection or atom
+            indices) or points in Å, e.g. the centers of a pocket.
+        selection : str or sequence of int, default 'all'
+            Candidate atoms.
+        syntax : str, default 'MolSysMT'
+            Syntax of the selections.
+        level : {"atom", "group", "component", "chain", "molecule", "entity"}, default "atom"
+            Return whole groups, molecules, ... with at least one atom
+            within `distance`.
+        frame : int, optional
+            Frame whose coordinates are used (see `spatial_index`).
+
+        Returns
+        -------
+        numpy.ndarray
+            Sorted atom indices, usable with `hide`, `isolate` or
+            `define_selection`. With periodic boundary conditions the
+            distance is the one to the closest image.
+        """
+        distance = float(distance)
+        if distance < 0:
+            raise ValueError("distance must be a non-negative distance in Å.")
+        index = self.spatial_index(frame)
+        reference = None if isinstance(of, str) else np.asarray(of)
+        if reference is not None and reference.ndim == 2 and reference.shape[1] == 3:
+            points = reference.astype(float)
+        else:
+            points = index.positions[as_atom_indices(self._select(of, syntax=syntax))]
+        atom_indices = index.within(points, distance)
+
+        if level != "atom":
+            topology = self._topology_index()
+            if topology is None or level not in topology.atom_levels:
+                raise ValueError(f"No {level} information available to expand the selection.")
+            ids = np.unique(topology.atom_levels[level][atom_indices])
+            atom_indices = topology.atoms_of(level, ids)
+        if not is_all(selection):
+            candidates = as_atom_indices(self._select(selection, syntax=syntax))
+            atom_indices = np.intersect1d(atom_indices, candidates)
+        return atom_indices
+
+    def _coordinates_owner(self, frame: int | None) -> tuple[Any, int]:
+        """De dónde salen las coordenadas de `spatial_index` (reproductor o MolSys) y qué frame."""
+        player = self.trajectory
+        if player is not None:
+            return player, player.frame_index if frame is None else int(frame)
+        molsys = self._molsys
+        if molsys is None:
+            if self._released_topology is not None:
+                raise ValueError(
+                    "The coordinates were released by the memory policy (molsys='topology'); "
+                    "set_memory_policy(molsys='keep') before loading to use spatial queries."
+                )
+            raise ValueError("No molecular system loaded; cannot build a spatial index.")
+        return molsys, 0 if frame is None else int(frame)
+
+    def _frame_coordinates(self, owner: Any, frame: int) -> tuple[np.ndarray, np.ndarray | None]:
+        """Posiciones (Å) y caja (Å, o None) del frame `frame` de `owner`."""
+        if isinstance(owner, TrajectoryPlayer):
+            positions, box = owner.ring.frame_and_box(frame)
+            return np.asarray(positions, dtype=float), box
+        molsys = owner
+        coordinates = msm.get(molsys, element="atom", structure_indices=[frame], coordinates=True)
+        positions = np.asarray(puw.get_value(coordinates, to_unit="angstroms"), dtype=float).reshape(-1, 3)
+        box = None
+        try:
+            value = msm.get(molsys, element="system", structure_indices=[frame], box=True)
+        except Exception:  # pragma: no cover - depende de la forma y versión de MolSysMT
+            logger.debug("Spatial index: msm.get(box) failed", exc_info=True)
+            value = None
+        if value is not None:
+            box = np.asarray(puw.get_value(value, to_unit="angstroms"), dtype=float).reshape(3, 3)
+        return positions, box
+
+    def _show_atoms(self, selection='all', structure_indices='all', syntax="MolSysMT") -> None:
+        """Parte de visibilidad de `show`: 'all' reinicia, otra selección se añade a lo visible."""
+        if not self._selectable or self.atom_mask is None:
+            return
+        if is_all(selection) and is_all(structure_indices):
+            # Reset visibility: show all atoms
+            self.atom_mask[:] = True
+        else:
+            # Partial "show": turn on only the requested selection
+            atom_indices = self._select(selection, syntax=syntax)
+            self.atom_mask[atom_indices] = True
+        self._update_visibility_in_frontend()
+
+    # --- Ensembles de confórmeros ---
+
+    @property
+    def n_conformers(self) -> int | None:
+        """Number of conformers of the loaded ensemble, or None if the last load was not an ensemble."""
+        ensemble = self._ensemble
+        # Cualquier load posterior reemplaza el MolSys (o deja una conversión pendiente).
+        if ensemble is None or self._pending_molsys is not None or ensemble[0] is not self._molsys_value:
+            return None
+        return ensemble[1]
+
+    def load_ensemble(
+        self,
+        molecular_system: Any,
+        selection="all",
+        structure_indices="all",
+        syntax="MolSysMT",
+        label: str | None = None,
+        *,
+        superpose=False,
+        conformers="all",
+    ) -> int:
+        """Load an ensemble of conformers sharing one topology.
+
+        Every structure of `molecular_system` (NMR models, docking poses of
+        one ligand, cluster representatives, ...) is a conformer. The
+        topology is sent once and the coordinates travel as a single
+        ``(n_conformers, n_atoms, 3)`` float32 block; the frontend builds one
+        model per conformer and overlays the visible ones. Changing the
+        visible conformers with `show_conformers` sends only their indices.
+
+        Parameters
+        ----------
+        molecular_system : Any
+            Any form MolSysMT can convert to ``molsysmt.MolSys``.
+        selection, structure_indices, syntax
+            Passed to ``msm.convert`` to choose the atoms and conformers.
+        label : str, optional
+            Label of the ensemble in the Mol* state tree.
+        superpose : bool, str or sequence of int, default False
+            Superpose every conformer on the first one before sending. True
+            fits on all atoms; a selection (MolSysMT string or atom indices)
+            fits on those atoms only.
+        conformers : 'all' or sequence of int, default 'all'
+            Conformers visible after loading.
+
+        Returns
+        -------
+        int
+            Number of conformers.
+
+        Notes
+        -----
+        Visibility operations (`hide`, `isolate`, ...) apply to every
+        conformer.
+        """
+        self._cancel_load_job()
+        return _load_ensemble(
+            self,
+            molecular_system=molecular_system,
+            selection=selection,
+            structure_indices=structure_indices,
+            syntax=syntax,
+            label=label,
+            superpose=superpose,
+            conformers=conformers,
+        )
+
+    def show_conformers(self, conformers="all") -> None:
+        """Choose which conformers of the loaded ensemble are displayed.
+
+        Nothing is retransmitted: the frontend already has every conformer
+        and only toggles their visibility.
+
+        Parameters
+        ----------
+        conformers : 'all' or sequence of int, default 'all'
+            Indices of the conformers to overlay.
+        """
+        n_conformers = self.n_conformers
+        if n_conformers is None:
+            raise ValueError("No ensemble loaded; use load_ensemble() first.")
+        self.visible_conformers = conformer_indices(conformers, n_conformers)
+        self._send({"op": "show_conformers", "conformers": self.visible_conformers})
+
+    # --- Trayectorias leídas por bloques ---
+
+    def load_trajectory(
+        self,
+        trajectory: Any,
+        topology: Any = None,
+        selection="all",
+        syntax="MolSysMT",
+        label: str | None = None,
+        *,
+        chunk_size: int = 32,
+        buffer_frames: int = 256,
+    ) -> TrajectoryPlayer:
+        """Load a trajectory for playback without reading it into memory.
+
+        Only the first frame is loaded as a structure. During playback the
+        frames are read in chunks of `chunk_size` (through MolSysMT for
+        DCD/XTC/HDF5/... files, or from a ``np.memmap``) by a background
+        thread that keeps up to `buffer_frames` upcoming frames ready; each
+        displayed frame travels as a float32 buffer that only updates the
+        coordinates in the frontend.
+
+        Parameters
+        ----------
+        trajectory : Any
+            Trajectory file or form readable by MolSysMT, a ``.npy`` file, or
+            an array (``np.ndarray``/``np.memmap``) of shape
+            ``(n_frames, n_atoms, 3)`` in Å.
+        topology : Any, optional
+            Topology for trajectory files without one (e.g. a PDB or PSF for
+            a DCD); required for arrays.
+        selection : str or sequence of int, default 'all'
+            Atoms to display (MolSysMT trajectories only).
+        syntax : str, default 'MolSysMT'
+            Syntax for the selection language.
+        label : str, optional
+            Label of the structure in the Mol* state tree.
+        chunk_size : int, default 32
+            Frames read per access to the file.
+        buffer_frames : int, default 256
+            Frames kept in the prefetch buffer.
+
+        Returns
+        -------
+        TrajectoryPlayer
+            Player with ``seek``, ``play`` and ``pause``; also stored in
+            ``self.trajectory``.
+        """
+        if self.trajectory is not None:
+            self.trajectory.close()
+            self.trajectory = None
+
+        source: FrameSource
+        if isinstance(trajectory, np.ndarray) or (isinstance(trajectory, str) and trajectory.endswith(".npy")):
+            if topology is None:
+                raise ValueError("A topology is required to play a coordinate array.")
+            if not is_all(selection):
+                raise ValueError("selection is only supported for trajectories read through MolSysMT.")
+            source = ArrayFrameSource(trajectory)
+            molecular_system = topology
+        else:
+            molecular_system = trajectory if topology is None else [topology, trajectory]
+            source = MolSysMTFrameSource(molecular_system, selection=selection, syntax=syntax)
+
+        _load_from_molsysmt(
+            self,
+            molecular_system=molecular_system,
+            selection=selection,
+            structure_indices=[0],
+            syntax=syntax,
+            label=label,
+        )
+        if self.atom_mask is not None and self.atom_mask.size != source.n_atoms:
+            source.close()
+            raise ValueError(
+                f"The trajectory has {source.n_atoms} atoms but the loaded structure has {self.atom_mask.size}."
+            )
+
+        self.trajectory = TrajectoryPlayer(self, source, chunk_size=chunk_size, buffer_frames=buffer_frames)
+        return self.trajectory
+
+    # --- Propiedades por átomo ---
+
+    def set_atom_property(
+        self,
+        name: str,
+        values,
+        *,
+        color: bool = True,
+        size: bool = False,
+        domain: tuple[float, float] | None = None,
+        color_map=None,
+        size_range: tuple[float, float] = (0.5, 2.0),
+    ) -> None:
+        """Attach per-atom scalar data and color or size the structure by it.
+
+        The values (RMSF, contact frequency, electrostatic potential,
+        per-frame energies, ...) travel once as a float32 binary buffer into
+        a named channel of the frontend, read by custom Mol* color and size
+        themes. Setting a name again replaces its values; loading a new
+        system into the structure removes every property.
+
+        Parameters
+        ----------
+        name : str
+            Name of the property channel.
+        values : array_like
+            One value per atom, shape ``(n_atoms,)``, or one per atom and
+            frame, shape ``(n_frames, n_atoms)``. Non-finite values get the
+            default color and size.
+        color : bool, default True
+            Color the representations of the structure by this property.
+        size : bool, default False
+            Scale the atom size by this property.
+        domain : tuple of float, optional
+            Values mapped to the ends of the color map and of `size_range`;
+            defaults to the finite minimum and maximum of `values`.
+        color_map : str or sequence of int, optional
+            Mol* color list name or hex colors (e.g. ``[0x0000ff, 0xff0000]``);
+            defaults to "turbo".
+        size_range : tuple of float, default (0.5, 2.0)
+            Size factors for the ends of `domain`.
+
+        Notes
+        -----
+        With a per-frame property and a trajectory loaded with
+        `load_trajectory`, only the row of the displayed frame is sent, and
+        each frame sent by the player carries its own row. Otherwise the whole
+        block is sent once and the frontend picks the row of the displayed
+        model.
+        """
+        if not isinstance(name, str) or not name:
+            raise ValueError("name must be a non-empty string.")
+        n_atoms = self.atom_mask.size if self.atom_mask is not None else None
+        values = as_property_values(values, n_atoms)
+        domain = property_domain(values) if domain is None else [float(domain[0]), float(domain[1])]
+
+        player = self.trajectory
+        streamed = values.ndim == 2 and player is not None
+        if streamed and values.shape[0] != player.n_frames:
+            raise ValueError(f"Got values for {values.shape[0]} frames but the trajectory has {player.n_frames}.")
+        if player is not None:
+            player.properties.pop(name, None)
+            if streamed:
+                player.properties[name] = values
+
+        self.atom_properties[name] = values
+        msg: dict[str, Any] = {
+            "op": "set_atom_property",
+            "name": name,
+            "n_atoms": int(values.shape[-1]),
+            "n_frames": int(values.shape[0]) if values.ndim == 2 else 1,
+            "streamed": streamed,
+            "color": {"domain": domain, "color_map": color_map_option(color_map)} if color else None,
+            "size": {"domain": domain, "range": [float(size_range[0]), float(size_range[1])]} if size else None,
+        }
+        block = property_row(values, player.frame_index if streamed else None)
+        self._send(msg, buffers=[block.tobytes()])
+
+    def remove_atom_property(self, name: str) -> None:
+        """Forget a property channel; representations colored or sized by it go back to the default themes."""
+        if self.atom_properties.pop(name, None) is None:
+            return
+        if self.trajectory is not None:
+            self.trajectory.properties.pop(name, None)
+        self._send({"op": "remove_atom_property", "name": name})
+
+    # --- Selecciones con nombre ---
+
+    def define_selection(self, name: str, selection, syntax: str = "MolSysMT") -> np.ndarray:
+        """Register a named selection that later operations can refer to by name.
+
+        The selection is resolved once in Python and its atom indices are sent
+        once to the frontend as a binary buffer. Shape and visibility
+        operations accepting ``selection=name`` then send only the name.
+        Redefining a name replaces only that entry; loading a new system
+        into the structure forgets all of them.
+
+        Parameters
+        ----------
+        name : str
+            Name of the selection.
+        selection : str or sequence of int
+            MolSysMT selection (resolved against the loaded system) or atom
+            indices.
+        syntax : str, default 'MolSysMT'
+            Syntax for the selection language.
+
+        Returns
+        -------
+        numpy.ndarray
+            Sorted atom indices of the selection.
+        """
+        if not isinstance(name, str) or not name:
+            raise ValueError("name must be a non-empty string.")
+        if isinstance(selection, str):
+            if selection not in self.selections and not self._selectable:
+                raise ValueError("No molecular system loaded; cannot resolve a selection string.")
+            atom_indices = self._select(selection, syntax=syntax)
+        else:
+            atom_indices = selection
+        atom_indices = as_atom_indices(atom_indices)
+
+        self.selections[name] = atom_indices
+        self._send(
+            {"op": "define_selection", "name": name, "count": int(atom_indices.size)},
+            buffers=[atom_indices.tobytes()],
+        )
+        return atom_indices
+
+    def remove_selection(self, name: str) -> None:
+        """Forget a named selection, both in Python and in the frontend."""
+        if self.selections.pop(name, None) is None:
+            return
+        self._send({"op": "remove_selection", "name": name})
+
+    # --- Visibilidad ---
+
+    def hide(self, selection='all', structure_indices='all', syntax="MolSysMT"):
+        """Hide atoms matching the given MolSysMT selection.
+
+        Notes
+        -----
+        - `structure_indices` is currently ignored for visibility control.
+          It only matters at load time when deciding which structures/frames
+          are present in `self._molsys`.
+        """
+        if self.atom_mask is None or not self._selectable:
+            return
+
+        if is_all(selection):
+            # Hide everything
+            self.atom_mask[:] = False
+        else:
+            atom_indices = self._select(selection, syntax=syntax)
+            self.atom_mask[atom_indices] = False
+
+        self._update_visibility_in_frontend()
+
+    def isolate(self, selection='all', structure_indices='all', syntax="MolSysMT"):
+        """Show only the atoms in `selection`; hide everything else.
+
+        Notes
+        -----
+        - If `selection == 'all'` this is equivalent to a visibility reset.
+        """
+        if self.atom_mask is None or not self._selectable:
+            return
+
+        if is_all(selection):
+            # Isolating "all" → same as reset visibility
+            self.atom_mask[:] = True
+            self._update_visibility_in_frontend()
+            return
+
+        atom_indices = self._select(selection, syntax=syntax)
+        self.atom_mask[:] = False
+        self.atom_mask[atom_indices] = True
+        named = isinstance(selection, str) and selection in self.selections
+        self._update_visibility_in_frontend(selection_name=selection if named else None)
+
+
+class StructureHandle(StructureState):
+    """Una estructura más dentro de un MolSysView (``view.load(..., key=...)``).
+
+    Tiene su propio MolSys, máscara de visibilidad, selecciones con nombre y
+    shapes; todos sus mensajes llevan ``"structure": key`` y el frontend los
+    aplica sólo a su subárbol del estado de Mol*. Quitarla no recarga las demás.
+    """
+
+    def __init__(self, view: "MolSysView", key: str) -> None:
+        self._view = view
+        self.key = key
+        self._init_structure_state()
+        self.shapes = ShapesManager(self)
+
+    def __repr__(self) -> str:
+        return f"StructureHandle(key={self.key!r})"
+
+    # La configuración de transporte y visibilidad es la de la vista.
+
+    @property
+    def compression(self):
+        return self._view.compression
+
+    @property
+    def load_limits(self):
+        return self._view.load_limits
+
+    @property
+    def memory_policy(self):
+        return self._view.memory_policy
+
+    @property
+    def preview_options(self):
+        return self._view.preview_options
+
+    @property
+    def progressive_options(self):
+        return self._view.progressive_options
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return self._view.stats
+
+    @property
+    def visibility_mode(self) -> str:
+        return self._view.visibility_mode
+
+    @property
+    def subset_threshold(self) -> float:
+        return self._view.subset_threshold
+
+    @property
+    def removed(self) -> bool:
+        """Whether this structure has been removed from its view."""
+        return self._view.structures.get(self.key) is not self
+
+    def _send(self, msg: dict, buffers: list | None = None) -> None:
+        if self.removed:
+            raise RuntimeError(f"Structure {self.key!r} has been removed from the view.")
+        self._view._send({**msg, "structure": self.key}, buffers)
+
+    def load(
+        self,
+        molecular_system: Any,
+        selection="all",
+        structure_indices="all",
+        syntax="MolSysMT",
+        label: str | None = None,
+        *,
+        start=None,
+        stop=None,
+        stride: int | None = None,
+        max_frames: int | None = None,
+        max_payload_bytes: int | None = None,
+        on_exceed: str | None = None,
+        pbc: str | None = None,
+        images_cutoff: float | None = None,
+        show_cell: bool = False,
+        preview: bool | None = None,
+        progressive: bool | None = None,
+        background: bool = False,
+    ) -> "StructureHandle | LoadJob":
+        """Replace the molecular system of this structure; the others are untouched.
+
+        The frame window, load limits, PBC options, `preview`,
+        `progressive` and `background` work as in `MolSysView.load`; a
+        background load returns a `LoadJob` whose result is this handle.
+        """
+        options = dict(
+            molecular_system=molecular_system,
+            selection=selection,
+            structure_indices=structure_indices,
+            syntax=syntax,
+            label=label if label is not None else self.key,
+            start=start,
+            stop=stop,
+            stride=stride,
+            limits=self._view._load_limits_for(max_frames, max_payload_bytes, on_exceed),
+            pbc=pbc,
+            images_cutoff=images_cutoff,
+            show_cell=show_cell,
+            preview=preview,
+            progressive=progressive,
+        )
+        if background:
+            return self._start_load_job(options, result=self)
+        _load_from_molsysmt(self, **options)
+        return self
+
+    def load_ensemble(
+        self,
+        molecular_system: Any,
+        selection="all",
+        structure_indices="all",
+        syntax="MolSysMT",
+        label: str | None = None,
+        *,
+        superpose=False,
+        conformers="all",
+    ) -> int:
+        """Replace this structure by an ensemble of conformers (see `MolSysView.load_ensemble`)."""
+        return super().load_ensemble(
+            molecular_system,
+            selection=selection,
+            structure_indices=structure_indices,
+            syntax=syntax,
+            label=label if label is not None else self.key,
+            superpose=superpose,
+            conformers=conformers,
+        )
+
+    def show(self, selection='all', structure_indices='all', syntax="MolSysMT") -> None:
+        """Make atoms of this structure visible ('all' resets its visibility)."""
+        self._show_atoms(selection, structure_indices=structure_indices, syntax=syntax)
+
+    def remove(self) -> None:
+        """Remove this structure, its shapes and its selections from the view."""
+        self._view.remove_structure(self.key)
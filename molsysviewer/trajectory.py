@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+from ._private.properties import property_row
+from ._private.trajectory import FrameRing, FrameSource
+
+
+class TrajectoryPlayer:
+    """Reproductor de una trayectoria leída por bloques (ver ``MolSysView.load_trajectory``).
+
+    La estructura se carga una vez con el primer frame; después cada frame
+    viaja como un buffer float32 ``(n_atoms, 3)`` y el frontend sólo cambia
+    las coordenadas del modelo. Los frames salen de un `FrameRing` que los
+    precarga en segundo plano, de modo que archivos mayores que la RAM se
+    reproducen a ritmo constante. Las propiedades por átomo y frame de
+    `properties` (ver ``set_atom_property``) viajan con cada frame, una fila
+    por propiedad en buffers adicionales.
+    """
+
+    def __init__(self, view: Any, source: FrameSource, *, chunk_size: int = 32, buffer_frames: int = 256) -> None:
+        self._view = view
+        self.ring = FrameRing(source, chunk_size=chunk_size, capacity=buffer_frames)
+        self.frame_index = 0
+        self.properties: dict[str, Any] = {}
+
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._sent = 0
+        self._late = 0
+        self._fps: float | None = None
+        self._started: float | None = None
+
+    def __repr__(self) -> str:
+        return f"TrajectoryPlayer(n_frames={self.n_frames}, n_atoms={self.n_atoms}, frame={self.frame_index})"
+
+    @property
+    def n_frames(self) -> int:
+        return self.ring.source.n_frames
+
+    @property
+    def n_atoms(self) -> int:
+        return self.ring.source.n_atoms
+
+    @property
+    def playing(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def seek(self, index: int) -> None:
+        """Display frame `index` (negative values count from the end)."""
+        if index < 0:
+            index += self.n_frames
+        self._send_frame(index, step=None)
+
+    def play(self, fps: float = 10.0, *, start: int | None = None, stop: int | None = None, step: int = 1, loop: bool = False) -> None:
+        """Play frames ``start:stop:step`` at `fps` frames per second in a background thread.
+
+        Parameters
+        ----------
+        fps : float, default 10.0
+            Target frame rate.
+        start, stop : int, optional
+            First frame (default: current frame) and end of the range
+            (default: end of the trajectory), interpreted like a slice:
+            negative values count from the end and out-of-range values are
+            clipped.
+        step : int, default 1
+            Stride between displayed frames; negative values play backwards.
+        loop : bool, default False
+            Start over when the end of the range is reached.
+
+        Notes
+        -----
+        Cache hit rate, stall time and the achieved frame rate are stored in
+        ``view.stats["playback"]``.
+        """
+        if fps <= 0:
+            raise ValueError("fps must be positive.")
+        if step == 0:
+            raise ValueError("step must be non-zero.")
+        self.pause()
+        first = self.frame_index if start is None else start
+        # Como un slice: índices negativos desde el final y `stop` recortado a la trayectoria.
+        frames = range(self.n_frames)[slice(first, stop, step)]
+        if len(frames) == 0:
+            return
+
+        self._stop.clear()
+        self._fps = float(fps)
+        self._sent = 0
+        self._late = 0
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._run, args=(frames, 1.0 / fps, step, loop), name="molsysviewer-playback", daemon=True
+        )
+        self._thread.start()
+
+    def pause(self) -> None:
+        """Stop playback, keeping the current frame."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self._thread = None
+
+    def close(self) -> None:
+        """Stop playback and release the frame buffer and the reader."""
+        self.pause()
+        self.ring.close()
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        stats = dict(self.ring.stats)
+        stats["frame"] = self.frame_index
+        stats["frames_sent"] = self._sent
+        if self._fps is not None and self._started is not None and self._sent:
+            elapsed = time.perf_counter() - self._started
+            stats["fps_target"] = self._fps
+            stats["fps"] = self._sent / elapsed if elapsed > 0 else None
+            stats["late_frames"] = self._late
+        return stats
+
+    # --- interno ---
+
+    def _send_frame(self, index: int, *, step: int | None) -> None:
+        positions = self.ring.frame(index, step=step)
+        msg = {"op": "set_frame_coordinates", "frame": int(index), "n_frames": self.n_frames, "n_atoms": self.n_atoms}
+        buffers = [positions.tobytes()]
+        properties = dict(self.properties)
+        if properties:
+            msg["properties"] = list(properties)
+            buffers.extend(property_row(values, index).tobytes() for values in properties.values())
+        self._view._send(msg, buffers=buffers)
+        self.frame_index = index
+
+    def _run(self, frames: range, period: float, step: int, loop: bool) -> None:
+        deadline = time.perf_counter()
+        while not self._stop.is_set():
+            for index in frames:
+                if self._stop.is_set():
+                    break
+                self._send_frame(index, step=step)
+                self._sent += 1
+                self._view.stats["playback"] = self.stats
+
+                deadline += period
+                delay = deadline - time.perf_counter()
+                if delay > 0:
+                    self._stop.wait(delay)
+                else:
+                    # Frame tardío: no se intenta recuperar el retraso de golpe.
+                    self._late += 1
+                    deadline = time.perf_counter()
+            if not loop:
+                break
@@ -2,16 +2,22 @@ from __future__ import annotations
 
 from typing import Any
 
-import molsysmt as msm
-import numpy as np
-
-from ._private.variables import is_all
+from ._private.background import LoadJob
+from ._private.budget import LoadLimits
+from ._private.compression import CompressionOptions
+from ._private.memory import MemoryPolicy, estimate_nbytes
+from ._private.preview import PreviewOptions
+from ._private.progressive import ProgressiveOptions
 from .widget import MolSysViewerWidget
 from .loaders import load_from_molsysmt as _load_from_molsysmt
 from .shapes import ShapesManager
+from .structures import StructureHandle, StructureState
+
+#: Estrategias de visibilidad del frontend (ver js/src/visibility.ts).
+VISIBILITY_MODES = ("auto", "subset", "transparency")
 
 
-class MolSysView:
+class MolSysView(StructureState):
     """Widget de visualización basado en Mol* para sistemas de MolSysMT."""
 
     def __init__(self) -> None:
@@ -25,60 +31,294 @@ class MolSysView:
 
         self._ready = False
         self._pending_messages: list[dict] = []
+        self._pending_buffers: list[list | None] = []
+
+        # Estadísticas de rendimiento reportadas por el frontend (time-to-ready, ...)
+        self.stats: dict[str, Any] = {}
+
+        # Compresión de los mensajes de carga con texto (ver set_compression)
+        self.compression = CompressionOptions()
+
+        # Límites de tamaño de las cargas (ver set_load_limits)
+        self.load_limits = LoadLimits()
+
+        # Qué se guarda en el kernel tras cargar (ver set_memory_policy)
+        self.memory_policy = MemoryPolicy()
+
+        # Vista previa de grano grueso de los sistemas grandes (ver set_preview)
+        self.preview_options = PreviewOptions()
+
+        # Envío por bloques de los payloads grandes (ver set_progressive)
+        self.progressive_options = ProgressiveOptions()
+
+        # Estrategia de visibilidad (ver set_visibility_mode)
+        self.visibility_mode = "auto"
+        self.subset_threshold = 0.5
 
         # Registrar callback para mensajes JS->Python
         def _handle_msg(widget, content, buffers):  # type: ignore[override]
             event = content.get("event")
             if event == "ready":
                 self._ready = True
+                if isinstance(content.get("timings"), dict):
+                    self.stats["ready"] = dict(content["timings"])
                 # En cuanto el frontend esté listo, reenviamos todo
-                for msg in self._pending_messages:
-                    self.widget.send(msg)
+                for msg, buffers in zip(self._pending_messages, self._pending_buffers):
+                    self.widget.send(msg, buffers)
                 self._pending_messages.clear()
+                self._pending_buffers.clear()
+            elif event == "loaded":
+                # Tiempos de parseo de la última carga (ver handleMessage en widget.ts)
+                self.stats["load"] = {key: value for key, value in content.items() if key != "event"}
+            elif event == "visibility":
+                # Estrategia elegida por el frontend y átomos visibles/totales
+                self.stats["visibility"] = {key: value for key, value in content.items() if key != "event"}
+            elif event == "frame":
+                # Último frame de trayectoria aplicado por el frontend (ver TrajectoryPlayer)
+                self.stats["frame"] = {key: value for key, value in content.items() if key != "event"}
+            elif event == "load_progress":
+                # Bloques de una carga progresiva ya dibujados (ver handleLoadPayloadChunk)
+                self.stats["load_progress"] = {key: value for key, value in content.items() if key != "event"}
 
         self.widget.on_msg(_handle_msg)
 
-        self.molecular_system = None
-        self.selection = None
-        self.structure_indices = None
-        self._molsys = None
-        self.atom_mask = None
-        self.structure_mask = None
+        self._init_structure_state()
 
-        self.shapes = ShapesManager(self)
+        # Estructuras adicionales cargadas con load(..., key=...)
+        self.structures: dict[str, StructureHandle] = {}
 
-    @property
-    def visible_atom_indices(self):
-        """Return the indices of currently visible atoms."""
-        if self.atom_mask is None:
-            return None
-        # lista para que sea JSON-serializable sin problemas
-        return np.nonzero(self.atom_mask)[0].tolist()
-
-    @property
-    def visible_structure_indices(self):
-        """Return the indices of currently visible structures."""
-        if self.structure_mask is None:
-            return None
-        # lista para que sea JSON-serializable sin problemas
-        return np.nonzero(self.structure_mask)[0].tolist()
+        self.shapes = ShapesManager(self)
 
     # --- util interno ---
 
-    def _send(self, msg: dict) -> None:
-        """Enviar un mensaje al frontend o encolarlo si aún no está listo."""
+    def _send(self, msg: dict, buffers: list | None = None) -> None:
+        """Enviar un mensaje (y buffers binarios opcionales) al frontend o encolarlo si aún no está listo."""
         if self._ready:
-            self.widget.send(msg)
+            self.widget.send(msg, buffers)
         else:
             self._pending_messages.append(msg)
+            self._pending_buffers.append(buffers)
 
-    def _update_visibility_in_frontend(self):
-        if self.atom_mask is None:
-            return
-        self._send({
-            "op": "update_visibility",
-            "options": {"visible_atom_indices": self.visible_atom_indices},
-        })
+    def set_visibility_mode(self, mode: str = "auto", subset_threshold: float = 0.5) -> None:
+        """Choose how the frontend hides atoms.
+
+        Parameters
+        ----------
+        mode : {"auto", "subset", "transparency"}, default "auto"
+            - "subset" rebuilds the representations from the visible atoms
+              only, so hidden geometry is neither built nor drawn.
+            - "transparency" makes hidden atoms fully transparent; cheap to
+              update, but the whole system is still drawn.
+            - "auto" uses "subset" when the visible fraction of atoms is at
+              most `subset_threshold` and "transparency" otherwise.
+        subset_threshold : float, default 0.5
+            Visible fraction (0–1) below which "auto" switches to "subset".
+
+        Notes
+        -----
+        The strategy used by the last update is stored in
+        ``self.stats["visibility"]``. The new mode applies to the current
+        visibility right away.
+        """
+        if mode not in VISIBILITY_MODES:
+            raise ValueError(f"mode must be one of {VISIBILITY_MODES}, got {mode!r}")
+        subset_threshold = float(subset_threshold)
+        if not 0.0 <= subset_threshold <= 1.0:
+            raise ValueError(f"subset_threshold must be between 0 and 1, got {subset_threshold!r}")
+        self.visibility_mode = mode
+        self.subset_threshold = subset_threshold
+        self._update_visibility_in_frontend()
+
+    def set_compression(
+        self,
+        codec: str | None = "gzip",
+        threshold: int = 256 * 1024,
+        level: int = 6,
+    ) -> None:
+        """Configure compression of text structure payloads (PDB/mmCIF).
+
+        Parameters
+        ----------
+        codec : {"gzip", "deflate", "deflate-raw"} or None, default "gzip"
+            Codec used for payloads above `threshold`; None sends plain text.
+        threshold : int, default 262144
+            Minimum size in bytes of the text before it is compressed.
+        level : int, default 6
+            Compression level, from 1 (fastest) to 9 (smallest).
+
+        Notes
+        -----
+        The compression ratio and time of the last compressed load are stored
+        in ``self.stats["compression"]``.
+        """
+        self.compression = CompressionOptions(codec=codec, threshold=threshold, level=level)
+
+    def set_load_limits(
+        self,
+        max_payload_bytes: int | None = None,
+        max_frames: int | None = None,
+        on_exceed: str = "subsample",
+    ) -> None:
+        """Set default size limits for the structures loaded with `load`.
+
+        Parameters
+        ----------
+        max_payload_bytes : int, optional
+            Maximum estimated size of the payload sent to the frontend; None
+            means no limit.
+        max_frames : int, optional
+            Maximum number of structures (frames) per load; None means no
+            limit.
+        on_exceed : {"subsample", "raise"}, default "subsample"
+            What to do when a load would exceed the limits: increase the
+            stride until it fits (with a logged warning) or refuse the load
+            with a ``ValueError``.
+
+        Notes
+        -----
+        The payload size is estimated from the number of atoms and frames
+        before anything is converted or serialized. The decision for the last
+        limited load is stored in ``self.stats["load_budget"]``. The limits
+        can also be given to a single `load` call.
+        """
+        self.load_limits = LoadLimits(max_payload_bytes=max_payload_bytes, max_frames=max_frames, on_exceed=on_exceed)
+
+    def _load_limits_for(
+        self,
+        max_frames: int | None,
+        max_payload_bytes: int | None,
+        on_exceed: str | None,
+    ) -> LoadLimits:
+        """Límites de una carga: los de la vista, con los argumentos de `load` encima."""
+        limits = self.load_limits
+        return LoadLimits(
+            max_payload_bytes=limits.max_payload_bytes if max_payload_bytes is None else max_payload_bytes,
+            max_frames=limits.max_frames if max_frames is None else max_frames,
+            on_exceed=limits.on_exceed if on_exceed is None else on_exceed,
+        )
+
+    def set_preview(
+        self,
+        enabled: bool = True,
+        threshold: int = 1_000_000,
+        beads: str | int = "group",
+        refine: str = "background",
+    ) -> None:
+        """Load very large systems as a coarse-grained preview first.
+
+        Parameters
+        ----------
+        enabled : bool, default True
+            Use the preview in `load` for systems above `threshold`.
+        threshold : int, default 1_000_000
+            Number of atoms above which `load` starts with the preview.
+        beads : "group" or int, default "group"
+            One bead per group (residue) at the centroid of its atoms, or one
+            bead per `beads` consecutive atoms. Beads are named "CA", so
+            polymers are drawn as a Cα trace.
+        refine : {"background", "manual"}, default "background"
+            Send the full atomic detail right after the preview, serialized
+            in a worker thread, or only when `refine` is called (for the
+            whole system or for a selected region).
+
+        Notes
+        -----
+        Visibility operations work on the preview: a bead is shown when any
+        of its atoms is visible. Named selections are resolved in Python
+        until the detail arrives.
+        """
+        self.preview_options = PreviewOptions(enabled=enabled, threshold=threshold, beads=beads, refine=refine)
+
+    def set_progressive(
+        self,
+        enabled: bool = True,
+        threshold: int = 200_000,
+        chunk_atoms: int = 50_000,
+        order: str = "chain",
+    ) -> None:
+        """Send large systems in chunks that are drawn as they arrive.
+
+        Parameters
+        ----------
+        enabled : bool, default True
+            Use progressive loading in `load` for systems above `threshold`.
+        threshold : int, default 200_000
+            Number of atoms above which `load` sends the system in chunks.
+        chunk_atoms : int, default 50_000
+            Approximate number of atoms per chunk; groups (residues) are
+            never split between chunks.
+        order : {"chain", "spatial"}, default "chain"
+            Send the chunks in the order of the atoms (chain by chain) or
+            as compact regions of space.
+
+        Notes
+        -----
+        Each chunk is shown as soon as the frontend receives it; the last
+        message merges them into a single model, so selections, visibility
+        and frames work as with a regular load once it has arrived. The
+        progress reported by the frontend is stored in
+        ``self.stats["load_progress"]``. Systems sent as a coarse-grained
+        preview (see `set_preview`) are not split.
+        """
+        self.progressive_options = ProgressiveOptions(
+            enabled=enabled, threshold=threshold, chunk_atoms=chunk_atoms, order=order
+        )
+
+    def set_memory_policy(self, source: str = "keep", molsys: str = "keep") -> None:
+        """Choose what the view keeps in the kernel after a load.
+
+        Parameters
+        ----------
+        source : {"keep", "weak", "drop"}, default "keep"
+            Keep the object passed to `load` (``self.molecular_system``), only
+            a weak reference to it, or nothing. Objects that do not support
+            weak references (paths, lists) are small and are always kept
+            with "weak".
+        molsys : {"keep", "topology"}, default "keep"
+            Keep the converted MolSys, or only the topology index that
+            resolves simple selections (chains, residue ranges, names,
+            elements, ``and``/``or``/``not``). With "topology", other
+            selections raise a ``ValueError``.
+
+        Notes
+        -----
+        The policy applies to every structure of the view, including the
+        ones already loaded; a released MolSys comes back only with a new
+        `load`. Ensembles always keep their MolSys. Use `memory_report` to
+        see the bytes held.
+        """
+        self.memory_policy = MemoryPolicy(source=source, molsys=molsys)
+        self._apply_memory_policy()
+        for handle in self.structures.values():
+            handle._apply_memory_policy()
+
+    def memory_report(self) -> dict[str, Any]:
+        """Approximate bytes held in the kernel by the view.
+
+        Returns
+        -------
+        dict
+            Bytes per item of the default structure (see
+            `StructureHandle.memory_report`), ``pending_messages`` (payloads
+            queued until the frontend is ready), ``structures`` with the
+            report of each keyed structure, and the ``total``. Memory shared
+            between items is counted once.
+        """
+        seen: set[int] = set()
+        report: dict[str, Any] = self._memory_items(seen)
+        report["pending_messages"] = estimate_nbytes(self._pending_messages, seen) + estimate_nbytes(
+            self._pending_buffers, seen
+        )
+        total = sum(report.values())
+        structures = {}
+        for key, handle in self.structures.items():
+            items = handle._memory_items(seen)
+            items["total"] = sum(items.values())
+            structures[key] = items
+            total += items["total"]
+        report["structures"] = structures
+        report["total"] = total
+        return report
 
     # --- Public loading API ---
 
@@ -89,36 +329,141 @@ class MolSysView:
         structure_indices="all",
         syntax="MolSysMT",
         label: str | None = None,
-    ) -> None:
-        _load_from_molsysmt(
-            self,
+        *,
+        key: str | None = None,
+        start=None,
+        stop=None,
+        stride: int | None = None,
+        max_frames: int | None = None,
+        max_payload_bytes: int | None = None,
+        on_exceed: str | None = None,
+        pbc: str | None = None,
+        images_cutoff: float | None = None,
+        show_cell: bool = False,
+        preview: bool | None = None,
+        progressive: bool | None = None,
+        background: bool = False,
+    ) -> StructureHandle | LoadJob | None:
+        """Load a molecular system into the viewer.
+
+        Parameters
+        ----------
+        molecular_system : Any
+            Any form MolSysMT can convert to ``molsysmt.MolSys``.
+        selection, structure_indices, syntax
+            Passed to ``msm.convert`` to choose the atoms and structures.
+        label : str, optional
+            Label of the structure in the Mol* state tree.
+        key : str, optional
+            Without a key the system replaces the default structure of the
+            view. With a key it is loaded next to the others as an
+            independent structure, with its own visibility mask, named
+            selections and shapes; loading again with the same key replaces
+            only that structure.
+        start, stop : int or quantity, optional
+            Window of structures to load, with `stop` excluded: structure
+            indices (negative values count from the end) or times such as
+            ``puw.quantity(10, "ns")`` compared with the time of each
+            structure. Applied to `structure_indices`.
+        stride : int, optional
+            Load one of every `stride` structures of the window.
+        max_frames, max_payload_bytes : int, optional
+            Limits for this load; default to the ones set with
+            `set_load_limits`. The payload size is estimated from the number
+            of atoms and frames before anything is serialized.
+        on_exceed : {"subsample", "raise"}, optional
+            Increase the stride until the load fits or raise a ``ValueError``
+            when the limits are exceeded; defaults to the view setting.
+        pbc : {"wrap", "unwrap", "whole"}, optional
+            Periodic-boundary treatment of the coordinates of every frame:
+            put each atom inside the unit cell, remove the jumps across the
+            boundary between consecutive frames, or rebuild the molecules
+            split by the boundary. Triclinic cells are supported; systems
+            without a cell are loaded unchanged.
+        images_cutoff : float, optional
+            Add the periodic images of the atoms closer than this distance
+            (Å) to a face of the cell. Image atoms are display-only: they
+            are not part of selections or visibility masks.
+        show_cell : bool, default False
+            Draw the unit cell of the first frame as lines.
+        preview : bool, optional
+            Start with a coarse-grained preview (see `set_preview`): True
+            always, False never; by default when the system has more atoms
+            than the preview threshold.
+        progressive : bool, optional
+            Send the system in chunks drawn as they arrive (see
+            `set_progressive`): True always, False never; by default when
+            the system has more atoms than the progressive threshold.
+        background : bool, default False
+            Run the conversion and serialization in a worker thread and
+            return at once (see `load_async`). A new load of the same
+            structure cancels a background load still in progress.
+
+        Returns
+        -------
+        StructureHandle, LoadJob or None
+            The handle of the structure when `key` is given; with
+            `background`, a `LoadJob` whose result is that value.
+        """
+        if key is not None:
+            return self.structure(key).load(
+                molecular_system,
+                selection=selection,
+                structure_indices=structure_indices,
+                syntax=syntax,
+                label=label,
+                start=start,
+                stop=stop,
+                stride=stride,
+                max_frames=max_frames,
+                max_payload_bytes=max_payload_bytes,
+                on_exceed=on_exceed,
+                pbc=pbc,
+                images_cutoff=images_cutoff,
+                show_cell=show_cell,
+                preview=preview,
+                progressive=progressive,
+                background=background,
+            )
+        options = dict(
             molecular_system=molecular_system,
             selection=selection,
             structure_indices=structure_indices,
             syntax=syntax,
             label=label,
+            start=start,
+            stop=stop,
+            stride=stride,
+            limits=self._load_limits_for(max_frames, max_payload_bytes, on_exceed),
+            pbc=pbc,
+            images_cutoff=images_cutoff,
+            show_cell=show_cell,
+            preview=preview,
+            progressive=progressive,
         )
+        if background:
+            return self._start_load_job(options)
+        _load_from_molsysmt(self, **options)
+        return None
 
-    def hide(self, selection='all', structure_indices='all', syntax="MolSysMT"):
-        """Hide atoms matching the given MolSysMT selection.
-
-        Notes
-        -----
-        - `structure_indices` is currently ignored for visibility control.
-          It only matters at load time when deciding which structures/frames
-          are present in `self._molsys`.
-        """
-        if self.atom_mask is None or self._molsys is None:
+    def structure(self, key: str) -> StructureHandle:
+        """Return the handle of the structure `key`, creating an empty one if needed."""
+        if not isinstance(key, str) or not key:
+            raise ValueError("key must be a non-empty string.")
+        handle = self.structures.get(key)
+        if handle is None:
+            handle = StructureHandle(self, key)
+            self.structures[key] = handle
+        return handle
+
+    def remove_structure(self, key: str) -> None:
+        """Remove the structure `key` (and its shapes) without touching the others."""
+        handle = self.structures.pop(key, None)
+        if handle is None:
             return
-
-        if is_all(selection):
-            # Hide everything
-            self.atom_mask[:] = False
-        else:
-            atom_indices = msm.select(self._molsys, selection=selection, syntax=syntax)
-            self.atom_mask[atom_indices] = False
-
-        self._update_visibility_in_frontend()
+        handle._cancel_load_job()
+        handle._replace_preview(None)
+        self._send({"op": "remove_structure", "structure": key})
 
     def show(self, selection='all', structure_indices='all', syntax="MolSysMT", *, force=False):
         """
@@ -144,16 +489,7 @@ class MolSysView:
         """
     
         # (1) Apply visibility changes if a system is loaded
-        if self._molsys is not None and self.atom_mask is not None:
-            if is_all(selection) and is_all(structure_indices):
-                # Reset visibility: show all atoms
-                self.atom_mask[:] = True
-                self._update_visibility_in_frontend()
-            elif not (is_all(selection) and is_all(structure_indices)):
-                # Partial "show": turn on only the requested selection
-                atom_indices = msm.select(self._molsys, selection=selection, syntax=syntax)
-                self.atom_mask[atom_indices] = True
-                self._update_visibility_in_frontend()
+        self._show_atoms(selection, structure_indices=structure_indices, syntax=syntax)
     
         # (2) Handle first-time or forced visualisation
         if force or not self._already_shown:
@@ -163,27 +499,6 @@ class MolSysView:
         # (3) Subsequent calls without force do not return the widget
         return None
 
-    def isolate(self, selection='all', structure_indices='all', syntax="MolSysMT"):
-        """Show only the atoms in `selection`; hide everything else.
-
-        Notes
-        -----
-        - If `selection == 'all'` this is equivalent to a visibility reset.
-        """
-        if self.atom_mask is None or self._molsys is None:
-            return
-
-        if is_all(selection):
-            # Isolating "all" → same as reset visibility
-            self.atom_mask[:] = True
-            self._update_visibility_in_frontend()
-            return
-
-        atom_indices = msm.select(self._molsys, selection=selection, syntax=syntax)
-        self.atom_mask[:] = False
-        self.atom_mask[atom_indices] = True
-        self._update_visibility_in_frontend()
-
     def clear_decorations(
         self,
         *,
@@ -239,12 +554,10 @@ class MolSysView:
         - resets masks and cached MolSysMT objects on the Python side.
         """
         # Reset Python-side state
-        self.molecular_system = None
-        self.selection = None
-        self.structure_indices = None
-        self._molsys = None
-        self.atom_mask = None
-        self.structure_mask = None
+        self._reset_structure_state()
+        for handle in self.structures.values():
+            handle._cancel_load_job()
+        self.structures.clear()
 
         # Ask frontend to clear everything (molecule + shapes + view)
         self._send(
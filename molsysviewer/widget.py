@@ -1,5 +1,88 @@
-import anywidget
+import hashlib
+from functools import lru_cache
 from pathlib import Path
 
+import anywidget
+import traitlets
+
+_PACKAGE_DIR = Path(__file__).parent
+_BUNDLE_DIR = _PACKAGE_DIR / "bundle"
+_ENTRY = "widget.js"
+
+
+@lru_cache(maxsize=1)
+def _read_bundle() -> tuple[str, dict[str, str]]:
+    """Lee (una vez por proceso) los módulos del bundle code-split desde package data."""
+    modules = {path.name: path.read_text(encoding="utf-8") for path in sorted(_BUNDLE_DIR.glob("*.js"))}
+    if _ENTRY not in modules:
+        # Sin la entrada el cargador del frontend esperaría un bundle que nunca llega.
+        raise FileNotFoundError(
+            f"MolSysViewer frontend bundle not found ({_BUNDLE_DIR / _ENTRY} is missing); "
+            "build it with `npm run build` in molsysviewer/js."
+        )
+    digest = hashlib.sha1()
+    for name, source in modules.items():
+        digest.update(name.encode("utf-8"))
+        digest.update(source.encode("utf-8"))
+    return digest.hexdigest()[:16], modules
+
+
 class MolSysViewerWidget(anywidget.AnyWidget):
-    _esm = (Path(__file__).parent / "viewer.js").read_text(encoding="utf-8")
+    # `viewer.js` es sólo el cargador; el bundle de Mol* se sirve bajo demanda
+    # desde `bundle/` (ver js/src/loader.ts), sin red y sin servidor de ficheros.
+    _esm = (_PACKAGE_DIR / "viewer.js").read_text(encoding="utf-8")
+
+    _entry = traitlets.Unicode(_ENTRY).tag(sync=True)
+    _bundle_id = traitlets.Unicode("").tag(sync=True)
+
+    def __init__(self, **kwargs) -> None:
+        bundle_id, _modules = _read_bundle()
+        super().__init__(_bundle_id=bundle_id, **kwargs)
+        self.on_msg(self._handle_bundle_request)
+
+    def _handle_bundle_request(self, widget, content, buffers) -> None:  # type: ignore[override]
+        if not isinstance(content, dict) or content.get("event") != "request_bundle":
+            return
+        # Todos los módulos viajan en este mensaje: lo que se difiere es su
+        # parseo (los chunks de shapes se importan al primer uso), no su envío.
+        bundle_id, modules = _read_bundle()
+        self.send({"event": "bundle", "bundle_id": bundle_id, "modules": modules})
+
+
+class MolSysViewGroupHub(anywidget.AnyWidget):
+    """Modelo sin vista que publica un payload una sola vez para un grupo de vistas.
+
+    Su `_esm` sólo reenvía los mensajes recibidos al registro de grupos del
+    navegador (`globalThis.__molsysviewer_groups`), del que leen los
+    controladores que se unieron con `join_group` (ver js/src/groups.ts).
+    """
+
+    _esm = """
+function getViewGroup(groupId) {
+    const root = globalThis;
+    if (!root.__molsysviewer_groups) root.__molsysviewer_groups = new Map();
+    let entry = root.__molsysviewer_groups.get(groupId);
+    if (!entry) {
+        entry = { listeners: new Set(), members: new Set() };
+        root.__molsysviewer_groups.set(groupId, entry);
+    }
+    return entry;
+}
+
+export default {
+    initialize({ model }) {
+        const group = getViewGroup(model.get("group_id"));
+        const onMessage = (msg, buffers) => {
+            if (!msg || typeof msg !== "object" || !("op" in msg)) return;
+            if (msg.op === "clear_all") group.last = undefined;
+            else if (String(msg.op).startsWith("load_")) group.last = [msg, buffers];
+            for (const listener of Array.from(group.listeners)) listener(msg, buffers);
+        };
+        model.on("msg:custom", onMessage);
+        model.send({ event: "ready" });
+        return () => model.off("msg:custom", onMessage);
+    },
+};
+"""
+
+    group_id = traitlets.Unicode("").tag(sync=True)
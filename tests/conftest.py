@@ -0,0 +1,38 @@
+import http.server
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def http_root(tmp_path):
+    """Servidor HTTP/1.1 en loopback que sirve `tmp_path/www`.
+
+    Devuelve `(root, base_url, log)`, donde `log` registra `(path, client_port,
+    request_headers)` de cada petición.
+    """
+    root = tmp_path / "www"
+    root.mkdir()
+    log = []
+
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=str(root), **kwargs)
+
+        def do_GET(self):
+            log.append((self.path, self.client_address[1], dict(self.headers)))
+            super().do_GET()
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield root, f"http://127.0.0.1:{server.server_address[1]}", log
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -9,5 +9,8 @@ def test_loaders_exports():
         "load_mmcif_string",
         "load_pdb_id",
         "load_from_url",
+        "StructureResolver",
+        "get_default_resolver",
+        "set_default_resolver",
     }
     assert exported == expected
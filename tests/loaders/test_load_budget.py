@@ -0,0 +1,89 @@
+import types
+
+import numpy as np
+import pytest
+
+import molsysviewer._private.budget as budget_mod
+from molsysviewer import MolSysView
+from molsysviewer._private.budget import LoadLimits, estimate_payload_bytes, plan_structure_indices
+
+
+class Time(float):
+    """Cantidad de tiempo mínima (en ns) para los tests."""
+
+
+@pytest.fixture
+def fake_trajectory(monkeypatch):
+    calls = []
+
+    def fake_get(_item, *, element=None, n_structures=False, n_atoms=False, time=False, structure_indices=None, **_kwargs):
+        calls.append(element)
+        if n_structures:
+            return 100
+        if n_atoms:
+            return 1000
+        if time:
+            return np.asarray(structure_indices) * 0.5
+        raise AssertionError("Unexpected get request")
+
+    monkeypatch.setattr(budget_mod.msm, "get", fake_get)
+    monkeypatch.setattr(budget_mod.puw, "is_quantity", lambda value: isinstance(value, Time))
+    monkeypatch.setattr(budget_mod.puw, "get_unit", lambda value: "ns", raising=False)
+    monkeypatch.setattr(budget_mod.puw, "get_value", lambda value, to_unit=None: value, raising=False)
+    return calls
+
+
+def test_without_options_the_system_is_not_queried(fake_trajectory):
+    assert plan_structure_indices("traj.dcd") == ("all", None)
+    assert fake_trajectory == []
+
+
+def test_index_window_and_stride(fake_trajectory):
+    indices, report = plan_structure_indices("traj.dcd", start=10, stop=-50, stride=10)
+    assert indices.tolist() == [10, 20, 30, 40]
+    assert report["n_frames"] == 4 and report["stride"] == 10
+
+
+def test_time_window(fake_trajectory):
+    indices, _ = plan_structure_indices("traj.dcd", start=Time(10.0), stop=Time(12.0))
+    assert indices.tolist() == [20, 21, 22, 23]
+
+
+def test_limits_subsample(fake_trajectory):
+    indices, report = plan_structure_indices("traj.dcd", limits=LoadLimits(max_frames=30))
+    assert indices.size <= 30
+    assert report["subsampled"] and report["stride"] == 4
+
+    max_bytes = estimate_payload_bytes(1000, 10)
+    indices, report = plan_structure_indices("traj.dcd", limits=LoadLimits(max_payload_bytes=max_bytes))
+    assert indices.size <= 10
+    assert report["estimated_bytes"] <= max_bytes
+
+
+def test_limits_refuse(fake_trajectory):
+    with pytest.raises(ValueError, match="stride=4"):
+        plan_structure_indices("traj.dcd", limits=LoadLimits(max_frames=30, on_exceed="raise"))
+    with pytest.raises(ValueError, match="single structure"):
+        plan_structure_indices("traj.dcd", limits=LoadLimits(max_payload_bytes=1000))
+
+
+def test_view_load_uses_view_limits(monkeypatch, fake_trajectory):
+    converted = {}
+
+    def fake_convert(item, *, to_form=None, structure_indices=None, **_kwargs):
+        converted["structure_indices"] = structure_indices
+        return types.SimpleNamespace()
+
+    import molsysviewer.loaders.load_molsysmt as loader_mod
+
+    monkeypatch.setattr(loader_mod.msm, "convert", fake_convert)
+    monkeypatch.setattr(loader_mod, "_build_load_message", lambda molsys, label=None: {"op": "noop"})
+
+    view = MolSysView()
+    view.set_load_limits(max_frames=10)
+    view.load("traj.dcd")
+    assert converted["structure_indices"].tolist() == list(range(0, 100, 10))
+    assert view.stats["load_budget"]["subsampled"]
+
+    with pytest.raises(ValueError):
+        view.load("traj.dcd", on_exceed="raise")
@@ -0,0 +1,86 @@
+import types
+
+import numpy as np
+import pytest
+
+import molsysviewer.loaders.load_ensemble as ensemble_mod
+from molsysviewer import MolSysView
+from molsysviewer.loaders.load_ensemble import superpose_conformers
+
+
+def rotation(angle):
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([[c, -s, 0.0], [s, c, 0.0], [0.0, 0.0, 1.0]])
+
+
+@pytest.fixture
+def conformers():
+    rng = np.random.default_rng(0)
+    base = rng.normal(size=(5, 3))
+    return np.stack([base, base @ rotation(0.7) + [1.0, 2.0, 3.0], base @ rotation(-1.2)])
+
+
+@pytest.fixture
+def fake_molsysmt(monkeypatch, conformers):
+    viewer_json = {"atoms": {"atom_id": [1, 2, 3, 4, 5]}, "bonds": {"indexA": [0], "indexB": [1]}}
+
+    def fake_convert(item, *, to_form=None, **_kwargs):
+        if to_form == "molsysmt.MolSys":
+            return types.SimpleNamespace()
+        if to_form == "molsysmt.ViewerJSON":
+            return types.SimpleNamespace(to_dict=lambda: viewer_json)
+        raise AssertionError("Unexpected conversion request")
+
+    def fake_get(_item, *, element=None, n_atoms=False, coordinates=False):
+        if n_atoms:
+            return 5
+        if coordinates:
+            return conformers / 10.0
+        raise AssertionError("Unexpected get request")
+
+    monkeypatch.setattr(ensemble_mod.msm, "convert", fake_convert)
+    monkeypatch.setattr(ensemble_mod.msm, "get", fake_get)
+    monkeypatch.setattr(ensemble_mod.puw, "get_value", lambda value, to_unit: value * 10.0, raising=False)
+
+
+def test_load_ensemble_sends_topology_once_and_one_coordinate_block(fake_molsysmt, conformers):
+    view = MolSysView()
+
+    assert view.load_ensemble("nmr.pdb", label="NMR") == 3
+
+    msg = view._pending_messages[-1]
+    assert msg["op"] == "load_ensemble"
+    assert msg["n_conformers"] == 3 and msg["n_atoms"] == 5
+    assert msg["topology"]["atoms"]["atom_id"] == [1, 2, 3, 4, 5]
+    assert "coordinates" not in msg["topology"]
+    (buffer,) = view._pending_buffers[-1]
+    block = np.frombuffer(buffer, dtype="<f4").reshape(3, 5, 3)
+    np.testing.assert_allclose(block, conformers, atol=1e-5)
+    assert view.n_conformers == 3
+
+
+def test_show_conformers_sends_only_indices(fake_molsysmt):
+    view = MolSysView()
+    view.load_ensemble("nmr.pdb")
+
+    view.show_conformers([2, 0])
+    assert view._pending_messages[-1] == {"op": "show_conformers", "conformers": [0, 2]}
+    assert view._pending_buffers[-1] is None
+
+    view.show_conformers()
+    assert view._pending_messages[-1]["conformers"] is None
+
+    with pytest.raises(ValueError):
+        view.show_conformers([3])
+
+
+def test_show_conformers_requires_an_ensemble():
+    view = MolSysView()
+    with pytest.raises(ValueError):
+        view.show_conformers([0])
+
+
+def test_superpose_conformers_recovers_reference(conformers):
+    aligned = superpose_conformers(conformers.astype("<f4"))
+    for conformer in aligned:
+        np.testing.assert_allclose(conformer, conformers[0], atol=1e-4)
@@ -1,3 +1,7 @@
+import sys
+
+import pytest
+
 from molsysviewer.loaders import load_from_url
 
 
@@ -29,3 +33,45 @@ def test_load_from_url_sends_minimal_message():
             "label": "demo",
         }
     ]
+
+
+def test_load_from_url_python_fetch_builds_molsys(http_root, monkeypatch):
+    import molsysmt as msm
+
+    from molsysviewer._private.fetch import HTTPSession
+    from molsysviewer.loaders import load_from_molsysmt
+
+    load_molsysmt_module = sys.modules[load_from_molsysmt.__module__]
+
+    root, base_url, _log = http_root
+    (root / "structure.pdb").write_text("ATOM\n")
+
+    converted = []
+
+    def fake_convert(item, **kwargs):
+        converted.append(item)
+        return "molsys"
+
+    monkeypatch.setattr(msm, "convert", fake_convert)
+    monkeypatch.setattr(msm, "get", lambda *args, **kwargs: 2)
+    monkeypatch.setattr(load_molsysmt_module, "_serialize_molsys_payload", lambda molsys: {"atoms": []})
+
+    view = DummyView()
+    load_from_url(
+        view,
+        url=base_url + "/structure.pdb",
+        label="demo",
+        fetch="python",
+        session=HTTPSession(cache_dir=False),
+    )
+
+    assert converted == ["ATOM\n"]
+    assert view._molsys == "molsys"
+    assert view.atom_mask.tolist() == [True, True]
+    assert view.messages == [{"op": "load_molsys_payload", "payload": {"atoms": []}, "label": "demo"}]
+
+
+def test_load_from_url_python_fetch_rejects_unknown_format():
+    view = DummyView()
+    with pytest.raises(ValueError):
+        load_from_url(view, url="http://example.com/structure.xyz", fetch="python")
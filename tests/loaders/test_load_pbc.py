@@ -0,0 +1,155 @@
+import molsysmt as msm
+import numpy as np
+import pytest
+
+from molsysviewer import MolSysView
+from molsysviewer._private.pbc import apply_pbc, bond_forest, cell_to_box, make_whole, unwrap, wrap
+
+CUBIC = {"a": 10.0, "b": 10.0, "c": 10.0, "alpha": 90.0, "beta": 90.0, "gamma": 90.0}
+TRICLINIC = {"a": 10.0, "b": 12.0, "c": 11.0, "alpha": 80.0, "beta": 75.0, "gamma": 60.0}
+
+
+def _payload(positions, cell, bonds=None):
+    n_atoms = len(positions[0])
+    return {
+        "atoms": {"atom_id": list(range(1, n_atoms + 1)), "chain_id": ["A"] * n_atoms},
+        "bonds": bonds,
+        "coordinates": [{"positions": np.asarray(p, dtype=float).tolist(), "cell": cell} for p in positions],
+    }
+
+
+def test_cell_to_box_triclinic():
+    box = cell_to_box(*(TRICLINIC[k] for k in ("a", "b", "c", "alpha", "beta", "gamma")))
+    lengths = np.linalg.norm(box, axis=-1)
+    np.testing.assert_allclose(lengths, [10.0, 12.0, 11.0])
+    cos = lambda u, v: np.dot(u, v) / (np.linalg.norm(u) * np.linalg.norm(v))
+    np.testing.assert_allclose(np.degrees(np.arccos(cos(box[1], box[2]))), 80.0)
+    np.testing.assert_allclose(np.degrees(np.arccos(cos(box[0], box[2]))), 75.0)
+
+
+def test_wrap_puts_atoms_inside_a_triclinic_cell():
+    box = cell_to_box(*(TRICLINIC[k] for k in ("a", "b", "c", "alpha", "beta", "gamma")))
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(-30, 30, size=(3, 50, 3))
+    boxes = np.broadcast_to(box, (3, 3, 3))
+
+    wrapped = wrap(positions, boxes)
+
+    fractional = wrapped @ np.linalg.inv(box)
+    assert np.all(fractional >= -1e-9) and np.all(fractional < 1 + 1e-9)
+    # Cada átomo se mueve un número entero de celdas.
+    shift = (wrapped - positions) @ np.linalg.inv(box)
+    np.testing.assert_allclose(shift, np.round(shift), atol=1e-9)
+
+
+def test_unwrap_removes_jumps_between_frames():
+    boxes = np.broadcast_to(np.eye(3) * 10.0, (3, 3, 3))
+    positions = np.array([[[9.5, 5, 5]], [[0.3, 5, 5]], [[1.0, 5, 5]]])
+    np.testing.assert_allclose(unwrap(positions, boxes)[:, 0, 0], [9.5, 10.3, 11.0])
+
+
+def test_make_whole_rebuilds_a_split_chain():
+    boxes = np.eye(3)[np.newaxis] * 10.0
+    positions = np.array([[[9.0, 5, 5], [0.0, 5, 5], [1.0, 5, 5], [2.0, 5, 5]]])
+    parent = bond_forest(4, np.array([0, 1, 2]), np.array([1, 2, 3]))
+
+    whole = make_whole(positions, boxes, parent)
+
+    np.testing.assert_allclose(whole[0, :, 0], [9.0, 10.0, 11.0, 12.0])
+
+
+def test_bond_forest_spans_each_component_with_bonds():
+    rng = np.random.default_rng(0)
+    # Anillos, ramas y átomos aislados en varias componentes.
+    index_a = rng.integers(0, 300, 400)
+    index_b = rng.integers(0, 300, 400)
+    keep = index_a != index_b
+    index_a, index_b = index_a[keep], index_b[keep]
+    n_atoms = 320
+
+    parent = bond_forest(n_atoms, index_a, index_b)
+
+    reference = list(range(n_atoms))
+
+    def find(atom):
+        while reference[atom] != atom:
+            atom = reference[atom]
+        return atom
+
+    for i, j in zip(index_a.tolist(), index_b.tolist()):
+        low, high = sorted((find(i), find(j)))
+        reference[high] = low
+    components = np.array([find(atom) for atom in range(n_atoms)])
+
+    # Cada átomo cuelga de un vecino enlazado y, subiendo, llega al menor átomo de su componente.
+    bonds = set(zip(index_a.tolist(), index_b.tolist())) | set(zip(index_b.tolist(), index_a.tolist()))
+    children = np.flatnonzero(parent != np.arange(n_atoms))
+    assert all((int(atom), int(parent[atom])) in bonds for atom in children)
+    ancestor = parent.copy()
+    for _ in range(n_atoms):
+        ancestor = parent[ancestor]
+    np.testing.assert_array_equal(ancestor, components)
+    np.testing.assert_array_equal(np.flatnonzero(parent == np.arange(n_atoms)), np.unique(components))
+
+
+def test_apply_pbc_adds_images_near_the_faces():
+    payload = _payload([[[0.5, 5, 5], [5, 5, 5], [9.0, 5, 5]], [[0.5, 5, 5], [5, 5, 5], [8.0, 5, 5]]], CUBIC)
+
+    report = apply_pbc(payload, images_cutoff=1.5)
+
+    # Sólo el primer átomo (x = 0.5) y el tercero en el primer frame (x = 9) están cerca de una cara.
+    assert report == {"applied": True, "mode": None, "n_images": 2}
+    assert payload["atoms"]["atom_id"] == [1, 2, 3, 4, 5]
+    assert payload["atoms"]["chain_id"][3:] == ["A'", "A'"]
+    positions = np.array(payload["coordinates"][0]["positions"])
+    np.testing.assert_allclose(positions[3:, 0], [10.5, -1.0])
+
+
+def test_apply_pbc_without_cell_does_nothing():
+    payload = _payload([[[12.0, 5, 5]]], None)
+    assert apply_pbc(payload, mode="wrap") == {"applied": False, "mode": "wrap", "n_images": 0}
+    assert payload["coordinates"][0]["positions"] == [[12.0, 5.0, 5.0]]
+
+
+def test_load_with_pbc_and_cell(monkeypatch):
+    payload = _payload([[[12.0, 5, 5], [-1.0, 5, 5]]], CUBIC)
+    monkeypatch.setattr(msm, "convert", lambda system, **kwargs: object())
+    monkeypatch.setattr(msm, "get", lambda molsys, element, n_atoms: 2)
+    monkeypatch.setattr("molsysviewer.loaders.load_molsysmt._serialize_molsys_payload", lambda molsys: payload)
+
+    view = MolSysView()
+    view.load("box.pdb", pbc="wrap", show_cell=True)
+
+    assert view.stats["pbc"]["applied"]
+    np.testing.assert_allclose(payload["coordinates"][0]["positions"], [[2.0, 5, 5], [9.0, 5, 5]])
+    cell_msg = view._pending_messages[-1]
+    assert cell_msg["op"] == "add_unit_cell"
+    np.testing.assert_allclose(cell_msg["options"]["vectors"], np.eye(3) * 10.0, atol=1e-12)
+
+    with pytest.raises(ValueError):
+        view.load("box.pdb", pbc="fold")
+
+
+def test_periodic_images_follow_the_visibility_of_their_atom(monkeypatch):
+    payload = _payload([[[0.5, 5, 5], [5, 5, 5], [9.0, 5, 5]]], CUBIC)
+    monkeypatch.setattr(msm, "convert", lambda system, **kwargs: object())
+    monkeypatch.setattr(msm, "get", lambda molsys, element, n_atoms: 3)
+    monkeypatch.setattr(msm, "select", lambda molsys, selection, syntax: np.asarray(selection))
+    monkeypatch.setattr("molsysviewer.loaders.load_molsysmt._serialize_molsys_payload", lambda molsys: payload)
+
+    view = MolSysView()
+    view.load("box.pdb", images_cutoff=1.5)
+    assert view.stats["pbc"]["n_images"] == 2  # imágenes de los átomos 0 y 2, índices 3 y 4
+
+    def visible():
+        return view._pending_messages[-1]["options"]["visible_atom_indices"]
+
+    view.hide([2])
+    assert visible() == [0, 1, 3]
+    # Con todo visible se envían también todas las imágenes: el frontend vuelve a "all".
+    view.show()
+    assert visible() == [0, 1, 2, 3, 4]
+    view.define_selection("edge", [0])
+    view.isolate("edge")
+    assert visible() == [0, 3]
+    assert view.visible_atom_indices == [0]
@@ -20,3 +20,34 @@ def test_load_pdb_id_validates_input():
     view = DummyView()
     with pytest.raises(ValueError):
         load_pdb_id(view, pdb_id="   ")
+
+
+def test_load_pdb_id_uses_resolver_text(tmp_path, monkeypatch):
+    import gzip
+
+    import molsysmt as msm
+
+    from molsysviewer.loaders import StructureResolver
+
+    mirror = tmp_path / "mirror"
+    (mirror / "cr").mkdir(parents=True)
+    (mirror / "cr" / "1crn.cif.gz").write_bytes(gzip.compress(b"data_1CRN\n"))
+
+    converted = []
+
+    def fake_convert(item, **kwargs):
+        converted.append(item)
+        return "molsys"
+
+    monkeypatch.setattr(msm, "convert", fake_convert)
+    monkeypatch.setattr(msm, "get", lambda *args, **kwargs: 3)
+
+    resolver = StructureResolver(tmp_path / "cache", mirror_root=mirror, offline=True)
+    view = DummyView()
+    load_pdb_id(view, pdb_id="1CRN", resolver=resolver)
+
+    assert converted == ["data_1CRN\n"]
+    assert view.atom_mask.tolist() == [True, True, True]
+    assert view.messages == [
+        {"op": "load_structure_from_string", "format": "mmcif", "data": "data_1CRN\n", "label": "1CRN"}
+    ]
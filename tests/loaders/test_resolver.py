@@ -0,0 +1,85 @@
+import gzip
+import os
+
+import pytest
+
+from molsysviewer.loaders import StructureResolver
+
+
+def test_resolver_reads_divided_mirror(tmp_path):
+    mirror = tmp_path / "mirror"
+    (mirror / "cr").mkdir(parents=True)
+    (mirror / "cr" / "pdb1crn.ent.gz").write_bytes(gzip.compress(b"ATOM\n"))
+
+    resolver = StructureResolver(tmp_path / "cache", mirror_root=mirror, offline=True)
+    structure = resolver.resolve("1CRN")
+
+    assert structure.source == "mirror"
+    assert structure.format == "pdb"
+    assert structure.read_text() == "ATOM\n"
+
+
+def test_resolver_offline_miss_raises(tmp_path):
+    resolver = StructureResolver(tmp_path / "cache", offline=True)
+    with pytest.raises(FileNotFoundError):
+        resolver.resolve("1crn")
+
+
+def test_resolver_rejects_invalid_ids(tmp_path):
+    resolver = StructureResolver(tmp_path / "cache", offline=True)
+    with pytest.raises(ValueError):
+        resolver.resolve("../etc")
+
+
+def test_resolver_downloads_once_then_hits_cache(tmp_path, http_root):
+    root, base_url, requests = http_root
+    (root / "1CRN.cif").write_bytes(b"data_1CRN\n")
+
+    resolver = StructureResolver(
+        tmp_path / "cache",
+        url_templates={"mmcif": base_url + "/{PDB_ID}.cif", "pdb": base_url + "/{PDB_ID}.pdb"},
+        offline=False,
+    )
+    first = resolver.resolve("1crn")
+    second = resolver.resolve("1crn")
+
+    assert first.source == "download"
+    assert second.source == "cache"
+    assert second.path == first.path
+    assert first.path.name == "1crn.cif.gz"
+    assert second.read_text() == "data_1CRN\n"
+    assert [entry[0] for entry in requests] == ["/1CRN.cif"]
+
+
+def test_resolver_falls_back_to_next_format(tmp_path, http_root):
+    root, base_url, _requests = http_root
+    (root / "1crn.pdb.gz").write_bytes(gzip.compress(b"ATOM\n"))
+
+    resolver = StructureResolver(
+        tmp_path / "cache",
+        url_templates={"mmcif": base_url + "/{pdb_id}.cif.gz", "pdb": base_url + "/{pdb_id}.pdb.gz"},
+        offline=False,
+    )
+    structure = resolver.resolve("1crn")
+
+    assert structure.format == "pdb"
+    assert structure.read_text() == "ATOM\n"
+
+
+def test_resolver_evicts_least_recently_used(tmp_path):
+    cache = tmp_path / "cache"
+    resolver = StructureResolver(cache, max_cache_bytes=None, offline=True)
+    paths = []
+    for index, pdb_id in enumerate(["1aaa", "1bbb", "1ccc"]):
+        path = resolver._cache_path(pdb_id, "mmcif")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (1000 + index, 1000 + index))
+        paths.append(path)
+
+    # Un acceso al más antiguo lo convierte en el más reciente.
+    resolver.resolve("1aaa")
+
+    removed = resolver.evict(max_bytes=200)
+    assert removed == [paths[1]]
+    assert resolver.cache_size() == 200
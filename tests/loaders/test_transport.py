@@ -0,0 +1,112 @@
+import molsysmt as msm
+import pytest
+
+from molsysviewer import MolSysView
+from molsysviewer.loaders import load_pdb_string
+from molsysviewer.loaders import transport as transport_module
+from molsysviewer.loaders.transport import _parse_mode, _send_structure_text
+
+PAYLOAD = {
+    "atoms": {
+        "atom_id": [1, 2],
+        "atom_name": ["N", "CA"],
+        "residue_id": [1, 1],
+        "residue_name": ["ALA", "ALA"],
+        "chain_id": ["A", "A"],
+        "entity_id": ["1", "1"],
+        "element_symbol": ["N", "C"],
+        "formal_charge": [0, 0],
+    },
+    "coordinates": [{"positions": [[0.0, 0.0, 0.0], [1.5, 0.0, 0.0]]}],
+}
+
+
+class DummyView:
+    def __init__(self) -> None:
+        self.messages = []
+        self.buffers = []
+        self.stats = {}
+        self._molsys = "molsys"
+
+    def _send(self, message, buffers=None):
+        self.messages.append(message)
+        self.buffers.append(buffers)
+
+
+def test_text_transport_sends_string():
+    view = DummyView()
+    _send_structure_text(view, data="ATOM\n", format="pdb", label="demo")
+
+    assert view.messages == [{"op": "load_structure_from_string", "format": "pdb", "data": "ATOM\n", "label": "demo"}]
+    assert view.buffers == [None]
+    assert view.stats["transport"]["encoding"] == "text"
+
+
+def test_bcif_transport_sends_binary_buffer(monkeypatch):
+    monkeypatch.setattr(transport_module, "_serialize_molsys_payload", lambda molsys: PAYLOAD)
+
+    view = DummyView()
+    _send_structure_text(view, data="ATOM\n" * 100, format="pdb", label="demo", transport="bcif")
+
+    assert view.messages == [{"op": "load_structure_from_bcif", "label": "demo"}]
+    (blob,) = view.buffers[0]
+    assert isinstance(blob, bytes)
+    stats = view.stats["transport"]
+    assert stats["encoding"] == "bcif"
+    assert stats["bytes"] == len(blob)
+    assert stats["text_bytes"] == 500
+
+
+def test_bcif_transport_falls_back_to_text(monkeypatch):
+    monkeypatch.setattr(transport_module, "_serialize_molsys_payload", lambda molsys: None)
+
+    view = DummyView()
+    _send_structure_text(view, data="ATOM\n", format="pdb", transport="bcif")
+    assert view.messages[0]["op"] == "load_structure_from_string"
+
+
+def test_unknown_transport_is_rejected():
+    with pytest.raises(ValueError):
+        _send_structure_text(DummyView(), data="", format="pdb", transport="msgpack")
+
+
+def test_bcif_transport_does_not_resolve_a_deferred_molsys(monkeypatch):
+    monkeypatch.setattr(transport_module, "_serialize_molsys_payload", lambda molsys: PAYLOAD)
+
+    class DeferringView(DummyView):
+        _pending_molsys = object()
+
+        @property
+        def _molsys(self):
+            raise AssertionError("the deferred MolSys was resolved")
+
+        @_molsys.setter
+        def _molsys(self, value):
+            pass
+
+    view = DeferringView()
+    _send_structure_text(view, data="ATOM\n", format="pdb", transport="bcif")
+    assert view.messages[0]["op"] == "load_structure_from_string"
+
+
+def test_bcif_transport_parses_eagerly():
+    assert _parse_mode("text", None) == "background"
+    assert _parse_mode("bcif", None) == "eager"
+    assert _parse_mode("text", "lazy") == "lazy"
+    with pytest.raises(ValueError):
+        _parse_mode("bcif", "background")
+
+
+def test_bcif_loader_converts_before_sending(monkeypatch):
+    monkeypatch.setattr(transport_module, "_serialize_molsys_payload", lambda molsys: PAYLOAD)
+    monkeypatch.setattr(msm, "convert", lambda item, **kwargs: "molsys")
+    monkeypatch.setattr(msm, "get", lambda molsys, element, n_atoms: 2)
+
+    view = MolSysView()
+    with pytest.raises(ValueError):
+        load_pdb_string(view, pdb_string="ATOM\n", transport="bcif", parse="lazy")
+    assert view._pending_messages == []
+
+    load_pdb_string(view, pdb_string="ATOM\n", transport="bcif")
+    assert view.molsys_ready
+    assert view._pending_messages[-1] == {"op": "load_structure_from_bcif", "label": None}
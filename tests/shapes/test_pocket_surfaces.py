@@ -50,3 +50,18 @@ def test_requires_atom_indices():
     pockets = PocketSurfaces(view)
     with pytest.raises(ValueError):
         pockets.add_pocket_surface(atom_indices=[])
+
+
+def test_named_selection_sends_only_the_name():
+    view = DummyView()
+    view.selections = {"site": [1, 2, 3]}
+    pockets = PocketSurfaces(view)
+
+    pockets.add_pocket_surface(selection="site", alpha=0.5)
+
+    assert view.messages == [
+        {"op": "add_pocket_surface", "options": {"selection": "site", "alpha": 0.5}}
+    ]
+
+    with pytest.raises(ValueError):
+        pockets.add_pocket_surface(selection="missing")
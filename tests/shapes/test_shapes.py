@@ -60,3 +60,46 @@ def test_add_spheres_broadcasts_and_validates():
 
     with pytest.raises(ValueError):
         shapes.add_spheres(centers, radii=[1.0], colors=[0xFFFFFF, 0x000000], alphas=0.5)
+
+
+def test_add_unit_cell_sends_message():
+    view = DummyView()
+    manager = ShapesManager(view)
+    manager.add_unit_cell([[10, 0, 0], [0, 10, 0], [0, 0, 10]], color=0x00FF00)
+
+    assert view.messages == [
+        {
+            "op": "add_unit_cell",
+            "options": {
+                "vectors": [[10.0, 0.0, 0.0], [0.0, 10.0, 0.0], [0.0, 0.0, 10.0]],
+                "origin": [0.0, 0.0, 0.0],
+                "color": 0x00FF00,
+            },
+        }
+    ]
+
+    with pytest.raises(ValueError):
+        manager.add_unit_cell([[10, 0, 0], [0, 10, 0]])
+
+
+def test_bound_shapes_need_atom_indices():
+    view = DummyView()
+    manager = ShapesManager(view)
+
+    manager.add_links(atom_pairs=[(0, 1)], bound=True)
+    manager.add_triangle_faces(atom_triplets=[(0, 1, 2)], bound=True)
+    manager.add_tetrahedra(atom_quads=[(0, 1, 2, 3)], bound=True)
+    manager.add_displacement_vectors(None, [(1, 0, 0)], atom_indices=[0], bound=True)
+    assert [message["options"]["bound"] for message in view.messages] == [True] * 4
+
+    manager.add_links(atom_pairs=[(0, 1)])
+    assert "bound" not in view.messages[-1]["options"]
+
+    with pytest.raises(ValueError):
+        manager.add_links(coordinate_pairs=[((0, 0, 0), (1, 1, 1))], bound=True)
+    with pytest.raises(ValueError):
+        manager.add_triangle_faces(vertices=[[(0, 0, 0), (1, 0, 0), (0, 1, 0)]], bound=True)
+    with pytest.raises(ValueError):
+        manager.add_tetrahedra(tetra_coords=[[(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1)]], bound=True)
+    with pytest.raises(ValueError):
+        manager.add_displacement_vectors([(0, 0, 0)], [(1, 0, 0)], bound=True)
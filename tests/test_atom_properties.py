@@ -0,0 +1,99 @@
+import molsysmt as msm
+import numpy as np
+import pytest
+
+from molsysviewer import MolSysView
+
+
+def test_set_atom_property_sends_float32_buffer():
+    view = MolSysView()
+    rmsf = np.array([0.5, 1.0, 2.5], dtype=np.float64)
+
+    view.set_atom_property("rmsf", rmsf, color_map=[0x0000FF, 0xFF0000])
+
+    msg = view._pending_messages[-1]
+    assert msg["op"] == "set_atom_property" and msg["name"] == "rmsf"
+    assert msg["n_atoms"] == 3 and msg["n_frames"] == 1 and not msg["streamed"]
+    assert msg["color"] == {"domain": [0.5, 2.5], "color_map": [0x0000FF, 0xFF0000]}
+    assert msg["size"] is None
+    (buffer,) = view._pending_buffers[-1]
+    np.testing.assert_array_equal(np.frombuffer(buffer, dtype="<f4"), rmsf)
+
+
+def test_per_frame_property_without_player_is_sent_whole():
+    view = MolSysView()
+    energies = np.arange(12, dtype=np.float32).reshape(4, 3)
+
+    view.set_atom_property("energy", energies, color=False, size=True, domain=(0, 10))
+
+    msg = view._pending_messages[-1]
+    assert msg["n_frames"] == 4 and not msg["streamed"]
+    assert msg["color"] is None
+    assert msg["size"] == {"domain": [0.0, 10.0], "range": [0.5, 2.0]}
+    (buffer,) = view._pending_buffers[-1]
+    assert len(buffer) == energies.nbytes
+
+
+def test_remove_atom_property():
+    view = MolSysView()
+    view.set_atom_property("rmsf", [1.0, 2.0])
+    view.remove_atom_property("rmsf")
+    assert view._pending_messages[-1] == {"op": "remove_atom_property", "name": "rmsf"}
+    n_messages = len(view._pending_messages)
+    view.remove_atom_property("rmsf")
+    assert len(view._pending_messages) == n_messages
+
+
+def test_values_must_match_the_loaded_atoms(monkeypatch):
+    monkeypatch.setattr(msm, "convert", lambda system, **kwargs: object())
+    monkeypatch.setattr(msm, "get", lambda molsys, element, n_atoms: 4)
+    monkeypatch.setattr(
+        "molsysviewer.loaders.load_molsysmt._serialize_molsys_payload", lambda molsys: {"atoms": {}}
+    )
+    view = MolSysView()
+    view.load("system.pdb")
+    with pytest.raises(ValueError):
+        view.set_atom_property("rmsf", np.ones(3))
+
+
+def test_per_frame_property_streams_with_trajectory_frames(monkeypatch):
+    monkeypatch.setattr(msm, "convert", lambda system, **kwargs: object())
+    monkeypatch.setattr(msm, "get", lambda molsys, element, n_atoms: 4)
+    monkeypatch.setattr(
+        "molsysviewer.loaders.load_molsysmt._serialize_molsys_payload", lambda molsys: {"atoms": {}}
+    )
+    view = MolSysView()
+    coordinates = np.zeros((10, 4, 3), dtype=np.float32)
+    player = view.load_trajectory(coordinates, topology="top.pdb", chunk_size=4)
+    try:
+        energies = np.arange(40, dtype=np.float32).reshape(10, 4)
+        view.set_atom_property("energy", energies)
+
+        msg = view._pending_messages[-1]
+        assert msg["streamed"] and msg["n_frames"] == 10
+        (row,) = view._pending_buffers[-1]
+        np.testing.assert_array_equal(np.frombuffer(row, dtype="<f4"), energies[0])
+
+        player.seek(7)
+        msg = view._pending_messages[-1]
+        assert msg["op"] == "set_frame_coordinates" and msg["properties"] == ["energy"]
+        positions, row = view._pending_buffers[-1]
+        np.testing.assert_array_equal(np.frombuffer(row, dtype="<f4"), energies[7])
+
+        with pytest.raises(ValueError):
+            view.set_atom_property("energy", energies[:5])
+    finally:
+        player.close()
+
+
+def test_load_removes_atom_properties(monkeypatch):
+    view = MolSysView()
+    view.set_atom_property("rmsf", [1.0, 2.0])
+
+    monkeypatch.setattr(msm, "convert", lambda *args, **kwargs: object())
+    monkeypatch.setattr(msm, "get", lambda molsys, element, n_atoms: 3)
+    monkeypatch.setattr("molsysviewer.loaders.load_molsysmt._serialize_molsys_payload", lambda molsys: {"atoms": {}})
+    view.load("other.pdb")
+
+    assert view.atom_properties == {}
+    assert {"op": "remove_atom_property", "name": "rmsf"} in view._pending_messages
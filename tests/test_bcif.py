@@ -0,0 +1,177 @@
+import struct
+
+import numpy as np
+import pytest
+
+from molsysviewer._private import bcif
+
+
+# --- Decodificador de referencia (port de mol-io/common/msgpack y binary-cif/decoder.ts) ---
+
+
+def _unpack(buffer, offset=0):
+    tag = buffer[offset]
+    offset += 1
+    if tag < 0x80:
+        return tag, offset
+    if tag >= 0xE0:
+        return tag - 0x100, offset
+    if 0x80 <= tag <= 0x8F:
+        return _unpack_map(buffer, offset, tag & 0x0F)
+    if 0x90 <= tag <= 0x9F:
+        return _unpack_array(buffer, offset, tag & 0x0F)
+    if 0xA0 <= tag <= 0xBF:
+        n = tag & 0x1F
+        return buffer[offset : offset + n].decode(), offset + n
+    fixed = {0xC0: None, 0xC2: False, 0xC3: True}
+    if tag in fixed:
+        return fixed[tag], offset
+    sized = {0xCC: ">B", 0xCD: ">H", 0xCE: ">I", 0xD0: ">b", 0xD1: ">h", 0xD2: ">i", 0xCB: ">d"}
+    if tag in sized:
+        fmt = sized[tag]
+        return struct.unpack_from(fmt, buffer, offset)[0], offset + struct.calcsize(fmt)
+    lengths = {0xC4: ">B", 0xC5: ">H", 0xC6: ">I", 0xD9: ">B", 0xDA: ">H", 0xDB: ">I"}
+    if tag in lengths:
+        fmt = lengths[tag]
+        n = struct.unpack_from(fmt, buffer, offset)[0]
+        offset += struct.calcsize(fmt)
+        raw = bytes(buffer[offset : offset + n])
+        return (raw if tag in (0xC4, 0xC5, 0xC6) else raw.decode()), offset + n
+    containers = {0xDC: (">H", _unpack_array), 0xDD: (">I", _unpack_array), 0xDE: (">H", _unpack_map), 0xDF: (">I", _unpack_map)}
+    fmt, reader = containers[tag]
+    n = struct.unpack_from(fmt, buffer, offset)[0]
+    return reader(buffer, offset + struct.calcsize(fmt), n)
+
+
+def _unpack_array(buffer, offset, n):
+    items = []
+    for _ in range(n):
+        item, offset = _unpack(buffer, offset)
+        items.append(item)
+    return items, offset
+
+
+def _unpack_map(buffer, offset, n):
+    items = {}
+    for _ in range(n):
+        key, offset = _unpack(buffer, offset)
+        items[key], offset = _unpack(buffer, offset)
+    return items, offset
+
+
+_BYTE_TYPES = {1: "<i1", 2: "<i2", 3: "<i4", 4: "<u1", 5: "<u2", 6: "<u4", 32: "<f4", 33: "<f8"}
+
+
+def _decode(encodings, data):
+    current = data
+    for encoding in reversed(encodings):
+        kind = encoding["kind"]
+        if kind == "ByteArray":
+            current = np.frombuffer(current, dtype=_BYTE_TYPES[encoding["type"]])
+        elif kind == "FixedPoint":
+            current = current / encoding["factor"]
+        elif kind == "RunLength":
+            current = np.asarray(current, dtype=np.int64)
+            current = np.repeat(current[0::2], current[1::2])
+        elif kind == "Delta":
+            current = np.asarray(current, dtype=np.int64)
+            current = np.cumsum(np.concatenate(([current[0] + encoding["origin"]], current[1:])))
+        elif kind == "IntegerPacking":
+            if len(current) != encoding["srcSize"]:
+                upper = (0x7F if encoding["byteCount"] == 1 else 0x7FFF) if not encoding["isUnsigned"] else (0xFF if encoding["byteCount"] == 1 else 0xFFFF)
+                limits = (upper,) if encoding["isUnsigned"] else (upper, -upper - 1)
+                output, value = [], 0
+                for t in current.tolist():
+                    value += t
+                    if t not in limits:
+                        output.append(value)
+                        value = 0
+                current = np.array(output)
+        elif kind == "StringArray":
+            offsets = _decode(encoding["offsetEncoding"], encoding["offsets"])
+            indices = _decode(encoding["dataEncoding"], current)
+            strings = [encoding["stringData"][offsets[i - 1] : offsets[i]] for i in range(1, len(offsets))]
+            current = [strings[i] if i >= 0 else "" for i in indices]
+    return current
+
+
+def _decode_file(blob):
+    unpacked, offset = _unpack(blob)
+    assert offset == len(blob)
+    block = unpacked["dataBlocks"][0]
+    return unpacked, {
+        category["name"]: {column["name"]: _decode(column["data"]["encoding"], column["data"]["data"]) for column in category["columns"]}
+        for category in block["categories"]
+    }
+
+
+# --- Tests ---
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [1, 2, 3, 4, 5, 1000, 1001],
+        [0, 0, 0, 0, 7, 7, 7, 300000],
+        [-5, 128, -129, 40000, -40000, 0],
+        list(range(1, 2000)),
+        [],
+    ],
+)
+def test_int_encoding_roundtrip(values):
+    encodings, raw = bcif.encode_int_array(values)
+    assert _decode(encodings, raw).tolist() == values
+
+
+def test_integer_packing_handles_overflow_words():
+    encodings, raw = bcif.integer_packing(np.array([0, 255, 256, 1000, 3], dtype=np.int32))
+    assert encodings[0]["kind"] == "IntegerPacking"
+    assert encodings[0]["byteCount"] == 1
+    assert _decode(encodings, raw).tolist() == [0, 255, 256, 1000, 3]
+
+
+def test_float_and_string_roundtrip():
+    floats = np.array([1.2345, -10.5, 100.001, 0.0], dtype=np.float32)
+    encodings, raw = bcif.encode_float_array(floats)
+    np.testing.assert_allclose(_decode(encodings, raw), floats, atol=1e-3)
+
+    strings = ["CA", "N", "CA", "C", "O", "CA"]
+    encodings, raw = bcif.encode_string_array(strings)
+    assert _decode(encodings, raw) == strings
+
+
+def test_encode_molsys_payload_structure():
+    payload = {
+        "atoms": {
+            "atom_id": [1, 2, 3],
+            "atom_name": ["N", "CA", "O1"],
+            "residue_id": [1, 1, 2],
+            "residue_name": ["ALA", "ALA", "HOH"],
+            "chain_id": ["A", "A", "B"],
+            "entity_id": ["1", "1", "2"],
+            "element_symbol": ["N", "C", "O"],
+            "formal_charge": [0, 0, 0],
+        },
+        "coordinates": [
+            {"positions": [[0.0, 1.0, 2.0], [1.5, 1.0, 2.0], [9.0, 9.0, 9.0]], "cell": {"a": 30.0, "b": 30.0, "c": 30.0, "alpha": 90.0, "beta": 90.0, "gamma": 90.0}},
+            {"positions": [[0.1, 1.0, 2.0], [1.6, 1.0, 2.0], [9.1, 9.0, 9.0]]},
+        ],
+        "bonds": {"indexA": [0], "indexB": [1], "order": [1]},
+    }
+    blob = bcif.encode_molsys_payload(payload)
+    unpacked, categories = _decode_file(blob)
+
+    assert unpacked["version"] == bcif.BCIF_VERSION
+    atom_site = categories["_atom_site"]
+    assert atom_site["group_PDB"] == ["ATOM", "ATOM", "HETATM"] * 2
+    assert atom_site["pdbx_PDB_model_num"].tolist() == [1, 1, 1, 2, 2, 2]
+    assert atom_site["label_atom_id"] == ["N", "CA", "O1"] * 2
+    np.testing.assert_allclose(atom_site["Cartn_x"], [0.0, 1.5, 9.0, 0.1, 1.6, 9.1], atol=1e-3)
+    assert categories["_cell"]["length_a"].tolist() == [30.0]
+    assert categories["_molstar_bond_site"]["atom_id_2"].tolist() == [2]
+    assert categories["_molstar_bond_site"]["value_order"] == ["sing"]
+
+
+def test_packb_rejects_64bit_integers():
+    with pytest.raises(OverflowError):
+        bcif.packb(2**40)
@@ -0,0 +1,72 @@
+import gzip
+import zlib
+
+import pytest
+
+from molsysviewer._private.compression import CompressionOptions, compress, send_load_message
+
+
+class DummyView:
+    def __init__(self, compression=None) -> None:
+        self.messages = []
+        self.buffers = []
+        self.stats = {}
+        if compression is not None:
+            self.compression = compression
+
+    def _send(self, message, buffers=None):
+        self.messages.append(message)
+        self.buffers.append(buffers)
+
+
+def _message(data):
+    return {"op": "load_structure_from_string", "format": "pdb", "data": data, "label": "demo"}
+
+
+@pytest.mark.parametrize(
+    "codec, decompress",
+    [
+        ("gzip", gzip.decompress),
+        ("deflate", zlib.decompress),
+        ("deflate-raw", lambda blob: zlib.decompress(blob, -15)),
+    ],
+)
+def test_compress_roundtrip(codec, decompress):
+    data = b"ATOM      1  N   ALA A   1      11.104   6.134  -6.504  1.00  0.00           N\n" * 50
+    assert decompress(compress(data, codec)) == data
+
+
+def test_small_payloads_are_sent_as_text():
+    view = DummyView()
+    send_load_message(view, _message("ATOM\n"))
+
+    assert view.messages == [_message("ATOM\n")]
+    assert view.buffers == [None]
+    assert "compression" not in view.stats
+
+
+def test_large_payloads_travel_compressed():
+    text = "ATOM      1  N   ALA A   1      11.104   6.134  -6.504  1.00  0.00           N\n" * 200
+    view = DummyView(CompressionOptions(codec="gzip", threshold=1024))
+    send_load_message(view, _message(text))
+
+    assert view.messages == [{"op": "load_structure_from_string", "format": "pdb", "label": "demo", "compression": "gzip"}]
+    (blob,) = view.buffers[0]
+    assert gzip.decompress(blob).decode() == text
+    stats = view.stats["compression"]
+    assert stats["raw_bytes"] == len(text)
+    assert stats["ratio"] > 5
+
+
+def test_disabled_codec_and_other_ops_are_untouched():
+    view = DummyView(CompressionOptions(codec=None, threshold=0))
+    send_load_message(view, _message("ATOM\n"))
+    send_load_message(DummyView(), {"op": "load_molsys_payload", "payload": {}, "label": None})
+    assert view.messages == [_message("ATOM\n")]
+
+
+def test_invalid_options_are_rejected():
+    with pytest.raises(ValueError):
+        CompressionOptions(codec="brotli")
+    with pytest.raises(ValueError):
+        CompressionOptions(level=0)
@@ -0,0 +1,72 @@
+import pytest
+
+from molsysviewer._private.fetch import HTTPSession
+
+
+def test_session_reuses_pooled_connection(tmp_path, http_root):
+    root, base_url, log = http_root
+    (root / "a.pdb").write_text("ATOM a\n")
+    (root / "b.pdb").write_text("ATOM b\n")
+
+    session = HTTPSession(cache_dir=False)
+    assert session.get(base_url + "/a.pdb").text() == "ATOM a\n"
+    assert session.get(base_url + "/b.pdb").text() == "ATOM b\n"
+    session.close()
+
+    assert session.stats["requests"] == 2
+    assert session.stats["connections"] == 1
+    assert len({client_port for _path, client_port, _headers in log}) == 1
+
+
+def test_session_revalidates_from_disk_cache(tmp_path, http_root):
+    root, base_url, log = http_root
+    (root / "a.pdb").write_text("ATOM a\n")
+
+    first = HTTPSession(cache_dir=tmp_path / "cache").get(base_url + "/a.pdb")
+    # Una sesión nueva (p. ej. otro kernel) reutiliza la caché en disco.
+    second = HTTPSession(cache_dir=tmp_path / "cache").get(base_url + "/a.pdb")
+
+    assert not first.from_cache
+    assert second.from_cache
+    assert second.body == b"ATOM a\n"
+    assert "If-Modified-Since" in log[1][2]
+
+
+def test_session_raises_on_http_errors(http_root):
+    _root, base_url, _log = http_root
+    with pytest.raises(OSError):
+        HTTPSession(cache_dir=False).get(base_url + "/missing.pdb")
+
+
+@pytest.fixture
+def no_proxy_env(monkeypatch):
+    for name in ("http_proxy", "https_proxy", "no_proxy", "all_proxy"):
+        monkeypatch.delenv(name, raising=False)
+        monkeypatch.delenv(name.upper(), raising=False)
+    return monkeypatch
+
+
+def test_session_goes_through_the_environment_proxy(http_root, no_proxy_env):
+    root, base_url, log = http_root
+    # El servidor de pruebas hace de proxy: recibe la URL absoluta como ruta.
+    (root / "http:" / "pdb.example").mkdir(parents=True)
+    (root / "http:" / "pdb.example" / "a.pdb").write_text("ATOM proxied\n")
+    no_proxy_env.setenv("http_proxy", base_url.replace("http://", "http://user:secret@"))
+
+    session = HTTPSession(cache_dir=False)
+    assert session.get("http://pdb.example/a.pdb").text() == "ATOM proxied\n"
+    session.close()
+
+    path, _port, headers = log[0]
+    assert path == "http://pdb.example/a.pdb"
+    assert headers["Proxy-Authorization"] == "Basic dXNlcjpzZWNyZXQ="
+
+
+def test_session_honours_no_proxy(http_root, no_proxy_env):
+    root, base_url, log = http_root
+    (root / "a.pdb").write_text("ATOM a\n")
+    no_proxy_env.setenv("http_proxy", "http://127.0.0.1:9")
+    no_proxy_env.setenv("no_proxy", "127.0.0.1")
+
+    assert HTTPSession(cache_dir=False).get(base_url + "/a.pdb").text() == "ATOM a\n"
+    assert log[0][0] == "/a.pdb"
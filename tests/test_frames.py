@@ -0,0 +1,34 @@
+import numpy as np
+
+from molsysviewer._private.frames import encode_frames
+
+
+def _viewer_frames(n_frames, n_atoms):
+    rng = np.random.default_rng(1)
+    return [
+        {"positions": rng.normal(size=(n_atoms, 3)), "time": 0.1 * i, "cell": {"a": 1.0}}
+        for i in range(n_frames)
+    ]
+
+
+def test_encode_frames_matches_frame_by_frame():
+    frames = _viewer_frames(150, 7)
+    frames[3] = {"positions": np.zeros((6, 3))}  # forma incorrecta: se descarta
+    frames[10] = "not a frame"
+
+    encoded = encode_frames(
+        frames, 7, convert_cell=lambda cell: {"a": cell["a"] * 10.0}, chunk_frames=16
+    )
+
+    expected = [i for i in range(150) if i not in (3, 10)]
+    assert [frame["time"] for frame in encoded] == [0.1 * i for i in expected]
+    for frame, index in zip(encoded, expected):
+        np.testing.assert_allclose(frame["positions"], frames[index]["positions"] * 10.0)
+        assert frame["cell"] == {"a": 10.0}
+    assert isinstance(encoded[0]["positions"][0][0], float)
+
+
+def test_time_defaults_to_frame_index():
+    encoded = encode_frames([{"positions": [[0.1, 0.2, 0.3]]}], 1)
+    assert encoded == [{"positions": [[1.0, 2.0, 3.0]], "time": 0}]
+
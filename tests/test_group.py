@@ -0,0 +1,83 @@
+import types
+
+import molsysviewer.loaders.load_molsysmt as loader_mod
+from molsysviewer import MolSysViewGroup
+
+
+def test_group_serializes_once_and_keeps_per_view_masks(monkeypatch):
+    calls = {"convert": 0, "viewer_json": 0}
+    viewer_json = {
+        "atoms": {"atom_id": [1, 2]},
+        "frames": [{"positions": [[0.0, 0.0, 0.0], [0.1, 0.0, 0.0]]}],
+    }
+
+    def fake_convert(item, *, to_form=None, **_kwargs):
+        if to_form == "molsysmt.MolSys":
+            calls["convert"] += 1
+            return types.SimpleNamespace()
+        if to_form == "molsysmt.ViewerJSON":
+            calls["viewer_json"] += 1
+            return types.SimpleNamespace(to_dict=lambda: viewer_json)
+        raise AssertionError("Unexpected conversion request")
+
+    def fake_get(_item, *, element=None, n_atoms=False, **_kwargs):
+        return 2
+
+    import molsysviewer.group as group_mod
+
+    monkeypatch.setattr(loader_mod.msm, "convert", fake_convert)
+    monkeypatch.setattr(group_mod.msm, "get", fake_get)
+
+    group = MolSysViewGroup(3, sync_camera=True)
+    group.load("dummy", label="shared")
+
+    assert calls == {"convert": 1, "viewer_json": 1}
+    assert [msg["op"] for msg in group._pending_messages] == ["load_molsys_payload"]
+
+    for view in group:
+        assert view._pending_messages[0] == {
+            "op": "join_group",
+            "group_id": group.group_id,
+            "sync_camera": True,
+            "sync_frames": False,
+        }
+        assert view._molsys is group._molsys
+        assert view.atom_mask.tolist() == [True, True]
+
+    group[0].atom_mask[0] = False
+    assert group[1].atom_mask.tolist() == [True, True]
+
+    late = group.add_view()
+    assert late._molsys is group._molsys
+    assert len(group) == 4
+
+
+def test_group_load_replaces_the_state_of_each_view(monkeypatch):
+    import numpy as np
+
+    import molsysviewer.group as group_mod
+
+    monkeypatch.setattr(
+        loader_mod.msm,
+        "convert",
+        lambda item, *, to_form=None, **_kwargs: types.SimpleNamespace(to_dict=lambda: {"atoms": {}, "frames": []}),
+    )
+    monkeypatch.setattr(group_mod.msm, "get", lambda _item, *, element=None, n_atoms=False, **_kwargs: 2)
+
+    group = MolSysViewGroup(2)
+    view = group[0]
+    view.selections["site"] = np.array([5, 6])
+    view.atom_properties["rmsf"] = np.zeros(10)
+    cancelled = []
+    monkeypatch.setattr(view, "_cancel_load_job", lambda: cancelled.append(True))
+
+    group.load("dummy")
+
+    assert cancelled == [True]
+    assert view.selections == {} and view.atom_properties == {}
+    ops = [msg["op"] for msg in view._pending_messages]
+    assert "clear_selections" in ops and "remove_atom_property" in ops
+
+    group[1].selections["site"] = np.array([0])
+    group.reset_viewer()
+    assert group[1].selections == {} and group[1]._molsys is None and group[1].atom_mask is None
@@ -0,0 +1,116 @@
+import threading
+
+import molsysmt as msm
+import numpy as np
+import pytest
+
+from molsysviewer._private.lazy import DeferredMolSys, defer_molsys
+
+
+class DeferringView:
+    """Vista mínima con el mismo protocolo de diferido que MolSysView."""
+
+    def __init__(self) -> None:
+        self.pending = None
+        self._molsys = None
+        self.atom_mask = None
+
+    def _defer_molsys(self, deferred):
+        self.pending = deferred
+
+
+class EagerView:
+    def __init__(self) -> None:
+        self._molsys = None
+        self.atom_mask = None
+
+
+@pytest.fixture
+def fake_get(monkeypatch):
+    monkeypatch.setattr(msm, "get", lambda molsys, **kwargs: len(molsys))
+
+
+def test_deferred_converts_once(fake_get):
+    calls = []
+
+    def convert():
+        calls.append(1)
+        return "abc"
+
+    deferred = DeferredMolSys(convert)
+    assert not deferred.done
+    molsys, mask = deferred.result()
+    deferred.result()
+
+    assert calls == [1]
+    assert molsys == "abc"
+    assert mask.tolist() == [True, True, True]
+
+
+def test_deferred_background_result_waits(fake_get):
+    release = threading.Event()
+
+    def convert():
+        release.wait(5)
+        return "ab"
+
+    deferred = DeferredMolSys(convert)
+    deferred.start()
+    release.set()
+    molsys, mask = deferred.result()
+    assert molsys == "ab"
+    assert mask.shape == (2,)
+
+
+def test_deferred_reraises_conversion_errors(fake_get):
+    def convert():
+        raise RuntimeError("boom")
+
+    deferred = DeferredMolSys(convert)
+    with pytest.raises(RuntimeError):
+        deferred.result()
+    assert deferred.done
+
+
+def test_defer_molsys_modes(fake_get):
+    view = DeferringView()
+    assert defer_molsys(view, lambda: "ab", parse="lazy") is view.pending
+    assert view._molsys is None
+
+    eager = EagerView()
+    assert defer_molsys(eager, lambda: "ab", parse="lazy") is None
+    assert eager._molsys == "ab"
+    assert np.all(eager.atom_mask)
+
+    with pytest.raises(ValueError):
+        defer_molsys(view, lambda: "ab", parse="later")
+
+
+def test_view_resolves_molsys_on_first_selection_use(fake_get, monkeypatch):
+    from molsysviewer import MolSysView
+    from molsysviewer.loaders import load_pdb_string
+
+    calls = []
+
+    def fake_convert(item, **kwargs):
+        calls.append(item)
+        return "abcd"
+
+    monkeypatch.setattr(msm, "convert", fake_convert)
+
+    view = MolSysView()
+    load_pdb_string(view, pdb_string="ATOM\n", parse="lazy")
+
+    assert calls == []
+    assert not view.molsys_ready
+    assert view._pending_messages[0]["op"] == "load_structure_from_string"
+
+    assert view.visible_atom_indices == [0, 1, 2, 3]
+    assert calls == ["ATOM\n"]
+    assert view.molsys_ready
+
+    # Un reset descarta la conversión pendiente sin ejecutarla.
+    load_pdb_string(view, pdb_string="ATOM\n", parse="lazy")
+    view.reset_viewer()
+    assert view._molsys is None
+    assert calls == ["ATOM\n"]
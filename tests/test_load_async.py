@@ -0,0 +1,111 @@
+import asyncio
+import threading
+from concurrent.futures import CancelledError
+
+import molsysmt as msm
+import pytest
+
+from molsysviewer import MolSysView
+
+
+@pytest.fixture
+def slow_convert(monkeypatch):
+    """Conversión que espera a que el test la libere (una Event por sistema)."""
+    gates: dict[str, threading.Event] = {}
+
+    def fake_convert(system, **kwargs):
+        gates.setdefault(system, threading.Event()).wait(5)
+        return system
+
+    monkeypatch.setattr(msm, "convert", fake_convert)
+    monkeypatch.setattr(msm, "get", lambda molsys, element, n_atoms: 3)
+    monkeypatch.setattr(
+        "molsysviewer.loaders.load_molsysmt._serialize_molsys_payload",
+        lambda molsys: {"atoms": {"name": [molsys]}},
+    )
+
+    def release(system):
+        gates.setdefault(system, threading.Event()).set()
+
+    return release
+
+
+def _loaded_names(view):
+    return [msg["payload"]["atoms"]["name"][0] for msg in view._pending_messages if msg["op"] == "load_molsys_payload"]
+
+
+def test_load_background_returns_before_conversion(slow_convert):
+    view = MolSysView()
+    job = view.load("a.pdb", background=True)
+
+    assert not job.done() and _loaded_names(view) == []
+    slow_convert("a.pdb")
+    assert job.result(timeout=5) is None
+    assert _loaded_names(view) == ["a.pdb"]
+    assert view._molsys == "a.pdb" and view.atom_mask.size == 3
+
+
+def test_new_load_cancels_superseded_one(slow_convert):
+    view = MolSysView()
+    first = view.load_async("a.pdb")
+    second = view.load_async("b.pdb")
+
+    assert first.cancelled()
+    slow_convert("a.pdb")
+    slow_convert("b.pdb")
+    second.result(timeout=5)
+    with pytest.raises(CancelledError):
+        first.result(timeout=5)
+    assert _loaded_names(view) == ["b.pdb"]
+
+
+def test_synchronous_load_cancels_background_load(slow_convert):
+    view = MolSysView()
+    job = view.load_async("a.pdb")
+    slow_convert("b.pdb")
+    view.load("b.pdb")
+    slow_convert("a.pdb")
+
+    with pytest.raises(CancelledError):
+        job.result(timeout=5)
+    assert _loaded_names(view) == ["b.pdb"]
+
+
+def test_text_load_cancels_background_load(slow_convert):
+    from molsysviewer.loaders import load_pdb_string
+
+    view = MolSysView()
+    job = view.load_async("a.pdb")
+    slow_convert("ATOM\n")
+    load_pdb_string(view, pdb_string="ATOM\n", parse="eager")
+    slow_convert("a.pdb")
+
+    with pytest.raises(CancelledError):
+        job.result(timeout=5)
+    assert _loaded_names(view) == []
+    assert view._molsys == "ATOM\n"
+    assert view._pending_messages[-1]["op"] == "load_structure_from_string"
+
+
+def test_keyed_load_async_is_awaitable(slow_convert):
+    view = MolSysView()
+    slow_convert("ligand.pdb")
+
+    async def run():
+        return await view.load_async("ligand.pdb", key="ligand")
+
+    handle = asyncio.run(run())
+    assert handle is view.structures["ligand"]
+    assert view._pending_messages[-1]["structure"] == "ligand"
+
+
+def test_conversion_errors_are_raised_by_result(monkeypatch):
+    def failing_convert(system, **kwargs):
+        raise RuntimeError("bad file")
+
+    monkeypatch.setattr(msm, "convert", failing_convert)
+    view = MolSysView()
+    job = view.load_async("broken.pdb")
+    with pytest.raises(RuntimeError, match="bad file"):
+        job.result(timeout=5)
+    assert view._molsys is None
@@ -0,0 +1,90 @@
+import gc
+
+import molsysmt as msm
+import numpy as np
+import pytest
+
+from molsysviewer import MolSysView
+from molsysviewer._private.memory import estimate_nbytes
+from molsysviewer._private.topology import TopologyIndex
+
+
+class FakeMolSys:
+    def __init__(self, n_atoms):
+        self.coordinates = np.zeros((n_atoms, 3))
+
+
+class Source:
+    """Objeto de entrada que admite referencias débiles."""
+
+
+@pytest.fixture
+def fake_load(monkeypatch):
+    monkeypatch.setattr(msm, "convert", lambda system, **kwargs: FakeMolSys(4))
+    monkeypatch.setattr(msm, "get", lambda molsys, element, n_atoms: 4)
+    monkeypatch.setattr("molsysviewer.loaders.load_molsysmt._serialize_molsys_payload", lambda molsys: {"atoms": {}})
+    monkeypatch.setattr(
+        "molsysviewer.structures.TopologyIndex.from_molsys",
+        classmethod(lambda cls, molsys: TopologyIndex(4, {"chain": [0, 0, 1, 1]}, {"chain_id": ["A", "B"]})),
+    )
+
+
+def test_weak_and_dropped_source(fake_load):
+    view = MolSysView()
+    view.set_memory_policy(source="weak")
+    source = Source()
+    view.load(source)
+    assert view.molecular_system is source
+    del source
+    gc.collect()
+    assert view.molecular_system is None
+
+    view.set_memory_policy(source="drop")
+    view.load(Source())
+    assert view.molecular_system is None
+
+
+def test_topology_policy_releases_molsys(fake_load):
+    view = MolSysView()
+    view.set_memory_policy(molsys="topology")
+    view.load("system.pdb")
+
+    assert view._molsys is None
+    view.isolate("chain_id == 'B'")
+    assert view.atom_mask.tolist() == [False, False, True, True]
+    with pytest.raises(ValueError, match="memory policy"):
+        view.hide("atom_name == 'CA' within 3 of chain_id == 'A'")
+
+    # Un MolSys nuevo vuelve a resolver selecciones con msm.select.
+    view.set_memory_policy()
+    view.load("system.pdb")
+    assert isinstance(view._molsys, FakeMolSys)
+
+
+def test_memory_report(fake_load):
+    view = MolSysView()
+    view.load("system.pdb")
+    view.load("ligand.pdb", key="ligand")
+    view.set_atom_property("rmsf", np.ones(4))
+
+    report = view.memory_report()
+    assert report["molsys"] >= 4 * 3 * 8
+    assert report["atom_mask"] == 4
+    assert report["atom_properties"] > 0
+    assert report["pending_messages"] > 0
+    assert report["structures"]["ligand"]["molsys"] >= 4 * 3 * 8
+    assert report["total"] == (
+        sum(value for key, value in report.items() if key not in ("structures", "total"))
+        + report["structures"]["ligand"]["total"]
+    )
+
+    view.set_memory_policy(molsys="topology")
+    assert view.memory_report()["molsys"] == 0
+
+
+def test_estimate_nbytes_counts_shared_arrays_once():
+    block = np.zeros(1000)
+    assert estimate_nbytes([block, block[10:], {"a": block}]) < 2 * block.nbytes
+    seen = set()
+    estimate_nbytes(block, seen)
+    assert estimate_nbytes({"again": block}, seen) < block.nbytes
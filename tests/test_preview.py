@@ -0,0 +1,110 @@
+import molsysmt as msm
+import numpy as np
+import pytest
+
+import molsysviewer._private.preview as preview_mod
+from molsysviewer import MolSysView
+from molsysviewer._private.preview import PreviewOptions, bead_centroids, bead_index
+
+GROUP_INDEX = np.array([5, 5, 5, 2, 2, 9])
+COORDINATES = np.arange(18, dtype=float).reshape(1, 6, 3)
+
+
+@pytest.fixture
+def fake_system(monkeypatch):
+    converted = []
+
+    def fake_convert(system, **kwargs):
+        selection = kwargs.get("selection", "all")
+        converted.append(selection)
+        return "molsys" if isinstance(selection, str) else "detail"
+
+    def fake_get(molsys, element=None, **kwargs):
+        (attribute,) = kwargs
+        values = {
+            ("atom", "n_atoms"): 6,
+            ("atom", "group_index"): GROUP_INDEX,
+            ("atom", "chain_index"): np.array([0, 0, 0, 1, 1, 1]),
+            ("atom", "coordinates"): COORDINATES,
+            ("group", "group_name"): np.array([f"R{i}" for i in range(10)]),
+            ("group", "group_id"): np.arange(100, 110),
+            ("chain", "chain_id"): np.array(["A", "B"]),
+        }
+        return values[(element, attribute)]
+
+    monkeypatch.setattr(msm, "convert", fake_convert)
+    monkeypatch.setattr(msm, "get", fake_get)
+    monkeypatch.setattr(msm, "select", lambda molsys, selection, syntax: np.asarray(selection))
+    monkeypatch.setattr(preview_mod.puw, "get_value", lambda value, to_unit=None: value, raising=False)
+    monkeypatch.setattr(
+        "molsysviewer.loaders.load_molsysmt._serialize_molsys_payload", lambda molsys: {"atoms": {"name": [molsys]}}
+    )
+    return converted
+
+
+def _payload_messages(view):
+    return [msg for msg in view._pending_messages if msg["op"] == "load_molsys_payload"]
+
+
+def test_beads_follow_atom_order_and_average_every_frame():
+    bead, n_beads = bead_index(6, group_index=GROUP_INDEX)
+    assert bead.tolist() == [0, 0, 0, 1, 1, 2] and n_beads == 3
+
+    coordinates = np.stack([COORDINATES[0], COORDINATES[0] + 1.0])
+    centroids, first_atom = bead_centroids(coordinates, bead, n_beads)
+    assert centroids.shape == (2, 3, 3)
+    np.testing.assert_allclose(centroids[0, 1], COORDINATES[0, 3:5].mean(axis=0))
+    np.testing.assert_allclose(centroids[1] - centroids[0], 1.0)
+    assert first_atom.tolist() == [0, 3, 5]
+
+    bead, n_beads = bead_index(7, atoms_per_bead=3)
+    assert bead.tolist() == [0, 0, 0, 1, 1, 1, 2] and n_beads == 3
+
+    with pytest.raises(ValueError):
+        PreviewOptions(beads=0)
+
+
+def test_manual_preview_then_region_and_full_refinement(fake_system):
+    view = MolSysView()
+    view.set_preview(refine="manual")
+    view.load("assembly.cif", preview=True)
+
+    (preview,) = _payload_messages(view)
+    atoms = preview["payload"]["atoms"]
+    assert atoms["atom_name"] == ["CA"] * 3
+    assert atoms["residue_name"] == ["R5", "R2", "R9"] and atoms["chain_id"] == ["A", "B", "B"]
+    np.testing.assert_allclose(preview["payload"]["coordinates"][0]["positions"][2], COORDINATES[0, 5])
+    assert view.previewing and view.atom_mask.size == 6
+
+    view.isolate([3])
+    assert view._pending_messages[-1]["options"]["visible_atom_indices"] == [1]
+
+    view.refine([0, 1])
+    detail = view._pending_messages[-1]
+    assert detail["structure"] == "#detail" and detail["payload"]["atoms"]["name"] == ["detail"]
+    assert fake_system[-1].tolist() == [0, 1]
+
+    view.refine()
+    assert {"op": "remove_structure", "structure": "#detail"} in view._pending_messages
+    full = _payload_messages(view)[-1]
+    assert full["payload"]["atoms"]["name"] == ["molsys"]
+    assert not view.previewing
+    # La visibilidad se reenvía con índices atómicos.
+    assert view._pending_messages[-1]["options"]["visible_atom_indices"] == [3]
+
+
+def test_threshold_and_background_refinement(fake_system):
+    view = MolSysView()
+    view.load("small.pdb")
+    assert not view.previewing
+
+    view.set_preview(threshold=5)
+    view.load("assembly.cif")
+    job = view._load_job
+    assert job is not None
+    job.result(timeout=5)
+
+    messages = _payload_messages(view)
+    assert messages[-2]["payload"]["atoms"]["atom_name"] == ["CA"] * 3
+    assert messages[-1]["payload"]["atoms"]["name"] == ["molsys"]
+    assert not view.previewing
@@ -0,0 +1,96 @@
+import molsysmt as msm
+import numpy as np
+import pytest
+
+from molsysviewer import MolSysView
+from molsysviewer._private.progressive import ProgressiveOptions, chunk_of_atoms, split_payload
+
+# Tres residuos en la cadena A (2+2+1 átomos) y uno en la B (3 átomos); el de B está junto al primero.
+POSITIONS = [[0, 0, 0], [1, 0, 0], [50, 0, 0], [51, 0, 0], [90, 0, 0], [0, 2, 0], [1, 2, 0], [2, 2, 0]]
+
+
+def _payload():
+    return {
+        "atoms": {
+            "atom_id": list(range(1, 9)),
+            "atom_name": [f"A{i}" for i in range(8)],
+            "residue_id": [1, 1, 2, 2, 3, 1, 1, 1],
+            "chain_id": ["A"] * 5 + ["B"] * 3,
+        },
+        "bonds": {"indexA": [0, 1, 2, 5, 6], "indexB": [1, 2, 3, 6, 7], "order": [1, 2, 1, 1, 1]},
+        "coordinates": [
+            {"positions": [list(map(float, p)) for p in POSITIONS], "time": 0, "cell": {"a": 10.0}},
+            {"positions": [[0.0, 0.0, 0.0]] * 8, "time": 1},
+        ],
+    }
+
+
+def _decode(chunk_msg, buffers):
+    indices = np.frombuffer(buffers[0], dtype="<i4")
+    positions = np.frombuffer(buffers[1], dtype="<f4").reshape(-1, 3)
+    return indices, positions
+
+
+def test_chunks_keep_groups_whole():
+    chunk, n_chunks = chunk_of_atoms(_payload(), chunk_atoms=2)
+    assert chunk.tolist() == [0, 0, 1, 1, 2, 2, 2, 2] and n_chunks == 3
+
+    # Los residuos cercanos al origen van juntos y primero.
+    chunk, n_chunks = chunk_of_atoms(_payload(), chunk_atoms=5, order="spatial")
+    assert chunk.tolist() == [0, 0, 1, 1, 1, 0, 0, 0] and n_chunks == 2
+
+    with pytest.raises(ValueError):
+        ProgressiveOptions(order="random")
+
+
+def test_split_payload_messages_reassemble_the_payload():
+    msg = {"op": "load_molsys_payload", "payload": _payload(), "label": "big"}
+    chunks, finish = split_payload(msg, chunk_atoms=2)
+
+    assert [chunk_msg["chunk"] for chunk_msg, _ in chunks] == [0, 1, 2]
+    assert {chunk_msg["load_id"] for chunk_msg, _ in chunks} == {finish["load_id"]}
+    names = [None] * 8
+    for chunk_msg, buffers in chunks:
+        indices, positions = _decode(chunk_msg, buffers)
+        np.testing.assert_allclose(positions, np.asarray(POSITIONS, dtype=float)[indices])
+        for index, name in zip(indices, chunk_msg["atoms"]["atom_name"]):
+            names[index] = name
+    assert names == [f"A{i}" for i in range(8)]
+
+    # Sólo los enlaces internos al bloque, con índices locales; el 1-2 cruza bloques.
+    assert chunks[0][0]["bonds"] == {"indexA": [0], "indexB": [1], "order": [1]}
+    assert chunks[1][0]["bonds"] == {"indexA": [0], "indexB": [1], "order": [1]}
+    assert chunks[2][0]["bonds"] == {"indexA": [1, 2], "indexB": [2, 3], "order": [1, 1]}
+
+    assert finish["op"] == "finish_payload_chunks" and finish["n_atoms"] == 8
+    assert finish["payload"]["bonds"] == _payload()["bonds"]
+    assert finish["payload"]["coordinates"][0] == {"time": 0, "cell": {"a": 10.0}}
+    assert finish["payload"]["coordinates"][1]["time"] == 1
+    assert "atoms" not in finish["payload"]
+
+    assert split_payload(msg, chunk_atoms=100) is None
+
+
+def test_progressive_load_sends_chunks_then_finish(monkeypatch):
+    monkeypatch.setattr(msm, "convert", lambda *args, **kwargs: "molsys")
+    monkeypatch.setattr(msm, "get", lambda molsys, element, n_atoms: 8)
+    monkeypatch.setattr("molsysviewer.loaders.load_molsysmt._serialize_molsys_payload", lambda molsys: _payload())
+
+    view = MolSysView()
+    view.load("big.pdb")
+    assert [msg["op"] for msg in view._pending_messages] == ["load_molsys_payload"]
+
+    view.set_progressive(threshold=4, chunk_atoms=2)
+    view.load("big.pdb", label="big")
+    ops = [msg["op"] for msg in view._pending_messages[1:]]
+    assert ops == ["load_payload_chunk"] * 3 + ["finish_payload_chunks"]
+    assert all(len(buffers) == 2 for buffers in view._pending_buffers[1:4])
+    assert view.atom_mask.size == 8
+
+    view.load("big.pdb", progressive=False)
+    assert view._pending_messages[-1]["op"] == "load_molsys_payload"
+
+    view.widget._handle_custom_msg(
+        {"event": "load_progress", "load_id": 1, "chunks": 1, "n_chunks": 3, "done": False}, []
+    )
+    assert view.stats["load_progress"]["chunks"] == 1
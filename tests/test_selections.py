@@ -0,0 +1,85 @@
+import molsysmt as msm
+import numpy as np
+import pytest
+
+from molsysviewer import MolSysView
+
+
+def make_view():
+    view = MolSysView()
+    view._molsys = object()
+    view.atom_mask = np.ones(6, dtype=bool)
+    return view
+
+
+def test_define_selection_sends_indices_once_as_buffer(monkeypatch):
+    view = make_view()
+    monkeypatch.setattr(msm, "select", lambda molsys, selection, syntax: np.array([4, 1, 1, 2]))
+
+    indices = view.define_selection("site", "resid 10 to 12")
+
+    assert indices.tolist() == [1, 2, 4]
+    msg = view._pending_messages[-1]
+    assert msg == {"op": "define_selection", "name": "site", "count": 3}
+    (buffer,) = view._pending_buffers[-1]
+    assert np.frombuffer(buffer, dtype="<i4").tolist() == [1, 2, 4]
+
+
+def test_isolate_by_name_sends_only_the_name(monkeypatch):
+    view = make_view()
+    view.define_selection("site", [0, 3])
+    monkeypatch.setattr(msm, "select", lambda *args, **kwargs: pytest.fail("msm.select should not be called"))
+
+    view.isolate("site")
+
+    assert view.visible_atom_indices == [0, 3]
+    options = view._pending_messages[-1]["options"]
+    assert options["selection"] == "site"
+    assert "visible_atom_indices" not in options
+
+    view.hide("site")
+    assert view.visible_atom_indices == []
+    assert view._pending_messages[-1]["options"]["visible_atom_indices"] == []
+
+
+def test_redefine_and_remove_selection():
+    view = make_view()
+    view.define_selection("site", [0])
+    view.define_selection("site", [1, 2])
+    assert view.selections["site"].tolist() == [1, 2]
+
+    view.remove_selection("site")
+    assert "site" not in view.selections
+    assert view._pending_messages[-1] == {"op": "remove_selection", "name": "site"}
+
+
+def test_define_selection_validates_input():
+    view = MolSysView()
+    with pytest.raises(ValueError):
+        view.define_selection("", [0])
+    with pytest.raises(ValueError):
+        view.define_selection("site", "chain A")
+    with pytest.raises(ValueError):
+        view.define_selection("site", [-1])
+
+
+def test_load_forgets_named_selections(monkeypatch):
+    view = make_view()
+    view.define_selection("site", [4, 5])
+
+    monkeypatch.setattr(msm, "convert", lambda *args, **kwargs: object())
+    monkeypatch.setattr(msm, "get", lambda molsys, element, n_atoms: 3)
+    monkeypatch.setattr("molsysviewer.loaders.load_molsysmt._serialize_molsys_payload", lambda molsys: {"atoms": {}})
+    view.load("smaller.pdb")
+
+    assert view.selections == {}
+    ops = [msg["op"] for msg in view._pending_messages]
+    assert ops.index("clear_selections") < ops.index("load_molsys_payload")
+
+    # "site" ya no es una selección con nombre: se resuelve contra el sistema nuevo.
+    def fake_select(molsys, selection, syntax):
+        raise ValueError(f"Unknown selection {selection!r}")
+
+    monkeypatch.setattr(msm, "select", fake_select)
+    with pytest.raises(ValueError):
+        view.isolate("site")
@@ -0,0 +1,152 @@
+import itertools
+
+import molsysmt as msm
+import numpy as np
+import pytest
+
+import molsysviewer.structures as structures_mod
+from molsysviewer import MolSysView
+from molsysviewer._private.spatial import SpatialIndex, aggregate_contacts, contact_pairs
+
+BOX = np.array([[30.0, 0.0, 0.0], [6.0, 28.0, 0.0], [3.0, 4.0, 27.0]])
+
+
+def _brute_force(positions, points, radius, box=None):
+    shifts = np.zeros((1, 3))
+    if box is not None:
+        shifts = np.array(list(itertools.product((-1, 0, 1), repeat=3))) @ box
+    found = set()
+    for query, point in enumerate(points):
+        distance = np.linalg.norm(positions[None] + shifts[:, None] - point, axis=2).min(axis=0)
+        found.update((query, atom) for atom in np.flatnonzero(distance <= radius))
+    return found
+
+
+@pytest.mark.parametrize("box", [None, BOX])
+def test_pairs_and_nearest_match_brute_force(box):
+    rng = np.random.default_rng(3)
+    positions = rng.uniform(0, 30, size=(800, 3))
+    points = rng.uniform(-5, 35, size=(40, 3))
+    index = SpatialIndex(positions, box, cell_size=4.0)
+
+    query, atom, distance = index.pairs_within(points, 6.0)
+    assert set(zip(query.tolist(), atom.tolist())) == _brute_force(positions, points, 6.0, box)
+    assert np.all(distance <= 6.0)
+
+    indices, distances = index.nearest(points, k=3)
+    for row, point in enumerate(points):
+        shifts = np.zeros((1, 3)) if box is None else np.array(list(itertools.product((-1, 0, 1), repeat=3))) @ box
+        expected = np.sort(np.linalg.norm(positions[None] + shifts[:, None] - point, axis=2).min(axis=0))[:3]
+        np.testing.assert_allclose(distances[row], expected)
+    assert indices.shape == (40, 3) and (indices >= 0).all()
+
+
+def test_update_reuses_the_grid():
+    rng = np.random.default_rng(4)
+    positions = rng.uniform(0, 30, size=(500, 3))
+    index = SpatialIndex(positions, BOX, cell_size=5.0)
+    moved = positions + rng.normal(scale=0.3, size=positions.shape)
+    index.update(moved, BOX)
+    assert index.stats["builds"] == 1 and index.stats["updates"] == 1
+    points = rng.uniform(0, 30, size=(20, 3))
+    query, atom, _ = index.pairs_within(points, 5.0)
+    assert set(zip(query.tolist(), atom.tolist())) == _brute_force(moved, points, 5.0, BOX)
+
+    index.update(moved, BOX * 1.1)
+    assert index.stats["builds"] == 2
+
+
+@pytest.fixture
+def fake_system(monkeypatch):
+    positions = np.array([[0, 0, 0], [1, 0, 0], [10, 0, 0], [11, 0, 0], [3, 0, 0], [30, 0, 0]], dtype=float)
+    calls = []
+
+    def fake_get(molsys, element, **kwargs):
+        if kwargs.get("n_atoms"):
+            return 6
+        if kwargs.get("coordinates"):
+            calls.append(kwargs["structure_indices"])
+            return (positions + 0.5 * kwargs["structure_indices"][0])[None] / 10.0
+        if kwargs.get("box"):
+            return None
+        if kwargs.get("group_index"):
+            return np.array([0, 0, 1, 1, 2, 3])
+        raise AttributeError(kwargs)
+
+    monkeypatch.setattr(msm, "convert", lambda *args, **kwargs: "molsys")
+    monkeypatch.setattr(msm, "get", fake_get)
+    monkeypatch.setattr(msm, "select", lambda molsys, selection, syntax: np.asarray(selection))
+    monkeypatch.setattr(structures_mod.puw, "get_value", lambda value, to_unit=None: value * 10.0, raising=False)
+    monkeypatch.setattr("molsysviewer.loaders.load_molsysmt._serialize_molsys_payload", lambda molsys: None)
+    monkeypatch.setattr(msm, "convert", lambda *args, **kwargs: "molsys" if "to_form" not in kwargs or kwargs["to_form"] != "string:pdb" else "PDB")
+    return calls
+
+
+def test_select_within(fake_system):
+    view = MolSysView()
+    view.load("system.pdb")
+
+    assert view.select_within(2.5, of=[0]).tolist() == [0, 1]
+    assert view.select_within(2.5, of=[0], selection=[1, 4, 5]).tolist() == [1]
+    assert view.select_within(1.5, of=np.array([[10.5, 0.0, 0.0]])).tolist() == [2, 3]
+    assert view.select_within(2.5, of=[4], level="group").tolist() == [0, 1, 4]
+
+    # El índice se construye una vez; otro frame sólo actualiza posiciones.
+    index = view.spatial_index()
+    assert view.spatial_index() is index and len(fake_system) == 1
+    assert view.spatial_index(frame=1) is index and index.stats["updates"] == 1
+    assert index.positions[0].tolist() == [0.5, 0.5, 0.5] and len(fake_system) == 2
+    assert view.shapes.spatial_index(1) is index
+
+
+@pytest.mark.parametrize("box", [None, BOX])
+def test_contact_pairs_match_brute_force(box):
+    rng = np.random.default_rng(5)
+    positions = rng.uniform(0, 30, size=(600, 3))
+    index = SpatialIndex(positions, box)
+    atoms_a, atoms_b = np.arange(0, 300), np.arange(200, 600)
+
+    pairs, distances = contact_pairs(index, atoms_a, atoms_b, 4.0)
+    expected = {
+        frozenset((int(atoms_a[q]), int(atoms_b[t])))
+        for q, t in _brute_force(positions[atoms_b], positions[atoms_a], 4.0, box)
+        if atoms_a[q] != atoms_b[t]
+    }
+    found = [frozenset(pair) for pair in pairs.tolist()]
+    assert len(found) == len(set(found)) and set(found) == expected
+    assert np.isin(pairs[:, 0], atoms_a).all() and np.isin(pairs[:, 1], atoms_b).all()
+    assert np.all(distances <= 4.0)
+
+
+def test_aggregate_contacts_keeps_the_closest_pair():
+    pairs = np.array([[0, 2], [1, 3], [1, 2], [0, 1], [4, 0]])
+    distances = np.array([3.0, 2.0, 2.5, 1.0, 3.5])
+    group_of_atom = np.array([0, 0, 1, 1, 2])
+
+    kept, kept_distances, counts = aggregate_contacts(pairs, distances, group_of_atom)
+    assert kept.tolist() == [[1, 3], [4, 0]]
+    assert kept_distances.tolist() == [2.0, 3.5] and counts.tolist() == [3, 1]
+
+
+def test_select_within_needs_coordinates():
+    with pytest.raises(ValueError):
+        MolSysView().select_within(3.0, of=[0])
+
+
+def test_add_contact_network(fake_system):
+    view = MolSysView()
+    view.load("system.pdb")
+
+    assert view.shapes.add_contact_network([0, 1], [2, 3, 4, 5], cutoff=2.5, color_map="turbo") == 1
+    msg, buffers = view._pending_messages[-1], view._pending_buffers[-1]
+    assert msg["op"] == "add_network_links"
+    assert msg["options"]["binary"] and msg["options"]["color_mode"] == "distance"
+    assert np.frombuffer(buffers[0], dtype="<i4").tolist() == [1, 4]
+    assert np.frombuffer(buffers[1], dtype="<f4").tolist() == [2.0]
+
+    # Por grupos: los contactos dentro del mismo grupo desaparecen.
+    assert view.shapes.add_contact_network("all", cutoff=2.5, level="group") == 1
+    assert len(view._pending_buffers[-1]) == 3
+    assert np.frombuffer(view._pending_buffers[-1][2], dtype="<i4").tolist() == [1]
+
+    assert view.shapes.add_contact_network([5], [0, 1], cutoff=2.5) == 0
@@ -0,0 +1,82 @@
+import molsysmt as msm
+import numpy as np
+import pytest
+
+from molsysviewer import MolSysView
+from molsysviewer.structures import StructureHandle
+
+
+@pytest.fixture
+def fake_molsysmt(monkeypatch):
+    sizes = {"protein": 4, "ligand": 2}
+    monkeypatch.setattr(msm, "convert", lambda system, **kwargs: {"name": system})
+    monkeypatch.setattr(msm, "get", lambda molsys, element, n_atoms: sizes[molsys["name"]])
+    monkeypatch.setattr(msm, "select", lambda molsys, selection, syntax: np.asarray(selection))
+    monkeypatch.setattr(
+        "molsysviewer.loaders.load_molsysmt._serialize_molsys_payload", lambda molsys: {"atoms": molsys}
+    )
+
+
+def test_load_with_key_returns_handle_and_tags_messages(fake_molsysmt):
+    view = MolSysView()
+
+    protein = view.load("protein", key="protein")
+    ligand = view.load("ligand", key="ligand")
+
+    assert isinstance(protein, StructureHandle)
+    assert view.structures == {"protein": protein, "ligand": ligand}
+    assert view._molsys is None
+    loads = [msg for msg in view._pending_messages if msg["op"] == "load_molsys_payload"]
+    assert [(msg["structure"], msg["label"]) for msg in loads] == [("protein", "protein"), ("ligand", "ligand")]
+
+
+def test_structures_have_independent_masks_and_selections(fake_molsysmt):
+    view = MolSysView()
+    protein = view.load("protein", key="protein")
+    ligand = view.load("ligand", key="ligand")
+
+    protein.define_selection("site", [1, 2])
+    protein.isolate("site")
+    ligand.hide([0])
+
+    assert protein.visible_atom_indices == [1, 2]
+    assert ligand.visible_atom_indices == [1]
+    assert "site" not in ligand.selections
+    isolate, hide = view._pending_messages[-2:]
+    assert isolate["structure"] == "protein"
+    assert isolate["options"]["selection"] == "site"
+    assert hide["structure"] == "ligand"
+    assert hide["options"]["visible_atom_indices"] == [1]
+
+
+def test_handle_shapes_are_bound_to_their_structure(fake_molsysmt):
+    view = MolSysView()
+    ligand = view.load("ligand", key="ligand")
+
+    ligand.shapes.add_sphere(center=[0, 0, 0], radius=1.0)
+
+    assert view._pending_messages[-1]["op"] == "add_sphere"
+    assert view._pending_messages[-1]["structure"] == "ligand"
+
+
+def test_remove_structure_keeps_the_others(fake_molsysmt):
+    view = MolSysView()
+    protein = view.load("protein", key="protein")
+    ligand = view.load("ligand", key="ligand")
+
+    ligand.remove()
+
+    assert view._pending_messages[-1] == {"op": "remove_structure", "structure": "ligand"}
+    assert list(view.structures) == ["protein"]
+    assert ligand.removed and not protein.removed
+    with pytest.raises(RuntimeError):
+        ligand.hide("all")
+
+    view.reset_viewer()
+    assert view.structures == {}
+
+
+def test_structure_key_must_be_a_non_empty_string():
+    view = MolSysView()
+    with pytest.raises(ValueError):
+        view.structure("")
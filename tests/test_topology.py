@@ -0,0 +1,115 @@
+import molsysmt as msm
+import numpy as np
+import pytest
+
+from molsysviewer._private.topology import TopologyIndex, UnsupportedSelection, fast_select
+
+
+@pytest.fixture
+def index():
+    # 10 átomos, 4 grupos, 2 cadenas; la cadena 1 va antes en memoria (niveles no contiguos).
+    group_index = [0, 0, 0, 1, 1, 2, 2, 2, 3, 3]
+    chain_index = [1, 1, 1, 1, 1, 0, 0, 0, 0, 0]
+    molecule_index = [0, 0, 0, 0, 0, 1, 1, 1, 2, 2]
+    return TopologyIndex(
+        10,
+        {"group": group_index, "chain": chain_index, "molecule": molecule_index},
+        {
+            "atom_name": ["N", "CA", "C", "N", "CA", "N", "CA", "C", "O", "H1"],
+            "atom_type": ["N", "C", "C", "N", "C", "N", "C", "C", "O", "H"],
+            "group_id": [10, 11, 12, 301],
+            "group_name": ["ALA", "GLY", "ALA", "HOH"],
+            "chain_id": ["B", "A"],
+            "molecule_type": ["protein", "protein", "water"],
+        },
+    )
+
+
+@pytest.mark.parametrize(
+    "selection, expected",
+    [
+        ("all", list(range(10))),
+        ("chain_id == 'A'", [0, 1, 2, 3, 4]),
+        ('atom_name == "CA"', [1, 4, 6]),
+        ("atom_name in ['N', 'C']", [0, 2, 3, 5, 7]),
+        ("group_name == 'ALA' and atom_type != 'C'", [0, 5]),
+        ("10 <= group_id <= 11", [0, 1, 2, 3, 4]),
+        ("group_index == 3", [8, 9]),
+        ("group_index not in [0, 3]", [3, 4, 5, 6, 7]),
+        ("molecule_type == 'water' or (chain_index == 1 and atom_name == 'C')", [2, 8, 9]),
+        ("not molecule_type == 'protein'", [8, 9]),
+        ("chain_id == 'Z'", []),
+        ("atom_index > 7", [8, 9]),
+    ],
+)
+def test_index_answers_simple_selections(index, selection, expected):
+    assert index.select(selection).tolist() == expected
+
+
+@pytest.mark.parametrize(
+    "selection",
+    ["within 3 of group_name == 'HOH'", "group_name < 'B'", "bonded_to == 3", "residue_name == 'ALA'", "atom_name =="],
+)
+def test_unsupported_selections_raise(index, selection):
+    with pytest.raises(UnsupportedSelection):
+        index.select(selection)
+
+
+def test_fast_select_falls_back_to_msm_select(index, monkeypatch):
+    calls = []
+
+    def fake_select(molsys, selection, syntax):
+        calls.append(selection)
+        return np.array([1])
+
+    monkeypatch.setattr(msm, "select", fake_select)
+
+    assert fast_select(index, "molsys", "chain_id == 'B'").tolist() == [5, 6, 7, 8, 9]
+    assert calls == []
+    assert fast_select(index, "molsys", "within 3 of group_index == 0").tolist() == [1]
+    assert fast_select(None, "molsys", "chain_id == 'B'").tolist() == [1]
+    assert fast_select(index, "molsys", [0, 1]).tolist() == [1]
+    assert len(calls) == 3
+
+
+def test_index_skips_missing_levels():
+    index = TopologyIndex(3, {"group": [0, None, 1]}, {"group_name": ["ALA", "GLY"]})
+    assert "group" not in index.level_sizes
+    with pytest.raises(UnsupportedSelection):
+        index.select("group_name == 'ALA'")
+
+
+def test_view_builds_index_once_per_molsys(monkeypatch):
+    from molsysviewer import MolSysView
+
+    gets = []
+
+    def fake_get(molsys, element="atom", **kwargs):
+        (attribute,) = kwargs
+        gets.append((element, attribute))
+        if attribute == "n_atoms":
+            return 4
+        if attribute == "group_index":
+            return [0, 0, 1, 1]
+        if attribute == "group_name":
+            return ["ALA", "HOH"]
+        raise ValueError(attribute)
+
+    monkeypatch.setattr(msm, "get", fake_get)
+    monkeypatch.setattr(msm, "select", lambda *args, **kwargs: pytest.fail("msm.select should not be called"))
+
+    view = MolSysView()
+    view._molsys = object()
+    view.atom_mask = np.ones(4, dtype=bool)
+
+    view.isolate("group_name == 'HOH'")
+    assert view.visible_atom_indices == [2, 3]
+    n_calls = len(gets)
+
+    view.hide("group_index == 1")
+    assert view.visible_atom_indices == []
+    assert len(gets) == n_calls
+
+    view._molsys = object()
+    view.show("group_name == 'ALA'")
+    assert len(gets) == 2 * n_calls
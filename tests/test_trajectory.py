@@ -0,0 +1,209 @@
+import time
+
+import molsysmt as msm
+import numpy as np
+import pytest
+
+from molsysviewer import MolSysView
+from molsysviewer._private import trajectory as trajectory_mod
+from molsysviewer._private.trajectory import ArrayFrameSource, FrameRing, MolSysMTFrameSource
+from molsysviewer.trajectory import TrajectoryPlayer
+
+
+class CountingSource(ArrayFrameSource):
+    def __init__(self, coordinates):
+        super().__init__(coordinates)
+        self.reads = []
+
+    def read(self, start, stop):
+        self.reads.append((start, stop))
+        return super().read(start, stop)
+
+
+def make_coordinates(n_frames=100, n_atoms=4):
+    return np.arange(n_frames * n_atoms * 3, dtype=np.float32).reshape(n_frames, n_atoms, 3)
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+
+def test_ring_prefetches_upcoming_chunks():
+    coordinates = make_coordinates()
+    source = CountingSource(coordinates)
+    ring = FrameRing(source, chunk_size=10, capacity=30)
+    try:
+        np.testing.assert_array_equal(ring.frame(0), coordinates[0])
+        wait_for(lambda: ring.stats["buffered_frames"] == 30)
+
+        for index in range(1, 30):
+            np.testing.assert_array_equal(ring.frame(index), coordinates[index])
+        assert ring.misses == 1
+        assert ring.hits == 29
+        assert ring.stats["hit_rate"] == pytest.approx(29 / 30)
+    finally:
+        ring.close()
+
+
+def test_ring_stays_within_capacity_and_follows_stride():
+    source = CountingSource(make_coordinates())
+    ring = FrameRing(source, chunk_size=10, capacity=30)
+    try:
+        ring.frame(95, step=-20)
+        wait_for(lambda: (50, 60) in source.reads)
+        assert ring.stats["buffered_frames"] <= 30
+        assert (80, 90) not in source.reads
+    finally:
+        ring.close()
+
+
+def test_ring_rejects_out_of_range_frames():
+    ring = FrameRing(ArrayFrameSource(make_coordinates(5)), chunk_size=2)
+    with pytest.raises(IndexError):
+        ring.frame(5)
+    ring.close()
+
+
+def test_ring_recovers_after_a_failed_read(monkeypatch):
+    class FlakySource(ArrayFrameSource):
+        failed = False
+
+        def read(self, start, stop):
+            if not self.failed:
+                self.failed = True
+                raise OSError("transient")
+            return super().read(start, stop)
+
+    coordinates = make_coordinates(20)
+    ring = FrameRing(FlakySource(coordinates), chunk_size=10, capacity=10)
+    # Sin hilo de precarga: el fallo le toca a la lectura del consumidor.
+    monkeypatch.setattr(ring, "_ensure_thread", lambda: None)
+    with pytest.raises(OSError):
+        ring.frame(1)
+    np.testing.assert_array_equal(ring.frame(1), coordinates[1])
+    ring.close()
+
+
+def test_ring_keeps_the_box_of_each_frame():
+    boxes = np.stack([np.eye(3) * (20.0 + i) for i in range(6)])
+    ring = FrameRing(ArrayFrameSource(make_coordinates(6), boxes=boxes), chunk_size=4)
+    try:
+        positions, box = ring.frame_and_box(5)
+        np.testing.assert_array_equal(positions, make_coordinates(6)[5])
+        np.testing.assert_array_equal(box, boxes[5])
+    finally:
+        ring.close()
+    ring = FrameRing(ArrayFrameSource(make_coordinates(6)), chunk_size=4)
+    assert ring.frame_and_box(1)[1] is None
+    ring.close()
+
+
+def test_molsysmt_source_reads_boxes(monkeypatch):
+    def fake_get(molsys, element, **kwargs):
+        if kwargs.get("n_structures"):
+            return 10
+        if kwargs.get("n_atoms"):
+            return 4
+        frames = np.asarray(kwargs["structure_indices"])
+        if kwargs.get("coordinates"):
+            return make_coordinates(10)[frames] / 10.0
+        if kwargs.get("box"):
+            return np.eye(3)[None] * (2.0 + frames[:, None, None])
+        raise AttributeError(kwargs)
+
+    monkeypatch.setattr(msm, "get", fake_get)
+    monkeypatch.setattr(trajectory_mod.puw, "get_value", lambda value, to_unit=None: value * 10.0, raising=False)
+
+    coordinates, boxes = MolSysMTFrameSource("traj.dcd").read(3, 5)
+    np.testing.assert_allclose(coordinates, make_coordinates(10)[3:5])
+    np.testing.assert_allclose(boxes, [np.eye(3) * 50.0, np.eye(3) * 60.0])
+
+
+@pytest.fixture
+def view_with_trajectory(monkeypatch):
+    monkeypatch.setattr(msm, "convert", lambda system, **kwargs: object())
+    monkeypatch.setattr(msm, "get", lambda molsys, element, n_atoms: 4)
+    monkeypatch.setattr(
+        "molsysviewer.loaders.load_molsysmt._serialize_molsys_payload", lambda molsys: {"atoms": {}}
+    )
+    view = MolSysView()
+    player = view.load_trajectory(make_coordinates(), topology="top.pdb", chunk_size=8, buffer_frames=32)
+    yield view, player
+    player.close()
+
+
+def test_seek_sends_one_frame_as_float32_buffer(view_with_trajectory):
+    view, player = view_with_trajectory
+
+    player.seek(-1)
+
+    msg = view._pending_messages[-1]
+    assert msg == {"op": "set_frame_coordinates", "frame": 99, "n_frames": 100, "n_atoms": 4}
+    (buffer,) = view._pending_buffers[-1]
+    np.testing.assert_array_equal(np.frombuffer(buffer, dtype="<f4").reshape(4, 3), make_coordinates()[99])
+    assert player.frame_index == 99
+
+
+def test_play_sends_frames_and_reports_stats(view_with_trajectory):
+    view, player = view_with_trajectory
+
+    player.play(fps=1000, start=0, stop=20, step=2)
+    wait_for(lambda: not player.playing)
+
+    frames = [msg["frame"] for msg in view._pending_messages if msg["op"] == "set_frame_coordinates"]
+    assert frames == list(range(0, 20, 2))
+    stats = view.stats["playback"]
+    assert stats["frames_sent"] == 10
+    assert stats["hits"] + stats["misses"] == 10
+    assert "stall_ms" in stats and "fps" in stats
+
+
+@pytest.mark.parametrize("start, stop, expected", [(95, 200, [95, 96, 97, 98, 99]), (-3, None, [97, 98, 99])])
+def test_play_range_behaves_like_a_slice(view_with_trajectory, start, stop, expected):
+    view, player = view_with_trajectory
+
+    player.play(fps=1000, start=start, stop=stop, loop=True)
+    # Con un rango fuera de la trayectoria el hilo moría antes de dar la segunda vuelta.
+    wait_for(lambda: player._sent >= 2 * len(expected))
+    player.pause()
+
+    frames = [msg["frame"] for msg in view._pending_messages if msg["op"] == "set_frame_coordinates"]
+    assert frames[: 2 * len(expected)] == expected * 2
+
+
+def test_load_trajectory_checks_atom_count(monkeypatch):
+    monkeypatch.setattr(msm, "convert", lambda system, **kwargs: object())
+    monkeypatch.setattr(msm, "get", lambda molsys, element, n_atoms: 5)
+    monkeypatch.setattr(
+        "molsysviewer.loaders.load_molsysmt._serialize_molsys_payload", lambda molsys: {"atoms": {}}
+    )
+    view = MolSysView()
+    with pytest.raises(ValueError):
+        view.load_trajectory(make_coordinates(), topology="top.pdb")
+
+
+def test_replacing_load_closes_the_player(view_with_trajectory):
+    view, player = view_with_trajectory
+
+    view.load("other.pdb")
+
+    assert view.trajectory is None
+    assert player.ring._closed
+
+
+def test_spatial_index_uses_the_box_of_the_played_frame(view_with_trajectory):
+    view, player = view_with_trajectory
+    player.close()
+    boxes = np.stack([np.eye(3) * (2000.0 + i) for i in range(100)])
+    view.trajectory = TrajectoryPlayer(view, ArrayFrameSource(make_coordinates(), boxes=boxes), chunk_size=8)
+    try:
+        view.trajectory.seek(7)
+        index = view.spatial_index()
+        assert index.periodic
+        np.testing.assert_array_equal(index.box, boxes[7])
+    finally:
+        view.trajectory.close()
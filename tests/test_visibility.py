@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from molsysviewer import MolSysView
+
+
+def make_view():
+    view = MolSysView()
+    view._molsys = object()
+    view.atom_mask = np.array([True, False, True, False])
+    return view
+
+
+def test_update_visibility_sends_mode_and_threshold():
+    view = make_view()
+    view._update_visibility_in_frontend()
+
+    msg = view._pending_messages[-1]
+    assert msg["op"] == "update_visibility"
+    assert msg["options"] == {
+        "visible_atom_indices": [0, 2],
+        "mode": "auto",
+        "subset_threshold": 0.5,
+    }
+
+
+def test_set_visibility_mode_resends_current_visibility():
+    view = make_view()
+    view.set_visibility_mode("subset")
+
+    msg = view._pending_messages[-1]
+    assert msg["options"]["mode"] == "subset"
+    assert msg["options"]["visible_atom_indices"] == [0, 2]
+
+    view.set_visibility_mode(subset_threshold=0.1)
+    assert view._pending_messages[-1]["options"]["mode"] == "auto"
+    assert view._pending_messages[-1]["options"]["subset_threshold"] == 0.1
+
+
+@pytest.mark.parametrize("kwargs", [{"mode": "hidden"}, {"subset_threshold": 1.5}])
+def test_set_visibility_mode_rejects_invalid_options(kwargs):
+    view = make_view()
+    with pytest.raises(ValueError):
+        view.set_visibility_mode(**kwargs)
+
+
+def test_visibility_event_is_recorded():
+    view = make_view()
+    view.widget._handle_custom_msg(
+        {"event": "visibility", "mode": "subset", "visible": 200, "total": 2_000_000}, []
+    )
+    assert view.stats["visibility"] == {"mode": "subset", "visible": 200, "total": 2_000_000}
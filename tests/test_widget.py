@@ -0,0 +1,38 @@
+import pytest
+
+import molsysviewer.widget as widget_mod
+
+
+def test_bundle_is_served_on_request(tmp_path, monkeypatch):
+    (tmp_path / "widget.js").write_text('import("./shapes-AAAA.js");', encoding="utf-8")
+    (tmp_path / "shapes-AAAA.js").write_text("export const x = 1;", encoding="utf-8")
+    (tmp_path / "widget.js.map").write_text("{}", encoding="utf-8")
+
+    monkeypatch.setattr(widget_mod, "_BUNDLE_DIR", tmp_path)
+    widget_mod._read_bundle.cache_clear()
+    try:
+        widget = widget_mod.MolSysViewerWidget()
+        sent = []
+        monkeypatch.setattr(widget, "send", lambda msg, buffers=None: sent.append(msg))
+
+        widget._handle_bundle_request(widget, {"event": "ready"}, [])
+        assert sent == []
+
+        widget._handle_bundle_request(widget, {"event": "request_bundle"}, [])
+        assert sent[0]["event"] == "bundle"
+        assert sent[0]["bundle_id"] == widget._bundle_id
+        assert sorted(sent[0]["modules"]) == ["shapes-AAAA.js", "widget.js"]
+    finally:
+        widget_mod._read_bundle.cache_clear()
+
+
+def test_missing_bundle_entry_is_reported(tmp_path, monkeypatch):
+    (tmp_path / "shapes-AAAA.js").write_text("export const x = 1;", encoding="utf-8")
+
+    monkeypatch.setattr(widget_mod, "_BUNDLE_DIR", tmp_path)
+    widget_mod._read_bundle.cache_clear()
+    try:
+        with pytest.raises(FileNotFoundError, match="npm run build"):
+            widget_mod.MolSysViewerWidget()
+    finally:
+        widget_mod._read_bundle.cache_clear()